@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Alter Sweep - dense parameter sweeps as .alter blocks inside one testbench
+
+A normal sweep simulates every supply at min/nom/max and every temperature
+in its own PVT directory, one farm job each; 20 vccn steps that way would be
+20 times the jobs. A dense sweep keeps one host point per group of plan
+points that differ only in the swept parameter and writes the steps into the
+host's generated testbench:
+
+    .title 0.99              <- first step (base run)
+    .param vcn=0.99
+    ...
+    .alter 1.0008            <- one block per further step
+    .param vcn=1.0008
+    .end
+
+The simulator writes one measurement file per run (primesim: sim_tx_aN.mt0,
+finesim: sim_tx#N.mt0), which is what alter extraction (alter_extraction:Yes,
+extract_alt.sh / extraction_engine.build_point_report) already reads: one
+report row per step, labelled with the alter title in the 'swp' column. The
+titles are the step values, so 'swp' is a numeric creport column.
+
+Parameters:
+- vcn: N steps from vcnmin to vcnmax (or explicit values). Host: first plan
+  point per corner/extraction/temperature/other supply levels. vsh follows
+  vcn through its expression, with the host point's min/nom/max offset.
+- temp: explicit temperature list. Host: first plan point per
+  corner/extraction/voltage. Supplies keep the host point's values (with
+  vcc_vid, the host temperature's VID levels). creport's temp column holds
+  the simulated temperature (as 'swp' does), so the measurement index and
+  the spec margins key each row on the temperature it was simulated at.
+
+prepare_dense_sweep() validates the request and switches config.cfg to alter
+extraction before the gen stage, apply_dense_sweep() rewrites the host
+testbenches after it, and extraction_engine.sweep_plan() restricts
+submission and extraction to the hosts (dense_sweep.json in the work_dir).
+"""
+
+import json
+import os
+import re
+import logging
+from typing import Dict, List, Optional
+
+from extraction_engine import load_stage_config, find_testbench, build_pvt_plan, point_directory
+
+logger = logging.getLogger(__name__)
+
+DENSE_SWEEP_FILE = 'dense_sweep.json'
+DENSE_PARAMETERS = ('vcn', 'temp')
+
+# Testbench line that sets the swept parameter (as matched by gen_tb.pl)
+PARAMETER_LINES = {
+    'vcn': re.compile(r'^\s*\.param\s+vcn\s*=', re.IGNORECASE),
+    'temp': re.compile(r'^\s*\.temp\s', re.IGNORECASE),
+}
+TITLE_LINE = re.compile(r'^\s*\.title\b', re.IGNORECASE)
+END_LINE = re.compile(r'^\s*\.end\s*$', re.IGNORECASE)
+
+
+def step_title(value: float) -> str:
+    """Alter title of a step: the value itself (no whitespace, so one creport field)."""
+    return format(value, 'g')
+
+
+def _statement(parameter: str, value: float) -> str:
+    """Testbench statement setting the swept parameter."""
+    if parameter == 'vcn':
+        return f".param vcn={step_title(value)}"
+    return f".temp {step_title(value)}"
+
+
+def dense_values(config: Dict[str, str], parameter: str, steps: Optional[int] = None,
+                 values: Optional[List] = None) -> List[float]:
+    """
+    Step values of a dense sweep.
+
+    Args:
+        config: Stage configuration from load_stage_config()
+        parameter: One of DENSE_PARAMETERS
+        steps: vcn only - number of evenly spaced steps from vcnmin to vcnmax
+        values: Explicit step values (required for temp)
+
+    Returns:
+        Distinct step values in request order (rounded to 4 decimals)
+
+    Raises:
+        ValueError: Unknown parameter, missing/invalid steps or values, fewer
+            than 2 or more than config.DENSE_SWEEP_MAX_STEPS steps
+    """
+    from config import DENSE_SWEEP_MAX_STEPS
+
+    if parameter not in DENSE_PARAMETERS:
+        raise ValueError("Unknown dense sweep parameter: {0} (use {1})".format(
+            parameter, ', '.join(DENSE_PARAMETERS)))
+
+    try:
+        if values:
+            result = [round(float(v), 4) for v in values]
+        elif parameter == 'vcn' and steps is not None:
+            steps = int(steps)
+            if steps < 2:
+                raise ValueError("A dense sweep needs at least 2 steps")
+            low, high = float(config['vcnmin']), float(config['vcnmax'])
+            result = [round(low + (high - low) * i / (steps - 1), 4) for i in range(steps)]
+        else:
+            raise ValueError("Dense {0} sweep needs {1}".format(
+                parameter, "'steps' or 'values'" if parameter == 'vcn' else "'values'"))
+    except (TypeError, KeyError) as e:
+        raise ValueError(f"Invalid dense sweep: {e}")
+
+    result = list(dict.fromkeys(result))
+    if len(result) < 2:
+        raise ValueError("A dense sweep needs at least 2 distinct values")
+    if len(result) > DENSE_SWEEP_MAX_STEPS:
+        raise ValueError(f"Dense sweep has {len(result)} steps (max {DENSE_SWEEP_MAX_STEPS})")
+    return result
+
+
+def vccn_level(config: Dict[str, str]) -> Optional[str]:
+    """Plan point key (lv1/lv2/lv3) of the vccn level, None if vccn is not swept."""
+    if config.get('supply1') == 'vccn':
+        return 'lv1'
+    if config.get('supply2') == 'vccn':
+        return 'lv2'
+    if config.get('supply3') in ('vccn', 'vccn_vcctx'):
+        return 'lv3'
+    return None
+
+
+def dense_hosts(plan: List[Dict], config: Dict[str, str], parameter: str) -> List[Dict]:
+    """
+    Plan points that carry a dense sweep: the first point (plan order) of
+    every group of points differing only in the swept parameter.
+
+    Raises:
+        ValueError: vcn sweep in a domain where vccn is not a swept supply
+    """
+    if parameter == 'vcn':
+        level = vccn_level(config)
+        if level is None:
+            raise ValueError("vccn is not a swept supply of this voltage domain")
+        others = [lv for lv in ('lv1', 'lv2', 'lv3') if lv != level]
+        key = lambda p: (p['corner'], p['extraction'], p['temp_dir']) + tuple(p[lv] for lv in others)
+    else:
+        key = lambda p: (p['corner'], p['extraction'], p['voltage'])
+
+    seen = set()
+    hosts = []
+    for point in plan:
+        if key(point) not in seen:
+            seen.add(key(point))
+            hosts.append(point)
+    return hosts
+
+
+def alter_testbench(lines: List[str], parameter: str, values: List[float]) -> List[str]:
+    """
+    Rewrite a generated testbench into a dense sweep deck.
+
+    The base run gets the first value (and its title); one .alter block per
+    further value goes before .end.
+
+    Args:
+        lines: Testbench lines (without newlines)
+        parameter: One of DENSE_PARAMETERS
+        values: Step values from dense_values()
+
+    Returns:
+        New testbench lines
+
+    Raises:
+        ValueError: If the testbench has no line setting the parameter
+    """
+    out = []
+    found = titled = False
+    for line in lines:
+        if not found and PARAMETER_LINES[parameter].match(line):
+            out.append(_statement(parameter, values[0]))
+            found = True
+        elif not titled and TITLE_LINE.match(line):
+            out.append(f".title {step_title(values[0])}")
+            titled = True
+        else:
+            out.append(line)
+
+    if not found:
+        raise ValueError("Testbench has no {0} line to sweep".format(
+            ".param vcn=" if parameter == 'vcn' else ".temp"))
+    if not titled:
+        out.insert(0, f".title {step_title(values[0])}")
+
+    alters = []
+    for value in values[1:]:
+        alters += [f".alter {step_title(value)}", _statement(parameter, value)]
+
+    ends = [i for i, line in enumerate(out) if END_LINE.match(line)]
+    if ends:
+        return out[:ends[-1]] + alters + out[ends[-1]:]
+    return out + alters + ['.end']
+
+
+def _set_cfg_values(config_path: str, values: Dict[str, str]):
+    """Set `key:value` lines of config.cfg (appended if missing)."""
+    with open(config_path, 'r') as f:
+        lines = f.readlines()
+
+    pending = dict(values)
+    for i, line in enumerate(lines):
+        key = line.split(':', 1)[0]
+        if key in pending:
+            lines[i] = f"{key}:{pending.pop(key)}\n"
+    if lines and not lines[-1].endswith('\n'):
+        lines[-1] += '\n'
+    lines.extend(f"{key}:{value}\n" for key, value in pending.items())
+
+    with open(config_path, 'w') as f:
+        f.writelines(lines)
+
+
+def load_dense_sweep(work_dir: str) -> Optional[Dict]:
+    """Dense sweep of a work_dir ({'parameter', 'values'}), None for a normal sweep."""
+    path = os.path.join(work_dir, DENSE_SWEEP_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def prepare_dense_sweep(work_dir: str, script_path: str, spec: Dict) -> Dict:
+    """
+    Validate a dense sweep request and set the work_dir up for it (before gen).
+
+    Switches config.cfg to alter extraction (alter_string# long enough for
+    the step titles) and writes dense_sweep.json.
+
+    Args:
+        work_dir: Working directory (config.cfg and template/)
+        script_path: Path to ver03 scripts (PaiHoExecutor.script_path)
+        spec: Request: {'parameter': 'vcn'|'temp', 'steps': N, 'values': [...]}
+
+    Returns:
+        Dict with keys: parameter, values, jobs (host points), points (plan size)
+
+    Raises:
+        ValueError: Invalid request, post-layout sweep, shell engines, or a
+            template without the swept parameter
+    """
+    from config import SUBMISSION_ENGINE, EXTRACTION_ENGINE
+
+    if SUBMISSION_ENGINE != 'python' or EXTRACTION_ENGINE != 'python':
+        raise ValueError("Dense sweeps need the Python submission and extraction engines")
+    if not isinstance(spec, dict):
+        raise ValueError("dense_sweep must be an object")
+
+    config = load_stage_config(work_dir, script_path)
+    if config.get('mode', 'prelay') != 'prelay':
+        raise ValueError(f"Dense sweeps are prelayout only (mode: {config.get('mode')})")
+
+    parameter = spec.get('parameter')
+    values = dense_values(config, parameter, spec.get('steps'), spec.get('values'))
+
+    testbench = find_testbench(work_dir)
+    if not testbench:
+        raise ValueError(f"No testbench found in {work_dir}/template")
+    with open(os.path.join(work_dir, 'template', f"{testbench}.sp"), 'r', errors='replace') as f:
+        alter_testbench(f.read().splitlines(), parameter, values)
+
+    plan = build_pvt_plan(config)
+    hosts = dense_hosts(plan, config, parameter)
+
+    try:
+        swpl = int(config.get('alt_ext_n', '0') or 0)
+    except ValueError:
+        swpl = 0
+    _set_cfg_values(os.path.join(work_dir, 'config.cfg'), {
+        'alter_extraction': 'Yes',
+        'alter_string#': str(max([swpl] + [len(step_title(v)) for v in values]))
+    })
+
+    with open(os.path.join(work_dir, DENSE_SWEEP_FILE), 'w') as f:
+        json.dump({'parameter': parameter, 'values': values}, f)
+
+    return {'parameter': parameter, 'values': values, 'jobs': len(hosts), 'points': len(plan)}
+
+
+def apply_dense_sweep(work_dir: str, script_path: str) -> int:
+    """
+    Write the .alter steps into the host testbenches (after the gen stage).
+
+    Args:
+        work_dir: Working directory
+        script_path: Path to ver03 scripts (PaiHoExecutor.script_path)
+
+    Returns:
+        Number of testbenches rewritten (0 for a normal sweep)
+    """
+    sweep = load_dense_sweep(work_dir)
+    if sweep is None:
+        return 0
+
+    config = load_stage_config(work_dir, script_path)
+    testbench = find_testbench(work_dir)
+    hosts = dense_hosts(build_pvt_plan(config), config, sweep['parameter'])
+
+    rewritten = 0
+    for point in hosts:
+        path = os.path.join(point_directory(work_dir, point), f"{testbench}.sp")
+        if not os.path.exists(path):
+            logger.warning(f"  ⚠️ {point['name']}: no generated testbench, not swept")
+            continue
+        with open(path, 'r', errors='replace') as f:
+            lines = alter_testbench(f.read().splitlines(), sweep['parameter'], sweep['values'])
+        with open(path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        rewritten += 1
+
+    logger.info(f"  ✓ Dense {sweep['parameter']} sweep: {len(sweep['values'])} steps "
+                f"in {rewritten} testbenches")
+    return rewritten
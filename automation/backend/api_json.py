@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+API JSON - compact serialisation for HTTP responses
+
+Handlers used to send json.dumps(..., indent=2): for a results response
+about a third of the bytes are indentation. to_json() writes compact JSON
+(no whitespace) and can round floats to a number of significant digits, so
+creport values like 7467.68798 become 7467.69 when full precision is not
+needed. Gzip is negotiated by Tornado (compress_response, config.API_GZIP).
+
+Run as a script to measure a results payload:
+    python api_json.py [creport.txt] [--precision N]
+"""
+
+import json
+from typing import Optional
+
+from config import API_JSON_INDENT, API_FLOAT_DIGITS
+
+MAX_FLOAT_DIGITS = 17  # repr() precision of a float64
+
+
+def round_floats(obj, digits: int):
+    """
+    Copy of a JSON-serialisable object with floats rounded to significant digits.
+
+    Args:
+        obj: dict / list / tuple / scalar
+        digits: Significant digits to keep
+
+    Returns:
+        Same structure (tuples become lists), other values unchanged
+    """
+    fmt = '%.{0}g'.format(digits)
+
+    def walk(value):
+        if isinstance(value, float):
+            return float(fmt % value)
+        if isinstance(value, dict):
+            return dict((k, walk(v)) for k, v in value.items())
+        if isinstance(value, (list, tuple)):
+            return [walk(v) for v in value]
+        return value
+
+    return walk(obj)
+
+
+def parse_precision(text: Optional[str]) -> Optional[int]:
+    """
+    Parse a ?precision= argument.
+
+    Returns:
+        Significant digits, or None when not given
+
+    Raises:
+        ValueError: If not an integer between 1 and MAX_FLOAT_DIGITS
+    """
+    if text is None or text == '':
+        return None
+    try:
+        digits = int(text)
+    except ValueError:
+        digits = 0
+    if not 1 <= digits <= MAX_FLOAT_DIGITS:
+        raise ValueError("precision must be an integer between 1 and {0}".format(MAX_FLOAT_DIGITS))
+    return digits
+
+
+def to_json(obj, precision: Optional[int] = None, indent: Optional[int] = API_JSON_INDENT) -> str:
+    """
+    Serialise an API response.
+
+    Args:
+        obj: Response object
+        precision: Significant digits for floats (None = API_FLOAT_DIGITS)
+        indent: Indentation (None = compact)
+
+    Returns:
+        JSON text
+    """
+    digits = precision if precision is not None else API_FLOAT_DIGITS
+    if digits is not None and digits < MAX_FLOAT_DIGITS:
+        obj = round_floats(obj, digits)
+    if indent is None:
+        return json.dumps(obj, separators=(',', ':'))
+    return json.dumps(obj, indent=indent)
+
+
+if __name__ == "__main__":
+    import gzip
+    import os
+    import sys
+    import time
+
+    from config import GPIO_ROOT
+    from results_parser import parse_creport, analyze_results
+
+    args = sys.argv[1:]
+    digits = 6
+    if '--precision' in args:
+        i = args.index('--precision')
+        digits = parse_precision(args[i + 1])
+        del args[i:i + 2]
+    creport = args[0] if args else str(GPIO_ROOT / "1p1v" / "00bkp_202510301443" / "report" / "creport.txt")
+
+    parsed = parse_creport(creport)
+    analysis = analyze_results(parsed)
+    headers = parsed['headers']
+    payload = {
+        'metadata': parsed['metadata'],
+        'headers': headers,
+        'rows': [{'values': [r.get(h, '') for h in headers], 'status': r['_status'],
+                  'failures': r['_failures']} for r in analysis['rows_with_status']],
+        'total_corners': parsed['total_corners']
+    }
+
+    def measure(label, encode, repeat=5):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            body = encode(payload)
+        seconds = (time.perf_counter() - start) / repeat
+        raw = body.encode('utf-8')
+        start = time.perf_counter()
+        packed = gzip.compress(raw, 6)
+        gzip_seconds = time.perf_counter() - start
+        print("  {0:<26} {1:>10,} B  gzip {2:>9,} B   encode {3:7.1f} ms  gzip {4:6.1f} ms".format(
+            label, len(raw), len(packed), seconds * 1000, gzip_seconds * 1000))
+
+    print("📊 {0}: {1} rows x {2} columns".format(os.path.basename(os.path.dirname(os.path.dirname(creport))),
+                                                 len(payload['rows']), len(headers)))
+    measure("indent=2 (previous)", lambda o: json.dumps(o, indent=2))
+    measure("compact", lambda o: to_json(o, indent=None))
+    measure("compact, {0} digits".format(digits), lambda o: to_json(o, precision=digits, indent=None))
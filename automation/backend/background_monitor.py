@@ -5,6 +5,12 @@ Background Monitoring Service for Simulations
 Periodically checks active simulations and triggers actions based on state.
 Uses Tornado IOLoop PeriodicCallback for non-blocking background tasks.
 Phase 2B: Added auto-extraction with threading support.
+Phase 3: Incremental per-job extraction while the sweep is still running.
+Sweeps submitted with stop_on_failure cancel their queued jobs on the first
+job error or spec violation.
+Canary sweeps release the rest of the plan once the canary job has results.
+Failed jobs are classified from their logs; transient failures are resubmitted.
+Canary releases and retries already queued skip simulations cancelled meanwhile.
 """
 
 import tornado.ioloop
@@ -14,7 +20,12 @@ import time
 import traceback
 import threading
 import os
-from netbatch_monitor import query_netbatch_status, get_summary_stats
+from netbatch_monitor import query_netbatch_status, get_summary_stats, remove_netbatch_jobs, remove_netbatch_jobs_batched
+from results_store import ResultsStore
+from stage_executor import get_stage_executor
+from stage_pipeline import StagePipeline, STAGE_STATES, STAGE_NAMES, run_pipeline_stage
+from waveform_archive import WaveformArchiveStore, queue_archival
+from measurement_index import queue_indexing, queue_backfill
 
 
 class BackgroundMonitor(object):
@@ -27,6 +38,16 @@ class BackgroundMonitor(object):
     - Broadcasts real-time updates via WebSocket
     - Detects completion and marks simulations as ready for extraction
     - Phase 2B: Auto-triggers extraction in background thread
+    - Phase 3: Extracts each job as soon as it completes (partial creport)
+    - Stage work runs on the shared StageExecutor (per-stage concurrency limits)
+    - ext/srt/bkp are checkpointed; interrupted pipelines resume on start()
+    - Waveforms of finished simulations are archived in the background
+    - stop_on_failure sweeps: queued jobs are cancelled on the first job
+      error or spec violation (sign-off failures surface early)
+    - Canary sweeps: the remaining points are submitted only after the
+      canary job produced a parseable measurement file
+    - Failed jobs get a failure class (failure_classifier.py); out-of-memory,
+      license and host failures are resubmitted within a retry budget
     
     Usage:
         monitor = BackgroundMonitor(db_path='automation/webapp.db', check_interval=3000)
@@ -51,6 +72,12 @@ class BackgroundMonitor(object):
         self.periodic_callback = None
         self.is_running = False
         self.extraction_threads = {}  # Track active extraction threads
+        self.incremental_tasks = {}  # Track queued/active per-job extraction futures
+        self.canary_tasks = {}  # Track canary verification/release futures
+        self.stop_tasks = {}  # Track stop-on-failure cancellation futures
+        self.retry_tasks = {}  # Track classification/resubmission futures
+        self.results_store = ResultsStore(db_path)
+        self.pipeline = StagePipeline(db_path)
         
         print("[BackgroundMonitor] Initialized (interval: {0}ms, auto_extract: {1})".format(
             check_interval, auto_extract))
@@ -58,7 +85,8 @@ class BackgroundMonitor(object):
     def start(self):
         """
         Start periodic monitoring.
-        Creates PeriodicCallback and starts it in the Tornado IOLoop.
+        Creates PeriodicCallback and starts it in the Tornado IOLoop, then
+        resumes stage pipelines interrupted by a previous server shutdown.
         """
         if self.is_running:
             print("[BackgroundMonitor] Already running")
@@ -72,6 +100,10 @@ class BackgroundMonitor(object):
         self.is_running = True
         
         print("[BackgroundMonitor] Started (checking every {0}ms)".format(self.check_interval))
+        
+        # Continue ext/srt/bkp pipelines interrupted by a restart
+        if self.auto_extract:
+            self.resume_interrupted_pipelines()
     
     def stop(self):
         """
@@ -199,7 +231,7 @@ class BackgroundMonitor(object):
             c = conn.cursor()
             
             c.execute('''
-                SELECT sim_id, netbatch_job_ids, work_dir, state, total_jobs, username
+                SELECT sim_id, netbatch_job_ids, work_dir, state, total_jobs, username, stop_on_failure, canary
                 FROM simulations
                 WHERE state IN ('submitted', 'running')
             ''')
@@ -222,13 +254,16 @@ class BackgroundMonitor(object):
                 total_jobs = row['total_jobs']
                 username = row['username']
                 
-                self.check_simulation(sim_id, job_ids_json, work_dir, state, total_jobs, username)
+                self.check_simulation(sim_id, job_ids_json, work_dir, state, total_jobs, username,
+                                      stop_on_failure=bool(row['stop_on_failure']),
+                                      canary=row['canary'])
         
         except Exception as e:
             print("[BackgroundMonitor] Error in check_all_simulations: {0}".format(e))
             traceback.print_exc()
     
-    def check_simulation(self, sim_id, job_ids_json, work_dir, state, total_jobs, username):
+    def check_simulation(self, sim_id, job_ids_json, work_dir, state, total_jobs, username,
+                         stop_on_failure=False, canary=None):
         """
         Check single simulation status using improved job tracking.
         
@@ -239,6 +274,8 @@ class BackgroundMonitor(object):
             state (str): Current simulation state
             total_jobs (int): Total number of jobs
             username (str): User who submitted simulation
+            stop_on_failure (bool): Cancel queued jobs on the first job error
+            canary (str): Canary state ('pending' while only the canary job is submitted)
         """
         try:
             # Import the new tracking function
@@ -275,6 +312,28 @@ class BackgroundMonitor(object):
             print("[BackgroundMonitor] Status for {0}: completed={1}, running={2}, waiting={3}, errors={4}".format(
                 sim_id, stats['completed'], stats['running'], stats['waiting'], stats['errors']))
             
+            # Transient failures go back to the queue instead of failing the sweep
+            if stats['errors'] > 0 or stats['retrying'] > 0:
+                retried = self.retry_failed_jobs(sim_id, work_dir)
+                if retried:
+                    stats['errors'] -= retried
+                    stats['waiting'] += retried
+                    stats['retrying'] += retried
+                    stats['all_jobs_finished'] = False
+            
+            # Canary run: the sweep is not finished until the rest is released
+            if canary == 'pending':
+                if stats.get('all_jobs_finished', False):
+                    self.trigger_canary_release(sim_id, work_dir)
+                elif state == 'submitted' and stats['running'] > 0:
+                    self._set_state(sim_id, 'running')
+                return
+            
+            # Early termination: the first failed job cancels everything still queued
+            # (counted as cancelled by the poll after the 'cxl' task recorded them)
+            if stop_on_failure and stats['errors'] > 0 and stats['waiting'] > 0:
+                self.stop_queued_jobs(sim_id, "{0} job(s) failed".format(stats['errors']))
+            
             # Update database
             conn = sqlite3.connect(self.db_path)
             c = conn.cursor()
@@ -300,11 +359,11 @@ class BackgroundMonitor(object):
             # Check if all jobs finished (may include errors)
             if stats.get('all_jobs_finished', False):
                 if state == 'submitted' or state == 'running':
-                    # Determine final state based on errors
-                    if stats['errors'] > 0:
+                    # Determine final state based on errors (or jobs cancelled by stop_on_failure)
+                    if stats['errors'] > 0 or stats['cancelled'] > 0:
                         new_state = 'failed'
-                        print("[BackgroundMonitor] Simulation failed: {0} ({1} completed, {2} errors)".format(
-                            sim_id, stats['completed'], stats['errors']))
+                        print("[BackgroundMonitor] Simulation failed: {0} ({1} completed, {2} errors, {3} cancelled)".format(
+                            sim_id, stats['completed'], stats['errors'], stats['cancelled']))
                     else:
                         new_state = 'completed'
                         print("[BackgroundMonitor] Simulation completed: {0}".format(sim_id))
@@ -335,6 +394,10 @@ class BackgroundMonitor(object):
                 else:
                     new_state = state
             else:
+                # Phase 3: Extract jobs that already completed
+                if self.auto_extract and stats['completed'] > 0:
+                    self.trigger_incremental_extraction(sim_id, work_dir)
+                
                 # Jobs still running or waiting
                 if state == 'submitted':
                     c.execute('''
@@ -359,6 +422,7 @@ class BackgroundMonitor(object):
                 'jobs_running': stats['running'],
                 'jobs_waiting': stats['waiting'],
                 'jobs_errors': stats['errors'],
+                'jobs_cancelled': stats['cancelled'],
                 'progress_pct': stats['progress_pct'],
                 'all_complete': stats['all_complete']
             }
@@ -381,6 +445,8 @@ class BackgroundMonitor(object):
         Trigger extraction for completed simulation.
         
         Phase 2B: Run extraction in background thread to avoid blocking IOLoop.
+        The thread only sequences the stages; the ext/srt/bkp work itself is
+        queued on the shared StageExecutor, so concurrent sweeps are throttled.
         
         Args:
             sim_id (str): Simulation ID
@@ -395,6 +461,9 @@ class BackgroundMonitor(object):
         
         print("[BackgroundMonitor] AUTO-EXTRACTION: Starting for {0}".format(sim_id))
         
+        # Persist the pipeline before the thread starts so a restart can resume it
+        self.pipeline.create(sim_id)
+        
         # Start extraction in background thread
         thread = threading.Thread(
             target=self._run_extraction,
@@ -406,88 +475,651 @@ class BackgroundMonitor(object):
         
         self.extraction_threads[sim_id] = thread
     
-    def _run_extraction(self, sim_id, work_dir):
+    def _set_state(self, sim_id, state):
+        """Set the state of a simulation."""
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute('UPDATE simulations SET state = ? WHERE sim_id = ?', (state, sim_id))
+        conn.commit()
+        conn.close()
+    
+    def trigger_canary_release(self, sim_id, work_dir):
         """
-        Run extraction stages in background thread.
+        Verify a finished canary job and submit the rest of its sweep.
         
-        Phase 2B: Full implementation with progress tracking.
+        Queued on the StageExecutor 'run' pool; at most one per simulation.
+        
+        Args:
+            sim_id (str): Simulation ID
+            work_dir (str): Working directory path
+        """
+        task = self.canary_tasks.get(sim_id)
+        if task and not task.done():
+            return
+        
+        print("[BackgroundMonitor] CANARY: job finished for {0}, verifying results".format(sim_id))
+        
+        self.canary_tasks[sim_id] = get_stage_executor().submit(
+            'run', self._release_after_canary, sim_id, work_dir,
+            label="{0} (canary)".format(sim_id))
+    
+    def _release_after_canary(self, sim_id, work_dir):
+        """
+        Check the canary's measurement file, then submit or abandon the sweep
+        (runs on a StageExecutor 'run' worker).
         
         Args:
             sim_id (str): Simulation ID
             work_dir (str): Working directory path
         """
-        from simulation import run_extraction_stage, run_sorting_stage, run_backup_stage
+        from main_tornado import insert_job_mappings
+        from paiho_executor import PaiHoExecutor
+        from simulation import run_submission_stage
+        from submission_engine import check_canary, read_job_map
         from websocket_handler import SimulationWebSocket
+        from config import REPO_ROOT
         
         try:
-            # Get simulation details including project and voltage_domain
             conn = sqlite3.connect(self.db_path)
             conn.row_factory = sqlite3.Row
             c = conn.cursor()
-            c.execute('SELECT * FROM simulations WHERE sim_id = ?', (sim_id,))
-            sim = dict(c.fetchone())
+            c.execute('SELECT project, voltage_domain, submit_order, state FROM simulations WHERE sim_id = ?', (sim_id,))
+            sim = c.fetchone()
+            c.execute('SELECT job_id, directory_path FROM job_tracking WHERE sim_id = ?', (sim_id,))
+            tracked = dict((row['job_id'], row['directory_path']) for row in c.fetchall())
+            conn.close()
+            if sim['state'] == 'cancelled':
+                return
             
-            project = sim['project']
-            voltage_domain = sim['voltage_domain']
+            script_path = str(PaiHoExecutor(project_root=str(REPO_ROOT), project=sim['project'],
+                                            voltage_domain=sim['voltage_domain']).script_path)
+            job_map = read_job_map(work_dir) or []
+            canary_dir = job_map[0]['directory_path'] if job_map else list(tracked.values())[0]
+            verdict = check_canary(work_dir, script_path, canary_dir)
+            
+            if not verdict['ok']:
+                self._fail_canary(sim_id, "Canary failed: {0}".format(verdict['reason']), verdict['log_tail'])
+                return
             
-            # Update state to extracting
-            c.execute('UPDATE simulations SET state = ? WHERE sim_id = ?', ('extracting', sim_id))
+            # A release interrupted by a restart may already have submitted the rest
+            new_jobs = [job for job in job_map if job['job_id'] not in tracked]
+            if not new_jobs:
+                print("[BackgroundMonitor] CANARY: ✓ {0} passed, submitting the remaining points".format(sim_id))
+                job_log_path = run_submission_stage(work_dir, project=sim['project'],
+                                                    voltage_domain=sim['voltage_domain'],
+                                                    order=sim['submit_order'], part='rest')
+                if not job_log_path:
+                    self._fail_canary(sim_id, "Canary passed but the remaining points could not be submitted", None)
+                    return
+                new_jobs = [job for job in read_job_map(work_dir) if job['job_id'] not in tracked]
+            
+            insert_job_mappings(sim_id, [(job['job_id'], {
+                'path': job['directory_path'],
+                'corner': job['corner'],
+                'temperature': job['temperature'],
+                'voltage': job['voltage']
+            }) for job in new_jobs])
+            
+            job_ids = list(tracked) + [job['job_id'] for job in new_jobs]
+            conn = sqlite3.connect(self.db_path)
+            c = conn.cursor()
+            c.execute('''
+                UPDATE simulations SET
+                    canary = 'passed',
+                    netbatch_job_ids = ?,
+                    total_jobs = ?,
+                    state = 'running'
+                WHERE sim_id = ? AND state != 'cancelled'
+            ''', (json.dumps(job_ids), len(job_ids), sim_id))
+            released = c.rowcount > 0
             conn.commit()
             conn.close()
             
-            # Broadcast state change
+            if not released:
+                # Cancelled while the rest was being submitted
+                from main_tornado import cancel_tracked_jobs
+                cancel_tracked_jobs([sim_id])
+                return
+            
             SimulationWebSocket.broadcast_update(sim_id, {
                 'sim_id': sim_id,
-                'state': 'extracting',
-                'extraction_stage': 'extraction',
-                'message': 'Extracting results from .mt0 files...'
+                'state': 'running',
+                'canary': 'passed',
+                'total_jobs': len(job_ids),
+                'message': 'Canary passed: {0} remaining jobs submitted'.format(len(new_jobs))
             })
+            print("[BackgroundMonitor] CANARY: {0} released ({1} jobs)".format(sim_id, len(new_jobs)))
+        
+        except Exception as e:
+            print("[BackgroundMonitor] CANARY: [{0}] ❌ FAILED: {1}".format(sim_id, e))
+            traceback.print_exc()
+    
+    def _fail_canary(self, sim_id, reason, log_tail):
+        """
+        Record a failed canary and fail the simulation without submitting the rest.
+        
+        Args:
+            sim_id (str): Simulation ID
+            reason (str): Failure reason
+            log_tail (str): Tail of the canary's simulator log (or None)
+        """
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute('''
+            UPDATE simulations SET canary = 'failed', canary_log = ?
+            WHERE sim_id = ?
+        ''', (log_tail, sim_id))
+        conn.commit()
+        conn.close()
+        
+        self._mark_as_failed(sim_id, reason)
+        
+        from websocket_handler import SimulationWebSocket
+        SimulationWebSocket.broadcast_update(sim_id, {
+            'sim_id': sim_id,
+            'canary': 'failed',
+            'canary_log': log_tail
+        })
+    
+    def retry_failed_jobs(self, sim_id, work_dir):
+        """
+        Hand newly failed jobs to a retry task on the StageExecutor 'run' pool.
+        
+        The jobs are set to 'retrying' (counted as waiting; a cancel releases
+        them) and _retry_jobs() classifies them, moves each failed attempt's
+        files to attempt_{n}/ and resubmits the transient ones off the IOLoop.
+        _record_retries() writes the outcome back on the IOLoop: every failed
+        job gets failure_class/failure_detail, resubmitted jobs their new job
+        ID. Out-of-memory, license and host failures are resubmitted while the
+        job (RETRY_MAX_ATTEMPTS) and the sweep (RETRY_SWEEP_BUDGET) have
+        retries left; out-of-memory retries ask for RETRY_MEM_FACTOR times the
+        memory class. At most one retry task per simulation is in flight.
+        
+        Args:
+            sim_id (str): Simulation ID
+            work_dir (str): Working directory path
+            
+        Returns:
+            int: Number of 'error' jobs handed to the retry task (now 'retrying')
+        """
+        task = self.retry_tasks.get(sim_id)
+        if task and not task.done():
+            return 0
+        
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        c = conn.cursor()
+        # 'retrying' without a task in flight: left behind by a restart
+        c.execute('''
+            SELECT job_id, directory_path, attempts, memory_gb, status FROM job_tracking
+            WHERE sim_id = ? AND status IN ('error', 'retrying') AND failure_class IS NULL
+        ''', (sim_id,))
+        jobs = [dict(row) for row in c.fetchall()]
+        if not jobs:
+            conn.close()
+            return 0
+        
+        c.execute('SELECT COALESCE(SUM(attempts - 1), 0) FROM job_tracking WHERE sim_id = ?', (sim_id,))
+        used = c.fetchone()[0]
+        c.execute('SELECT nb_memory FROM simulations WHERE sim_id = ?', (sim_id,))
+        row = c.fetchone()
+        base_memory = (row[0] if row else None) or 2
+        c.executemany('''
+            UPDATE job_tracking SET status = 'retrying'
+            WHERE sim_id = ? AND job_id = ?
+        ''', [(sim_id, job['job_id']) for job in jobs])
+        conn.commit()
+        conn.close()
+        
+        task = get_stage_executor().submit('run', self._retry_jobs, sim_id, work_dir, jobs, used, base_memory,
+                                           label="{0} (retry)".format(sim_id))
+        self.retry_tasks[sim_id] = task
+        tornado.ioloop.IOLoop.current().add_future(task, lambda future: self._record_retries(sim_id, jobs, future))
+        return sum(1 for job in jobs if job['status'] == 'error')
+    
+    def _job_status(self, sim_id, job_id):
+        """Current job_tracking status of a job (None if it is gone)."""
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute('SELECT status FROM job_tracking WHERE sim_id = ? AND job_id = ?', (sim_id, job_id))
+        row = c.fetchone()
+        conn.close()
+        return row[0] if row else None
+    
+    def _retry_jobs(self, sim_id, work_dir, jobs, used, base_memory):
+        """
+        Classify failed jobs, archive and resubmit the transient ones
+        (runs on a StageExecutor 'run' worker).
+        
+        Jobs cancelled in the meantime (no longer 'retrying') are classified
+        but not resubmitted.
+        
+        Args:
+            sim_id (str): Simulation ID
+            work_dir (str): Working directory path
+            jobs (list): job_tracking rows (job_id, directory_path, attempts, memory_gb, status)
+            used (int): Resubmissions the sweep has already spent
+            base_memory (int): Memory class of the sweep in GB
+            
+        Returns:
+            list: One dict per job (job_id, attempt, failure_class, failure_detail,
+                memory_gb, new_job_id - None unless resubmitted)
+        """
+        from config import AUTO_RETRY, RETRY_MAX_ATTEMPTS, RETRY_SWEEP_BUDGET, RETRY_MEM_FACTOR, RETRY_MAX_MEM_GB
+        from config import REPO_ROOT
+        from extraction_engine import find_testbench
+        from failure_classifier import classify_failure
+        from paiho_executor import PaiHoExecutor
+        from submission_engine import archive_attempt, resubmit_point, replace_job_id
+        
+        testbench = find_testbench(work_dir) or 'sim_tx'
+        script_path = None
+        
+        outcomes = []
+        for job in jobs:
+            verdict = classify_failure(job['directory_path'], testbench)
+            attempts = job['attempts'] or 1
+            memory = job['memory_gb']
+            detail = verdict['detail']
+            retry = (AUTO_RETRY and verdict['transient'] and attempts < RETRY_MAX_ATTEMPTS
+                     and used < RETRY_SWEEP_BUDGET and self._job_status(sim_id, job['job_id']) == 'retrying')
+            
+            if retry and verdict['class'] == 'oom':
+                current = memory or base_memory
+                memory = min(int(current * RETRY_MEM_FACTOR), RETRY_MAX_MEM_GB)
+                if memory <= current:
+                    retry = False
+                    detail += " (already at {0}G)".format(current)
             
-            print("[AUTO-EXTRACT] [{0}] Stage 1/3: Running extraction...".format(sim_id))
-            ext_result = run_extraction_stage(work_dir, project=project, voltage_domain=voltage_domain)
+            if retry:
+                try:
+                    archive_attempt(job['directory_path'], testbench, attempts)
+                except OSError as e:
+                    print("[BackgroundMonitor] ⚠️  Could not archive attempt {0} of job {1}: {2}".format(
+                        attempts, job['job_id'], e))
+                    retry = False
             
-            if not ext_result:
-                raise Exception("Extraction stage failed")
+            new_id = None
+            if retry:
+                used += 1
+                if script_path is None:
+                    conn = sqlite3.connect(self.db_path)
+                    c = conn.cursor()
+                    c.execute('SELECT project, voltage_domain FROM simulations WHERE sim_id = ?', (sim_id,))
+                    project, voltage_domain = c.fetchone()
+                    conn.close()
+                    script_path = str(PaiHoExecutor(project_root=str(REPO_ROOT), project=project,
+                                                    voltage_domain=voltage_domain).script_path)
+                new_id = resubmit_point(work_dir, script_path, job['directory_path'], mem=memory)
+                if new_id is None:
+                    detail += " (resubmission failed)"
+                else:
+                    replace_job_id(work_dir, job['job_id'], new_id)
+            
+            outcomes.append({'job_id': job['job_id'], 'attempt': attempts, 'failure_class': verdict['class'],
+                             'failure_detail': detail, 'memory_gb': memory, 'new_job_id': new_id})
+        return outcomes
+    
+    def _record_retries(self, sim_id, jobs, future):
+        """
+        Write the outcome of a retry task to job_tracking (IOLoop callback).
+        
+        A resubmitted job whose row is no longer 'retrying' (the simulation was
+        cancelled while nbjob ran) is removed again on the 'cxl' pool.
+        
+        Args:
+            sim_id (str): Simulation ID
+            jobs (list): The job_tracking rows handed to the task
+            future (Future): The finished _retry_jobs() task
+        """
+        from websocket_handler import SimulationWebSocket
+        
+        try:
+            outcomes = future.result()
+        except Exception as e:
+            print("[BackgroundMonitor] RETRY: [{0}] ❌ FAILED: {1}".format(sim_id, e))
+            traceback.print_exc()
+            outcomes = [{'job_id': job['job_id'], 'attempt': job['attempts'] or 1, 'failure_class': 'unknown',
+                         'failure_detail': "Retry failed: {0}".format(e), 'memory_gb': job['memory_gb'],
+                         'new_job_id': None} for job in jobs]
+        
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        replaced = {}
+        stale = []
+        for outcome in outcomes:
+            job_id, new_id = outcome['job_id'], outcome['new_job_id']
+            if new_id is None:
+                c.execute('''
+                    UPDATE job_tracking SET status = 'error', failure_class = ?, failure_detail = ?, memory_gb = ?
+                    WHERE sim_id = ? AND job_id = ? AND status = 'retrying'
+                ''', (outcome['failure_class'], outcome['failure_detail'], outcome['memory_gb'], sim_id, job_id))
+            else:
+                c.execute('SELECT retry_history FROM job_tracking WHERE sim_id = ? AND job_id = ?', (sim_id, job_id))
+                row = c.fetchone()
+                history = json.loads((row[0] if row else None) or '[]')
+                history.append(dict((k, outcome[k]) for k in ('attempt', 'job_id', 'failure_class',
+                                                               'failure_detail', 'memory_gb')))
+                c.execute('''
+                    UPDATE job_tracking SET
+                        job_id = ?, status = 'waiting', attempts = attempts + 1, memory_gb = ?,
+                        failure_class = NULL, failure_detail = NULL, retry_history = ?,
+                        last_checked = CURRENT_TIMESTAMP
+                    WHERE sim_id = ? AND job_id = ? AND status = 'retrying'
+                ''', (new_id, outcome['memory_gb'], json.dumps(history), sim_id, job_id))
+                if c.rowcount:
+                    replaced[job_id] = new_id
+                else:
+                    stale.append(new_id)
             
-            # Update to sorting
+            print("[BackgroundMonitor] Job {0} of {1} failed: {2} ({3}){4}".format(
+                job_id, sim_id, outcome['failure_class'], outcome['failure_detail'],
+                " - resubmitted as {0}".format(new_id) if new_id is not None else ''))
+        
+        if replaced:
+            c.execute('SELECT netbatch_job_ids FROM simulations WHERE sim_id = ?', (sim_id,))
+            job_ids = [replaced.get(job_id, job_id) for job_id in json.loads(c.fetchone()[0] or '[]')]
+            c.execute('UPDATE simulations SET netbatch_job_ids = ? WHERE sim_id = ?',
+                      (json.dumps(job_ids), sim_id))
+        conn.commit()
+        conn.close()
+        
+        if stale:
+            # Cancelled while nbjob ran
+            get_stage_executor().submit('cxl', remove_netbatch_jobs, stale, label="{0} (retry)".format(sim_id))
+        
+        if replaced:
+            SimulationWebSocket.broadcast_update(sim_id, {
+                'sim_id': sim_id,
+                'jobs_retried': len(replaced),
+                'message': 'Resubmitted {0} job(s) after transient failures ({1})'.format(
+                    len(replaced), ', '.join(sorted(set(o['failure_class'] for o in outcomes
+                                                        if o['job_id'] in replaced))))
+            })
+        print("[BackgroundMonitor] RETRY: {0} of {1} failed jobs resubmitted for {2}".format(
+            len(replaced), len(outcomes), sim_id))
+    
+    def trigger_incremental_extraction(self, sim_id, work_dir):
+        """
+        Extract completed jobs that are not yet in the results store.
+        
+        Phase 3: Queued on the StageExecutor 'ext' pool; at most one batch per
+        simulation. Jobs completing while a batch is queued or running are
+        picked up on the next poll.
+        
+        Args:
+            sim_id (str): Simulation ID
+            work_dir (str): Working directory path
+        """
+        from config import EXTRACTION_ENGINE, INCREMENTAL_EXTRACTION
+        
+        if not INCREMENTAL_EXTRACTION or EXTRACTION_ENGINE != 'python':
+            return
+        
+        task = self.incremental_tasks.get(sim_id)
+        if task and not task.done():
+            return
+        
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute('''
+            SELECT directory_path FROM job_tracking
+            WHERE sim_id = ? AND status = 'completed'
+        ''', (sim_id,))
+        completed_paths = [row[0] for row in c.fetchall()]
+        conn.close()
+        
+        recorded = self.results_store.get_recorded_paths(sim_id)
+        pending = [path for path in completed_paths if path not in recorded]
+        
+        if not pending:
+            return
+        
+        print("[BackgroundMonitor] INCREMENTAL-EXTRACTION: {0} new jobs for {1}".format(
+            len(pending), sim_id))
+        
+        self.incremental_tasks[sim_id] = get_stage_executor().submit(
+            'ext', self._run_incremental_extraction, sim_id, work_dir, pending,
+            label="{0} (incremental)".format(sim_id))
+    
+    def _run_incremental_extraction(self, sim_id, work_dir, directory_paths):
+        """
+        Extract a batch of completed jobs (runs on a StageExecutor 'ext' worker).
+        
+        Args:
+            sim_id (str): Simulation ID
+            work_dir (str): Working directory path
+            directory_paths (list): Output directories of the completed jobs
+        """
+        from simulation import run_incremental_extraction
+        from websocket_handler import SimulationWebSocket
+        
+        try:
             conn = sqlite3.connect(self.db_path)
             c = conn.cursor()
-            c.execute('UPDATE simulations SET state = ? WHERE sim_id = ?', ('sorting', sim_id))
-            conn.commit()
+            c.execute('SELECT project, voltage_domain FROM simulations WHERE sim_id = ?', (sim_id,))
+            project, voltage_domain = c.fetchone()
             conn.close()
             
+            results = run_incremental_extraction(work_dir, directory_paths,
+                                                 project=project, voltage_domain=voltage_domain)
+            self.results_store.record_points(sim_id, results)
+            
+            summary = self.results_store.get_summary(sim_id)
+            
             SimulationWebSocket.broadcast_update(sim_id, {
                 'sim_id': sim_id,
-                'state': 'sorting',
-                'extraction_stage': 'sorting',
-                'message': 'Compiling results into creport.txt...'
+                'partial_results': True,
+                'points_extracted': summary['extracted'],
+                'points_failed': summary['failed'],
+                'message': 'Partial results available ({0} PVT points extracted)'.format(summary['extracted'])
             })
             
-            print("[AUTO-EXTRACT] [{0}] Stage 2/3: Running sorting...".format(sim_id))
-            srt_result = run_sorting_stage(work_dir, project=project, voltage_domain=voltage_domain)
+            print("[INCREMENTAL-EXTRACT] [{0}] {1} points extracted so far".format(
+                sim_id, summary['extracted']))
+            
+            self._stop_on_spec_violation(sim_id, work_dir)
+        
+        except Exception as e:
+            print("[INCREMENTAL-EXTRACT] [{0}] ❌ FAILED: {1}".format(sim_id, e))
+            traceback.print_exc()
+    
+    def _stop_on_spec_violation(self, sim_id, work_dir):
+        """
+        Cancel queued jobs of a stop_on_failure sweep once the partial creport violates spec.
+        
+        Args:
+            sim_id (str): Simulation ID
+            work_dir (str): Working directory path
+        """
+        from extraction_engine import PARTIAL_CREPORT
+        from results_cache import get_results_cache
+        from results_parser import load_custom_spec_limits, get_default_spec_limits
+        from spec_evaluator import summarize_columns
+        
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute('SELECT stop_on_failure FROM simulations WHERE sim_id = ?', (sim_id,))
+        row = c.fetchone()
+        conn.close()
+        if not row or not row[0]:
+            return
+        
+        partial_path = os.path.join(work_dir, "report", PARTIAL_CREPORT)
+        if not os.path.exists(partial_path):
+            return
+        columns = get_results_cache().get_columns(partial_path)
+        if columns is None:
+            return
+        
+        summary = summarize_columns(columns, load_custom_spec_limits() or get_default_spec_limits())
+        if summary and summary['fail_count']:
+            self.stop_queued_jobs(sim_id, "spec violation ({0})".format(
+                ', '.join(sorted(summary['param_failures']))))
+    
+    def stop_queued_jobs(self, sim_id, reason):
+        """
+        Cancel the queued (waiting) NetBatch jobs of a simulation.
+        
+        Running jobs are left to finish. The nbjob calls run on the
+        StageExecutor 'cxl' pool; once they return, the removed jobs are
+        marked 'cancelled' in job_tracking (final like 'error'), so the next
+        poll counts them. At most one stop per simulation is in flight.
+        
+        Args:
+            sim_id (str): Simulation ID
+            reason (str): Why the sweep is stopped (logged and broadcast)
             
-            if not srt_result:
-                raise Exception("Sorting stage failed")
+        Returns:
+            Future: The queued cancellation (the pending one if already queued)
+        """
+        task = self.stop_tasks.get(sim_id)
+        if task and not task.done():
+            return task
+        
+        task = get_stage_executor().submit('cxl', self._remove_queued_jobs, sim_id,
+                                           label="{0} (stop)".format(sim_id))
+        self.stop_tasks[sim_id] = task
+        task.add_done_callback(lambda future: self._record_stopped_jobs(sim_id, reason, future))
+        return task
+    
+    def _remove_queued_jobs(self, sim_id):
+        """
+        Remove the waiting jobs of a simulation from NetBatch (runs on a StageExecutor 'cxl' worker).
+        
+        Args:
+            sim_id (str): Simulation ID
             
-            # Update to backing up
+        Returns:
+            list: Job IDs nbjob accepted for removal
+        """
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute('''
+            SELECT job_id FROM job_tracking
+            WHERE sim_id = ? AND status = 'waiting'
+        ''', (sim_id,))
+        job_ids = [row[0] for row in c.fetchall()]
+        conn.close()
+        
+        if not job_ids:
+            return []
+        return remove_netbatch_jobs_batched(job_ids)
+    
+    def _record_stopped_jobs(self, sim_id, reason, future):
+        """
+        Mark the jobs removed by _remove_queued_jobs() as cancelled (done callback).
+        
+        Args:
+            sim_id (str): Simulation ID
+            reason (str): Why the sweep is stopped
+            future (Future): The finished 'cxl' task
+        """
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            print("[BackgroundMonitor] ⚠️  Could not cancel queued jobs of {0}: {1}".format(
+                sim_id, future.exception()))
+            return
+        
+        job_ids = future.result()
+        if not job_ids:
+            print("[BackgroundMonitor] ⚠️  Could not cancel queued jobs of {0}".format(sim_id))
+            return
+        
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.executemany('''
+            UPDATE job_tracking SET status = 'cancelled', last_checked = CURRENT_TIMESTAMP
+            WHERE sim_id = ? AND job_id = ?
+        ''', [(sim_id, job_id) for job_id in job_ids])
+        conn.commit()
+        conn.close()
+        
+        print("[BackgroundMonitor] 🛑 Stopped {0} on first failure ({1}): {2} queued jobs cancelled".format(
+            sim_id, reason, len(job_ids)))
+        
+        from websocket_handler import SimulationWebSocket
+        SimulationWebSocket.broadcast_update(sim_id, {
+            'sim_id': sim_id,
+            'jobs_cancelled': len(job_ids),
+            'message': 'Stopped on first failure ({0}): {1} queued jobs cancelled'.format(reason, len(job_ids))
+        })
+    
+    def _run_extraction(self, sim_id, work_dir):
+        """
+        Run extraction stages in background thread.
+        
+        Phase 2B: Full implementation with progress tracking.
+        Each stage waits for a slot in its StageExecutor pool and is
+        checkpointed in the StagePipeline, so stages already done (e.g.
+        before a server restart) are skipped.
+        
+        Args:
+            sim_id (str): Simulation ID
+            work_dir (str): Working directory path
+        """
+        from websocket_handler import SimulationWebSocket
+        
+        executor = get_stage_executor()
+        
+        # Let a queued/in-flight per-job batch finish before the final stages
+        incremental = self.incremental_tasks.pop(sim_id, None)
+        if incremental:
+            try:
+                incremental.result()
+            except Exception:
+                pass
+        
+        # Progress messages per stage: (extraction_stage, message)
+        stage_messages = {
+            'ext': ('extraction', 'Extracting results from .mt0 files...'),
+            'srt': ('sorting', 'Compiling results into creport.txt...'),
+            'bkp': ('backup', 'Creating timestamped backup...'),
+        }
+        
+        stage = None
+        
+        try:
+            # Get simulation details including project and voltage_domain
             conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
             c = conn.cursor()
-            c.execute('UPDATE simulations SET state = ? WHERE sim_id = ?', ('backing_up', sim_id))
-            conn.commit()
+            c.execute('SELECT * FROM simulations WHERE sim_id = ?', (sim_id,))
+            sim = dict(c.fetchone())
             conn.close()
             
-            SimulationWebSocket.broadcast_update(sim_id, {
-                'sim_id': sim_id,
-                'state': 'backing_up',
-                'extraction_stage': 'backup',
-                'message': 'Creating timestamped backup...'
-            })
+            project = sim['project']
+            voltage_domain = sim['voltage_domain']
             
-            print("[AUTO-EXTRACT] [{0}] Stage 3/3: Running backup...".format(sim_id))
-            backup_dir = run_backup_stage(work_dir, project=project, voltage_domain=voltage_domain)
+            for stage in self.pipeline.pending_stages(sim_id):
+                state = STAGE_STATES[stage]
+                extraction_stage, message = stage_messages[stage]
+                
+                conn = sqlite3.connect(self.db_path)
+                c = conn.cursor()
+                c.execute('UPDATE simulations SET state = ? WHERE sim_id = ?', (state, sim_id))
+                conn.commit()
+                conn.close()
+                
+                SimulationWebSocket.broadcast_update(sim_id, {
+                    'sim_id': sim_id,
+                    'state': state,
+                    'extraction_stage': extraction_stage,
+                    'message': message
+                })
+                
+                print("[AUTO-EXTRACT] [{0}] Stage {1}/{2}: Running {3}...".format(
+                    sim_id, StagePipeline.STAGES.index(stage) + 1, len(StagePipeline.STAGES),
+                    STAGE_NAMES[stage].lower()))
+                
+                self.pipeline.start_stage(sim_id, stage)
+                result = executor.run(stage, run_pipeline_stage, stage, work_dir, project,
+                                      voltage_domain, label=sim_id)
+                self.pipeline.complete_stage(sim_id, stage, result)
             
-            if not backup_dir:
-                raise Exception("Backup stage failed")
+            stage = None
+            backup_dir = self.pipeline.get_result(sim_id, 'bkp')
             
             # Mark as finished
             conn = sqlite3.connect(self.db_path)
@@ -512,10 +1144,17 @@ class BackgroundMonitor(object):
             
             print("[AUTO-EXTRACT] [{0}] ✅ COMPLETE - Results in {1}".format(sim_id, backup_dir))
             
+            # Compress compiled_waveform/ and index measurements in the background
+            queue_archival(self.db_path, sim_id, backup_dir)
+            queue_indexing(self.db_path, sim_id)
+            
         except Exception as e:
             print("[AUTO-EXTRACT] [{0}] ❌ FAILED: {1}".format(sim_id, e))
             traceback.print_exc()
             
+            if stage:
+                self.pipeline.fail_stage(sim_id, stage, str(e))
+            
             # Mark as failed
             conn = sqlite3.connect(self.db_path)
             c = conn.cursor()
@@ -534,6 +1173,65 @@ class BackgroundMonitor(object):
             # Clean up thread tracking
             if sim_id in self.extraction_threads:
                 del self.extraction_threads[sim_id]
+    
+    def resume_interrupted_pipelines(self):
+        """
+        Re-queue stage pipelines interrupted by a server restart.
+        
+        Simulations left in extracting/sorting/backing_up, or with pending/running
+        checkpoints, continue from their last finished stage.
+        
+        Returns:
+            list: sim_ids that were resumed
+        """
+        try:
+            conn = sqlite3.connect(self.db_path)
+            c = conn.cursor()
+            c.execute('''
+                SELECT sim_id, work_dir FROM simulations
+                WHERE state IN ('extracting', 'sorting', 'backing_up')
+            ''')
+            work_dirs = dict(c.fetchall())
+            
+            interrupted = self.pipeline.find_interrupted()
+            if interrupted:
+                c.execute('''
+                    SELECT sim_id, work_dir FROM simulations
+                    WHERE state NOT IN ('finished', 'failed')
+                    AND sim_id IN ({0})
+                '''.format(','.join('?' * len(interrupted))), interrupted)
+                work_dirs.update(dict(c.fetchall()))
+            conn.close()
+        
+        except Exception as e:
+            print("[BackgroundMonitor] Error finding interrupted pipelines: {0}".format(e))
+            return []
+        
+        for sim_id, work_dir in sorted(work_dirs.items()):
+            print("[BackgroundMonitor] RESUME: {0} (pending stages: {1})".format(
+                sim_id, ', '.join(self.pipeline.pending_stages(sim_id)) or 'none'))
+            self.trigger_extraction(sim_id, work_dir)
+        
+        # Waveform archival interrupted by the restart
+        from waveform_archive import run_archival
+        
+        try:
+            for archive in WaveformArchiveStore(self.db_path).list_by_status('pending'):
+                print("[BackgroundMonitor] RESUME: waveform archival for {0}".format(archive['sim_id']))
+                get_stage_executor().submit('arc', run_archival, self.db_path, archive['sim_id'],
+                                            label="{0} (waveforms)".format(archive['sim_id']))
+        except Exception as e:
+            print("[BackgroundMonitor] Error resuming waveform archival: {0}".format(e))
+        
+        # Finished simulations missing from the measurement index (interrupted, or older history)
+        try:
+            backfill = queue_backfill(self.db_path)
+            if backfill:
+                print("[BackgroundMonitor] RESUME: indexing measurements of {0} simulations".format(len(backfill)))
+        except Exception as e:
+            print("[BackgroundMonitor] Error queueing measurement index backfill: {0}".format(e))
+        
+        return sorted(work_dirs)
 
 
 # Example usage:
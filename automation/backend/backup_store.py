@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Backup Store - content-addressed, deduplicating store for 00bkp snapshots
+
+The bkp stage creates 00bkp_<timestamp>/ with report/, simulation.log and
+tb_bkp/<ex>/<ex>_<temp>/<voltage>/sim_tx.sp. Re-running a sweep (same config,
+same testbenches) writes a snapshot that is largely identical to the previous
+one, and unchanged reports repeat across re-runs as well.
+
+Each file of a snapshot is stored once under objects/<sha256[:2]>/<sha256[2:]>
+and the snapshot itself becomes a small JSON manifest (path -> hash, size,
+mode). The files under 00bkp_*/report/ are replaced by hard links to the
+objects, so existing readers (ResultsHandler, analysis scripts) keep working
+while identical reports take disk space only once. restore_snapshot() rebuilds
+a snapshot from its manifest as private copies.
+
+Objects are immutable (0o444). A hard link shares the object's inode and
+permissions, so linked report files are read-only and writing one in place
+(e.g. as root) would change every snapshot sharing it. simulation.log and the
+tb_bkp/ testbenches are stored but stay private, writable copies; call
+detach_file() before editing a linked file (copy on write).
+
+compiled_waveform/ is left out; waveform_archive.py compresses it separately.
+
+Layout (one store per <project>/<voltage_domain>/runs/ unless BACKUP_STORE_DIR is set):
+    .backup_store/objects/ab/cdef...     read-only file contents
+    .backup_store/manifests/<sim_id>__<00bkp_name>.json
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+from datetime import datetime
+from typing import Dict, List, Optional
+
+STORE_DIR_NAME = '.backup_store'
+
+# Snapshot entries that are not stored (handled by waveform_archive.py)
+EXCLUDED_ENTRIES = ['compiled_waveform', 'compiled_waveform.zip', 'compiled_waveform.zip.partial']
+
+# Snapshot entries whose files are replaced by hard links to the objects
+# (written once by ext/srt, only read afterwards)
+LINKED_ENTRIES = ['report']
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def get_store_root(work_dir: str) -> str:
+    """
+    Store location for a work_dir: config.BACKUP_STORE_DIR or <runs>/.backup_store.
+    """
+    from config import BACKUP_STORE_DIR
+
+    if BACKUP_STORE_DIR:
+        return BACKUP_STORE_DIR
+    return os.path.join(os.path.dirname(os.path.abspath(work_dir)), STORE_DIR_NAME)
+
+
+def hash_file(path: str) -> str:
+    """SHA-256 of a file's contents."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def object_path(store_root: str, digest: str) -> str:
+    """Path of an object in the store."""
+    return os.path.join(store_root, 'objects', digest[:2], digest[2:])
+
+
+def _put_object(store_root: str, path: str, digest: str) -> bool:
+    """
+    Copy a file into the store unless the object already exists.
+
+    Returns:
+        True if a new object was written
+    """
+    dest = object_path(store_root, digest)
+    if os.path.exists(dest):
+        return False
+
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(dest), prefix='.tmp_')
+    os.close(fd)
+    try:
+        shutil.copyfile(path, tmp_path)
+        os.chmod(tmp_path, 0o444)
+        os.replace(tmp_path, dest)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return True
+
+
+def _link_to_object(obj: str, path: str) -> bool:
+    """
+    Replace path with a hard link to obj (atomic rename).
+
+    Returns:
+        False if hard links are not possible (e.g. store on another filesystem)
+    """
+    if os.path.samefile(obj, path):
+        return True
+
+    tmp_path = path + '.bkplink'
+    try:
+        os.link(obj, tmp_path)
+    except OSError:
+        return False
+    os.replace(tmp_path, path)
+    return True
+
+
+def detach_file(path: str, mode: int = 0o644) -> bool:
+    """
+    Replace a hard-linked file with a private, writable copy (copy on write).
+
+    Args:
+        path: File in a snapshot (or a restored snapshot)
+        mode: Permissions of the copy
+
+    Returns:
+        True if the file was shared and has been copied
+    """
+    if os.stat(path).st_nlink < 2:
+        return False
+
+    tmp_path = path + '.bkpcopy'
+    shutil.copyfile(path, tmp_path)
+    os.chmod(tmp_path, mode)
+    os.replace(tmp_path, path)
+    return True
+
+
+def _is_linked_entry(rel: str) -> bool:
+    """Whether a snapshot file (relative path) is hard-linked to its object."""
+    return rel.split(os.sep, 1)[0] in LINKED_ENTRIES
+
+
+def _walk_snapshot(snapshot_dir: str) -> List[str]:
+    """Relative paths of all stored files in a snapshot, sorted."""
+    files = []
+    for root, dirs, names in os.walk(snapshot_dir):
+        if root == snapshot_dir:
+            dirs[:] = [d for d in dirs if d not in EXCLUDED_ENTRIES]
+            names = [n for n in names if n not in EXCLUDED_ENTRIES]
+        dirs.sort()
+        for name in sorted(names):
+            path = os.path.join(root, name)
+            if os.path.isfile(path) and not os.path.islink(path):
+                files.append(os.path.relpath(path, snapshot_dir))
+    return files
+
+
+def store_snapshot(snapshot_dir: str, store_root: str, sim_id: str, link: bool = True) -> Dict:
+    """
+    Store a 00bkp snapshot: write new objects and a manifest.
+
+    Re-running on the same snapshot is safe (already-linked files hash to
+    existing objects). Files outside LINKED_ENTRIES that are still linked to
+    an object are detached.
+
+    Args:
+        snapshot_dir: 00bkp_<timestamp> directory
+        store_root: Backup store root
+        sim_id: Simulation ID (manifest name prefix)
+        link: Replace the LINKED_ENTRIES files with hard links to the objects
+
+    Returns:
+        Dict with keys: manifest, files, total_bytes, new_objects, new_bytes, linked
+    """
+    files = {}
+    total_bytes = 0
+    new_objects = 0
+    new_bytes = 0
+    linked = 0
+
+    for rel in _walk_snapshot(snapshot_dir):
+        path = os.path.join(snapshot_dir, rel)
+        st = os.stat(path)
+        digest = hash_file(path)
+
+        if _put_object(store_root, path, digest):
+            new_objects += 1
+            new_bytes += st.st_size
+
+        mode = st.st_mode & 0o777
+        if not _is_linked_entry(rel):
+            if os.path.samefile(object_path(store_root, digest), path):
+                mode = 0o644
+                detach_file(path, mode)
+        elif link and _link_to_object(object_path(store_root, digest), path):
+            linked += 1
+
+        files[rel] = {'hash': digest, 'size': st.st_size, 'mode': mode}
+        total_bytes += st.st_size
+
+    manifest = {
+        'sim_id': sim_id,
+        'snapshot': os.path.basename(os.path.normpath(snapshot_dir)),
+        'source': os.path.abspath(snapshot_dir),
+        'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'files': files
+    }
+
+    manifest_dir = os.path.join(store_root, 'manifests')
+    os.makedirs(manifest_dir, exist_ok=True)
+    manifest_path = os.path.join(manifest_dir, "{0}__{1}.json".format(sim_id, manifest['snapshot']))
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+    return {
+        'manifest': manifest_path,
+        'files': len(files),
+        'total_bytes': total_bytes,
+        'new_objects': new_objects,
+        'new_bytes': new_bytes,
+        'linked': linked
+    }
+
+
+def load_manifest(manifest_path: str) -> Dict:
+    """Load a snapshot manifest."""
+    with open(manifest_path, 'r') as f:
+        return json.load(f)
+
+
+def list_manifests(store_root: str, sim_id: Optional[str] = None) -> List[str]:
+    """Manifest paths in the store (optionally for one simulation), sorted."""
+    manifest_dir = os.path.join(store_root, 'manifests')
+    if not os.path.isdir(manifest_dir):
+        return []
+    prefix = "{0}__".format(sim_id) if sim_id else ''
+    return [os.path.join(manifest_dir, m) for m in sorted(os.listdir(manifest_dir))
+            if m.endswith('.json') and m.startswith(prefix)]
+
+
+def restore_snapshot(manifest_path: str, dest_dir: str, store_root: Optional[str] = None,
+                     link: bool = False) -> int:
+    """
+    Rebuild a snapshot from its manifest.
+
+    Files are copied with their recorded permissions, so the restored
+    snapshot can be edited without touching the store.
+
+    Args:
+        manifest_path: Manifest JSON path
+        dest_dir: Destination directory (created)
+        store_root: Backup store root (default: the manifest's store)
+        link: Hard-link the LINKED_ENTRIES objects (read-only, shared) instead
+            of copying them when possible
+
+    Returns:
+        Number of files restored
+    """
+    if store_root is None:
+        store_root = os.path.dirname(os.path.dirname(os.path.abspath(manifest_path)))
+
+    manifest = load_manifest(manifest_path)
+
+    for rel, entry in sorted(manifest['files'].items()):
+        src = object_path(store_root, entry['hash'])
+        dest = os.path.join(dest_dir, rel)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        if os.path.exists(dest):
+            os.remove(dest)
+
+        if link and _is_linked_entry(rel):
+            try:
+                os.link(src, dest)
+                continue
+            except OSError:
+                pass
+        shutil.copyfile(src, dest)
+        os.chmod(dest, entry['mode'] | 0o200)
+
+    return len(manifest['files'])
+
+
+def collect_garbage(store_root: str) -> Dict:
+    """
+    Remove objects no longer referenced by any manifest.
+
+    Returns:
+        Dict with keys: removed, freed_bytes
+    """
+    referenced = set()
+    for manifest_path in list_manifests(store_root):
+        referenced.update(e['hash'] for e in load_manifest(manifest_path)['files'].values())
+
+    removed = 0
+    freed = 0
+    objects_dir = os.path.join(store_root, 'objects')
+    if os.path.isdir(objects_dir):
+        for prefix in os.listdir(objects_dir):
+            for rest in os.listdir(os.path.join(objects_dir, prefix)):
+                if prefix + rest in referenced or rest.startswith('.tmp_'):
+                    continue
+                path = os.path.join(objects_dir, prefix, rest)
+                freed += os.path.getsize(path)
+                os.remove(path)
+                removed += 1
+
+    return {'removed': removed, 'freed_bytes': freed}
+
+
+if __name__ == '__main__':
+    import sys
+
+    if len(sys.argv) < 3:
+        print("Usage: python3 backup_store.py store <00bkp_dir> <sim_id> [store_root]")
+        print("       python3 backup_store.py restore <manifest.json> <dest_dir>")
+        print("       python3 backup_store.py gc <store_root>")
+        sys.exit(1)
+
+    command = sys.argv[1]
+    if command == 'store':
+        snapshot = sys.argv[2]
+        root = sys.argv[4] if len(sys.argv) > 4 else get_store_root(os.path.dirname(os.path.abspath(snapshot)))
+        summary = store_snapshot(snapshot, root, sys.argv[3])
+        print("Stored {0} files ({1:.1f} MB), {2} new objects ({3:.1f} MB) -> {4}".format(
+            summary['files'], summary['total_bytes'] / 1e6, summary['new_objects'],
+            summary['new_bytes'] / 1e6, summary['manifest']))
+    elif command == 'restore':
+        count = restore_snapshot(sys.argv[2], sys.argv[3])
+        print("Restored {0} files to {1}".format(count, sys.argv[3]))
+    elif command == 'gc':
+        result = collect_garbage(sys.argv[2])
+        print("Removed {0} objects ({1:.1f} MB)".format(result['removed'], result['freed_bytes'] / 1e6))
+    else:
+        print("Unknown command: {0}".format(command))
+        sys.exit(1)
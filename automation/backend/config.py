@@ -32,6 +32,85 @@ SERVER_PORT = 5000
 # Debug settings
 DEBUG = True
 
+# Extraction settings
+# 'python' uses extraction_engine.py for ext/srt, 'shell' runs Pai Ho's stages
+EXTRACTION_ENGINE = 'python'
+EXTRACTION_WORKERS = 8
+# Extract each job as soon as it completes (Python engine only)
+INCREMENTAL_EXTRACTION = True
+# Pack per-point report_*.txt into report/reports.zip after ext (report_container.py)
+REPORT_CONTAINER = False
+
+# Submission ('run' stage)
+# 'python' submits each PVT point itself (submission_engine.py), 'shell' runs Pai Ho's run stage
+SUBMISSION_ENGINE = 'shell'
+# 'plan' = gen_pvt_loop_seq order, 'risk' = lowest prior spec margin first (Python engine only)
+SUBMISSION_ORDER = 'plan'
+# Cancel a sweep's queued jobs on its first job error or spec violation (per-submission override)
+STOP_ON_FIRST_FAILURE = False
+# Submit the typical nominal point first and the rest only once it produced results (per-submission override)
+CANARY_RUN = False
+# Resubmit jobs that failed for a transient reason (failure_classifier.py: oom, license, host)
+AUTO_RETRY = True
+RETRY_MAX_ATTEMPTS = 3      # attempts per job, including the first
+RETRY_SWEEP_BUDGET = 25     # resubmissions per sweep
+RETRY_MEM_FACTOR = 2        # memory class multiplier per out-of-memory retry
+RETRY_MAX_MEM_GB = 64
+# Job IDs per `nbjob remove` call when cancelling simulations (POST /api/simulations/<id>/cancel)
+NB_REMOVE_BATCH = 200
+# Steps per dense .alter sweep (dense_sweep on submit, alter_sweep.py); one job runs them all
+DENSE_SWEEP_MAX_STEPS = 50
+
+# Pre-flight check of the template's .inc/.lib files and sections before gen (preflight.py)
+PREFLIGHT_VALIDATION = True
+PREFLIGHT_WORKERS = 16
+PREFLIGHT_CACHE_ENTRIES = 512
+# Reject (instead of warn about) references through environment variables unset on this server
+PREFLIGHT_REQUIRE_ENV = False
+
+# Max concurrent tasks per stage across all simulations (stage_executor.py)
+STAGE_CONCURRENCY = {
+    'pre': 2,
+    'gen': 4,
+    'run': 2,
+    'ext': 2,
+    'srt': 2,
+    'bkp': 1,
+    'arc': 1,
+    'idx': 1,
+    'exp': 2,
+    'cxl': 1,
+}
+
+# Waveform archival (waveform_archive.py) - compiled_waveform/ -> compiled_waveform.zip
+WAVEFORM_ARCHIVE = True
+WAVEFORM_ARCHIVE_COMPRESSION = 'deflate'  # 'deflate', 'bzip2' or 'lzma'
+WAVEFORM_ARCHIVE_LEVEL = 6
+# Oldest archives beyond the budget move to WAVEFORM_COLD_DIR (None = keep in place)
+WAVEFORM_COLD_DIR = None
+WAVEFORM_HOT_BUDGET_GB = 200
+
+# Write report/creport.npz (columnar results) after srt; needs NumPy (results_sidecar.py)
+RESULTS_SIDECAR = True
+
+# Parsed creport / response cache for ResultsHandler (results_cache.py)
+RESULTS_CACHE_ENTRIES = 64
+RESULTS_CACHE_MB = 256
+
+# API responses (api_json.py): compact JSON, gzip when the client sends Accept-Encoding: gzip
+API_JSON_INDENT = None   # e.g. 2 for readable responses while debugging
+API_FLOAT_DIGITS = None  # significant digits for floats (None = full precision); /api/results?precision=N
+API_GZIP = True
+
+# Rows per chunk of streamed exports (/api/export/..., results_export.py)
+EXPORT_CHUNK_ROWS = 5000
+
+# Deduplicating backup store (backup_store.py) - 00bkp_*/report/ files become read-only
+# hard links into a content-addressed store; each snapshot is a manifest of hashes
+BACKUP_STORE = True
+# None = <project>/<voltage_domain>/runs/.backup_store
+BACKUP_STORE_DIR = None
+
 def get_project_root(project: str) -> Path:
     """Get root directory for a project"""
     if project == 'gpio':
@@ -0,0 +1,859 @@
+#!/usr/bin/env python3
+"""
+Extraction Engine - Python implementation of Pai Ho's ver03 'ext' and 'srt' stages
+
+The shell ext stage copies extract_alt.sh/move.sh into every PVT directory and
+runs them one directory at a time (gen_pvt_loop_seq). Each invocation re-reads
+the measurement file with head | tail and a 102-variable `read`, so a large
+sweep takes tens of minutes on NFS.
+
+This module reads the measurement files (finesim: sim_tx.mt0, sim_tx#N.mt0,
+primesim: sim_tx_aN.mt0) directly, in a single pass per file, and writes
+report/report_<corner>_<ex>_<temp>_<v>.txt byte-identical to the shell output.
+PVT points are fanned out across a process pool.
+
+The srt stage builds report/creport.txt with `head -n $count | tail -1` for
+every row of every report, which is quadratic in rows per file. run_sorting()
+streams each report once and writes the same metadata block, header and rows
+in plan order.
+
+extract_jobs() extracts single completed jobs while the sweep is still
+running and keeps report/creport_partial.txt up to date, so the final ext
+stage (skip_existing=True) only has to pick up the stragglers.
+
+With config.REPORT_CONTAINER the per-point reports are packed into
+report/reports.zip at the end of the ext stage (report_container.py); srt and
+all later readers go through ReportReader.
+
+Differences from the shell stages:
+- Any number of measurement columns is supported (shell limits: 102 for ext,
+  100 for srt)
+- Measurement files are read in place; nothing is renamed or deleted, so the
+  stage can be re-run safely. Waveforms are still moved to compiled_waveform/
+  with the shell's file names.
+"""
+
+import os
+import re
+import shutil
+import subprocess
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+from report_container import ReportReader, pack_reports
+
+logger = logging.getLogger(__name__)
+
+# Shell variables needed from read_cfg / read_supply / read_corner
+STAGE_CONFIG_VARS = [
+    'mode', 'condition', 'supply1', 'supply2', 'supply3', 'simulator', 'ncpu', 'nmem',
+    'alt_ext_mode', 'alt_ext_n', 'vcc_vid',
+    'typ_ex', 'typ_corner', 'typ_ex_cornerlist', 'cross_ex', 'cross_ex_cornerlist',
+    'vccmin', 'vccnom', 'vccmax',
+    'vcnmin', 'vcnnom', 'vcnmax',
+    'vccanamin', 'vccananom', 'vccanamax',
+    'vctxmin', 'vctxnom', 'vctxmax',
+    'vccmin_ff_h', 'vccnom_ff_h', 'vccmax_ff_h',
+    'vccmin_ff_c', 'vccnom_ff_c', 'vccmax_ff_c',
+    'vccmin_tt_h', 'vccnom_tt_h', 'vccmax_tt_h',
+    'vccmin_tt_c', 'vccnom_tt_c', 'vccmax_tt_c',
+    'vccmin_ss_h', 'vccnom_ss_h', 'vccmax_ss_h',
+    'vccmin_ss_c', 'vccnom_ss_c', 'vccmax_ss_c',
+]
+
+# Number of `read` variables in extract.sh / extract_alt.sh
+REPORT_FIELDS = 102
+
+# Number of `read` variables per report line in the srt stage
+CREPORT_FIELDS = 100
+
+# Measurement file types, in the order the shell checks them (last match wins)
+MEAS_TYPES = ['mt0', 'ma0', 'md0']
+
+# Waveform file types moved to compiled_waveform/
+WAVEFORM_TYPES = ['tr0', 'fsdb', 'ac0', 'sw0']
+
+# Special directories in a work_dir that are never PVT corners
+NON_CORNER_DIRS = ['template', 'configuration', 'report', 'compiled_waveform']
+
+# creport built from the points extracted so far while the sweep is running
+PARTIAL_CREPORT = 'creport_partial.txt'
+
+
+def load_stage_config(work_dir: str, script_path: str, cfg_file: str = 'config.cfg') -> Dict[str, str]:
+    """
+    Load the variables sim_pvt.sh sees after read_cfg, read_supply and read_corner.
+
+    Sources Pai Ho's configuration scripts once in a single bash process
+    (same approach as SubmitHandler.get_supply_config) so the values are
+    exactly the ones the shell stages would use.
+
+    Args:
+        work_dir: Working directory containing config.cfg
+        script_path: Path to ver03 scripts (PaiHoExecutor.script_path)
+        cfg_file: Config filename (default: 'config.cfg')
+
+    Returns:
+        Dict mapping shell variable name -> value
+
+    Raises:
+        RuntimeError: If the configuration scripts cannot be sourced
+    """
+    script = f"""
+    current_path="{work_dir}"
+    cfg_file="{cfg_file}"
+    script_path="{script_path}"
+    source "$script_path/configuration/read_cfg.sh"
+    source "$script_path/configuration/read_supply.sh"
+    source "$script_path/configuration/read_corner.sh"
+    read_cfg > /dev/null
+    read_supply > /dev/null
+    read_corner > /dev/null
+    for v in {' '.join(STAGE_CONFIG_VARS)}; do
+        echo "__cfg__$v=${{!v}}"
+    done
+    """
+
+    result = subprocess.run(
+        ['bash', '-c', script],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        timeout=30
+    )
+
+    if result.returncode != 0:
+        raise RuntimeError(f"Failed to read stage configuration: {result.stderr[:200]}")
+
+    config = {}
+    for line in result.stdout.split('\n'):
+        if line.startswith('__cfg__') and '=' in line:
+            key, value = line[len('__cfg__'):].split('=', 1)
+            config[key] = value
+
+    return config
+
+
+def find_testbench(work_dir: str) -> Optional[str]:
+    """
+    Find the testbench name the same way sim_pvt.sh does.
+
+    Shell: ls template | grep -e '.sp' | grep -v '~'  (first match, '.sp' removed)
+
+    Args:
+        work_dir: Working directory containing template/
+
+    Returns:
+        Testbench name (e.g., 'sim_tx') or None if no template found
+    """
+    template_dir = os.path.join(work_dir, 'template')
+    if not os.path.isdir(template_dir):
+        return None
+
+    candidates = [f for f in sorted(os.listdir(template_dir))
+                  if re.search(r'.sp', f) and '~' not in f]
+    if not candidates:
+        return None
+
+    return re.sub(r'.sp', '', candidates[0])
+
+
+def _split_voltage(l: str, supply2: str, supply3: str):
+    """Split a vtrend entry into (lv1, lv2, lv3) exactly like pvt_loop.sh."""
+    if supply3 in ('vccn', 'vccn_vcctx'):
+        # lv1=${l%_*}; lv1=${lv1%_*}; lv1=${lv1#v1}
+        lv1 = l.rsplit('_', 1)[0] if '_' in l else l
+        lv1 = lv1.rsplit('_', 1)[0] if '_' in lv1 else lv1
+        lv1 = lv1[2:] if lv1.startswith('v1') else lv1
+        # lv2=${l#*_v2}; lv2=${lv2%_*}
+        lv2 = l.split('_v2', 1)[1] if '_v2' in l else l
+        lv2 = lv2.rsplit('_', 1)[0] if '_' in lv2 else lv2
+        # lv3=${l#*_v3}
+        lv3 = l.split('_v3', 1)[1] if '_v3' in l else l
+    else:
+        lv1 = l.rsplit('_', 1)[0] if '_' in l else l
+        lv1 = lv1[2:] if lv1.startswith('v1') else lv1
+        lv2 = l.split('_v2', 1)[1] if '_v2' in l else l
+        lv3 = 'NA'
+    return lv1, lv2, lv3
+
+
+def get_vtrends(config: Dict[str, str]) -> Dict[str, List[str]]:
+    """
+    Get voltage trend lists (max, nom, all) for the configured supplies.
+
+    Args:
+        config: Stage configuration from load_stage_config()
+
+    Returns:
+        Dict with 'max', 'nom' and 'all' voltage directory lists
+    """
+    supply2 = config.get('supply2', 'NA')
+    supply3 = config.get('supply3', 'NA')
+
+    if supply3 in ('vccn', 'vccn_vcctx'):
+        return {
+            'max': ['v1max_v2max_v3max'],
+            'nom': ['v1nom_v2nom_v3nom'],
+            'all': ['v1min_v2min_v3min', 'v1min_v2max_v3min', 'v1max_v2min_v3min',
+                    'v1max_v2max_v3min', 'v1min_v2min_v3max', 'v1min_v2max_v3max',
+                    'v1max_v2min_v3max', 'v1max_v2max_v3max', 'v1nom_v2nom_v3nom']
+        }
+    elif supply2 == 'NA':
+        return {
+            'max': ['v1max'],
+            'nom': ['v1nom'],
+            'all': ['v1min', 'v1max', 'v1nom']
+        }
+    else:
+        return {
+            'max': ['v1max_v2max'],
+            'nom': ['v1nom_v2nom'],
+            'all': ['v1min_v2min', 'v1min_v2max', 'v1max_v2min', 'v1max_v2max', 'v1nom_v2nom']
+        }
+
+
+def build_pvt_plan(config: Dict[str, str]) -> List[Dict]:
+    """
+    Enumerate PVT points in the same order as gen_pvt_loop_seq (pvt_loop.sh).
+
+    Order:
+    1. Typical-extraction corners x {m40, 125} x vtrend
+    2. (post-layout only) cross-extraction corners x {m40, 125} x vtrend
+    3. Typical corner x {85, 100} x nominal voltage
+
+    Args:
+        config: Stage configuration from load_stage_config()
+
+    Returns:
+        List of point dicts with keys:
+            corner, extraction, temp_dir, temp, voltage, lv1, lv2, lv3, name
+    """
+    supply2 = config.get('supply2', 'NA')
+    supply3 = config.get('supply3', 'NA')
+    vtrends = get_vtrends(config)
+
+    if config.get('condition') in ('hvqk', 'htol'):
+        vtrend = vtrends['max']
+    else:
+        vtrend = vtrends['all']
+
+    groups = [(config.get('typ_ex_cornerlist', ''), config.get('typ_ex', ''), ['m40', '125'], vtrend)]
+    if config.get('mode', 'prelay') != 'prelay':
+        groups.append((config.get('cross_ex_cornerlist', ''), config.get('cross_ex', ''), ['m40', '125'], vtrend))
+    groups.append((config.get('typ_corner', ''), config.get('typ_ex', ''), ['85', '100'], vtrends['nom']))
+
+    plan = []
+    for corners, extractions, temperatures, voltages in groups:
+        for i in corners.split():
+            for j in extractions.split():
+                for k in temperatures:
+                    tmp = '-40' if k == 'm40' else k
+                    for l in voltages:
+                        lv1, lv2, lv3 = _split_voltage(l, supply2, supply3)
+                        plan.append({
+                            'corner': i,
+                            'extraction': j,
+                            'temp_dir': k,
+                            'temp': tmp,
+                            'voltage': l,
+                            'lv1': lv1,
+                            'lv2': lv2,
+                            'lv3': lv3,
+                            'name': f"{i}_{j}_{k}_{l}"
+                        })
+
+    return plan
+
+
+def sweep_plan(work_dir: str, config: Dict[str, str]) -> List[Dict]:
+    """
+    PVT points simulated in a work_dir: the whole plan, or only the host
+    points of a dense sweep (see alter_sweep).
+
+    Args:
+        work_dir: Working directory path
+        config: Stage configuration from load_stage_config()
+
+    Returns:
+        List of build_pvt_plan() point dicts (plan order)
+    """
+    from alter_sweep import load_dense_sweep, dense_hosts
+
+    plan = build_pvt_plan(config)
+    sweep = load_dense_sweep(work_dir)
+    if sweep is None:
+        return plan
+    return dense_hosts(plan, config, sweep['parameter'])
+
+
+def point_directory(work_dir: str, point: Dict) -> str:
+    """Get simulation directory for a PVT point: {corner}/{ex}/{ex}_{temp}/{voltage}"""
+    return os.path.join(work_dir, point['corner'], point['extraction'],
+                        f"{point['extraction']}_{point['temp_dir']}", point['voltage'])
+
+
+def report_path(work_dir: str, point: Dict) -> str:
+    """Get per-point report path: report/report_{corner}_{ex}_{temp}_{voltage}.txt"""
+    return os.path.join(work_dir, 'report', f"report_{point['name']}.txt")
+
+
+def _read_lines(path: str) -> List[str]:
+    """
+    Read newline-terminated lines of a file.
+
+    Mirrors the shell's `wc -l` loop bound: an unterminated last line is
+    not counted.
+    """
+    with open(path, 'r', errors='replace') as f:
+        content = f.read()
+    return content.split('\n')[:content.count('\n')]
+
+
+def _line(lines: List[str], n: int) -> str:
+    """Equivalent of `head -n N file | tail -1` (1-based)."""
+    if not lines:
+        return ''
+    return lines[min(n, len(lines)) - 1]
+
+
+def format_fields(tokens: List[str], width: int = REPORT_FIELDS) -> str:
+    """
+    Join whitespace-split tokens with tabs, padded to the shell's field count.
+
+    Equivalent to `read var1 ... varN <<< $line; echo "$var1\t...\t$varN"`
+    for lines with up to N tokens. Longer lines are kept in full instead of
+    being truncated into the last variable.
+    """
+    if len(tokens) < width:
+        tokens = tokens + [''] * (width - len(tokens))
+    return '\t'.join(tokens)
+
+
+def _alter_title(line: str, swpl: int) -> str:
+    """
+    Alter title from line 2 of a measurement file, as extract_alt.sh builds it.
+
+    Shell:
+        read var0 var1 <<< $line0
+        var1=`echo $var1 | tr -d "[='=]"`
+        var1=${var1:0:$swpl}
+        varswp=`echo $var1 | tr -d '\\n'`
+    """
+    parts = line.split(None, 1)
+    title = parts[1] if len(parts) > 1 else ''
+    title = ' '.join(title.split()).replace("'", '')
+    title = title[:max(swpl, 0)]
+    return ' '.join(title.split())
+
+
+def find_measurement_files(point_dir: str, testbench: str, alter_mode: bool, simulator: str) -> List[str]:
+    """
+    Find measurement files for a PVT point in alter order.
+
+    Non-alter: {tb}.{meas}
+    Alter (finesim): {tb}.{meas}, {tb}#1.{meas}, {tb}#2.{meas}, ...
+    Alter (primesim): {tb}_a0.{meas}, {tb}_a1.{meas}, ...
+
+    The measurement type follows the shell priority: md0 > ma0 > mt0.
+
+    Returns:
+        List of absolute file paths (empty if no measurement file exists)
+    """
+    primesim_alter = alter_mode and simulator == 'primesim'
+
+    meas = None
+    for candidate in MEAS_TYPES:
+        first = f"{testbench}_a0.{candidate}" if primesim_alter else f"{testbench}.{candidate}"
+        if os.path.exists(os.path.join(point_dir, first)):
+            meas = candidate
+
+    if meas is None:
+        return []
+
+    if not alter_mode:
+        return [os.path.join(point_dir, f"{testbench}.{meas}")]
+
+    files = []
+    count = 0
+    while True:
+        if primesim_alter:
+            name = f"{testbench}_a{count}.{meas}"
+        elif count == 0:
+            name = f"{testbench}.{meas}"
+        else:
+            name = f"{testbench}#{count}.{meas}"
+
+        path = os.path.join(point_dir, name)
+        if not os.path.exists(path):
+            break
+        files.append(path)
+        count += 1
+
+    return files
+
+
+def build_point_report(meas_files: List[str], alter_mode: bool, swpl: int = 0) -> List[str]:
+    """
+    Build report.txt lines for one PVT point.
+
+    Non-alter (extract.sh): header from line 3, one row per line 4..N.
+    Alter (extract_alt.sh): 'swp' + header from line 3 of the first file,
+    then one row per alter file: truncated alter title + line 4.
+
+    Args:
+        meas_files: Measurement files from find_measurement_files()
+        alter_mode: True for alter extraction (config alter_extraction:Yes)
+        swpl: Alter title length (config alter_string#)
+
+    Returns:
+        List of report lines (without trailing newlines)
+    """
+    if not meas_files:
+        return []
+
+    if not alter_mode:
+        lines = _read_lines(meas_files[0])
+        report = [format_fields(_line(lines, 3).split())]
+        for line in lines[3:]:
+            report.append(format_fields(line.split()))
+        return report
+
+    first = _read_lines(meas_files[0])
+    report = ['swp\t' + format_fields(_line(first, 3).split())]
+    for path in meas_files:
+        lines = first if path == meas_files[0] else _read_lines(path)
+        title = _alter_title(_line(lines, 2), swpl)
+        report.append(title + '\t' + format_fields(_line(lines, 4).split()))
+    return report
+
+
+def _waveform_moves(point_dir: str, testbench: str, tag: str, alter_mode: bool, simulator: str):
+    """
+    List (source, destination-name) waveform moves matching the shell ext stage.
+
+    Non-alter: every {tb}.{tr0,fsdb,ac0,sw0} -> {tb}_{tag}.{ext}
+    Alter (finesim): first type found among fsdb/ac0/sw0,
+        {tb}.{ext} -> {tb}_{tag}.{ext}, {tb}#N.{ext} -> {tb}_{tag}#N.{ext}
+    Alter (primesim): first type found among fsdb/ac0/sw0,
+        {tb}_aN.{ext} -> {tb}_{tag}_aN.{ext}
+    """
+    moves = []
+
+    if not alter_mode:
+        for ext in WAVEFORM_TYPES:
+            src = os.path.join(point_dir, f"{testbench}.{ext}")
+            if os.path.exists(src):
+                moves.append((src, f"{testbench}_{tag}.{ext}"))
+        return moves
+
+    primesim = simulator == 'primesim'
+    for ext in ['fsdb', 'ac0', 'sw0']:
+        first = f"{testbench}_a0.{ext}" if primesim else f"{testbench}.{ext}"
+        if not os.path.exists(os.path.join(point_dir, first)):
+            continue
+
+        count = 0
+        while True:
+            if primesim:
+                src_name = f"{testbench}_a{count}.{ext}"
+                dst_name = f"{testbench}_{tag}_a{count}.{ext}"
+            elif count == 0:
+                src_name = f"{testbench}.{ext}"
+                dst_name = f"{testbench}_{tag}.{ext}"
+            else:
+                src_name = f"{testbench}#{count}.{ext}"
+                dst_name = f"{testbench}_{tag}#{count}.{ext}"
+
+            src = os.path.join(point_dir, src_name)
+            if not os.path.exists(src):
+                break
+            moves.append((src, dst_name))
+            count += 1
+        break
+
+    return moves
+
+
+def extract_point(work_dir: str, point: Dict, testbench: str, alter_mode: bool,
+                  swpl: int, simulator: str, move_waveforms: bool = True) -> Dict:
+    """
+    Extract a single PVT point (worker function, runs in a pool process).
+
+    Writes report/report_{name}.txt atomically and moves waveforms to
+    compiled_waveform/.
+
+    Returns:
+        Dict with keys: name, directory, report, success, rows, waveforms, error
+    """
+    point_dir = point_directory(work_dir, point)
+    out_path = report_path(work_dir, point)
+    result = {'name': point['name'], 'directory': point_dir, 'report': out_path,
+              'success': False, 'rows': 0, 'waveforms': 0, 'error': None}
+
+    try:
+        if not os.path.isdir(point_dir):
+            result['error'] = f"Directory not found: {point_dir}"
+            return result
+
+        meas_files = find_measurement_files(point_dir, testbench, alter_mode, simulator)
+        if not meas_files:
+            result['error'] = "No measurement file"
+            return result
+
+        lines = build_point_report(meas_files, alter_mode, swpl)
+
+        tmp_path = out_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(''.join(line + '\n' for line in lines))
+        os.replace(tmp_path, out_path)
+
+        if move_waveforms:
+            wave_dir = os.path.join(work_dir, 'compiled_waveform')
+            for src, dst_name in _waveform_moves(point_dir, testbench, point['name'], alter_mode, simulator):
+                shutil.move(src, os.path.join(wave_dir, dst_name))
+                result['waveforms'] += 1
+
+        result['rows'] = max(len(lines) - 1, 0)
+        result['success'] = True
+
+    except Exception as e:
+        result['error'] = str(e)
+
+    return result
+
+
+def _extraction_settings(work_dir: str, config: Dict[str, str]) -> Dict:
+    """
+    Testbench and alter settings shared by every point of a sweep.
+
+    Also creates report/ and compiled_waveform/ in the work_dir.
+
+    Returns:
+        Dict with keys: testbench, alter_mode, swpl, simulator
+    """
+    testbench = find_testbench(work_dir)
+    if not testbench:
+        raise FileNotFoundError(f"No testbench found in {os.path.join(work_dir, 'template')}")
+
+    try:
+        swpl = int(config.get('alt_ext_n', '0') or 0)
+    except ValueError:
+        swpl = 0
+
+    os.makedirs(os.path.join(work_dir, 'report'), exist_ok=True)
+    os.makedirs(os.path.join(work_dir, 'compiled_waveform'), exist_ok=True)
+
+    return {
+        'testbench': testbench,
+        'alter_mode': config.get('alt_ext_mode', 'No') != 'No',
+        'swpl': swpl,
+        'simulator': config.get('simulator', 'finesim')
+    }
+
+
+def run_extraction(work_dir: str, script_path: str, max_workers: Optional[int] = None,
+                   cfg_file: str = 'config.cfg', skip_existing: bool = False,
+                   pack: Optional[bool] = None) -> Dict:
+    """
+    Run the ext stage for every PVT point of the plan in a process pool.
+
+    Args:
+        work_dir: Working directory path
+        script_path: Path to ver03 scripts (for configuration tables)
+        max_workers: Process pool size (default: config.EXTRACTION_WORKERS)
+        cfg_file: Config filename
+        skip_existing: Skip points whose report file already exists
+            (extracted incrementally while the sweep was running)
+        pack: Pack the reports into report/reports.zip afterwards
+            (default: config.REPORT_CONTAINER)
+
+    Returns:
+        Dict with keys: success, total, extracted, skipped, failed (list of {name, error})
+    """
+    if max_workers is None:
+        from config import EXTRACTION_WORKERS
+        max_workers = EXTRACTION_WORKERS
+    if pack is None:
+        from config import REPORT_CONTAINER
+        pack = REPORT_CONTAINER
+
+    config = load_stage_config(work_dir, script_path, cfg_file)
+    settings = _extraction_settings(work_dir, config)
+
+    plan = sweep_plan(work_dir, config)
+    pending = plan
+    if skip_existing:
+        with ReportReader(os.path.join(work_dir, 'report')) as reader:
+            pending = [p for p in plan if not reader.has(p['name'])]
+    skipped = len(plan) - len(pending)
+
+    logger.info(f"📊 Extracting {len(pending)} PVT points with {max_workers} workers "
+                f"(alter={settings['alter_mode']}, simulator={settings['simulator']}, "
+                f"already extracted={skipped})")
+
+    extracted = 0
+    failed = []
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(extract_point, work_dir, point, settings['testbench'], settings['alter_mode'],
+                        settings['swpl'], settings['simulator'])
+            for point in pending
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            if result['success']:
+                extracted += 1
+            else:
+                failed.append({'name': result['name'], 'error': result['error']})
+
+    for item in failed:
+        logger.warning(f"  ⚠️ {item['name']}: {item['error']}")
+
+    logger.info(f"  ✓ Extracted {extracted}/{len(pending)} PVT points")
+
+    if pack:
+        packed = pack_reports(os.path.join(work_dir, 'report'))
+        logger.info(f"  📦 Packed {packed['packed']} reports into {packed['container']} "
+                    f"({packed['total']} total)")
+
+    return {
+        'success': extracted + skipped > 0,
+        'total': len(plan),
+        'extracted': extracted,
+        'skipped': skipped,
+        'failed': failed
+    }
+
+
+def extract_jobs(work_dir: str, script_path: str, directory_paths: List[str],
+                 cfg_file: str = 'config.cfg') -> List[Dict]:
+    """
+    Extract the PVT points of individual completed jobs while the sweep runs.
+
+    Runs in the caller's thread (one point is a few milliseconds of work) and
+    refreshes report/creport_partial.txt from every report extracted so far.
+
+    Args:
+        work_dir: Working directory path
+        script_path: Path to ver03 scripts (for configuration tables)
+        directory_paths: Job directories ({corner}/{ex}/{ex}_{temp}/{voltage})
+        cfg_file: Config filename
+
+    Returns:
+        List of extract_point() results; directories that are not part of
+        the PVT plan are returned as failures
+    """
+    config = load_stage_config(work_dir, script_path, cfg_file)
+    settings = _extraction_settings(work_dir, config)
+    plan = sweep_plan(work_dir, config)
+
+    points_by_dir = dict((os.path.normpath(point_directory(work_dir, p)), p) for p in plan)
+
+    results = []
+    for path in directory_paths:
+        point = points_by_dir.get(os.path.normpath(path))
+        if point is None:
+            results.append({'name': os.path.relpath(path, work_dir), 'directory': path, 'report': None,
+                            'success': False, 'rows': 0, 'waveforms': 0,
+                            'error': "Directory is not part of the PVT plan"})
+            continue
+        results.append(extract_point(work_dir, point, settings['testbench'], settings['alter_mode'],
+                                     settings['swpl'], settings['simulator']))
+
+    if any(r['success'] for r in results):
+        write_partial_creport(work_dir, config, plan)
+
+    return results
+
+
+
+def creport_metadata(config: Dict[str, str]) -> List[str]:
+    """
+    Supply condition block written at the top of creport.txt (srt stage).
+
+    Args:
+        config: Stage configuration from load_stage_config()
+
+    Returns:
+        List of lines (without newlines), ending with the blank separator line
+    """
+    c = lambda key: config.get(key, '')
+
+    lines = [
+        "supply condition",
+        f"v1: {c('supply1')}",
+        f"v2: {c('supply2')}",
+        f"v3: {c('supply3')}",
+    ]
+
+    if c('vcc_vid') == 'Yes':
+        lines.append("vcc_vid: " + "; ".join(
+            f"vcc_{pc}#{c('vccmin_' + pc)},{c('vccnom_' + pc)},{c('vccmax_' + pc)}"
+            for pc in ('ff_h', 'ff_c', 'tt_h', 'tt_c', 'ss_h', 'ss_c')
+        ))
+    else:
+        lines.append(f"vcc none vid: {c('vccmin')},{c('vccnom')},{c('vccmax')}")
+
+    lines.extend([
+        f"vccana: {c('vccanamin')},{c('vccananom')},{c('vccanamax')}",
+        f"vccn: {c('vcnmin')},{c('vcnnom')},{c('vcnmax')}",
+        f"vcctx: {c('vctxmin')},{c('vctxnom')},{c('vctxmax')}",
+        "",
+    ])
+    return lines
+
+
+def _voltage_columns(config: Dict[str, str]) -> List[str]:
+    """Voltage column keys of creport.txt for the configured supplies."""
+    if config.get('supply3') in ('vccn', 'vccn_vcctx'):
+        return ['lv1', 'lv2', 'lv3']
+    elif config.get('supply2') == 'NA':
+        return ['lv1']
+    return ['lv1', 'lv2']
+
+
+def iter_creport_lines(work_dir: str, config: Dict[str, str], plan: Optional[List[Dict]] = None):
+    """
+    Generate creport.txt lines exactly as the shell srt stage does.
+
+    Each report is read once (loose file or report/reports.zip); the shell
+    re-reads the file from the top for every row (head -n $count | tail -1).
+    Missing reports contribute no rows, as in the shell. In a dense
+    temperature sweep the temp column holds each row's simulated
+    temperature (its 'swp' alter title), not the host point's.
+
+    Args:
+        work_dir: Working directory path
+        config: Stage configuration from load_stage_config()
+        plan: PVT plan (default: sweep_plan(work_dir, config))
+
+    Yields:
+        Lines (without newlines)
+    """
+    from alter_sweep import load_dense_sweep
+
+    if plan is None:
+        plan = sweep_plan(work_dir, config)
+
+    voltage_columns = _voltage_columns(config)
+    sweep = load_dense_sweep(work_dir)
+    swept_temp = sweep is not None and sweep['parameter'] == 'temp'
+
+    yield from creport_metadata(config)
+
+    # Header comes from the typical corner, 85C, nominal voltage report
+    header_name = "{0}_{1}_85_{2}".format(config.get('typ_corner', ''), config.get('typ_ex', ''),
+                                          get_vtrends(config)['nom'][0])
+    with ReportReader(os.path.join(work_dir, 'report')) as reader:
+        header_text = reader.read_text(header_name)
+        if header_text is None:
+            # Not simulated (dense temp sweep): first report available
+            header_text = next((t for t in (reader.read_text(p['name']) for p in plan) if t is not None), '')
+        header_tokens = header_text.split('\n', 1)[0].split()
+        prefix = ['process', 'extract', 'temp'] + ['v1', 'v2', 'v3'][:len(voltage_columns)]
+        yield '\t'.join(prefix) + '\t' + format_fields(header_tokens, CREPORT_FIELDS)
+
+        for point in plan:
+            lines = reader.read_lines(point['name'])
+            if lines is None:
+                continue
+            voltages = [point[col] for col in voltage_columns]
+            prefix = '\t'.join([point['corner'], point['extraction'], point['temp']] + voltages)
+            for line in lines[1:]:
+                tokens = line.split()
+                if swept_temp and tokens:
+                    yield '\t'.join([point['corner'], point['extraction'], tokens[0]] + voltages +
+                                     [format_fields(tokens, CREPORT_FIELDS)])
+                else:
+                    yield prefix + '\t' + format_fields(tokens, CREPORT_FIELDS)
+
+
+def _write_creport(path: str, lines) -> int:
+    """Write creport lines atomically, returning the line count."""
+    tmp_path = path + '.tmp'
+    count = 0
+    with open(tmp_path, 'w') as f:
+        for line in lines:
+            f.write(line + '\n')
+            count += 1
+    os.replace(tmp_path, path)
+    return count
+
+
+def write_partial_creport(work_dir: str, config: Dict[str, str], plan: Optional[List[Dict]] = None) -> str:
+    """
+    Write report/creport_partial.txt from the reports extracted so far.
+
+    Same format as creport.txt; points without a report yet are left out.
+
+    Returns:
+        Path to the partial creport
+    """
+    path = os.path.join(work_dir, 'report', PARTIAL_CREPORT)
+    _write_creport(path, iter_creport_lines(work_dir, config, plan))
+    return path
+
+
+def run_sorting(work_dir: str, script_path: str, cfg_file: str = 'config.cfg') -> Dict:
+    """
+    Run the srt stage: build report/creport.txt from the per-point reports.
+
+    Args:
+        work_dir: Working directory path
+        script_path: Path to ver03 scripts (for configuration tables)
+        cfg_file: Config filename
+
+    Returns:
+        Dict with keys: success, creport, rows, missing (list of point names)
+    """
+    config = load_stage_config(work_dir, script_path, cfg_file)
+    plan = sweep_plan(work_dir, config)
+
+    report_dir = os.path.join(work_dir, 'report')
+    os.makedirs(report_dir, exist_ok=True)
+    creport = os.path.join(report_dir, 'creport.txt')
+
+    with ReportReader(report_dir) as reader:
+        missing = [p['name'] for p in plan if not reader.has(p['name'])]
+    metadata_lines = len(creport_metadata(config)) + 1
+
+    count = _write_creport(creport, iter_creport_lines(work_dir, config, plan))
+
+    # The final creport supersedes the one built while jobs were running
+    partial = os.path.join(report_dir, PARTIAL_CREPORT)
+    if os.path.exists(partial):
+        os.remove(partial)
+
+    rows = count - metadata_lines
+    if missing:
+        logger.warning(f"  ⚠️ {len(missing)} report files missing, e.g. {missing[0]}")
+    logger.info(f"  ✓ Sorted {rows} rows from {len(plan) - len(missing)}/{len(plan)} reports")
+
+    return {
+        'success': len(missing) < len(plan),
+        'creport': creport,
+        'rows': rows,
+        'missing': missing
+    }
+
+if __name__ == '__main__':
+    import sys
+    import time
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    if len(sys.argv) < 3:
+        print("Usage: python3 extraction_engine.py <work_dir> <ver03_script_path> [ext|srt]")
+        sys.exit(1)
+
+    stage = sys.argv[3] if len(sys.argv) > 3 else 'ext'
+    start = time.time()
+    if stage == 'srt':
+        summary = run_sorting(sys.argv[1], sys.argv[2])
+        print(f"Sorted {summary['rows']} rows into {summary['creport']} in {time.time() - start:.3f}s")
+    else:
+        summary = run_extraction(sys.argv[1], sys.argv[2])
+        print(f"Extracted {summary['extracted']}/{summary['total']} points in {time.time() - start:.2f}s")
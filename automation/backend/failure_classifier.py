@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Failure Classifier - why did a PVT job fail?
+
+check_single_job_status() only knows that a job failed (NetBatch Exit Status
+-4/1, or an mt0 without "Successfully Completed"). classify_failure() scans
+the tails of the simulator log ({tb}.log) and the NetBatch output files
+(##...altera_png_vp...; they carry the whole job stdout plus the NetBatch
+header/footer) for known signatures:
+
+- oom:         the simulator or NetBatch ran out of memory
+- license:     no simulator license could be checked out
+- convergence: timestep too small / no convergence
+- netlist:     syntax errors, missing includes/models
+- host:        the execution host or file system failed, or NetBatch killed
+               the job (Exit Status -4) without any other explanation
+- unknown:     none of the above
+
+TRANSIENT_CLASSES are worth resubmitting unchanged (oom with more memory);
+convergence and netlist failures fail the same way again.
+"""
+
+import glob
+import os
+import re
+from typing import Dict, List, Optional
+
+# First match wins: OOM kills usually also leave host-like noise ("Killed")
+FAILURE_SIGNATURES = [
+    ('oom', re.compile(
+        r'out of memory|cannot allocate memory|memory allocation (failed|error)|bad_alloc|'
+        r'insufficient memory|not enough memory|memory limit (exceeded|reached)|'
+        r'exceed(ed|s)? (its |the )?memory (limit|reservation)|oom[- ]kill', re.IGNORECASE)),
+    ('license', re.compile(
+        r'licen[cs]e[^\n]*(not available|unavailable|denied|expired|checkout failed|error)|'
+        r'(failed|unable|cannot|could not) to (check ?out|checkout|obtain|get)[^\n]*licen[cs]e|'
+        r'licensed number of users already reached|no such feature exists|FLEXnet Licensing error', re.IGNORECASE)),
+    ('convergence', re.compile(
+        r'time ?step (is )?too small|(failed|unable) to converge|no convergence|'
+        r'convergence (failure|problem|error)|dc operating point[^\n]*(fail|not converge)', re.IGNORECASE)),
+    ('netlist', re.compile(
+        r'syntax error|cannot (open|find) (include )?file|(can ?not|can\'t) find (model|subckt|subcircuit)|'
+        r'undefined (subcircuit|subckt|model|parameter)|unknown (model|subckt|subcircuit)', re.IGNORECASE)),
+    ('host', re.compile(
+        r'stale (nfs )?file handle|no space left on device|input/output error|'
+        r'host[^\n]*(down|unreachable|failure)|lost connection|connection (refused|reset|timed out)|'
+        r'segmentation fault|sigsegv|bus error|preempted|exit status\s*:\s*-4', re.IGNORECASE)),
+]
+
+FAILURE_CLASSES = [name for name, _ in FAILURE_SIGNATURES] + ['unknown']
+TRANSIENT_CLASSES = ('oom', 'license', 'host')
+
+# Bytes read from the end of each log (the failure is reported last)
+TAIL_BYTES = 64 * 1024
+
+
+def _tail(path: str, size: int = TAIL_BYTES) -> str:
+    """Last `size` bytes of a file as text ('' if unreadable)."""
+    try:
+        with open(path, 'rb') as f:
+            f.seek(max(0, os.path.getsize(path) - size))
+            return f.read().decode('utf-8', errors='ignore')
+    except OSError:
+        return ''
+
+
+def failure_logs(directory: str, testbench: str = 'sim_tx') -> List[str]:
+    """Simulator log and NetBatch output files of a PVT directory, if present."""
+    paths = [os.path.join(directory, f"{testbench}.log")]
+    paths += sorted(glob.glob(os.path.join(glob.escape(directory), '##*altera_png_vp*')))
+    return [p for p in paths if os.path.isfile(p)]
+
+
+def _match_line(name: str, match, text: str) -> Dict:
+    """{'class', 'detail'} with the (whitespace-collapsed) line of a match."""
+    start = text.rfind('\n', 0, match.start()) + 1
+    end = text.find('\n', match.end())
+    line = text[start:end if end >= 0 else len(text)]
+    return {'class': name, 'detail': ' '.join(line.strip(' |').split())[:300]}
+
+
+def classify_text(text: str) -> Optional[Dict]:
+    """
+    Match log text against FAILURE_SIGNATURES.
+
+    Returns:
+        Dict with keys: class, detail (the matching line), or None
+    """
+    for name, pattern in FAILURE_SIGNATURES:
+        match = pattern.search(text)
+        if match:
+            return _match_line(name, match, text)
+    return None
+
+
+def classify_failure(directory: str, testbench: str = 'sim_tx') -> Dict:
+    """
+    Classify a failed job from the logs in its PVT directory.
+
+    Signatures are checked in FAILURE_SIGNATURES order across all logs, so an
+    out-of-memory message in sim_tx.log wins over the NetBatch -4 exit status.
+
+    Args:
+        directory: PVT directory of the job
+        testbench: Testbench name
+
+    Returns:
+        Dict with keys: class (FAILURE_CLASSES), detail, source (log file
+        name or None), transient (bool)
+    """
+    texts = [(path, _tail(path)) for path in failure_logs(directory, testbench)]
+
+    for name, pattern in FAILURE_SIGNATURES:
+        for path, text in texts:
+            match = pattern.search(text)
+            if match:
+                return dict(_match_line(name, match, text), source=os.path.basename(path),
+                            transient=name in TRANSIENT_CLASSES)
+
+    detail = 'no output files' if not texts else 'no known failure signature'
+    return {'class': 'unknown', 'detail': detail, 'source': None, 'transient': False}
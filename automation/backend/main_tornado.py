@@ -11,12 +11,14 @@ Phase 2A Features:
 import tornado.ioloop
 import tornado.web
 import tornado.escape
+import tornado.gen
 import sqlite3
 import json
 import os
 import sys
+import shutil
+from concurrent.futures import CancelledError
 from datetime import datetime
-from pathlib import Path
 
 # Add backend to path
 sys.path.insert(0, os.path.dirname(__file__))
@@ -26,6 +28,7 @@ from netbatch_monitor import (
     query_netbatch_status, 
     get_summary_stats, 
     capture_job_ids_from_log,
+    remove_netbatch_jobs_batched,
     CURRENT_USER
 )
 from simulation import (
@@ -33,11 +36,10 @@ from simulation import (
     create_work_directory,
     copy_simulation_files,
     update_config_file,
+    run_preflight_stage,
+    run_dense_sweep_setup,
     run_generation_stage,
     run_submission_stage,
-    run_extraction_stage,
-    run_sorting_stage,
-    run_backup_stage,
     get_available_voltage_domains,  # Import voltage domain function
     validate_custom_corners  # Import corner validation
 )
@@ -45,14 +47,22 @@ from simulation import (
 # Phase 2A: Import WebSocket handler and background monitor
 from websocket_handler import SimulationWebSocket
 from background_monitor import BackgroundMonitor
+from results_store import ResultsStore, init_results_table
+from stage_executor import get_stage_executor
+from results_cache import get_results_cache
+from preflight import get_preflight_cache
+from api_json import to_json, parse_precision
+from config import API_GZIP, EXPORT_CHUNK_ROWS, SUBMISSION_ORDER, STOP_ON_FIRST_FAILURE, CANARY_RUN, PREFLIGHT_VALIDATION, AUTO_RETRY
+from stage_pipeline import StagePipeline, init_checkpoint_table, run_pipeline_stage, STAGE_STATES
+from waveform_archive import init_archive_table, queue_archival
+from measurement_index import MeasurementIndex, init_measurement_table, queue_indexing
 
 # Import sync utility for startup auto-sync
 from sync_shared_files import sync_shared_files
 
-# Database path - use absolute path for consistency
-BACKEND_DIR = Path(__file__).parent.resolve()
-AUTOMATION_DIR = BACKEND_DIR.parent.resolve()
-DB_PATH = str(AUTOMATION_DIR / "webapp.db")
+# Database path - absolute, shared with the stage modules (config.DB_PATH)
+import config
+DB_PATH = config.DB_PATH
 
 # Debug logging to confirm database location
 print(f"📊 Database path: {DB_PATH}")
@@ -167,11 +177,25 @@ def create_job_directory_mapping(sim_id, job_ids, work_dir):
         
     The mapping is stored in the job_tracking table for accurate per-job
     status monitoring even after jobs complete and are purged from NetBatch.
+    
+    Sweeps submitted by the Python submission engine (any submission order)
+    are mapped from its job_map.csv instead.
     """
     if not os.path.exists(work_dir):
         print(f"⚠️ Warning: work_dir does not exist: {work_dir}")
         return
     
+    from submission_engine import read_job_map
+    job_map = read_job_map(work_dir)
+    if job_map is not None:
+        insert_job_mappings(sim_id, [(job['job_id'], {
+            'path': job['directory_path'],
+            'corner': job['corner'],
+            'temperature': job['temperature'],
+            'voltage': job['voltage']
+        }) for job in job_map])
+        return
+    
     # Parse config.cfg to determine expected directory structure
     config_path = os.path.join(work_dir, 'config.cfg')
     if not os.path.exists(config_path):
@@ -301,13 +325,23 @@ def create_job_directory_mapping(sim_id, job_ids, work_dir):
     else:
         print(f"✅ Job count matches: {len(job_ids)} jobs = {len(expected_paths)} expected paths")
     
-    # Create mappings in database
     # Job IDs and expected paths should be in matching order
+    insert_job_mappings(sim_id, zip(sorted(job_ids), expected_paths))
+
+
+def insert_job_mappings(sim_id, mappings):
+    """
+    Store job-directory mappings in the job_tracking table.
+    
+    Args:
+        sim_id (str): Simulation ID
+        mappings: Iterable of (job_id, {'path', 'corner', 'temperature', 'voltage'})
+    """
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
     
     mapped_count = 0
-    for job_id, dir_info in zip(sorted(job_ids), expected_paths):
+    for job_id, dir_info in mappings:
         try:
             c.execute('''
                 INSERT OR REPLACE INTO job_tracking 
@@ -326,6 +360,15 @@ def create_job_directory_mapping(sim_id, job_ids, work_dir):
 
 
 # Simple database initialization
+# simulations columns added by migrate_db() on existing databases
+SIMULATION_ADDED_COLUMNS = [('submit_order', 'TEXT'), ('stop_on_failure', 'INTEGER DEFAULT 0'),
+                            ('canary', 'TEXT'), ('canary_log', 'TEXT'), ('cancel_reason', 'TEXT'),
+                            ('dense_sweep', 'TEXT'), ('temperature_list', 'TEXT'), ('voltage_sweep', 'TEXT')]
+# job_tracking columns added by migrate_db() on existing databases (failure classification/retry)
+JOB_TRACKING_ADDED_COLUMNS = [('failure_class', 'TEXT'), ('failure_detail', 'TEXT'),
+                              ('attempts', 'INTEGER DEFAULT 1'), ('memory_gb', 'INTEGER'),
+                              ('retry_history', 'TEXT')]
+
 def init_db():
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
@@ -354,7 +397,15 @@ def init_db():
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             submitted_at TIMESTAMP,
             completed_at TIMESTAMP,
-            finished_at TIMESTAMP
+            finished_at TIMESTAMP,
+            submit_order TEXT,
+            stop_on_failure INTEGER DEFAULT 0,
+            canary TEXT,
+            canary_log TEXT,
+            cancel_reason TEXT,
+            dense_sweep TEXT,
+            temperature_list TEXT,
+            voltage_sweep TEXT
         )
     ''')
     
@@ -371,6 +422,11 @@ def init_db():
             status TEXT DEFAULT 'waiting',
             last_checked TIMESTAMP,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            failure_class TEXT,
+            failure_detail TEXT,
+            attempts INTEGER DEFAULT 1,
+            memory_gb INTEGER,
+            retry_history TEXT,
             UNIQUE(sim_id, job_id),
             FOREIGN KEY(sim_id) REFERENCES simulations(sim_id) ON DELETE CASCADE
         )
@@ -381,6 +437,18 @@ def init_db():
     c.execute('CREATE INDEX IF NOT EXISTS idx_job_tracking_status ON job_tracking(sim_id, status)')
     c.execute('CREATE INDEX IF NOT EXISTS idx_job_tracking_jobid ON job_tracking(job_id)')
     
+    # Create point_results table for incremental per-job extraction
+    init_results_table(conn)
+    
+    # Create stage_checkpoints table for the resumable ext/srt/bkp pipeline
+    init_checkpoint_table(conn)
+    
+    # Create waveform_archives table for background waveform archival
+    init_archive_table(conn)
+    
+    # Create measurements table (cross-simulation measurement index)
+    init_measurement_table(conn)
+    
     conn.commit()
     conn.close()
     print(f"✓ Database initialized: {DB_PATH}")
@@ -446,7 +514,15 @@ def migrate_db():
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 submitted_at TIMESTAMP,
                 completed_at TIMESTAMP,
-                finished_at TIMESTAMP
+                finished_at TIMESTAMP,
+                submit_order TEXT,
+                stop_on_failure INTEGER DEFAULT 0,
+                canary TEXT,
+                canary_log TEXT,
+                cancel_reason TEXT,
+                dense_sweep TEXT,
+                temperature_list TEXT,
+                voltage_sweep TEXT
             )
         ''')
         
@@ -468,6 +544,7 @@ def migrate_db():
         existing_cols.extend(['state', 'work_dir', 'backup_dir', 'netbatch_job_ids', 'job_log_path',
                              'total_jobs', 'jobs_completed', 'jobs_running', 'jobs_waiting', 'jobs_errors',
                              'progress_pct', 'username', 'created_at', 'submitted_at', 'completed_at', 'finished_at'])
+        existing_cols.extend(name for name, _ in SIMULATION_ADDED_COLUMNS)
         
         # Filter to only columns that exist in old table
         select_cols = [col for col in existing_cols if col in column_names]
@@ -486,6 +563,13 @@ def migrate_db():
         conn.commit()
         print("✓ Database migration complete: Added nb_cores, nb_memory, custom_corners, and custom_extraction columns")
     
+    # Columns added after the table rebuild above (submission options)
+    c.execute("PRAGMA table_info(simulations)")
+    column_names = [col[1] for col in c.fetchall()]
+    for name, column_type in SIMULATION_ADDED_COLUMNS:
+        if name not in column_names:
+            c.execute('ALTER TABLE simulations ADD COLUMN {0} {1}'.format(name, column_type))
+    
     # Ensure job_tracking table exists (add to existing databases)
     c.execute('''
         CREATE TABLE IF NOT EXISTS job_tracking (
@@ -499,6 +583,11 @@ def migrate_db():
             status TEXT DEFAULT 'waiting',
             last_checked TIMESTAMP,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            failure_class TEXT,
+            failure_detail TEXT,
+            attempts INTEGER DEFAULT 1,
+            memory_gb INTEGER,
+            retry_history TEXT,
             UNIQUE(sim_id, job_id),
             FOREIGN KEY(sim_id) REFERENCES simulations(sim_id) ON DELETE CASCADE
         )
@@ -508,6 +597,24 @@ def migrate_db():
     c.execute('CREATE INDEX IF NOT EXISTS idx_job_tracking_sim ON job_tracking(sim_id)')
     c.execute('CREATE INDEX IF NOT EXISTS idx_job_tracking_status ON job_tracking(sim_id, status)')
     c.execute('CREATE INDEX IF NOT EXISTS idx_job_tracking_jobid ON job_tracking(job_id)')
+    
+    c.execute("PRAGMA table_info(job_tracking)")
+    column_names = [col[1] for col in c.fetchall()]
+    for name, column_type in JOB_TRACKING_ADDED_COLUMNS:
+        if name not in column_names:
+            c.execute('ALTER TABLE job_tracking ADD COLUMN {0} {1}'.format(name, column_type))
+    
+    # Ensure point_results table exists (incremental per-job extraction)
+    init_results_table(conn)
+    
+    # Ensure stage_checkpoints table exists (resumable ext/srt/bkp pipeline)
+    init_checkpoint_table(conn)
+    
+    # Ensure waveform_archives table exists (background waveform archival)
+    init_archive_table(conn)
+    
+    # Ensure measurements table exists (cross-simulation measurement index)
+    init_measurement_table(conn)
     conn.commit()
     
     conn.close()
@@ -535,13 +642,13 @@ class IndexHandler(tornado.web.RequestHandler):
             }
         }
         self.set_header("Content-Type", "application/json")
-        self.write(json.dumps(info, indent=2))
+        self.write(to_json(info))
 
 class HealthHandler(tornado.web.RequestHandler):
     """Health check"""
     def get(self):
         self.set_header("Content-Type", "application/json")
-        self.write(json.dumps({"status": "healthy", "user": CURRENT_USER}))
+        self.write(to_json({"status": "healthy", "user": CURRENT_USER}))
 
 class SimulationsHandler(tornado.web.RequestHandler):
     """List all simulations for current user"""
@@ -567,7 +674,7 @@ class SimulationsHandler(tornado.web.RequestHandler):
             simulations.append(sim)
         
         self.set_header("Content-Type", "application/json")
-        self.write(json.dumps({"simulations": simulations, "count": len(simulations)}, indent=2))
+        self.write(to_json({"simulations": simulations, "count": len(simulations)}))
 
 class SubmitHandler(tornado.web.RequestHandler):
     """Submit new simulation"""
@@ -699,6 +806,7 @@ class SubmitHandler(tornado.web.RequestHandler):
                 "supply3": "NA"
             }
     
+    @tornado.gen.coroutine
     def post(self):
         try:
             # Parse JSON body
@@ -723,17 +831,17 @@ class SubmitHandler(tornado.web.RequestHandler):
             # Validation
             if not all([project, voltage_domain]):
                 self.set_status(400)
-                self.write(json.dumps({"error": "Missing required fields"}))
+                self.write(to_json({"error": "Missing required fields"}))
                 return
             
             if not corners or len(corners) == 0:
                 self.set_status(400)
-                self.write(json.dumps({"error": "At least one corner must be selected"}))
+                self.write(to_json({"error": "At least one corner must be selected"}))
                 return
             
             if not temperatures or len(temperatures) == 0:
                 self.set_status(400)
-                self.write(json.dumps({"error": "At least one temperature must be selected"}))
+                self.write(to_json({"error": "At least one temperature must be selected"}))
                 return
             
             # Validate that each temperature has voltage specifications
@@ -741,19 +849,19 @@ class SubmitHandler(tornado.web.RequestHandler):
                 volt_key = f"temp_{temp}_voltages"
                 if volt_key not in temp_voltages:
                     self.set_status(400)
-                    self.write(json.dumps({"error": f"Missing voltage specification for temperature {temp}°C"}))
+                    self.write(to_json({"error": f"Missing voltage specification for temperature {temp}°C"}))
                     return
                 voltages = temp_voltages[volt_key].split(',')
                 if len(voltages) == 0 or (len(voltages) == 1 and voltages[0] == ''):
                     self.set_status(400)
-                    self.write(json.dumps({"error": f"No voltages selected for temperature {temp}°C"}))
+                    self.write(to_json({"error": f"No voltages selected for temperature {temp}°C"}))
                     return
             
             # Validate corners
             validation = validate_custom_corners(corners)
             if not validation['valid']:
                 self.set_status(400)
-                self.write(json.dumps({"error": validation['error']}))
+                self.write(to_json({"error": validation['error']}))
                 return
             
             # Log warning if TT not selected
@@ -765,15 +873,27 @@ class SubmitHandler(tornado.web.RequestHandler):
                 import os
                 if not os.path.exists(custom_template_path):
                     self.set_status(400)
-                    self.write(json.dumps({"error": f"Custom template path does not exist: {custom_template_path}"}))
+                    self.write(to_json({"error": f"Custom template path does not exist: {custom_template_path}"}))
                     return
                 if not os.path.isdir(custom_template_path):
                     self.set_status(400)
-                    self.write(json.dumps({"error": "Custom template path must be a directory"}))
+                    self.write(to_json({"error": "Custom template path must be a directory"}))
                     return
             
             # Get voltage condition
             voltage_condition = data.get('voltage_condition', 'perf')
+            
+            # Submission order ('plan' | 'risk') and early termination on the first failure
+            from submission_engine import ORDER_POLICIES
+            submit_order = data.get('submit_order') or SUBMISSION_ORDER
+            stop_on_failure = bool(data.get('stop_on_failure', STOP_ON_FIRST_FAILURE))
+            canary = bool(data.get('canary', CANARY_RUN))
+            # Dense sweep: {"parameter": "vcn", "steps": 20} or {"parameter": "temp", "values": [...]}
+            dense_sweep = data.get('dense_sweep')
+            if submit_order not in ORDER_POLICIES:
+                self.set_status(400)
+                self.write(to_json({"error": f"Unknown submit_order: {submit_order} (use {', '.join(ORDER_POLICIES)})"}))
+                return
 
             # ROOT CAUSE #6 FIX: Normalize voltage selections based on supply configuration
             try:
@@ -811,6 +931,32 @@ class SubmitHandler(tornado.web.RequestHandler):
             copy_simulation_files(work_dir, project, voltage_domain, custom_template_path)
             update_config_file(work_dir, corners, temperatures, temp_voltages, nb_cores, nb_memory, project, voltage_domain, voltage_condition)
             
+            # Dense sweep: one job per host point runs every step as an .alter block
+            dense_summary = None
+            if dense_sweep:
+                try:
+                    dense_summary = yield get_stage_executor().submit('pre', run_dense_sweep_setup, work_dir, dense_sweep,
+                                                                      project=project, voltage_domain=voltage_domain,
+                                                                      label=sim_id)
+                except ValueError as e:
+                    shutil.rmtree(work_dir, ignore_errors=True)
+                    self.set_status(400)
+                    self.write(to_json({"error": f"Invalid dense_sweep: {e}"}))
+                    return
+            
+            # Pre-flight: reject missing include files / model sections before anything runs
+            if PREFLIGHT_VALIDATION:
+                preflight = yield get_stage_executor().submit('pre', run_preflight_stage, work_dir, project=project,
+                                                              voltage_domain=voltage_domain, label=sim_id)
+                if not preflight['ok']:
+                    shutil.rmtree(work_dir, ignore_errors=True)
+                    self.set_status(400)
+                    self.write(to_json({
+                        "error": f"Pre-flight validation failed: {preflight['errors'][0]}",
+                        "preflight": preflight
+                    }))
+                    return
+            
             # Insert into database
             conn = sqlite3.connect(DB_PATH)
             c = conn.cursor()
@@ -821,31 +967,50 @@ class SubmitHandler(tornado.web.RequestHandler):
             c.execute('''
                 INSERT INTO simulations 
                 (sim_id, project, voltage_domain, corner_set, nb_cores, nb_memory, work_dir, username, state, 
-                 custom_corners, custom_extraction, temperature_list, voltage_sweep)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'created', ?, ?, ?, ?)
+                 custom_corners, custom_extraction, temperature_list, voltage_sweep, submit_order, stop_on_failure,
+                 dense_sweep)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'created', ?, ?, ?, ?, ?, ?, ?)
             ''', (sim_id, project, voltage_domain, 'custom', nb_cores, nb_memory, work_dir, CURRENT_USER, 
-                  json.dumps(corners), 'typical', ','.join(temperatures), temp_voltages_json))
+                  json.dumps(corners), 'typical', ','.join(temperatures), temp_voltages_json,
+                  submit_order, int(stop_on_failure),
+                  json.dumps({k: dense_summary[k] for k in ('parameter', 'values')}) if dense_summary else None))
             db_id = c.lastrowid
             conn.commit()
             conn.close()
             
+            # Run generation and submission stages on the shared stage executor
+            # (per-stage concurrency limits; the IOLoop is not blocked meanwhile)
+            executor = get_stage_executor()
+            
             # Run generation stage
             print(f"[{sim_id}] Running generation stage...")
-            gen_result = run_generation_stage(work_dir, project=project, voltage_domain=voltage_domain)
+            gen_result = yield executor.submit('gen', run_generation_stage, work_dir, project=project,
+                                               voltage_domain=voltage_domain, label=sim_id)
             if gen_result:
                 print(f"[{sim_id}] Generation complete")
             else:
                 raise Exception(f"Generation failed")
-            
-            # Run submission stage
-            print(f"[{sim_id}] Running submission stage...")
-            job_log_path = run_submission_stage(work_dir, project=project, voltage_domain=voltage_domain)
+            if simulation_cancelled(sim_id):
+                raise CancelledError()
+            
+            # Run submission stage (canary run: the nominal point only, the
+            # background monitor releases the rest once it produced results)
+            print(f"[{sim_id}] Running submission stage{' (canary)' if canary else ''}...")
+            job_log_path = yield executor.submit('run', run_submission_stage, work_dir, project=project,
+                                                 voltage_domain=voltage_domain, order=submit_order,
+                                                 part='canary' if canary else 'all', label=sim_id)
             if job_log_path:
                 print(f"[{sim_id}] Submission complete")
                 
                 # Capture job IDs (job_log_path is returned from run_submission_stage)
                 job_ids = capture_job_ids_from_log(job_log_path)
                 
+                # The shell run stage (post-layout) has no canary: it submitted everything
+                from submission_engine import read_job_map
+                canary_state = 'pending' if canary and read_job_map(work_dir) is not None else None
+                if canary and canary_state is None:
+                    print(f"[{sim_id}] Canary run not available for this sweep, submitted all points")
+                
                 # Create job-directory mapping for accurate status tracking
                 print(f"[{sim_id}] Creating job-directory mapping...")
                 create_job_directory_mapping(sim_id, job_ids, work_dir)
@@ -855,17 +1020,23 @@ class SubmitHandler(tornado.web.RequestHandler):
                 c = conn.cursor()
                 c.execute('''
                     UPDATE simulations 
-                    SET state = 'submitted',
+                    SET state = CASE WHEN state = 'cancelled' THEN state ELSE 'submitted' END,
                         netbatch_job_ids = ?,
                         job_log_path = ?,
                         total_jobs = ?,
+                        canary = ?,
                         submitted_at = CURRENT_TIMESTAMP
                     WHERE id = ?
-                ''', (json.dumps(job_ids), job_log_path, len(job_ids), db_id))
+                ''', (json.dumps(job_ids), job_log_path, len(job_ids), canary_state, db_id))
                 conn.commit()
                 conn.close()
                 
                 print(f"[{sim_id}] {len(job_ids)} jobs submitted to NetBatch")
+                
+                # Cancelled while the run stage was submitting: take the jobs back off the farm
+                if simulation_cancelled(sim_id):
+                    yield executor.submit('cxl', cancel_tracked_jobs, [sim_id], label=sim_id)
+                    raise CancelledError()
             else:
                 raise Exception(f"Submission failed")
             
@@ -875,18 +1046,29 @@ class SubmitHandler(tornado.web.RequestHandler):
             response_msg = f"Simulation {sim_id} submitted successfully. Corners: {', '.join(corners)} | Temps: {temp_str} | Voltages: {volt_summary}"
             
             self.set_header("Content-Type", "application/json")
-            self.write(json.dumps({
+            self.write(to_json({
                 "sim_id": sim_id,
                 "status": "submitted",
                 "work_dir": work_dir,
                 "jobs_submitted": len(job_ids),
+                "submit_order": submit_order,
+                "stop_on_failure": stop_on_failure,
+                "canary": canary_state,
+                "dense_sweep": dense_summary,
                 "message": response_msg
-            }, indent=2))
+            }))
+            
+        except CancelledError:
+            # CancelHandler released the queued stage task or cancelled mid-stage
+            print(f"[{sim_id}] Submission stopped: simulation cancelled")
+            self.set_status(409)
+            self.write(to_json({"sim_id": sim_id, "status": "cancelled",
+                                "error": f"Simulation {sim_id} was cancelled"}))
             
         except Exception as e:
             print(f"Error in submit: {e}")
             self.set_status(500)
-            self.write(json.dumps({"error": str(e)}))
+            self.write(to_json({"error": str(e)}))
 
 
 def check_single_job_status(job_id, directory_path, current_status='waiting'):
@@ -905,14 +1087,16 @@ def check_single_job_status(job_id, directory_path, current_status='waiting'):
         current_status (str): Current status from database (default: 'waiting')
         
     Returns:
-        str: Status - 'completed', 'error', 'running', or 'waiting'
+        str: Status - 'completed', 'error', 'running', 'waiting', 'cancelled'
+        or 'retrying'
     """
     import logging
     logger = logging.getLogger(__name__)
     
-    # Lock 'error' status only - errors are final
+    # Lock 'error' and 'cancelled' status only - both are final
+    # ('retrying' is owned by the background monitor until the job is resubmitted)
     # But 'completed' status must be RE-VERIFIED to catch false positives!
-    if current_status == 'error':
+    if current_status in ('error', 'cancelled', 'retrying'):
         return current_status
     
     # PRIORITY 1: Check file system for completion/error markers (ALWAYS, even if currently 'completed')
@@ -920,6 +1104,11 @@ def check_single_job_status(job_id, directory_path, current_status='waiting'):
         # Check for completion marker (MT0 file)
         mt0_file = os.path.join(directory_path, "sim_tx.mt0")
         log_file = os.path.join(directory_path, "sim_tx.log")
+        # .alter decks (primesim) write sim_tx_a0.mt0 after the first alter run,
+        # so without "Successfully Completed" the job may still be running
+        alter_run = not os.path.exists(mt0_file) and os.path.exists(os.path.join(directory_path, "sim_tx_a0.mt0"))
+        if alter_run:
+            mt0_file = os.path.join(directory_path, "sim_tx_a0.mt0")
         
         # CRITICAL: Check if .mt0 file exists - this is the ONLY proof of completion
         if os.path.exists(mt0_file) and os.path.getsize(mt0_file) > 0:
@@ -936,7 +1125,7 @@ def check_single_job_status(job_id, directory_path, current_status='waiting'):
                         if current_status == 'completed':
                             logger.debug(f"Job {job_id}: Re-verified 'completed' status (output file exists)")
                         return 'completed'
-                    else:
+                    elif not alter_run:
                         # MT0 exists but log shows error
                         if current_status == 'completed':
                             logger.warning(f"Job {job_id}: FALSE POSITIVE DETECTED - marked 'completed' but log shows error")
@@ -945,7 +1134,7 @@ def check_single_job_status(job_id, directory_path, current_status='waiting'):
                         return 'error'
                 except Exception:
                     return 'completed'  # Assume completed if can't read log
-            else:
+            elif not alter_run:
                 return 'completed'  # MT0 exists, assume completed
         else:
             # NO MT0 FILE - this is a false positive if currently marked 'completed'
@@ -985,9 +1174,10 @@ def check_single_job_status(job_id, directory_path, current_status='waiting'):
         # Must re-check filesystem for completion markers!
         if os.path.exists(directory_path):
             # Check for .mt0 file (completed)
-            mt0_file = os.path.join(directory_path, "sim_tx.mt0")
-            if os.path.exists(mt0_file) and os.path.getsize(mt0_file) > 0:
-                return 'completed'
+            for mt0_name in ("sim_tx.mt0", "sim_tx_a0.mt0"):
+                mt0_file = os.path.join(directory_path, mt0_name)
+                if os.path.exists(mt0_file) and os.path.getsize(mt0_file) > 0:
+                    return 'completed'
             
             # Check for error markers
             try:
@@ -1046,7 +1236,7 @@ def get_simulation_status_from_tracking(sim_id):
     
     # Get all jobs for this simulation
     c.execute('''
-        SELECT job_id, directory_path, status 
+        SELECT job_id, directory_path, status, failure_class 
         FROM job_tracking 
         WHERE sim_id = ?
     ''', (sim_id,))
@@ -1063,8 +1253,12 @@ def get_simulation_status_from_tracking(sim_id):
         'completed': 0,
         'running': 0,
         'waiting': 0,
-        'error': 0
+        'error': 0,
+        'cancelled': 0,
+        'retrying': 0
     }
+    # Failed jobs the background monitor has not classified (and maybe retried) yet
+    unclassified = 0
     
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
@@ -1086,33 +1280,195 @@ def get_simulation_status_from_tracking(sim_id):
             ''', (new_status, job_id))
         
         status_counts[new_status] += 1
+        if new_status == 'error' and job['failure_class'] is None:
+            unclassified += 1
     
     conn.commit()
     conn.close()
     
     # Calculate progress and return stats
     total = sum(status_counts.values())
-    finished_count = status_counts['completed'] + status_counts['error']
+    finished_count = status_counts['completed'] + status_counts['error'] + status_counts['cancelled']
     progress_pct = round(finished_count / total * 100, 1) if total > 0 else 0.0
     
     # Two completion flags:
     # - all_complete: Perfect completion (no errors, all completed)
     # - all_jobs_finished: All jobs done (may include errors, but nothing running/waiting)
     all_complete = (status_counts['completed'] == total) and (status_counts['error'] == 0)
-    all_jobs_finished = (status_counts['running'] == 0) and (status_counts['waiting'] == 0)
+    # Jobs being resubmitted count as waiting
+    waiting = status_counts['waiting'] + status_counts['retrying']
+    all_jobs_finished = (status_counts['running'] == 0) and (waiting == 0)
     
     return {
         'total': total,
         'completed': status_counts['completed'],
         'running': status_counts['running'],
-        'waiting': status_counts['waiting'],
+        'waiting': waiting,
         'errors': status_counts['error'],
+        'cancelled': status_counts['cancelled'],
+        'retrying': status_counts['retrying'],
+        'unclassified_errors': unclassified,
         'progress_pct': progress_pct,
         'all_complete': all_complete,
         'all_jobs_finished': all_jobs_finished  # NEW: Indicates monitoring can stop
     }
 
 
+def get_job_failures(sim_id):
+    """
+    Failed and retried jobs of a simulation with their failure class.
+    
+    Args:
+        sim_id (str): Simulation ID
+        
+    Returns:
+        list: One dict per job that failed at least once (retry_history parsed)
+    """
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    c = conn.cursor()
+    c.execute('''
+        SELECT job_id, corner, temperature, voltage_combo, status, failure_class,
+               failure_detail, attempts, memory_gb, retry_history
+        FROM job_tracking
+        WHERE sim_id = ? AND (failure_class IS NOT NULL OR attempts > 1)
+        ORDER BY corner, temperature, voltage_combo
+    ''', (sim_id,))
+    failures = []
+    for row in c.fetchall():
+        job = dict(row)
+        job['retry_history'] = json.loads(job['retry_history'] or '[]')
+        failures.append(job)
+    conn.close()
+    return failures
+
+
+# Simulation states a cancel request applies to (generation/submission or jobs on the farm)
+CANCELLABLE_STATES = ('created', 'submitted', 'running')
+
+
+def simulation_cancelled(sim_id):
+    """True if a cancel request reached the simulation (CancelHandler)."""
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute('SELECT state FROM simulations WHERE sim_id = ?', (sim_id,))
+    row = c.fetchone()
+    conn.close()
+    return row is not None and row[0] == 'cancelled'
+
+
+def mark_simulations_cancelled(sim_ids, reason):
+    """
+    Set simulations to 'cancelled' and release their queued stage executor tasks.
+    
+    The state change comes first: it stops the background monitor, canary
+    releases, retries and in-flight submissions from adding jobs. The NetBatch
+    jobs themselves are removed by cancel_tracked_jobs().
+    
+    Args:
+        sim_ids (list): Simulation IDs
+        reason (str): Why the simulations are cancelled
+        
+    Returns:
+        list: One dict per sim_id with sim_id, cancelled (bool), state (before
+        the request), stage_tasks_released, and error if not cancelled
+    """
+    executor = get_stage_executor()
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    
+    results = []
+    for sim_id in sim_ids:
+        c.execute('SELECT state FROM simulations WHERE sim_id = ? AND username = ?', (sim_id, CURRENT_USER))
+        row = c.fetchone()
+        if not row:
+            results.append({"sim_id": sim_id, "cancelled": False, "state": None, "error": "Simulation not found"})
+            continue
+        if row[0] not in CANCELLABLE_STATES:
+            results.append({"sim_id": sim_id, "cancelled": False, "state": row[0],
+                            "error": f"Simulation is {row[0]}, nothing to cancel"})
+            continue
+        
+        c.execute('''
+            UPDATE simulations SET
+                state = 'cancelled',
+                cancel_reason = ?,
+                canary = CASE WHEN canary = 'pending' THEN 'cancelled' ELSE canary END,
+                completed_at = CURRENT_TIMESTAMP
+            WHERE sim_id = ?
+        ''', (reason, sim_id))
+        conn.commit()
+        
+        results.append({
+            "sim_id": sim_id,
+            "cancelled": True,
+            "state": row[0],
+            "stage_tasks_released": executor.cancel_queued(sim_id)
+        })
+    
+    conn.close()
+    return results
+
+
+def cancel_tracked_jobs(sim_ids):
+    """
+    Remove the unfinished jobs of simulations and mark them 'cancelled'.
+    
+    'waiting' and 'running' jobs of all simulations go out in batched
+    `nbjob remove` calls; 'retrying' jobs have no live NetBatch job and are
+    marked directly. Jobs nbjob did not accept keep their status.
+    
+    Args:
+        sim_ids (list): Simulation IDs
+        
+    Returns:
+        dict: sim_id -> {'jobs_cancelled': int, 'jobs_not_removed': [job_id, ...]}
+    """
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    
+    jobs = []
+    for sim_id in sim_ids:
+        c.execute('''
+            SELECT sim_id, job_id, status FROM job_tracking
+            WHERE sim_id = ? AND status IN ('waiting', 'running', 'retrying')
+        ''', (sim_id,))
+        jobs.extend(c.fetchall())
+    conn.close()
+    
+    removed = set(remove_netbatch_jobs_batched([job_id for _, job_id, status in jobs if status != 'retrying']))
+    
+    counts = dict((sim_id, {'jobs_cancelled': 0, 'jobs_not_removed': []}) for sim_id in sim_ids)
+    cancelled = []
+    for sim_id, job_id, status in jobs:
+        if status == 'retrying' or job_id in removed:
+            cancelled.append((sim_id, job_id))
+            counts[sim_id]['jobs_cancelled'] += 1
+        else:
+            counts[sim_id]['jobs_not_removed'].append(job_id)
+    
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.executemany('''
+        UPDATE job_tracking SET status = 'cancelled', last_checked = CURRENT_TIMESTAMP
+        WHERE sim_id = ? AND job_id = ?
+    ''', cancelled)
+    for sim_id in sim_ids:
+        c.execute('''
+            UPDATE simulations SET
+                jobs_running = (SELECT COUNT(*) FROM job_tracking WHERE sim_id = ? AND status = 'running'),
+                jobs_waiting = (SELECT COUNT(*) FROM job_tracking WHERE sim_id = ? AND status IN ('waiting', 'retrying'))
+            WHERE sim_id = ?
+        ''', (sim_id, sim_id, sim_id))
+    conn.commit()
+    conn.close()
+    
+    for sim_id, count in counts.items():
+        print(f"[{sim_id}] 🛑 Cancelled: {count['jobs_cancelled']} jobs removed"
+              + (f", {len(count['jobs_not_removed'])} not accepted by nbjob" if count['jobs_not_removed'] else ""))
+    return counts
+
+
 class StatusHandler(tornado.web.RequestHandler):
     """Get simulation status"""
     def get(self, sim_id):
@@ -1126,13 +1482,14 @@ class StatusHandler(tornado.web.RequestHandler):
         if not row:
             conn.close()
             self.set_status(404)
-            self.write(json.dumps({"error": "Simulation not found"}))
+            self.write(to_json({"error": "Simulation not found"}))
             return
         
         sim = dict(row)
         
         # If submitted/running, use improved job tracking system
-        if sim['state'] in ['submitted', 'running'] and sim['total_jobs'] > 0:
+        # (canary runs are finished by the background monitor once the rest is released)
+        if sim['state'] in ['submitted', 'running'] and sim['total_jobs'] > 0 and sim.get('canary') != 'pending':
             # Try new job_tracking method first
             stats = get_simulation_status_from_tracking(sim['sim_id'])
             
@@ -1148,6 +1505,9 @@ class StatusHandler(tornado.web.RequestHandler):
             
             # Update database with current status
             new_state = 'completed' if stats['all_complete'] else ('failed' if stats.get('errors', 0) > 0 else 'running')
+            # Failures that may still be retried do not fail the sweep yet
+            if new_state == 'failed' and AUTO_RETRY and (stats.get('retrying') or stats.get('unclassified_errors')):
+                new_state = 'running'
             
             # When completed or failed, no jobs should be running or waiting
             jobs_running = 0 if new_state in ['completed', 'failed'] else stats['running']
@@ -1173,11 +1533,69 @@ class StatusHandler(tornado.web.RequestHandler):
         
         conn.close()
         
+        sim['job_failures'] = get_job_failures(sim['sim_id'])
+        
         self.set_header("Content-Type", "application/json")
-        self.write(json.dumps(sim, indent=2))
+        self.write(to_json(sim))
+
+class CancelHandler(tornado.web.RequestHandler):
+    """Cancel simulations: remove their NetBatch jobs and queued stage tasks"""
+    @tornado.gen.coroutine
+    def post(self, sim_id=None):
+        """
+        POST /api/simulations/<sim_id>/cancel
+        POST /api/simulations/cancel  {"sim_ids": [...]}
+        
+        Optional body field: reason (stored as cancel_reason).
+        """
+        try:
+            data = json.loads(self.request.body) if self.request.body else {}
+        except ValueError:
+            self.set_status(400)
+            self.write(to_json({"error": "Invalid JSON body"}))
+            return
+        
+        sim_ids = [sim_id] if sim_id else data.get('sim_ids')
+        if not isinstance(sim_ids, list) or not sim_ids:
+            self.set_status(400)
+            self.write(to_json({"error": "sim_ids must be a non-empty list"}))
+            return
+        sim_ids = list(dict.fromkeys(str(s) for s in sim_ids))
+        reason = data.get('reason') or 'Cancelled by user'
+        
+        results = mark_simulations_cancelled(sim_ids, reason)
+        cancelled = [r['sim_id'] for r in results if r['cancelled']]
+        
+        if cancelled:
+            # nbjob calls run on their own pool, not behind queued submissions
+            counts = yield get_stage_executor().submit('cxl', cancel_tracked_jobs, cancelled,
+                                                       label=','.join(cancelled))
+            for result in results:
+                if result['cancelled']:
+                    result.update(counts[result['sim_id']])
+                    SimulationWebSocket.broadcast_update(result['sim_id'], {
+                        'sim_id': result['sim_id'],
+                        'state': 'cancelled',
+                        'jobs_cancelled': result['jobs_cancelled'],
+                        'message': f"{reason}: {result['jobs_cancelled']} jobs cancelled"
+                    })
+        
+        if sim_id:
+            result = results[0]
+            if not result['cancelled']:
+                self.set_status(404 if result['state'] is None else 409)
+            self.write(to_json(result))
+            return
+        
+        self.write(to_json({
+            "cancelled": len(cancelled),
+            "jobs_cancelled": sum(r.get('jobs_cancelled', 0) for r in results),
+            "results": results
+        }))
 
 class ExtractHandler(tornado.web.RequestHandler):
     """Manually trigger extraction"""
+    @tornado.gen.coroutine
     def post(self, sim_id):
         # Get simulation
         conn = sqlite3.connect(DB_PATH)
@@ -1189,7 +1607,7 @@ class ExtractHandler(tornado.web.RequestHandler):
         if not row:
             conn.close()
             self.set_status(404)
-            self.write(json.dumps({"error": "Simulation not found"}))
+            self.write(to_json({"error": "Simulation not found"}))
             return
         
         sim = dict(row)
@@ -1197,31 +1615,39 @@ class ExtractHandler(tornado.web.RequestHandler):
         project = sim['project']
         voltage_domain = sim['voltage_domain']
         
+        executor = get_stage_executor()
+        pipeline = StagePipeline(DB_PATH)
+        
+        # bkp moved report/ into 00bkp_* and removed the corner directories:
+        # a new ext run would find nothing and fail a finished simulation
+        backup_dir = pipeline.get_result(sim_id, 'bkp') or sim['backup_dir']
+        if backup_dir:
+            conn.close()
+            self.set_status(409)
+            self.write(to_json({
+                "error": "Results are already backed up, nothing left to extract",
+                "backup_dir": backup_dir
+            }))
+            return
+        
+        pipeline.create(sim_id)
+        stage = None
+        
         try:
-            # Run extraction stages
-            c.execute('UPDATE simulations SET state = ? WHERE id = ?', ('extracting', sim['id']))
-            conn.commit()
-            
-            print(f"[{sim_id}] Running extraction...")
-            ext_result = run_extraction_stage(work_dir, project=project, voltage_domain=voltage_domain)
-            if not ext_result:
-                raise Exception(f"Extraction failed")
-            
-            c.execute('UPDATE simulations SET state = ? WHERE id = ?', ('sorting', sim['id']))
-            conn.commit()
-            
-            print(f"[{sim_id}] Running sorting...")
-            srt_result = run_sorting_stage(work_dir, project=project, voltage_domain=voltage_domain)
-            if not srt_result:
-                raise Exception(f"Sorting failed")
-            
-            c.execute('UPDATE simulations SET state = ? WHERE id = ?', ('backing_up', sim['id']))
-            conn.commit()
+            # Run remaining extraction stages (queued on the shared stage executor);
+            # stages already checkpointed as done are not run again
+            for stage in pipeline.pending_stages(sim_id):
+                c.execute('UPDATE simulations SET state = ? WHERE id = ?', (STAGE_STATES[stage], sim['id']))
+                conn.commit()
+                
+                print(f"[{sim_id}] Running {stage} stage...")
+                pipeline.start_stage(sim_id, stage)
+                result = yield executor.submit(stage, run_pipeline_stage, stage, work_dir, project,
+                                               voltage_domain, label=sim_id)
+                pipeline.complete_stage(sim_id, stage, result)
             
-            print(f"[{sim_id}] Running backup...")
-            backup_dir = run_backup_stage(work_dir, project=project, voltage_domain=voltage_domain)
-            if not backup_dir:
-                raise Exception(f"Backup failed")
+            stage = None
+            backup_dir = pipeline.get_result(sim_id, 'bkp')
             
             # Mark as finished
             c.execute('''
@@ -1234,19 +1660,71 @@ class ExtractHandler(tornado.web.RequestHandler):
             conn.commit()
             conn.close()
             
-            self.write(json.dumps({"status": "finished", "message": f"Extraction complete for {sim_id}"}))
+            # Compress compiled_waveform/ and index measurements in the background
+            queue_archival(DB_PATH, sim_id, backup_dir)
+            queue_indexing(DB_PATH, sim_id)
+            
+            self.write(to_json({"status": "finished", "message": f"Extraction complete for {sim_id}"}))
             
         except Exception as e:
             print(f"Error in extraction: {e}")
+            if stage:
+                pipeline.fail_stage(sim_id, stage, str(e))
             c.execute('UPDATE simulations SET state = ? WHERE id = ?', ('failed', sim['id']))
             conn.commit()
             conn.close()
             self.set_status(500)
-            self.write(json.dumps({"error": str(e)}))
+            self.write(to_json({"error": str(e)}))
 
 class ResultsHandler(tornado.web.RequestHandler):
-    """Get parsed results for a finished simulation"""
+    """
+    Get parsed results for a finished simulation (or partial results while running).
+    
+    Optional query parameters (evaluated server-side on the cached analysis):
+        process, extract, temp, v1, v2, v3: accepted values (comma-separated or repeated)
+        status: pass | fail
+        columns: comma-separated headers to return
+        sort: header to sort on, '-' prefix for descending
+        offset, limit: pagination
+        precision: significant digits for float values
+    Without parameters the full response is returned, as before.
+    """
+    def _parse_query(self):
+        """Query arguments for query_results(), or None for the full response."""
+        from results_parser import QUERY_FILTER_COLUMNS
+        
+        def values(name):
+            items = []
+            for arg in self.get_arguments(name):
+                items.extend(v.strip() for v in arg.split(',') if v.strip())
+            return items
+        
+        filters = dict((c, values(c)) for c in QUERY_FILTER_COLUMNS if values(c))
+        status = self.get_argument('status', None)
+        columns = values('columns') or None
+        sort = self.get_argument('sort', None)
+        offset = self.get_argument('offset', None)
+        limit = self.get_argument('limit', None)
+        
+        if not (filters or status or columns or sort or offset is not None or limit is not None):
+            return None
+        try:
+            offset = int(offset) if offset is not None else 0
+            limit = int(limit) if limit is not None else None
+        except ValueError:
+            raise ValueError("offset and limit must be integers")
+        return {'filters': filters, 'status': status, 'columns': columns, 'sort': sort,
+                'offset': offset, 'limit': limit}
+    
     def get(self, sim_id):
+        try:
+            query = self._parse_query()
+            precision = parse_precision(self.get_argument('precision', None))
+        except ValueError as e:
+            self.set_status(400)
+            self.write(to_json({"error": str(e)}))
+            return
+        
         # Get simulation from database
         conn = sqlite3.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
@@ -1257,50 +1735,67 @@ class ResultsHandler(tornado.web.RequestHandler):
         
         if not row:
             self.set_status(404)
-            self.write(json.dumps({"error": "Simulation not found"}))
+            self.write(to_json({"error": "Simulation not found"}))
             return
         
         sim = dict(row)
         
-        # Check if simulation is finished
-        if sim['state'] != 'finished':
-            self.set_status(400)
-            self.write(json.dumps({
-                "error": "Simulation not finished",
-                "current_state": sim['state'],
-                "message": "Results are only available for finished simulations"
-            }))
-            return
+        from results_parser import analyze_results, query_results
+        from extraction_engine import PARTIAL_CREPORT
         
-        # Check if backup directory exists
+        partial = sim['state'] != 'finished'
         backup_dir = sim.get('backup_dir')
-        if not backup_dir or not os.path.exists(backup_dir):
-            self.set_status(404)
-            self.write(json.dumps({
-                "error": "Backup directory not found",
-                "backup_dir": backup_dir
-            }))
-            return
-        
-        # Parse creport.txt
-        from results_parser import parse_creport, analyze_results
         
-        creport_path = os.path.join(backup_dir, "report", "creport.txt")
+        if partial:
+            # Partial creport built from the jobs extracted so far
+            creport_path = os.path.join(sim.get('work_dir') or '', "report", PARTIAL_CREPORT)
+            
+            if not os.path.exists(creport_path):
+                self.set_status(400)
+                self.write(to_json({
+                    "error": "Simulation not finished",
+                    "current_state": sim['state'],
+                    "message": "Results are only available for finished simulations"
+                }))
+                return
+        else:
+            # Check if backup directory exists
+            if not backup_dir or not os.path.exists(backup_dir):
+                self.set_status(404)
+                self.write(to_json({
+                    "error": "Backup directory not found",
+                    "backup_dir": backup_dir
+                }))
+                return
+            
+            creport_path = os.path.join(backup_dir, "report", "creport.txt")
         
         if not os.path.exists(creport_path):
             self.set_status(404)
-            self.write(json.dumps({
+            self.write(to_json({
                 "error": "creport.txt not found",
                 "expected_path": creport_path
             }))
             return
         
-        # Parse the results
-        parsed_results = parse_creport(creport_path)
+        cache = get_results_cache()
+        spec_version = cache.spec_version()
+        
+        # Final creports never change: serve the cached response if there is one
+        cacheable = not partial and query is None and precision is None
+        if cacheable:
+            body = cache.get_response(creport_path, spec_version)
+            if body is not None:
+                self.set_header("Content-Type", "application/json")
+                self.write(body)
+                return
+        
+        # Parse the results (cached per file identity)
+        parsed_results = cache.get_parsed(creport_path)
         
         if not parsed_results:
             self.set_status(500)
-            self.write(json.dumps({
+            self.write(to_json({
                 "error": "Failed to parse creport.txt",
                 "file": creport_path
             }))
@@ -1311,16 +1806,29 @@ class ResultsHandler(tornado.web.RequestHandler):
         custom_limits = load_custom_spec_limits()
         
         # Analyze results (pass/fail classification) with custom or default limits
-        analysis = analyze_results(parsed_results, spec_limits=custom_limits)
+        analysis = cache.get_analysis(creport_path, spec_version,
+                                      lambda: analyze_results(parsed_results, spec_limits=custom_limits))
+        
+        headers = parsed_results.get('headers', [])
+        rows = analysis.get('rows_with_status', []) if analysis else parsed_results.get('rows', [])
+        
+        if query is not None:
+            try:
+                selection = query_results(headers, rows, **query)
+            except ValueError as e:
+                self.set_status(400)
+                self.write(to_json({"error": str(e)}))
+                return
+            headers = selection['headers']
+            rows = selection['rows']
         
         # Convert rows from dictionary format to array format for frontend
         # Frontend expects: {values: [...], status: "pass/fail"}
         # Backend has: {header1: value1, header2: value2, _status: "pass"}
-        headers = parsed_results.get('headers', [])
         rows_for_frontend = []
         
         if analysis:
-            for row_dict in analysis.get('rows_with_status', []):
+            for row_dict in rows:
                 # Extract values in header order
                 values = [row_dict.get(h, '') for h in headers]
                 rows_for_frontend.append({
@@ -1330,7 +1838,7 @@ class ResultsHandler(tornado.web.RequestHandler):
                 })
         else:
             # No analysis, just convert rows
-            for row_dict in parsed_results.get('rows', []):
+            for row_dict in rows:
                 values = [row_dict.get(h, '') for h in headers]
                 rows_for_frontend.append({
                     'values': values
@@ -1349,11 +1857,604 @@ class ResultsHandler(tornado.web.RequestHandler):
                 "total": parsed_results.get('total_corners', 0)
             },
             "backup_dir": backup_dir,
-            "creport_path": creport_path
+            "creport_path": creport_path,
+            "partial": partial
         }
         
+        if query is not None:
+            response["total_rows"] = selection['total']
+            response["offset"] = query['offset']
+            response["limit"] = query['limit']
+        
+        if partial:
+            points = ResultsStore(DB_PATH).get_summary(sim_id)
+            response["current_state"] = sim['state']
+            response["points_extracted"] = points['extracted']
+            response["total_jobs"] = sim.get('total_jobs', 0)
+        
+        body = to_json(response, precision=precision)
+        if cacheable:
+            cache.put_response(creport_path, spec_version, body)
+        
+        self.set_header("Content-Type", "application/json")
+        self.write(body)
+
+
+def creport_path_for(sim):
+    """
+    creport a simulation's results are read from.
+    
+    Args:
+        sim (dict): simulations row
+    
+    Returns:
+        tuple: (path, partial) - backup_dir/report/creport.txt once finished,
+            the partial creport in work_dir/report while running
+    """
+    from extraction_engine import PARTIAL_CREPORT
+    
+    if sim['state'] != 'finished':
+        return os.path.join(sim.get('work_dir') or '', "report", PARTIAL_CREPORT), True
+    return os.path.join(sim.get('backup_dir') or '', "report", "creport.txt"), False
+
+
+class ResultsDiffHandler(tornado.web.RequestHandler):
+    """
+    Row-aligned diff of two simulations' creports: /api/results/diff?a=<sim>&b=<sim>
+    
+    Optional query parameters: rel_threshold (default 0.05), abs_threshold,
+    flagged (1 = flagged rows only), offset, limit (default 500), precision.
+    """
+    def get(self):
+        from results_diff import diff_columns, DEFAULT_REL_THRESHOLD
+        
+        sim_ids = [self.get_argument('a', None), self.get_argument('b', None)]
+        if not all(sim_ids):
+            self.set_status(400)
+            self.write(to_json({"error": "Both a and b simulation IDs are required"}))
+            return
+        
+        try:
+            rel_threshold = float(self.get_argument('rel_threshold', DEFAULT_REL_THRESHOLD))
+            abs_threshold = self.get_argument('abs_threshold', None)
+            abs_threshold = float(abs_threshold) if abs_threshold else None
+            offset = int(self.get_argument('offset', 0))
+            limit = int(self.get_argument('limit', 500))
+            precision = parse_precision(self.get_argument('precision', None))
+        except ValueError as e:
+            self.set_status(400)
+            self.write(to_json({"error": "Invalid query parameter: {0}".format(e)}))
+            return
+        flagged_only = self.get_argument('flagged', '0') in ('1', 'true')
+        
+        conn = sqlite3.connect(DB_PATH)
+        conn.row_factory = sqlite3.Row
+        c = conn.cursor()
+        sims = {}
+        for sim_id in sim_ids:
+            c.execute('SELECT * FROM simulations WHERE sim_id = ? AND username = ?', (sim_id, CURRENT_USER))
+            row = c.fetchone()
+            if row:
+                sims[sim_id] = dict(row)
+        conn.close()
+        
+        cache = get_results_cache()
+        columns = []
+        for sim_id in sim_ids:
+            if sim_id not in sims:
+                self.set_status(404)
+                self.write(to_json({"error": "Simulation not found", "sim_id": sim_id}))
+                return
+            creport_path, _ = creport_path_for(sims[sim_id])
+            if not os.path.exists(creport_path):
+                self.set_status(404)
+                self.write(to_json({
+                    "error": "creport.txt not found",
+                    "sim_id": sim_id,
+                    "expected_path": creport_path
+                }))
+                return
+            columns.append(cache.get_columns(creport_path))
+            if columns[-1] is None:
+                self.set_status(500)
+                self.write(to_json({
+                    "error": "Failed to load creport columns (NumPy required)",
+                    "file": creport_path
+                }))
+                return
+        
+        try:
+            diff = diff_columns(columns[0], columns[1], rel_threshold=rel_threshold,
+                                abs_threshold=abs_threshold, flagged_only=flagged_only,
+                                offset=offset, limit=limit)
+        except ValueError as e:
+            self.set_status(400)
+            self.write(to_json({"error": str(e)}))
+            return
+        
+        diff.update({
+            "a": sim_ids[0],
+            "b": sim_ids[1],
+            "rel_threshold": rel_threshold,
+            "abs_threshold": abs_threshold,
+            "offset": offset,
+            "limit": limit
+        })
+        self.set_header("Content-Type", "application/json")
+        self.write(to_json(diff, precision=precision))
+
+
+class ResultsSummaryHandler(tornado.web.RequestHandler):
+    """
+    Per-measurement min/max/mean, argmin/argmax PVT point and spec margin.
+    
+    Optional query parameters: group_by (process, temp, ...), precision.
+    """
+    def get(self, sim_id):
+        conn = sqlite3.connect(DB_PATH)
+        conn.row_factory = sqlite3.Row
+        c = conn.cursor()
+        c.execute('SELECT * FROM simulations WHERE sim_id = ? AND username = ?', (sim_id, CURRENT_USER))
+        row = c.fetchone()
+        conn.close()
+        
+        if not row:
+            self.set_status(404)
+            self.write(to_json({"error": "Simulation not found"}))
+            return
+        
+        sim = dict(row)
+        
+        from results_parser import load_custom_spec_limits, get_default_spec_limits
+        from spec_evaluator import summarize_measurements
+        
+        creport_path, partial = creport_path_for(sim)
+        
+        if not os.path.exists(creport_path):
+            self.set_status(404)
+            self.write(to_json({
+                "error": "creport.txt not found",
+                "expected_path": creport_path
+            }))
+            return
+        
+        try:
+            precision = parse_precision(self.get_argument('precision', None))
+        except ValueError as e:
+            self.set_status(400)
+            self.write(to_json({"error": str(e)}))
+            return
+        group_by = self.get_argument('group_by', None) or None
+        
+        columns = get_results_cache().get_columns(creport_path)
+        if columns is None:
+            self.set_status(500)
+            self.write(to_json({
+                "error": "Failed to load creport columns (NumPy required)",
+                "file": creport_path
+            }))
+            return
+        
+        spec_limits = load_custom_spec_limits() or get_default_spec_limits()
+        try:
+            groups = summarize_measurements(columns, spec_limits, group_by=group_by)
+        except ValueError as e:
+            self.set_status(400)
+            self.write(to_json({"error": str(e)}))
+            return
+        
+        self.set_header("Content-Type", "application/json")
+        self.write(to_json({
+            "sim_id": sim_id,
+            "total_corners": columns['rows'],
+            "group_by": group_by,
+            "groups": groups,
+            "partial": partial
+        }, precision=precision))
+
+
+class ResultsSurrogateHandler(tornado.web.RequestHandler):
+    """
+    Per-corner surrogate predictions and the points that still need simulating.
+        
+    Optional query parameters:
+        method: gp (default) | poly
+        temps: comma-separated candidate temperatures (default: simulated ones)
+        process: comma-separated corners to fit
+        measurements: comma-separated measurements (default: all)
+        rel_tol: relative 1-sigma uncertainty that requires simulation
+        sigmas: prediction band checked against spec limits
+        precision: significant digits for float values
+    """
+    def get(self, sim_id):
+        conn = sqlite3.connect(DB_PATH)
+        conn.row_factory = sqlite3.Row
+        c = conn.cursor()
+        c.execute('SELECT * FROM simulations WHERE sim_id = ? AND username = ?', (sim_id, CURRENT_USER))
+        row = c.fetchone()
+        conn.close()
+        
+        if not row:
+            self.set_status(404)
+            self.write(to_json({"error": "Simulation not found"}))
+            return
+        
+        sim = dict(row)
+        
+        from results_parser import load_custom_spec_limits, get_default_spec_limits
+        from surrogate_model import DEFAULT_REL_TOL, DEFAULT_SIGMAS, recommend_points
+        
+        creport_path, partial = creport_path_for(sim)
+        
+        if not os.path.exists(creport_path):
+            self.set_status(404)
+            self.write(to_json({
+                "error": "creport.txt not found",
+                "expected_path": creport_path
+            }))
+            return
+        
+        def arg_list(name):
+            values = []
+            for value in self.get_arguments(name):
+                values.extend(v.strip() for v in value.split(',') if v.strip())
+            return values
+        
+        columns = get_results_cache().get_columns(creport_path)
+        if columns is None:
+            self.set_status(500)
+            self.write(to_json({
+                "error": "Failed to load creport columns (NumPy required)",
+                "file": creport_path
+            }))
+            return
+        
+        spec_limits = load_custom_spec_limits() or get_default_spec_limits()
+        try:
+            precision = parse_precision(self.get_argument('precision', None))
+            result = recommend_points(
+                columns,
+                temps=[float(t) for t in arg_list('temps')] or None,
+                method=self.get_argument('method', 'gp'),
+                measurements=arg_list('measurements') or None,
+                corners=arg_list('process') or None,
+                spec_limits=spec_limits,
+                rel_tol=float(self.get_argument('rel_tol', DEFAULT_REL_TOL)),
+                sigmas=float(self.get_argument('sigmas', DEFAULT_SIGMAS))
+            )
+        except ValueError as e:
+            self.set_status(400)
+            self.write(to_json({"error": str(e)}))
+            return
+        
+        result.update({"sim_id": sim_id, "partial": partial})
+        self.set_header("Content-Type", "application/json")
+        self.write(to_json(result, precision=precision))
+
+
+class ReportsHandler(tornado.web.RequestHandler):
+    """List per-PVT reports of a simulation, or get a single report (loose or reports.zip)"""
+    def get(self, sim_id, name=None):
+        conn = sqlite3.connect(DB_PATH)
+        conn.row_factory = sqlite3.Row
+        c = conn.cursor()
+        c.execute('SELECT * FROM simulations WHERE sim_id = ? AND username = ?', (sim_id, CURRENT_USER))
+        row = c.fetchone()
+        conn.close()
+        
+        if not row:
+            self.set_status(404)
+            self.write(to_json({"error": "Simulation not found"}))
+            return
+        
+        sim = dict(row)
+        
+        from report_container import ReportReader
+        
+        # report/ moves into the backup directory at the bkp stage
+        base_dir = sim.get('backup_dir') if sim['state'] == 'finished' else sim.get('work_dir')
+        report_dir = os.path.join(base_dir or '', "report")
+        
+        if not os.path.isdir(report_dir):
+            self.set_status(404)
+            self.write(to_json({
+                "error": "Report directory not found",
+                "expected_path": report_dir
+            }))
+            return
+        
+        with ReportReader(report_dir) as reader:
+            if name is None:
+                self.set_header("Content-Type", "application/json")
+                self.write(to_json({
+                    "sim_id": sim_id,
+                    "report_dir": report_dir,
+                    "reports": reader.names()
+                }))
+                return
+            
+            content = reader.read_text(name)
+        
+        if content is None:
+            self.set_status(404)
+            self.write(to_json({"error": f"Report not found: {name}"}))
+            return
+        
+        self.set_header("Content-Type", "text/plain")
+        self.write(content)
+
+
+class WaveformsHandler(tornado.web.RequestHandler):
+    """List archived waveforms of a simulation, or download a single one"""
+    @tornado.gen.coroutine
+    def get(self, sim_id, name=None):
+        from waveform_archive import WaveformArchiveStore, list_waveforms, open_waveform, CHUNK_SIZE
+        
+        conn = sqlite3.connect(DB_PATH)
+        c = conn.cursor()
+        c.execute('SELECT 1 FROM simulations WHERE sim_id = ? AND username = ?', (sim_id, CURRENT_USER))
+        owned = c.fetchone() is not None
+        conn.close()
+        
+        if not owned:
+            self.set_status(404)
+            self.write(to_json({"error": "Simulation not found"}))
+            return
+        
+        archive = WaveformArchiveStore(DB_PATH).get(sim_id)
+        
+        if not archive or archive['status'] != 'archived' or not archive['archive_path']:
+            self.set_status(404)
+            self.write(to_json({
+                "error": "No waveform archive for simulation",
+                "status": archive['status'] if archive else None
+            }))
+            return
+        
+        if not os.path.exists(archive['archive_path']):
+            self.set_status(404)
+            self.write(to_json({
+                "error": "Waveform archive not found",
+                "archive_path": archive['archive_path']
+            }))
+            return
+        
+        # Archive reads and decompression run on the 'exp' pool; the IOLoop only writes
+        executor = get_stage_executor()
+        label = "waveform {0}".format(sim_id)
+        
+        if name is None:
+            waveforms = yield executor.submit('exp', list_waveforms, archive['archive_path'], label=label)
+            self.set_header("Content-Type", "application/json")
+            self.write(to_json({
+                "sim_id": sim_id,
+                "archive_path": archive['archive_path'],
+                "location": archive['location'],
+                "original_bytes": archive['original_bytes'],
+                "archived_bytes": archive['archived_bytes'],
+                "waveforms": waveforms
+            }))
+            return
+        
+        try:
+            zf, fin = yield executor.submit('exp', open_waveform, archive['archive_path'], name, label=label)
+        except KeyError:
+            self.set_status(404)
+            self.write(to_json({"error": f"Waveform not in archive: {name}"}))
+            return
+        
+        # Stream the single member out of the archive
+        try:
+            self.set_header("Content-Type", "application/octet-stream")
+            self.set_header("Content-Disposition", f'attachment; filename="{os.path.basename(name)}"')
+            while True:
+                chunk = yield executor.submit('exp', fin.read, CHUNK_SIZE, label=label)
+                if not chunk:
+                    break
+                self.write(chunk)
+                yield self.flush()
+        finally:
+            fin.close()
+            zf.close()
+
+
+class ExportHandler(tornado.web.RequestHandler):
+    """Stream results as CSV, NDJSON or NPZ (chunked, constant memory)
+    
+    /api/export/results/<sim_id>?format=csv: every row of one simulation's creport
+    /api/export/measurements?format=ndjson&measurement=...: a measurement index
+        selection across simulations (same filters as /api/measurements, no limit)
+    """
+    @tornado.gen.coroutine
+    def get(self, sim_id=None):
+        from results_export import FORMATS, check_format, export_creport, export_measurements
+        from measurement_index import FILTER_COLUMNS
+        
+        def arg_list(name):
+            values = []
+            for value in self.get_arguments(name):
+                values.extend(v.strip() for v in value.split(',') if v.strip())
+            return values
+        
+        def arg_float(name):
+            value = self.get_argument(name, None)
+            return float(value) if value not in (None, '') else None
+        
+        fmt = self.get_argument('format', 'csv')
+        try:
+            check_format(fmt)
+            if sim_id is None:
+                filters = dict((column, arg_list(column)) for column in FILTER_COLUMNS if arg_list(column))
+                index = MeasurementIndex(DB_PATH)
+                min_value, max_value = arg_float('min_value'), arg_float('max_value')
+                # Validate up front; NPZ's counting pass runs lazily on the 'exp' pool
+                MeasurementIndex.validate_filters(filters, min_value, max_value)
+                chunks = export_measurements(index, fmt, filters, min_value, max_value,
+                                             chunk_rows=EXPORT_CHUNK_ROWS)
+                filename = "measurements.{0}".format(fmt)
+        except ValueError as e:
+            self.set_status(400)
+            self.write(to_json({"error": str(e)}))
+            return
+        
+        if sim_id is not None:
+            conn = sqlite3.connect(DB_PATH)
+            conn.row_factory = sqlite3.Row
+            c = conn.cursor()
+            c.execute('SELECT * FROM simulations WHERE sim_id = ? AND username = ?', (sim_id, CURRENT_USER))
+            row = c.fetchone()
+            conn.close()
+            
+            if not row:
+                self.set_status(404)
+                self.write(to_json({"error": "Simulation not found"}))
+                return
+            
+            creport_path, _ = creport_path_for(dict(row))
+            if not os.path.exists(creport_path):
+                self.set_status(404)
+                self.write(to_json({
+                    "error": "creport.txt not found",
+                    "expected_path": creport_path
+                }))
+                return
+            
+            chunks = export_creport(creport_path, fmt, chunk_rows=EXPORT_CHUNK_ROWS)
+            filename = "{0}_creport.{1}".format(sim_id, fmt)
+        
+        self.set_header("Content-Type", FORMATS[fmt])
+        self.set_header("Content-Disposition", f'attachment; filename="{filename}"')
+        executor = get_stage_executor()
+        label = "export {0}".format(filename)
+        try:
+            # Chunks are read and encoded on the 'exp' pool; the IOLoop only writes them
+            while True:
+                chunk = yield executor.submit('exp', next, chunks, None, label=label)
+                if chunk is None:
+                    break
+                self.write(chunk)
+                yield self.flush()
+        except RuntimeError as e:
+            # Headers are sent: cut the response so the client sees an incomplete download
+            print(f"⚠️  Export aborted: {e}")
+            self.request.connection.close()
+        finally:
+            executor.submit('exp', chunks.close, label=label)
+
+
+class ExecutorStatsHandler(tornado.web.RequestHandler):
+    """Get queue depth, wait times and active tasks of the stage executor"""
+    def get(self):
+        executor = get_stage_executor()
+        self.set_header("Content-Type", "application/json")
+        self.write(to_json({
+            "stages": executor.get_stats(),
+            "timestamp": datetime.now().isoformat()
+        }))
+
+
+class MeasurementsHandler(tornado.web.RequestHandler):
+    """Query the cross-simulation measurement index
+    
+    Query arguments (repeat or comma-separate for several values):
+        sim_id, project, voltage_domain, process, extract, temp, v1, v2, v3, measurement
+        min_value, max_value: value range
+        group_by: columns to group on (returns count/min/max/avg per group)
+        limit: max rows or groups (default 1000)
+    
+    Example: /api/measurements?measurement=rwkpull_vih&process=SSG&temp=-40&min_value=7000&group_by=sim_id,voltage_domain
+    """
+    def get(self):
+        from measurement_index import FILTER_COLUMNS
+        
+        def arg_list(name):
+            values = []
+            for value in self.get_arguments(name):
+                values.extend(v.strip() for v in value.split(',') if v.strip())
+            return values
+        
+        def arg_float(name):
+            value = self.get_argument(name, None)
+            return float(value) if value not in (None, '') else None
+        
+        try:
+            filters = dict((column, arg_list(column)) for column in FILTER_COLUMNS if arg_list(column))
+            result = MeasurementIndex(DB_PATH).query(
+                filters,
+                min_value=arg_float('min_value'),
+                max_value=arg_float('max_value'),
+                group_by=arg_list('group_by'),
+                limit=int(self.get_argument('limit', 1000))
+            )
+        except ValueError as e:
+            self.set_status(400)
+            self.write(to_json({"error": str(e)}))
+            return
+        
+        self.set_header("Content-Type", "application/json")
+        self.write(to_json(result))
+
+
+class TrendsHandler(tornado.web.RequestHandler):
+    """A measurement at one PVT point across all 00bkp_* snapshots of a voltage domain
+    
+    Query arguments:
+        project, voltage_domain, measurement: required
+        process, extract, temp, v1, v2, v3: PVT point (left out = aggregate over all values)
+    
+    Served from the measurement index. Snapshots in the voltage domain directory
+    that are not indexed yet are queued on the 'idx' pool and listed under "indexing".
+    The snapshot scan and the trend query run on the 'exp' pool.
+    
+    Example: /api/trends?project=gpio&voltage_domain=1p1v&measurement=rwkpull_vih&process=SSG&temp=-40&v1=max&v2=min
+    """
+    @tornado.gen.coroutine
+    def get(self):
+        from measurement_index import KEY_COLUMNS, queue_snapshot_indexing
+        
+        project = self.get_argument('project', None)
+        voltage_domain = self.get_argument('voltage_domain', None)
+        measurement = self.get_argument('measurement', None)
+        if not (project and voltage_domain and measurement):
+            self.set_status(400)
+            self.write(to_json({"error": "project, voltage_domain and measurement are required"}))
+            return
+        
+        point = dict((column, self.get_argument(column)) for column in KEY_COLUMNS
+                     if self.get_argument(column, None))
+        
+        def load_trend():
+            indexing = queue_snapshot_indexing(DB_PATH, project, voltage_domain)
+            return indexing, MeasurementIndex(DB_PATH).trend(project, voltage_domain, measurement, point)
+        
+        try:
+            indexing, result = yield get_stage_executor().submit(
+                'exp', load_trend, label="trends {0}/{1} {2}".format(project, voltage_domain, measurement))
+        except ValueError as e:
+            self.set_status(400)
+            self.write(to_json({"error": str(e)}))
+            return
+        
+        result.update({
+            "project": project,
+            "voltage_domain": voltage_domain,
+            "measurement": measurement,
+            "point": point,
+            "indexing": indexing
+        })
+        self.set_header("Content-Type", "application/json")
+        self.write(to_json(result))
+
+
+class CacheStatsHandler(tornado.web.RequestHandler):
+    """Get hit/miss counters and size of the results and pre-flight caches"""
+    def get(self):
         self.set_header("Content-Type", "application/json")
-        self.write(json.dumps(response, indent=2))
+        self.write(to_json({
+            "results": get_results_cache().get_stats(),
+            "preflight": get_preflight_cache().get_stats(),
+            "timestamp": datetime.now().isoformat()
+        }))
 
 
 class SpecLimitsHandler(tornado.web.RequestHandler):
@@ -1374,7 +2475,7 @@ class SpecLimitsHandler(tornado.web.RequestHandler):
         }
         
         self.set_header("Content-Type", "application/json")
-        self.write(json.dumps(response, indent=2))
+        self.write(to_json(response))
     
     def post(self):
         """Save custom spec limits"""
@@ -1403,6 +2504,7 @@ class SpecLimitsHandler(tornado.web.RequestHandler):
             
             # Save to file
             if save_custom_spec_limits(spec_limits):
+                get_results_cache().invalidate_spec_limits()
                 self.write({
                     "status": "success",
                     "message": "Custom spec limits saved",
@@ -1427,6 +2529,7 @@ class SpecLimitsHandler(tornado.web.RequestHandler):
         try:
             if os.path.exists(config_file):
                 os.remove(config_file)
+                get_results_cache().invalidate_spec_limits()
                 self.write({
                     "status": "success",
                     "message": "Custom spec limits deleted, reverted to defaults"
@@ -1759,11 +2862,26 @@ def make_app():
         (r"/", IndexHandler),
         (r"/api/health", HealthHandler),
         (r"/api/simulations", SimulationsHandler),
+        (r"/api/simulations/cancel", CancelHandler),  # Bulk cancel {"sim_ids": [...]}
+        (r"/api/simulations/([^/]+)/cancel", CancelHandler),  # Remove jobs, release queued stage tasks
         (r"/api/submit", SubmitHandler),
         (r"/api/status/([^/]+)", StatusHandler),
         (r"/api/extract/([^/]+)", ExtractHandler),
+        (r"/api/results/diff", ResultsDiffHandler),  # Row-aligned diff of two runs (before /api/results/<id>)
         (r"/api/results/([^/]+)", ResultsHandler),  # Phase 2B: Results API
+        (r"/api/results/([^/]+)/summary", ResultsSummaryHandler),  # Per-measurement min/max/argmin/argmax
+        (r"/api/results/([^/]+)/surrogate", ResultsSurrogateHandler),  # Predicted PVT points, what to simulate
+        (r"/api/results/([^/]+)/reports", ReportsHandler),  # Per-PVT report list
+        (r"/api/results/([^/]+)/reports/([^/]+)", ReportsHandler),  # Single per-PVT report
         (r"/api/spec-limits", SpecLimitsHandler),   # Phase 2B: Spec limits configuration
+        (r"/api/executor/stats", ExecutorStatsHandler),  # Stage executor queues and limits
+        (r"/api/cache/stats", CacheStatsHandler),  # Results/pre-flight cache hit/miss counters
+        (r"/api/measurements", MeasurementsHandler),  # Cross-simulation measurement index
+        (r"/api/trends", TrendsHandler),  # Measurement across 00bkp_* snapshots
+        (r"/api/export/results/([^/]+)", ExportHandler),  # Streamed CSV/NDJSON/NPZ of one creport
+        (r"/api/export/measurements", ExportHandler),  # Streamed measurement index selection
+        (r"/api/waveforms/([^/]+)", WaveformsHandler),  # Archived waveform list
+        (r"/api/waveforms/([^/]+)/(.+)", WaveformsHandler),  # Single archived waveform
         (r"/api/voltage-domains/([^/]+)", VoltageDomainsHandler),  # Voltage domain API
         (r"/api/validate-voltage", ValidateVoltageHandler),  # Voltage validation API
         (r"/api/supply-config", GetSupplyConfigHandler),  # ROOT CAUSE #6 FIX: Supply configuration API
@@ -1773,7 +2891,7 @@ def make_app():
             "path": frontend_path,
             "default_filename": "index.html"
         }),
-    ])
+    ], compress_response=API_GZIP)  # gzip API and static responses when the client accepts it
 
 if __name__ == "__main__":
     # Auto-sync shared files on startup
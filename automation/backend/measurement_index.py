@@ -0,0 +1,583 @@
+#!/usr/bin/env python3
+"""
+Measurement Index - every creport value of every finished simulation in SQLite
+
+Historical questions ("which runs had rwkpull_vih above 7k at SSG -40C in any
+voltage domain?") used to mean opening each 00bkp_*/report/creport.txt by
+hand. When a simulation finishes, its creport (via the creport.npz sidecar
+when available) is flattened into the measurements table, one row per
+(sim_id, process, extract, temp, v1, v2, v3, measurement, value).
+Non-numeric cells (PrimeSim 'error') are stored with value NULL.
+
+MeasurementIndex.query() filters, groups and aggregates in SQL; it is served
+at /api/measurements. Indexing runs on the 'idx' stage pool.
+
+Every row also records its snapshot (the 00bkp_YYYYMMDDHHMM directory) and
+snapshot time, so MeasurementIndex.trend() returns a measurement at one PVT
+point across all snapshots of a voltage domain in time order
+(/api/trends). Snapshots kept directly in the voltage domain directory
+(gpio/1p1v/00bkp_*) belong to no simulation; index_snapshots() indexes them
+under the ID "<project>/<voltage_domain>/<snapshot>".
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+MEASUREMENTS_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS measurements (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        sim_id TEXT NOT NULL,
+        project TEXT,
+        voltage_domain TEXT,
+        process TEXT,
+        extract TEXT,
+        temp REAL,
+        v1 TEXT,
+        v2 TEXT,
+        v3 TEXT,
+        row_index INTEGER,
+        measurement TEXT NOT NULL,
+        value REAL,
+        snapshot TEXT,
+        snapshot_time TEXT,
+        FOREIGN KEY(sim_id) REFERENCES simulations(sim_id) ON DELETE CASCADE
+    )
+'''
+
+# creport columns that identify a PVT point (the rest are measurements)
+KEY_COLUMNS = ['process', 'extract', 'temp', 'v1', 'v2', 'v3']
+
+# Columns that can be filtered and grouped on
+FILTER_COLUMNS = ['sim_id', 'project', 'voltage_domain'] + KEY_COLUMNS + ['measurement']
+
+# Columns of iter_rows() (streaming export)
+EXPORT_COLUMNS = FILTER_COLUMNS + ['row_index', 'value']
+
+# Columns added after the first release of the table (added by init_measurement_table)
+ADDED_COLUMNS = [('snapshot', 'TEXT'), ('snapshot_time', 'TEXT')]
+
+SNAPSHOT_PATTERN = re.compile(r'^00bkp_(\d{4})(\d{2})(\d{2})(\d{2})(\d{2})$')
+
+# Snapshot index IDs queued on the 'idx' pool and not finished yet
+_queued_snapshots = set()
+_queued_lock = threading.Lock()
+
+AGGREGATES = {
+    'count': 'COUNT(value)',
+    'min': 'MIN(value)',
+    'max': 'MAX(value)',
+    'avg': 'AVG(value)',
+}
+
+
+def init_measurement_table(conn):
+    """
+    Create measurements table and indices if they do not exist.
+
+    Args:
+        conn: Open sqlite3 connection (caller commits)
+    """
+    c = conn.cursor()
+    c.execute(MEASUREMENTS_SCHEMA)
+    c.execute('PRAGMA table_info(measurements)')
+    existing = set(row[1] for row in c.fetchall())
+    for column, column_type in ADDED_COLUMNS:
+        if column not in existing:
+            c.execute('ALTER TABLE measurements ADD COLUMN {0} {1}'.format(column, column_type))
+    c.execute('CREATE INDEX IF NOT EXISTS idx_measurements_sim ON measurements(sim_id, measurement)')
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_measurements_lookup
+                 ON measurements(measurement, process, temp, value)''')
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_measurements_domain
+                 ON measurements(voltage_domain, measurement, value)''')
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_measurements_trend
+                 ON measurements(voltage_domain, measurement, process, temp, v1, v2, v3, snapshot_time)''')
+
+
+def snapshot_of(creport_path: str):
+    """
+    Snapshot a creport belongs to.
+
+    Args:
+        creport_path: <backup_dir>/report/creport.txt
+
+    Returns:
+        tuple: (snapshot directory name, 'YYYY-MM-DD HH:MM' or None if the
+            name is not 00bkp_YYYYMMDDHHMM)
+    """
+    snapshot = os.path.basename(os.path.dirname(os.path.dirname(os.path.abspath(creport_path))))
+    match = SNAPSHOT_PATTERN.match(snapshot)
+    if not match:
+        return snapshot, None
+    return snapshot, '{0}-{1}-{2} {3}:{4}'.format(*match.groups())
+
+
+class MeasurementIndex(object):
+    """
+    Cross-simulation measurement index.
+
+    Usage:
+        index = MeasurementIndex(db_path)
+        index.index_simulation(sim_id, creport_path, 'gpio', '1p1v')
+        index.query({'measurement': ['rwkpull_vih'], 'process': ['SSG'], 'temp': ['-40']},
+                    min_value=7000, group_by=['sim_id'])
+        index.trend('gpio', '1p1v', 'rwkpull_vih', {'process': 'SSG', 'temp': '-40', 'v1': 'max'})
+    """
+
+    def __init__(self, db_path):
+        """
+        Initialize index.
+
+        Args:
+            db_path (str): Path to SQLite database
+        """
+        self.db_path = db_path
+
+    def index_simulation(self, sim_id: str, creport_path: str, project: Optional[str] = None,
+                         voltage_domain: Optional[str] = None) -> int:
+        """
+        (Re-)index the creport of a simulation.
+
+        Args:
+            sim_id: Simulation ID
+            creport_path: Path to creport.txt
+            project: Project name
+            voltage_domain: Voltage domain
+
+        Returns:
+            Number of measurement rows written
+        """
+        from results_parser import load_creport
+
+        parsed = load_creport(creport_path)
+        if not parsed:
+            return 0
+
+        headers = [h for h in dict.fromkeys(parsed['headers']) if h]
+        keys = [h for h in KEY_COLUMNS if h in headers]
+        measurements = [h for h in headers if h not in KEY_COLUMNS]
+
+        snapshot, snapshot_time = snapshot_of(creport_path)
+        records = []
+        for i, row in enumerate(parsed['rows']):
+            point = [row.get(k) for k in KEY_COLUMNS]
+            for name in measurements:
+                value = row.get(name)
+                records.append([sim_id, project, voltage_domain] + point + [
+                    i, name, value if isinstance(value, float) else None, snapshot, snapshot_time])
+
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute('DELETE FROM measurements WHERE sim_id = ?', (sim_id,))
+        c.executemany('''
+            INSERT INTO measurements (sim_id, project, voltage_domain, process, extract, temp,
+                                      v1, v2, v3, row_index, measurement, value,
+                                      snapshot, snapshot_time)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', records)
+        conn.commit()
+        conn.close()
+
+        print("[MeasurementIndex] Indexed {0}: {1} rows x {2} measurements (keys: {3})".format(
+            sim_id, len(parsed['rows']), len(measurements), ', '.join(keys)))
+        return len(records)
+
+    def remove_simulation(self, sim_id: str):
+        """Drop the index rows of a simulation."""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('DELETE FROM measurements WHERE sim_id = ?', (sim_id,))
+        conn.commit()
+        conn.close()
+
+    def get_indexed_sims(self) -> List[str]:
+        """sim_ids with index rows."""
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute('SELECT DISTINCT sim_id FROM measurements ORDER BY sim_id')
+        sim_ids = [row[0] for row in c.fetchall()]
+        conn.close()
+        return sim_ids
+
+    def get_measurement_names(self) -> List[str]:
+        """Distinct measurement names in the index."""
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute('SELECT DISTINCT measurement FROM measurements ORDER BY measurement')
+        names = [row[0] for row in c.fetchall()]
+        conn.close()
+        return names
+
+    def query(self, filters: Optional[Dict[str, List]] = None, min_value: Optional[float] = None,
+              max_value: Optional[float] = None, group_by: Optional[List[str]] = None,
+              limit: int = 1000) -> Dict:
+        """
+        Filter (and optionally group) measurement rows.
+
+        Args:
+            filters: Column -> list of accepted values (columns from FILTER_COLUMNS)
+            min_value: Only values >= min_value
+            max_value: Only values <= max_value
+            group_by: Columns to group on; each group gets count/min/max/avg of value
+            limit: Max rows (or groups) returned
+
+        Returns:
+            Dict with keys: columns, rows (lists), truncated
+
+        Raises:
+            ValueError: For unknown filter or group columns
+        """
+        group_by = group_by or []
+        for column in group_by:
+            if column not in FILTER_COLUMNS:
+                raise ValueError("Unknown column: {0}".format(column))
+        where, params = self._where(filters, min_value, max_value)
+
+        if group_by:
+            columns = list(group_by) + list(AGGREGATES)
+            select = ', '.join(list(group_by) + list(AGGREGATES.values()))
+            suffix = ' GROUP BY {0} ORDER BY {0}'.format(', '.join(group_by))
+        else:
+            columns = list(EXPORT_COLUMNS)
+            select = ', '.join(columns)
+            suffix = ' ORDER BY sim_id, row_index, measurement'
+
+        sql = 'SELECT {0} FROM measurements{1}'.format(select, where)
+        sql += suffix + ' LIMIT ?'
+        params.append(int(limit) + 1)
+
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute(sql, params)
+        rows = [list(row) for row in c.fetchall()]
+        conn.close()
+
+        return {
+            'columns': columns,
+            'rows': rows[:limit],
+            'truncated': len(rows) > limit
+        }
+
+    @staticmethod
+    def validate_filters(filters: Optional[Dict[str, List]] = None, min_value: Optional[float] = None,
+                         max_value: Optional[float] = None):
+        """
+        Check a query() / iter_rows() selection without running it.
+
+        Lets callers that stream lazily (iter_rows() is a generator) reject a
+        bad selection before they start a response.
+
+        Raises:
+            ValueError: For unknown filter columns or non-numeric value bounds
+        """
+        for column in (filters or {}):
+            if column not in FILTER_COLUMNS:
+                raise ValueError("Unknown column: {0}".format(column))
+        for name, bound in (('min_value', min_value), ('max_value', max_value)):
+            if bound is not None and not isinstance(bound, (int, float)):
+                raise ValueError("{0} must be a number".format(name))
+
+    @staticmethod
+    def _where(filters: Optional[Dict[str, List]], min_value: Optional[float],
+               max_value: Optional[float]):
+        """
+        WHERE clause and parameters for query() / iter_rows() filters.
+
+        Raises:
+            ValueError: As for validate_filters()
+        """
+        MeasurementIndex.validate_filters(filters, min_value, max_value)
+        filters = filters or {}
+        where = []
+        params = []
+        for column, values in filters.items():
+            if not values:
+                continue
+            where.append('{0} IN ({1})'.format(column, ','.join('?' * len(values))))
+            params.extend(values)
+        if min_value is not None:
+            where.append('value >= ?')
+            params.append(min_value)
+        if max_value is not None:
+            where.append('value <= ?')
+            params.append(max_value)
+        return (' WHERE ' + ' AND '.join(where) if where else ''), params
+
+    def count_rows(self, filters: Optional[Dict[str, List]] = None, min_value: Optional[float] = None,
+                   max_value: Optional[float] = None) -> Dict:
+        """
+        Row count and longest text of each column for an iter_rows() selection.
+
+        Returns:
+            Dict with keys: rows, widths (text column -> max length)
+        """
+        where, params = self._where(filters, min_value, max_value)
+        text_columns = [c for c in EXPORT_COLUMNS if c not in ('temp', 'row_index', 'value')]
+        sql = 'SELECT COUNT(*), {0} FROM measurements{1}'.format(
+            ', '.join('MAX(LENGTH({0}))'.format(c) for c in text_columns), where)
+
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute(sql, params)
+        row = c.fetchone()
+        conn.close()
+
+        return {'rows': row[0], 'widths': dict((c, w or 0) for c, w in zip(text_columns, row[1:]))}
+
+    def iter_rows(self, filters: Optional[Dict[str, List]] = None, min_value: Optional[float] = None,
+                  max_value: Optional[float] = None, chunk_size: int = 5000):
+        """
+        Stream all matching measurement rows (EXPORT_COLUMNS), without a limit.
+
+        Args:
+            filters, min_value, max_value: As for query()
+            chunk_size: Rows fetched per batch
+
+        Yields:
+            Lists of row tuples
+        """
+        where, params = self._where(filters, min_value, max_value)
+        sql = 'SELECT {0} FROM measurements{1} ORDER BY sim_id, row_index, measurement'.format(
+            ', '.join(EXPORT_COLUMNS), where)
+
+        # Exports advance the generator from 'exp' pool threads, one batch at a time
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        try:
+            c = conn.cursor()
+            c.execute(sql, params)
+            while True:
+                rows = c.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            conn.close()
+
+    def trend(self, project: str, voltage_domain: str, measurement: str,
+              point: Optional[Dict] = None) -> Dict:
+        """
+        A measurement at one PVT point across all snapshots, in time order.
+
+        Args:
+            project: Project name
+            voltage_domain: Voltage domain
+            measurement: Measurement name
+            point: PVT column -> value (KEY_COLUMNS); columns left out match
+                any value, so each snapshot is then aggregated over several rows
+
+        Returns:
+            Dict with keys: columns (sim_id, snapshot, snapshot_time, count,
+            min, max, avg), rows (one per snapshot, oldest first; snapshots
+            without a parsable time last)
+
+        Raises:
+            ValueError: For unknown PVT columns
+        """
+        point = point or {}
+        for column in point:
+            if column not in KEY_COLUMNS:
+                raise ValueError("Unknown PVT column: {0}".format(column))
+
+        where = ['voltage_domain = ?', 'measurement = ?', 'project = ?']
+        params = [voltage_domain, measurement, project]
+        for column in KEY_COLUMNS:
+            if point.get(column) not in (None, ''):
+                where.append('{0} = ?'.format(column))
+                params.append(point[column])
+
+        columns = ['sim_id', 'snapshot', 'snapshot_time'] + list(AGGREGATES)
+        sql = '''
+            SELECT sim_id, snapshot, snapshot_time, {0}
+            FROM measurements WHERE {1}
+            GROUP BY sim_id
+            ORDER BY snapshot_time IS NULL, snapshot_time, sim_id
+        '''.format(', '.join(AGGREGATES.values()), ' AND '.join(where))
+
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute(sql, params)
+        rows = [list(row) for row in c.fetchall()]
+        conn.close()
+
+        return {'columns': columns, 'rows': rows}
+
+    def point_extremes(self, project: str, voltage_domain: str, measurements: List[str]) -> List[List]:
+        """
+        Lowest and highest value ever recorded per PVT point and measurement.
+
+        Args:
+            project: Project name
+            voltage_domain: Voltage domain
+            measurements: Measurement names
+
+        Returns:
+            List of [process, extract, temp, v1, v2, v3, measurement, min, max]
+        """
+        if not measurements:
+            return []
+        sql = '''
+            SELECT process, extract, temp, v1, v2, v3, measurement, MIN(value), MAX(value)
+            FROM measurements
+            WHERE voltage_domain = ? AND measurement IN ({0}) AND project = ? AND value IS NOT NULL
+            GROUP BY process, extract, temp, v1, v2, v3, measurement
+        '''.format(', '.join('?' * len(measurements)))
+
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute(sql, [voltage_domain] + list(measurements) + [project])
+        rows = [list(row) for row in c.fetchall()]
+        conn.close()
+        return rows
+
+    def index_snapshots(self, project: str, voltage_domain: str, domain_dir: Optional[str] = None) -> List[str]:
+        """
+        Index the 00bkp_* snapshots kept in a voltage domain directory.
+
+        Snapshots that are already indexed, or that are the backup_dir of a
+        simulation (indexed under its sim_id), are skipped.
+
+        Args:
+            project: Project name
+            voltage_domain: Voltage domain
+            domain_dir: Directory holding the snapshots (default:
+                config.get_voltage_domain_path)
+
+        Returns:
+            List of newly indexed snapshot names
+        """
+        indexed = []
+        for name, creport_path, sim_id in self.pending_snapshots(project, voltage_domain, domain_dir):
+            self.index_simulation(sim_id, creport_path, project, voltage_domain)
+            indexed.append(name)
+        return indexed
+
+    def pending_snapshots(self, project: str, voltage_domain: str, domain_dir: Optional[str] = None) -> List:
+        """
+        Snapshots in a voltage domain directory that are not indexed yet.
+
+        Returns:
+            List of (snapshot name, creport path, index sim_id)
+        """
+        if domain_dir is None:
+            from config import get_voltage_domain_path
+            domain_dir = str(get_voltage_domain_path(project, voltage_domain))
+        if not os.path.isdir(domain_dir):
+            return []
+
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute('SELECT DISTINCT sim_id FROM measurements WHERE project = ? AND voltage_domain = ?',
+                  (project, voltage_domain))
+        indexed = set(row[0] for row in c.fetchall())
+        try:
+            c.execute("SELECT backup_dir FROM simulations WHERE backup_dir IS NOT NULL AND backup_dir != ''")
+            sim_backups = set(os.path.realpath(row[0]) for row in c.fetchall())
+        except sqlite3.OperationalError:
+            sim_backups = set()
+        conn.close()
+
+        pending = []
+        for name in sorted(os.listdir(domain_dir)):
+            snapshot_dir = os.path.join(domain_dir, name)
+            creport_path = os.path.join(snapshot_dir, 'report', 'creport.txt')
+            sim_id = '{0}/{1}/{2}'.format(project, voltage_domain, name)
+            if (not SNAPSHOT_PATTERN.match(name) or sim_id in indexed
+                    or os.path.realpath(snapshot_dir) in sim_backups or not os.path.isfile(creport_path)):
+                continue
+            pending.append((name, creport_path, sim_id))
+        return pending
+
+
+def index_finished_simulation(db_path: str, sim_id: str) -> int:
+    """
+    Index the creport of a finished simulation (idx stage worker).
+
+    Returns:
+        Number of measurement rows written (0 if the creport is missing)
+    """
+    conn = sqlite3.connect(db_path)
+    c = conn.cursor()
+    c.execute('SELECT backup_dir, project, voltage_domain FROM simulations WHERE sim_id = ?', (sim_id,))
+    row = c.fetchone()
+    conn.close()
+
+    if not row or not row[0]:
+        return 0
+
+    creport_path = os.path.join(row[0], 'report', 'creport.txt')
+    if not os.path.exists(creport_path):
+        print("[MeasurementIndex] ⚠️  No creport for {0}: {1}".format(sim_id, creport_path))
+        return 0
+
+    return MeasurementIndex(db_path).index_simulation(sim_id, creport_path, row[1], row[2])
+
+
+def queue_indexing(db_path: str, sim_id: str):
+    """
+    Queue measurement indexing of a finished simulation on the 'idx' stage pool.
+
+    Returns:
+        concurrent.futures.Future
+    """
+    from stage_executor import get_stage_executor
+
+    return get_stage_executor().submit('idx', index_finished_simulation, db_path, sim_id,
+                                       label="{0} (index)".format(sim_id))
+
+
+def queue_backfill(db_path: str) -> List[str]:
+    """
+    Queue indexing of finished simulations that are not in the index yet
+    (or were indexed before snapshot columns were recorded).
+
+    Returns:
+        List of queued sim_ids
+    """
+    indexed = set(MeasurementIndex(db_path).get_indexed_sims())
+
+    conn = sqlite3.connect(db_path)
+    c = conn.cursor()
+    c.execute('SELECT DISTINCT sim_id FROM measurements WHERE snapshot IS NULL')
+    indexed -= set(row[0] for row in c.fetchall())
+    c.execute('''
+        SELECT sim_id FROM simulations
+        WHERE state = 'finished' AND backup_dir IS NOT NULL AND backup_dir != ''
+        ORDER BY sim_id
+    ''')
+    pending = [row[0] for row in c.fetchall() if row[0] not in indexed]
+    conn.close()
+
+    for sim_id in pending:
+        queue_indexing(db_path, sim_id)
+    return pending
+
+
+def queue_snapshot_indexing(db_path: str, project: str, voltage_domain: str) -> List[str]:
+    """
+    Queue indexing of the not yet indexed 00bkp_* snapshots of a voltage domain on the 'idx' pool.
+
+    Snapshots already queued (e.g. by an earlier trend request) are not queued again.
+
+    Returns:
+        List of snapshot names queued or still being indexed
+    """
+    from stage_executor import get_stage_executor
+
+    index = MeasurementIndex(db_path)
+    pending = index.pending_snapshots(project, voltage_domain)
+    for name, creport_path, sim_id in pending:
+        with _queued_lock:
+            if sim_id in _queued_snapshots:
+                continue
+            _queued_snapshots.add(sim_id)
+        future = get_stage_executor().submit('idx', index.index_simulation, sim_id, creport_path, project,
+                                             voltage_domain, label="{0} (index)".format(sim_id))
+        future.add_done_callback(lambda _, sim_id=sim_id: _forget_queued(sim_id))
+    return [name for name, _, _ in pending]
+
+
+def _forget_queued(sim_id: str):
+    """Done callback of a snapshot indexing job."""
+    with _queued_lock:
+        _queued_snapshots.discard(sim_id)
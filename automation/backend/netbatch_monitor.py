@@ -62,6 +62,72 @@ def query_netbatch_status(job_ids: List[int]) -> Dict[int, str]:
         return {}
 
 
+def remove_netbatch_jobs(job_ids: List[int]) -> bool:
+    """
+    Remove (cancel) NetBatch jobs
+
+    Args:
+        job_ids: List of NetBatch job IDs to remove
+
+    Returns:
+        True if nbjob accepted the removal
+    """
+    if not job_ids:
+        return True
+
+    cmd = ["nbjob", "remove", "--target", "altera_png_normal"] + [str(jid) for jid in job_ids]
+
+    try:
+        result = subprocess.run(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            timeout=30
+        )
+
+        if result.returncode != 0:
+            print(f"⚠️ nbjob remove failed: {result.stderr}")
+            return False
+        return True
+
+    except subprocess.TimeoutExpired:
+        print("⚠️ nbjob remove timed out")
+        return False
+    except Exception as e:
+        print(f"⚠️ Error removing NetBatch jobs: {e}")
+        return False
+
+
+def remove_netbatch_jobs_batched(job_ids: List[int], batch_size: int = None) -> List[int]:
+    """
+    Remove NetBatch jobs with one `nbjob remove` call per batch of IDs
+
+    A rejected batch (e.g. one of its jobs finished in the meantime) is
+    retried one job at a time, so one stale ID does not keep the rest queued.
+
+    Args:
+        job_ids: List of NetBatch job IDs to remove
+        batch_size: IDs per call (default: config.NB_REMOVE_BATCH)
+
+    Returns:
+        IDs nbjob accepted for removal
+    """
+    if batch_size is None:
+        from config import NB_REMOVE_BATCH
+        batch_size = NB_REMOVE_BATCH
+    batch_size = max(1, int(batch_size))
+
+    removed = []
+    for start in range(0, len(job_ids), batch_size):
+        batch = job_ids[start:start + batch_size]
+        if remove_netbatch_jobs(batch):
+            removed.extend(batch)
+        elif len(batch) > 1:
+            removed.extend(jid for jid in batch if remove_netbatch_jobs([jid]))
+    return removed
+
+
 def parse_nbstatus_output(output: str, job_ids: List[int]) -> Dict[int, str]:
     """
     Parse nbstatus output and extract job statuses
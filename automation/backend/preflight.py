@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Preflight - validate a sweep's testbench includes before submission
+
+template/sim_tx.sp pulls in a dozen absolute .inc/.lib files, and gen_tb.pl
+rewrites some of those lines per PVT point:
+
+- any line mentioning DP_HSPICE_MODEL -> `.lib "$DP_HSPICE_MODEL" {corner}`
+- `_tparam_typical.spf` / `_tparam_typical.red.spf` -> `_tparam_{extraction}...`
+- `_lib.lib` -> section `{corner}_{ex}_{temp}_v1{v1}[_v2{v2}[_v3{v3}]]`
+
+A missing file or .lib section used to surface only once the jobs ran on the
+farm, failing every PVT point. validate_testbench() expands the template
+lines for every point of the plan, then walks the include graph level by
+level (nested .inc files and the body of every referenced .lib section),
+stat-ing and scanning the files of a level concurrently.
+
+Parsed files are kept in an LRU keyed on file identity (size, mtime_ns,
+inode), so a repeated submission only re-stats the files. Paths with
+environment variables that are not set on this server (e.g. DP_HSPICE_MODEL
+outside the farm environment) are reported as warnings, or as errors with
+config.PREFLIGHT_REQUIRE_ENV.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+# .inc "path" | .include 'path' | .lib "path" section | .lib path section
+REFERENCE_PATTERN = re.compile(
+    r'^\s*\.(inc|include|lib)\s+(?:"([^"]*)"|\'([^\']*)\'|(\S+))\s*(\S*)', re.IGNORECASE)
+ENDL_PATTERN = re.compile(r'^\s*\.endl\b', re.IGNORECASE)
+
+
+def _reference(line: str):
+    """
+    Parse a .inc/.lib line.
+
+    Returns:
+        ('ref', path, section or None), ('section', name, None) for a .lib
+        section definition, or None
+    """
+    match = REFERENCE_PATTERN.match(line)
+    if not match:
+        return None
+    keyword = match.group(1).lower()
+    quoted = match.group(2) if match.group(2) is not None else match.group(3)
+    target = quoted if quoted is not None else match.group(4)
+    section = match.group(5) or None
+
+    if keyword == 'lib' and quoted is None and section is None:
+        return ('section', target.upper(), None)
+    if keyword != 'lib':
+        section = None
+    return ('ref', target, section)
+
+
+def parse_spice_file(path: str) -> Dict:
+    """
+    Scan a SPICE file for its references and .lib sections.
+
+    Only lines starting with '.' are looked at; comment lines are skipped.
+
+    Returns:
+        Dict with keys: references (list of (line_no, path, section) outside
+        any section), sections (upper-case name -> list of references)
+    """
+    references = []
+    sections = {}
+    current = None
+    with open(path, 'r', errors='replace') as f:
+        for line_no, line in enumerate(f, 1):
+            stripped = line.lstrip()
+            if not stripped.startswith('.'):
+                continue
+            if ENDL_PATTERN.match(stripped):
+                current = None
+                continue
+            parsed = _reference(stripped)
+            if parsed is None:
+                continue
+            kind, target, section = parsed
+            if kind == 'section':
+                current = sections.setdefault(target, [])
+            elif current is not None:
+                current.append((line_no, target, section))
+            else:
+                references.append((line_no, target, section))
+    return {'references': references, 'sections': sections}
+
+
+class SpiceFileCache(object):
+    """
+    Bounded LRU of parse_spice_file() results keyed on file identity.
+
+    Usage:
+        cache = get_preflight_cache()
+        parsed = cache.get(path)  # None if the file does not exist
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        """
+        Initialize cache.
+
+        Args:
+            max_entries: Max cached files (default: config.PREFLIGHT_CACHE_ENTRIES)
+        """
+        if max_entries is None:
+            from config import PREFLIGHT_CACHE_ENTRIES
+            max_entries = PREFLIGHT_CACHE_ENTRIES
+
+        self.max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # path -> (identity, parsed)
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get(self, path: str) -> Optional[Dict]:
+        """
+        Parsed file, from cache if unchanged.
+
+        Returns:
+            parse_spice_file() result, None if the path is not a readable file
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        identity = (st.st_size, st.st_mtime_ns, st.st_ino)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == identity:
+                self._entries.move_to_end(path)
+                self._stats['hits'] += 1
+                return entry[1]
+            self._stats['misses'] += 1
+
+        try:
+            parsed = parse_spice_file(path)
+        except OSError:
+            return None
+
+        with self._lock:
+            self._entries[path] = (identity, parsed)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+        return parsed
+
+    def get_stats(self) -> Dict:
+        """Hit/miss counters and entry count."""
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), max_entries=self.max_entries)
+
+    def clear(self):
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_preflight_cache() -> SpiceFileCache:
+    """Get the process-wide SpiceFileCache (created on first use)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SpiceFileCache()
+        return _cache
+
+
+def _lib_section(point: Dict, config: Dict[str, str]) -> str:
+    """`_lib.lib` section gen_tb.pl writes for a point."""
+    name = "{0}_{1}_{2}_v1{3}".format(point['corner'], point['extraction'], point['temp_dir'], point['lv1'])
+    if config.get('supply3') == 'vccn':
+        return name + "_v2{0}_v3{1}".format(point['lv2'], point['lv3'])
+    if config.get('supply2', 'NA') == 'NA':
+        return name
+    return name + "_v2{0}".format(point['lv2'])
+
+
+def expand_template_reference(target: str, section: Optional[str], line: str,
+                              plan: List[Dict], config: Dict[str, str]) -> List[tuple]:
+    """
+    (path, section) pairs a template reference becomes across the plan.
+
+    Mirrors the gen_tb.pl substitutions listed in the module docstring.
+    """
+    if 'DP_HSPICE_MODEL' in line:
+        return [(target, corner) for corner in sorted(set(p['corner'] for p in plan))]
+    if '_tparam_typical' in target:
+        return [(target.replace('_tparam_typical', '_tparam_' + ex), None)
+                for ex in sorted(set(p['extraction'] for p in plan))]
+    if '_lib.lib' in line:
+        return [(target, name) for name in sorted(set(_lib_section(p, config) for p in plan))]
+    return [(target, section)]
+
+
+def validate_testbench(testbench_path: str, plan: List[Dict], config: Dict[str, str],
+                       base_dir: Optional[str] = None, workers: Optional[int] = None,
+                       require_env: Optional[bool] = None) -> Dict:
+    """
+    Check every file and .lib section a sweep's testbenches reference.
+
+    Args:
+        testbench_path: Template testbench (template/{tb}.sp)
+        plan: build_pvt_plan() result
+        config: Stage configuration from load_stage_config()
+        base_dir: Directory relative template paths resolve against (the PVT
+            directory the testbench runs in; default: the template directory)
+        workers: Concurrent stat/scan threads (default: config.PREFLIGHT_WORKERS)
+        require_env: Unset environment variables are errors (default:
+            config.PREFLIGHT_REQUIRE_ENV)
+
+    Returns:
+        Dict with keys: ok, errors, warnings, files (distinct files checked),
+        elapsed_ms
+    """
+    from config import PREFLIGHT_WORKERS, PREFLIGHT_REQUIRE_ENV
+
+    workers = PREFLIGHT_WORKERS if workers is None else workers
+    require_env = PREFLIGHT_REQUIRE_ENV if require_env is None else require_env
+    started = time.time()
+    cache = get_preflight_cache()
+    errors = []
+    warnings = []
+    name = os.path.basename(testbench_path)
+    base_dir = base_dir or os.path.dirname(testbench_path)
+
+    template = cache.get(testbench_path)
+    if template is None:
+        return {'ok': False, 'errors': ["{0}: testbench not found".format(testbench_path)],
+                'warnings': [], 'files': 0, 'elapsed_ms': 0.0}
+
+    with open(testbench_path, 'r', errors='replace') as f:
+        template_lines = f.read().splitlines()
+
+    # (origin, raw path, resolved path, section)
+    pending = []
+    for line_no, target, section in template['references']:
+        line = template_lines[line_no - 1]
+        for path, sec in expand_template_reference(target, section, line, plan, config):
+            pending.append(("{0}:{1}".format(name, line_no), path, base_dir, sec))
+
+    seen = set()
+    checked = set()
+    unresolved = OrderedDict()  # (origin, raw path) -> sections
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        while pending:
+            level = []
+            for origin, raw, base, section in pending:
+                path = os.path.expandvars(raw)
+                if '$' in path:
+                    sections = unresolved.setdefault((origin, raw), [])
+                    if section:
+                        sections.append(section)
+                    continue
+                path = os.path.normpath(os.path.join(base, path))
+                key = (path, section.upper() if section else None)
+                if key in seen:
+                    continue
+                seen.add(key)
+                level.append((origin, raw, path, section))
+
+            paths = sorted(set(item[2] for item in level))
+            parsed = dict(zip(paths, pool.map(cache.get, paths)))
+            checked.update(paths)
+
+            pending = []
+            for origin, raw, path, section in level:
+                entry = parsed[path]
+                if entry is None:
+                    errors.append("{0}: missing file {1}".format(origin, path))
+                    continue
+                if section:
+                    body = entry['sections'].get(section.upper())
+                    if body is None:
+                        available = ', '.join(sorted(entry['sections'])) or 'none'
+                        errors.append("{0}: section {1} not found in {2} (sections: {3})".format(
+                            origin, section, path, available))
+                        continue
+                else:
+                    body = entry['references']
+                child_base = os.path.dirname(path)
+                child_name = os.path.basename(path)
+                for line_no, target, child_section in body:
+                    pending.append(("{0}:{1}".format(child_name, line_no), target, child_base, child_section))
+
+    for (origin, raw), sections in unresolved.items():
+        variable = re.search(r'\$\{?(\w*)', os.path.expandvars(raw)).group(1) or '$'
+        message = "{0}: {1} is not set here, {2}{3} not checked".format(
+            origin, variable, raw, " (sections {0})".format(', '.join(sections)) if sections else '')
+        (errors if require_env else warnings).append(message)
+
+    return {
+        'ok': not errors,
+        'errors': errors,
+        'warnings': warnings,
+        'files': len(checked),
+        'elapsed_ms': round((time.time() - started) * 1000.0, 1)
+    }
+
+
+def validate_work_dir(work_dir: str, script_path: str) -> Dict:
+    """
+    validate_testbench() for a prepared work_dir (config.cfg and template/).
+
+    Args:
+        work_dir: Working directory (before the gen stage)
+        script_path: Path to ver03 scripts (PaiHoExecutor.script_path)
+
+    Returns:
+        validate_testbench() result
+
+    Raises:
+        ValueError: If the work_dir has no testbench or an empty PVT plan
+    """
+    from extraction_engine import load_stage_config, find_testbench, build_pvt_plan, point_directory
+
+    testbench = find_testbench(work_dir)
+    if not testbench:
+        raise ValueError(f"No testbench found in {work_dir}/template")
+    config = load_stage_config(work_dir, script_path)
+    plan = build_pvt_plan(config)
+    if not plan:
+        raise ValueError("Empty PVT plan: no corners/temperatures selected")
+
+    # Testbenches run in the PVT directories; relative includes resolve from there
+    return validate_testbench(os.path.join(work_dir, 'template', f"{testbench}.sp"), plan, config,
+                              base_dir=point_directory(work_dir, plan[0]))
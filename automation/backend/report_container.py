@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Report Container - all per-PVT reports of a simulation in one indexed file
+
+The ext stage leaves one report/report_<corner>_<ex>_<temp>_<v>.txt per PVT
+point (92 in the gpio/1p1v backups, hundreds on full sweeps). Every reader -
+srt, backups, libgen-style scripts, the results API - pays an NFS open/stat
+per file.
+
+pack_reports() moves the loose reports into report/reports.zip. The zip
+central directory is the offset index: a reader opens one file, reads the
+index once and seeks straight to the member it needs. Member names are the
+original file names, so export_reports() (or plain `unzip`) recreates the
+loose files byte for byte.
+
+creport.txt and creport_partial.txt stay loose (libgen.py globs for them).
+
+ReportReader looks up a report in the loose files first and then in the
+container, so the engine works unchanged while a sweep is partly packed
+(e.g. reports extracted incrementally after an earlier pack).
+"""
+
+import os
+import io
+import zipfile
+import threading
+from typing import Dict, List, Optional
+
+CONTAINER_NAME = 'reports.zip'
+
+REPORT_PREFIX = 'report_'
+REPORT_SUFFIX = '.txt'
+
+# Packing is rare; one pack at a time per process keeps concurrent stages safe
+_pack_lock = threading.Lock()
+
+
+def container_path(report_dir: str) -> str:
+    """Path of the report container in a report/ directory."""
+    return os.path.join(report_dir, CONTAINER_NAME)
+
+
+def _is_report_file(name: str) -> bool:
+    """Per-point report file name (report_<name>.txt)."""
+    return name.startswith(REPORT_PREFIX) and name.endswith(REPORT_SUFFIX)
+
+
+def report_name(file_name: str) -> str:
+    """Point name of a report file: report_<name>.txt -> <name>."""
+    return file_name[len(REPORT_PREFIX):-len(REPORT_SUFFIX)]
+
+
+def report_file_name(name: str) -> str:
+    """Report file name of a point: <name> -> report_<name>.txt."""
+    return REPORT_PREFIX + name + REPORT_SUFFIX
+
+
+class ReportReader(object):
+    """
+    Read per-point reports from report/ (loose files, then reports.zip).
+
+    Usage:
+        with ReportReader(report_dir) as reader:
+            if reader.has(name):
+                lines = reader.read_lines(name)
+    """
+
+    def __init__(self, report_dir: str):
+        """
+        Initialize reader.
+
+        Args:
+            report_dir: report/ directory of a work_dir or 00bkp_* backup
+        """
+        self.report_dir = report_dir
+        self._zip = None
+        self._loose = set()
+        self._packed = set()
+
+        if os.path.isdir(report_dir):
+            self._loose = set(report_name(f) for f in os.listdir(report_dir) if _is_report_file(f))
+
+        path = container_path(report_dir)
+        if os.path.isfile(path):
+            self._zip = zipfile.ZipFile(path, 'r')
+            self._packed = set(report_name(n) for n in self._zip.namelist() if _is_report_file(n))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Close the container."""
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+
+    def names(self) -> List[str]:
+        """Point names with a report, sorted."""
+        return sorted(self._loose | self._packed)
+
+    def has(self, name: str) -> bool:
+        """True if a report exists for the point."""
+        return name in self._loose or name in self._packed
+
+    def read_text(self, name: str) -> Optional[str]:
+        """
+        Report content (universal newlines, like open(path, 'r')).
+
+        Returns:
+            Content, or None if the point has no report
+        """
+        if name in self._loose:
+            path = os.path.join(self.report_dir, report_file_name(name))
+            if os.path.isfile(path):
+                with open(path, 'r', errors='replace') as f:
+                    return f.read()
+
+        if name in self._packed:
+            with self._zip.open(report_file_name(name)) as raw:
+                with io.TextIOWrapper(raw, errors='replace') as f:
+                    return f.read()
+
+        return None
+
+    def read_lines(self, name: str) -> Optional[List[str]]:
+        """
+        Newline-terminated lines of a report (an unterminated last line is
+        dropped, as extraction_engine._read_lines does).
+
+        Returns:
+            List of lines, or None if the point has no report
+        """
+        content = self.read_text(name)
+        if content is None:
+            return None
+        return content.split('\n')[:content.count('\n')]
+
+
+def pack_reports(report_dir: str, compression: int = zipfile.ZIP_DEFLATED) -> Dict:
+    """
+    Move loose report files into report/reports.zip.
+
+    Reports already in the container are kept unless a loose file of the same
+    point replaces them. The new container is written next to the old one and
+    renamed into place before any loose file is removed.
+
+    Args:
+        report_dir: report/ directory
+        compression: zipfile compression method
+
+    Returns:
+        Dict with keys: container, packed (loose files added), total (reports in container)
+    """
+    path = container_path(report_dir)
+
+    with _pack_lock:
+        loose = sorted(f for f in os.listdir(report_dir) if _is_report_file(f))
+        if not loose:
+            total = 0
+            if os.path.isfile(path):
+                with zipfile.ZipFile(path, 'r') as zf:
+                    total = len(zf.namelist())
+            return {'container': path if total else None, 'packed': 0, 'total': total}
+
+        tmp_path = path + '.partial'
+        loose_set = set(loose)
+        total = 0
+        with zipfile.ZipFile(tmp_path, 'w', compression) as out:
+            if os.path.isfile(path):
+                with zipfile.ZipFile(path, 'r') as old:
+                    for info in old.infolist():
+                        if info.filename not in loose_set:
+                            out.writestr(info, old.read(info.filename))
+                            total += 1
+            for file_name in loose:
+                out.write(os.path.join(report_dir, file_name), file_name)
+                total += 1
+        os.replace(tmp_path, path)
+
+        for file_name in loose:
+            os.remove(os.path.join(report_dir, file_name))
+
+    return {'container': path, 'packed': len(loose), 'total': total}
+
+
+def export_reports(report_dir: str, dest_dir: Optional[str] = None) -> int:
+    """
+    Recreate loose report files from the container (compatibility exporter).
+
+    Args:
+        report_dir: report/ directory containing reports.zip
+        dest_dir: Output directory (default: report_dir itself)
+
+    Returns:
+        Number of files written (0 if there is no container)
+    """
+    path = container_path(report_dir)
+    if not os.path.isfile(path):
+        return 0
+
+    dest_dir = dest_dir or report_dir
+    os.makedirs(dest_dir, exist_ok=True)
+
+    count = 0
+    with zipfile.ZipFile(path, 'r') as zf:
+        for file_name in zf.namelist():
+            if not _is_report_file(file_name) or os.path.basename(file_name) != file_name:
+                continue
+            with open(os.path.join(dest_dir, file_name), 'wb') as f:
+                f.write(zf.read(file_name))
+            count += 1
+
+    return count
+
+
+if __name__ == '__main__':
+    import sys
+
+    if len(sys.argv) < 3 or sys.argv[1] not in ('pack', 'export'):
+        print("Usage: python3 report_container.py pack <report_dir>")
+        print("       python3 report_container.py export <report_dir> [dest_dir]")
+        sys.exit(1)
+
+    if sys.argv[1] == 'pack':
+        summary = pack_reports(sys.argv[2])
+        print("Packed {0} reports ({1} total) into {2}".format(
+            summary['packed'], summary['total'], summary['container']))
+    else:
+        count = export_reports(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None)
+        print("Exported {0} reports".format(count))
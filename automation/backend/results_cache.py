@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Results Cache - in-process LRU cache of parsed creport.txt files
+
+ResultsHandler used to re-read and re-parse creport.txt (a float() attempt
+per cell), run analyze_results() and serialise the response with indent=2 on
+every request, although result pages are reloaded constantly.
+
+Entries are keyed on file identity (path, size, mtime_ns), so a rewritten
+creport (srt re-run, partial creport refresh) is a miss without any explicit
+invalidation. Each entry holds the parsed creport, its NumPy columns (for
+/summary), its pass/fail analysis and
+the serialised full responses per spec-limit version (filtered or paginated
+requests are evaluated against the cached analysis); SpecLimitsHandler calls
+invalidate_spec_limits() when the limits change.
+
+Memory is bounded by entry count and an estimate of the entry sizes
+(config.RESULTS_CACHE_ENTRIES / RESULTS_CACHE_MB). Hit/miss counters are
+served at /api/cache/stats.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+# Parsed rows (dicts of floats/strings) take several times the file size
+PARSED_SIZE_FACTOR = 8
+
+
+class ResultsCache(object):
+    """
+    Bounded LRU cache of parsed creports and serialised responses.
+
+    Usage:
+        cache = get_results_cache()
+        parsed = cache.get_parsed(creport_path)
+        body = cache.get_response(creport_path, cache.spec_version())
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, max_mb: Optional[float] = None):
+        """
+        Initialize cache.
+
+        Args:
+            max_entries: Max cached creports (default: config.RESULTS_CACHE_ENTRIES)
+            max_mb: Max estimated size in MB (default: config.RESULTS_CACHE_MB)
+        """
+        if max_entries is None or max_mb is None:
+            from config import RESULTS_CACHE_ENTRIES, RESULTS_CACHE_MB
+            max_entries = RESULTS_CACHE_ENTRIES if max_entries is None else max_entries
+            max_mb = RESULTS_CACHE_MB if max_mb is None else max_mb
+
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # path -> {identity, parsed, analyses, responses, size}
+        self._bytes = 0
+        self._spec_generation = 0
+        self._stats = {'hits': 0, 'misses': 0, 'response_hits': 0, 'response_misses': 0,
+                       'evictions': 0, 'invalidations': 0}
+
+    @staticmethod
+    def _identity(path):
+        """(size, mtime_ns) of a file, or None if it does not exist."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_size, st.st_mtime_ns)
+
+    def _lookup(self, path, identity):
+        """Current entry for path (moved to MRU end), dropping a stale one. Caller holds lock."""
+        entry = self._entries.get(path)
+        if entry is None:
+            return None
+        if entry['identity'] != identity:
+            self._drop(path)
+            return None
+        self._entries.move_to_end(path)
+        return entry
+
+    def _drop(self, path):
+        """Remove an entry. Caller holds lock."""
+        entry = self._entries.pop(path)
+        self._bytes -= entry['size']
+
+    def _resize(self, path, entry, size):
+        """Update an entry's size and evict least recently used entries. Caller holds lock."""
+        self._bytes += size - entry['size']
+        entry['size'] = size
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            oldest = next(iter(self._entries))
+            if oldest == path and len(self._entries) == 1:
+                break  # a single oversized entry stays until replaced
+            self._drop(oldest)
+            self._stats['evictions'] += 1
+
+    def get_parsed(self, path: str) -> Optional[Dict]:
+        """
+        Parsed creport (results_parser.load_creport), from cache if unchanged.
+
+        The returned dict is shared between requests and must not be modified.
+
+        Returns:
+            Parsed data, or None if the file is missing or cannot be parsed
+        """
+        identity = self._identity(path)
+        if identity is None:
+            return None
+
+        with self._lock:
+            entry = self._lookup(path, identity)
+            if entry is not None:
+                self._stats['hits'] += 1
+                return entry['parsed']
+            self._stats['misses'] += 1
+
+        from results_parser import load_creport
+
+        parsed = load_creport(path)
+        if parsed is None:
+            return None
+
+        with self._lock:
+            if path in self._entries:
+                self._drop(path)
+            entry = {'identity': identity, 'parsed': parsed, 'analyses': {}, 'responses': {}, 'size': 0}
+            self._entries[path] = entry
+            self._resize(path, entry, identity[0] * PARSED_SIZE_FACTOR)
+
+        return parsed
+
+    def get_columns(self, path: str) -> Optional[Dict]:
+        """
+        Creport as NumPy columns (results_sidecar.load_columns structure), from cache if unchanged.
+
+        Read from the creport.npz sidecar when it is valid, otherwise built
+        from the cached parsed rows. Shared between requests, must not be modified.
+
+        Returns:
+            Columns, or None if the file cannot be parsed or NumPy is not installed
+        """
+        from results_sidecar import np, load_columns, columns_from_parsed
+
+        parsed = self.get_parsed(path)
+        if parsed is None or np is None:
+            return None
+
+        identity = self._identity(path)
+        with self._lock:
+            entry = self._lookup(path, identity) if identity else None
+            if entry is not None and 'columns' in entry:
+                return entry['columns']
+
+        columns = load_columns(path) or columns_from_parsed(parsed)
+
+        with self._lock:
+            entry = self._lookup(path, identity) if identity else None
+            if entry is not None and 'columns' not in entry:
+                entry['columns'] = columns
+                self._resize(path, entry, entry['size'] + identity[0])
+        return columns
+
+    def get_analysis(self, path: str, version, compute: Callable[[], Optional[Dict]]) -> Optional[Dict]:
+        """
+        Pass/fail analysis of a cached creport for a spec-limit version.
+
+        Args:
+            path: creport path (must have been loaded with get_parsed)
+            version: spec_version() the analysis is computed for
+            compute: Called on a miss, e.g. lambda: analyze_results(parsed, limits)
+
+        Returns:
+            Analysis dict (shared, must not be modified)
+        """
+        identity = self._identity(path)
+        with self._lock:
+            entry = self._lookup(path, identity) if identity else None
+            if entry is not None and version in entry['analyses']:
+                return entry['analyses'][version]
+
+        analysis = compute()
+
+        with self._lock:
+            entry = self._lookup(path, identity) if identity else None
+            if entry is not None and analysis is not None and version == self._spec_generation:
+                entry['analyses'][version] = analysis
+                self._resize(path, entry, entry['size'] + identity[0] * PARSED_SIZE_FACTOR)
+        return analysis
+
+    def get_response(self, path: str, version) -> Optional[str]:
+        """Serialised response for a creport and spec-limit version, or None."""
+        identity = self._identity(path)
+        with self._lock:
+            entry = self._lookup(path, identity) if identity else None
+            body = entry['responses'].get(version) if entry else None
+            self._stats['response_hits' if body is not None else 'response_misses'] += 1
+            return body
+
+    def put_response(self, path: str, version, body: str):
+        """Cache a serialised response (ignored if the creport is not cached)."""
+        identity = self._identity(path)
+        with self._lock:
+            entry = self._lookup(path, identity) if identity else None
+            if entry is None or version != self._spec_generation:
+                return
+            old = entry['responses'].get(version)
+            entry['responses'][version] = body
+            self._resize(path, entry, entry['size'] + len(body) - (len(old) if old else 0))
+
+    def spec_version(self):
+        """Current spec-limit version (part of the response cache key)."""
+        with self._lock:
+            return self._spec_generation
+
+    def invalidate_spec_limits(self):
+        """Drop all cached analyses and responses after a spec-limit change (parsed data is kept)."""
+        with self._lock:
+            self._spec_generation += 1
+            self._stats['invalidations'] += 1
+            for path, entry in self._entries.items():
+                dropped = sum(len(b) for b in entry['responses'].values())
+                dropped += len(entry['analyses']) * entry['identity'][0] * PARSED_SIZE_FACTOR
+                entry['analyses'] = {}
+                entry['responses'] = {}
+                entry['size'] -= dropped
+                self._bytes -= dropped
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> Dict:
+        """
+        Get cache counters.
+
+        Returns:
+            Dict with entries, max_entries, size_mb, max_mb, hits, misses,
+            hit_rate, response_hits, response_misses, evictions, invalidations
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats['hits'] + stats['misses']
+            stats.update({
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'size_mb': round(self._bytes / (1024.0 * 1024.0), 2),
+                'max_mb': round(self.max_bytes / (1024.0 * 1024.0), 2),
+                'hit_rate': round(stats['hits'] / lookups, 3) if lookups else 0.0,
+                'spec_version': self._spec_generation
+            })
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_results_cache() -> ResultsCache:
+    """Get the process-wide ResultsCache (created on first use)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultsCache()
+        return _cache
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Results Diff - row-aligned comparison of two creports
+
+After a netlist or model change the new creport is compared against a
+previous 00bkp_* snapshot. Rows are aligned on their PVT point (process,
+extract, temp, v1, v2, v3): each point is coded as an integer key (repeated
+points numbered in order of occurrence) and the two key arrays are joined
+with np.intersect1d. Every measurement column the two runs share is then
+compared in one step on (measurements x matched rows) float64 matrices:
+
+    delta = b - a
+    rel   = delta / |a|          (inf when a == 0 and b != 0)
+
+A row is flagged when any cell exceeds the relative (or absolute) threshold,
+or when a cell is numeric in one run and an 'error' in the other. Rows
+present in only one run are reported separately. Served at
+/api/results/diff?a=<sim>&b=<sim>.
+"""
+
+from typing import Dict, List, Optional
+
+from measurement_index import KEY_COLUMNS
+from spec_evaluator import np, columns_from_sidecar, column_values
+
+# Default relative change that flags a cell (5%)
+DEFAULT_REL_THRESHOLD = 0.05
+
+
+def _key_codes(columns_data: Dict, column: str):
+    """(codes, parsed values) of a PVT column, floats or categorical alike."""
+    if column in columns_data['floats']:
+        values, codes = np.unique(columns_data['floats'][column], return_inverse=True)
+        return codes, values.tolist()
+    codes, categories = columns_data['categorical'][column]
+    return codes, categories
+
+
+def _row_keys(columns_a: Dict, columns_b: Dict, keys: List[str]):
+    """
+    Integer join keys for the rows of both runs.
+
+    Each PVT column is coded in a value space shared by the two runs and the
+    codes are combined into one int64 group id per point; repeated points are
+    numbered in row order, so equal (point, occurrence) pairs get equal keys.
+    """
+    n_a, n_b = columns_a['rows'], columns_b['rows']
+    groups = np.zeros(n_a + n_b, dtype=np.int64)
+    radix = 1
+    for column in keys:
+        codes_a, values_a = _key_codes(columns_a, column)
+        codes_b, values_b = _key_codes(columns_b, column)
+        shared = dict((v, i) for i, v in enumerate(values_a))
+        remap_b = np.array([shared.setdefault(v, len(shared)) for v in values_b], dtype=np.int64)
+        codes = np.concatenate([np.asarray(codes_a, dtype=np.int64),
+                                remap_b[codes_b] if n_b else np.zeros(0, dtype=np.int64)])
+        # Mixed-radix key; re-densify before it could overflow int64
+        if radix * len(shared) >= 2 ** 62:
+            _, groups = np.unique(groups, return_inverse=True)
+            radix = int(groups.max(initial=0)) + 1
+        groups = groups * len(shared) + codes
+        radix *= max(len(shared), 1)
+
+    occurrence = np.zeros(n_a + n_b, dtype=np.int64)
+    for side in (slice(0, n_a), slice(n_a, n_a + n_b)):
+        g = groups[side]
+        if not g.size:
+            continue
+        order = np.argsort(g, kind='stable')
+        sorted_g = g[order]
+        starts = np.flatnonzero(np.r_[True, sorted_g[1:] != sorted_g[:-1]])
+        counts = np.diff(np.r_[starts, g.size])
+        occ = np.empty(g.size, dtype=np.int64)
+        occ[order] = np.arange(g.size) - np.repeat(starts, counts)
+        occurrence[side] = occ
+
+    _, groups = np.unique(groups, return_inverse=True)
+    join_keys = groups.reshape(-1) * (int(occurrence.max(initial=0)) + 1) + occurrence
+    return join_keys[:n_a], join_keys[n_a:]
+
+
+def _json_matrix(matrix):
+    """Rows of a (measurements x rows) matrix as lists, None for NaN/inf."""
+    values = matrix.T.astype(object)
+    values[~np.isfinite(matrix.T)] = None
+    return values.tolist()
+
+
+def diff_columns(columns_a: Dict, columns_b: Dict, rel_threshold: float = DEFAULT_REL_THRESHOLD,
+                 abs_threshold: Optional[float] = None, flagged_only: bool = False,
+                 offset: int = 0, limit: Optional[int] = None) -> Dict:
+    """
+    Compare two creports given as columns (results_sidecar.load_columns structure).
+
+    Args:
+        columns_a: Baseline run
+        columns_b: New run
+        rel_threshold: |delta / a| above which a cell is flagged (None = off)
+        abs_threshold: |delta| above which a cell is flagged (None = off)
+        flagged_only: Only return flagged rows
+        offset: Matched rows to skip (after flagged_only)
+        limit: Max matched rows returned; None for all
+
+    Returns:
+        Dict with keys:
+            key_columns, measurements: shared PVT and measurement columns
+            matched, flagged_count, total_rows: row counts
+            rows: list of {point, row_a, row_b, flagged, a, b, delta, rel,
+                flags} where a/b/delta/rel are lists in measurements order and
+                flags names the flagged measurements
+            only_a, only_b: PVT points present in one run only
+            max_abs_delta, max_rel_delta: per measurement over matched rows
+
+    Raises:
+        ValueError: For negative offset/limit or thresholds
+    """
+    if offset < 0 or (limit is not None and limit < 0):
+        raise ValueError("offset and limit must not be negative")
+    if (rel_threshold is not None and rel_threshold < 0) or (abs_threshold is not None and abs_threshold < 0):
+        raise ValueError("thresholds must not be negative")
+
+    headers_a = [h for h in dict.fromkeys(columns_a['headers']) if h]
+    headers_b = set(h for h in columns_b['headers'] if h)
+    keys = [h for h in KEY_COLUMNS if h in headers_a and h in headers_b]
+    measurements = [h for h in headers_a if h in headers_b and h not in KEY_COLUMNS]
+
+    # Join on the PVT point (keys are unique per run), in baseline row order
+    keys_a, keys_b = _row_keys(columns_a, columns_b, keys)
+    _, rows_a, rows_b = np.intersect1d(keys_a, keys_b, assume_unique=True, return_indices=True)
+    order = np.argsort(rows_a)
+    rows_a, rows_b = rows_a[order], rows_b[order]
+    matched = rows_a.size
+
+    values_a = columns_from_sidecar(columns_a, measurements)
+    values_b = columns_from_sidecar(columns_b, measurements)
+    a = np.array([values_a[m][rows_a] for m in measurements], dtype=np.float64).reshape(len(measurements), matched)
+    b = np.array([values_b[m][rows_b] for m in measurements], dtype=np.float64).reshape(len(measurements), matched)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        delta = b - a
+        rel = np.where(delta == 0, 0.0, delta / np.abs(a))
+
+    flags = np.isnan(a) != np.isnan(b)  # 'error' in one run only
+    if rel_threshold is not None:
+        flags |= np.abs(rel) > rel_threshold
+    if abs_threshold is not None:
+        flags |= np.abs(delta) > abs_threshold
+    flagged = flags.any(axis=0)
+
+    selected = np.flatnonzero(flagged) if flagged_only else np.arange(matched)
+    end = None if limit is None else offset + limit
+    page = selected[offset:end]
+
+    def points(columns_data, rows):
+        return [dict(zip(keys, cells)) for cells in zip(*(column_values(columns_data, k, rows) for k in keys))] \
+            if keys else [{} for _ in rows]
+
+    page_rows = zip(points(columns_a, rows_a[page]), rows_a[page].tolist(), rows_b[page].tolist(),
+                    flagged[page].tolist(), _json_matrix(a[:, page]), _json_matrix(b[:, page]),
+                    _json_matrix(delta[:, page]), _json_matrix(rel[:, page]), flags[:, page].T.tolist())
+    result_rows = [{
+        'point': point, 'row_a': row_a, 'row_b': row_b, 'flagged': is_flagged,
+        'a': va, 'b': vb, 'delta': vd, 'rel': vr,
+        'flags': [m for m, f in zip(measurements, cell_flags) if f]
+    } for point, row_a, row_b, is_flagged, va, vb, vd, vr, cell_flags in page_rows]
+
+    max_abs = {}
+    max_rel = {}
+    for i, name in enumerate(measurements):
+        finite_delta = np.abs(delta[i][np.isfinite(delta[i])])
+        finite_rel = np.abs(rel[i][np.isfinite(rel[i])])
+        max_abs[name] = float(finite_delta.max()) if finite_delta.size else None
+        max_rel[name] = float(finite_rel.max()) if finite_rel.size else None
+
+    only_a = np.setdiff1d(np.arange(columns_a['rows']), rows_a, assume_unique=True)
+    only_b = np.setdiff1d(np.arange(columns_b['rows']), rows_b, assume_unique=True)
+
+    return {
+        'key_columns': keys,
+        'measurements': measurements,
+        'matched': matched,
+        'flagged_count': int(flagged.sum()),
+        'total_rows': int(selected.size),
+        'rows': result_rows,
+        'only_a': points(columns_a, only_a),
+        'only_b': points(columns_b, only_b),
+        'max_abs_delta': max_abs,
+        'max_rel_delta': max_rel
+    }
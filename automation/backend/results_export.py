@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Results Export - streaming CSV / NDJSON / NPZ encoders
+
+results_parser.export_to_csv() needs the whole parsed creport in memory and
+is only reachable from the CLI. The encoders here turn a row iterator into
+a sequence of chunks that ExportHandler writes and flushes one by one
+(chunked transfer encoding), so memory stays bounded by one chunk whatever
+the export size:
+
+- csv: header line, then csv.writer rows
+- ndjson: one JSON object per row
+- npz: a single structured array ('rows'), one field per column. The array
+  is written through zipfile into an unseekable sink; the row count and the
+  text column widths are needed up front for the .npy header, so callers
+  make a cheap counting pass first (count_creport / MeasurementIndex.count_rows).
+
+Sources are one creport (results_parser.stream_creport) or a measurement
+index selection across simulations (MeasurementIndex.iter_rows).
+"""
+
+import csv
+import io
+import json
+import zipfile
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from results_parser import stream_creport
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+FORMATS = {
+    'csv': 'text/csv; charset=UTF-8',
+    'ndjson': 'application/x-ndjson',
+    'npz': 'application/octet-stream',
+}
+
+NPZ_MEMBER = 'rows'
+
+
+def check_format(fmt: str) -> str:
+    """
+    Validate an export format.
+
+    Raises:
+        ValueError: For unknown formats, or npz without NumPy
+    """
+    if fmt not in FORMATS:
+        raise ValueError("Unknown export format: {0} (use {1})".format(fmt, ', '.join(FORMATS)))
+    if fmt == 'npz' and np is None:
+        raise ValueError("npz export requires NumPy")
+    return fmt
+
+
+def _batches(rows: Iterable, chunk_rows: int) -> Iterator[List]:
+    """Group a row iterator into lists of chunk_rows rows."""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= chunk_rows:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def csv_chunks(columns: List[str], batches: Iterable[List]) -> Iterator[str]:
+    """CSV text chunks: the header, then one chunk per batch of rows (None -> empty cell)."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    yield buf.getvalue()
+    for batch in batches:
+        buf.seek(0)
+        buf.truncate()
+        writer.writerows(batch)
+        yield buf.getvalue()
+
+
+def ndjson_chunks(columns: List[str], batches: Iterable[List]) -> Iterator[str]:
+    """NDJSON text chunks, one JSON object per row."""
+    encode = json.JSONEncoder(separators=(',', ':')).encode
+    for batch in batches:
+        yield ''.join(encode(dict(zip(columns, row))) + '\n' for row in batch)
+
+
+class _Sink(object):
+    """Unseekable file object collecting what zipfile writes, drained per chunk."""
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+def npz_dtype(columns: List[str], kinds: Dict[str, str], widths: Dict[str, int]):
+    """
+    Structured dtype for an NPZ export.
+
+    Args:
+        columns: Column names, in order
+        kinds: Column -> 'f8', 'i8' or 'U' (text)
+        widths: Text column -> max length
+    """
+    return np.dtype([(c, 'U{0}'.format(max(widths.get(c, 0), 1)) if kinds[c] == 'U' else kinds[c])
+                     for c in columns])
+
+
+def npz_chunks(dtype, count: int, batches: Iterable[List]) -> Iterator[bytes]:
+    """
+    NPZ byte chunks holding one structured array of count rows.
+
+    Text fields take '' for None, float fields NaN.
+
+    Raises:
+        RuntimeError: If the batches do not hold exactly count rows (the
+            source changed between the counting pass and the export)
+    """
+    fill = tuple('' if dtype[name].kind == 'U' else (np.nan if dtype[name].kind == 'f' else 0)
+                 for name in dtype.names)
+
+    sink = _Sink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED) as zf:
+        with zf.open(NPZ_MEMBER + '.npy', 'w', force_zip64=True) as member:
+            np.lib.format.write_array_header_2_0(member, {
+                'descr': np.lib.format.dtype_to_descr(dtype),
+                'fortran_order': False,
+                'shape': (count,)
+            })
+            written = 0
+            for batch in batches:
+                records = [tuple(f if v is None else v for v, f in zip(row, fill)) for row in batch]
+                written += len(records)
+                if written > count:
+                    raise RuntimeError("Export source grew during the export")
+                member.write(np.array(records, dtype=dtype).tobytes())
+                yield sink.drain()
+            if written != count:
+                raise RuntimeError("Export source shrank during the export")
+    yield sink.drain()
+
+
+def count_creport(f) -> Optional[Dict]:
+    """
+    Counting pass over an open creport for NPZ export.
+
+    Returns:
+        Dict with keys: columns, kinds (float columns 'f8', others 'U'),
+        widths, rows; None if the creport has no header
+    """
+    stream = stream_creport(f)
+    if stream is None:
+        return None
+    _, columns, rows = stream
+
+    numeric = [True] * len(columns)
+    widths = [0] * len(columns)
+    count = 0
+    for row in rows:
+        count += 1
+        for i, value in enumerate(row):
+            if not isinstance(value, float):
+                numeric[i] = False
+                widths[i] = max(widths[i], len(value))
+            else:
+                widths[i] = max(widths[i], len(repr(value)))
+    return {
+        'columns': columns,
+        'kinds': dict((c, 'f8' if n else 'U') for c, n in zip(columns, numeric)),
+        'widths': dict(zip(columns, widths)),
+        'rows': count
+    }
+
+
+def export_creport(creport_path: str, fmt: str, chunk_rows: int = 5000) -> Iterator:
+    """
+    Stream one creport in an export format.
+
+    Args:
+        creport_path: Path to creport.txt
+        fmt: 'csv', 'ndjson' or 'npz'
+        chunk_rows: Rows per chunk
+
+    Yields:
+        str (csv/ndjson) or bytes (npz) chunks
+    """
+    with open(creport_path, 'r') as f:
+        if fmt == 'npz':
+            info = count_creport(f)
+            f.seek(0)
+        stream = stream_creport(f)
+        if stream is None:
+            return
+        _, columns, rows = stream
+        batches = _batches(rows, chunk_rows)
+
+        if fmt == 'csv':
+            chunks = csv_chunks(columns, batches)
+        elif fmt == 'ndjson':
+            chunks = ndjson_chunks(columns, batches)
+        else:
+            # Numeric-looking text in a text column (e.g. temp 'error' rows) goes back to text
+            dtype = npz_dtype(columns, info['kinds'], info['widths'])
+            text = [dtype[c].kind == 'U' for c in columns]
+            batches = ([[repr(v) if t and isinstance(v, float) else v for v, t in zip(row, text)]
+                        for row in batch] for batch in batches)
+            chunks = npz_chunks(dtype, info['rows'], batches)
+
+        for chunk in chunks:
+            yield chunk
+
+
+def export_measurements(index, fmt: str, filters: Optional[Dict[str, List]] = None,
+                        min_value: Optional[float] = None, max_value: Optional[float] = None,
+                        chunk_rows: int = 5000) -> Iterator:
+    """
+    Stream a measurement index selection (across simulations) in an export format.
+
+    Args:
+        index: MeasurementIndex
+        fmt: 'csv', 'ndjson' or 'npz'
+        filters, min_value, max_value: As for MeasurementIndex.query()
+        chunk_rows: Rows per chunk
+
+    Yields:
+        str (csv/ndjson) or bytes (npz) chunks
+    """
+    from measurement_index import EXPORT_COLUMNS
+
+    columns = list(EXPORT_COLUMNS)
+    if fmt == 'npz':
+        info = index.count_rows(filters, min_value, max_value)
+        kinds = dict((c, 'f8' if c in ('temp', 'value') else 'i8' if c == 'row_index' else 'U')
+                     for c in columns)
+        dtype = npz_dtype(columns, kinds, info['widths'])
+
+    batches = index.iter_rows(filters, min_value, max_value, chunk_size=chunk_rows)
+
+    if fmt == 'csv':
+        chunks = csv_chunks(columns, batches)
+    elif fmt == 'ndjson':
+        chunks = ndjson_chunks(columns, batches)
+    else:
+        chunks = npz_chunks(dtype, info['rows'], batches)
+
+    for chunk in chunks:
+        yield chunk
@@ -121,6 +121,84 @@ def parse_creport(creport_path):
         return None
 
 
+def stream_creport(lines):
+    """
+    Stream the rows of a creport without building the parsed dict.
+    
+    Rows are converted as in parse_creport(): float where possible, text
+    otherwise; incomplete rows are skipped and a repeated header keeps its
+    last value.
+    
+    Args:
+        lines: Iterable of creport.txt lines (e.g. an open file)
+    
+    Returns:
+        tuple: (metadata dict, column names, iterator of row lists in column
+            order), or None if there is no header line
+    """
+    lines = iter(lines)
+    metadata = {}
+    header_line = None
+    
+    for line in lines:
+        line = line.strip()
+        if line.startswith('process'):
+            header_line = line
+            break
+        if ':' in line:
+            key, value = line.split(':', 1)
+            metadata[key.strip()] = value.strip()
+    
+    if header_line is None:
+        return None
+    
+    headers = [h.strip() for h in header_line.split('\t')]
+    # Unique non-empty columns, each taken from its last occurrence
+    last = dict((h, j) for j, h in enumerate(headers) if h)
+    columns = [h for h in dict.fromkeys(headers) if h]
+    positions = [last[h] for h in columns]
+    
+    def convert(value):
+        value = value.strip()
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    
+    def rows():
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            values = line.split('\t')
+            if len(values) < len(headers):
+                continue
+            yield [convert(values[j]) for j in positions]
+    
+    return metadata, columns, rows()
+
+
+def load_creport(creport_path):
+    """
+    Load parsed results, preferring the columnar sidecar (creport.npz).
+    
+    Falls back to parse_creport() when there is no sidecar, it is out of
+    date, or NumPy is not installed.
+    
+    Args:
+        creport_path (str): Path to creport.txt
+        
+    Returns:
+        dict: Same structure as parse_creport(), or None
+    """
+    from results_sidecar import load_sidecar
+    
+    parsed = load_sidecar(creport_path)
+    if parsed is not None:
+        return parsed
+    return parse_creport(creport_path)
+
+
 def analyze_results(parsed_data, spec_limits=None):
     """
     Analyze parsed results and classify pass/fail.
@@ -142,6 +220,11 @@ def analyze_results(parsed_data, spec_limits=None):
     if spec_limits is None:
         spec_limits = get_default_spec_limits()
     
+    # Vectorised evaluation (spec_evaluator.py) when NumPy is available
+    from spec_evaluator import np, analyze_rows
+    if np is not None:
+        return analyze_rows(parsed_data, spec_limits)
+    
     analysis = {
         'total_corners': parsed_data['total_corners'],
         'pass_count': 0,
@@ -191,6 +274,91 @@ def analyze_results(parsed_data, spec_limits=None):
     return analysis
 
 
+# Columns /api/results can filter rows on (besides pass/fail status)
+QUERY_FILTER_COLUMNS = ['process', 'extract', 'temp', 'v1', 'v2', 'v3']
+
+
+def _cell_value(text):
+    """Convert a query value the way parse_creport converts a cell."""
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def _sort_key(value):
+    """Sort numbers before text; missing cells last."""
+    if isinstance(value, (int, float)):
+        return (0, value, '')
+    if value is None or value == '':
+        return (2, 0, '')
+    return (1, 0, str(value))
+
+
+def query_results(headers, rows, filters=None, status=None, columns=None, sort=None,
+                  offset=0, limit=None):
+    """
+    Filter, sort, project and paginate analysed result rows.
+    
+    Args:
+        headers (list): creport headers (parse_creport()['headers'])
+        rows (list): analyze_results()['rows_with_status'] (or parsed rows)
+        filters (dict): Column -> list of accepted values (QUERY_FILTER_COLUMNS),
+            as text; numeric values match numerically ('-40' == -40.0)
+        status (str): 'pass' or 'fail'
+        columns (list): Headers to return; None keeps every header. Empty
+            (trailing-tab) headers are dropped from a projection.
+        sort (str): Header to sort on, '-' prefix for descending
+        offset (int): Rows to skip
+        limit (int): Max rows returned; None for all
+    
+    Returns:
+        dict: headers (returned columns), rows (selected row dicts, shared
+            with the input), total (rows matching the filters)
+    
+    Raises:
+        ValueError: For unknown columns, statuses or negative offset/limit
+    """
+    known = set(h for h in headers if h)
+    filters = filters or {}
+    
+    for column in filters:
+        if column not in QUERY_FILTER_COLUMNS:
+            raise ValueError("Cannot filter on column: {0}".format(column))
+    if status not in (None, 'pass', 'fail'):
+        raise ValueError("Unknown status: {0}".format(status))
+    if columns is not None:
+        for column in columns:
+            if column not in known:
+                raise ValueError("Unknown column: {0}".format(column))
+    descending = bool(sort) and sort.startswith('-')
+    sort_column = sort[1:] if descending else sort
+    if sort_column and sort_column not in known:
+        raise ValueError("Unknown sort column: {0}".format(sort_column))
+    if offset < 0 or (limit is not None and limit < 0):
+        raise ValueError("offset and limit must not be negative")
+    
+    accepted = dict((column, set(_cell_value(v) for v in values))
+                    for column, values in filters.items() if values)
+    selected = [row for row in rows
+                if (status is None or row.get('_status') == status)
+                and all(row.get(column) in values for column, values in accepted.items())]
+    
+    if sort_column:
+        # Missing cells stay last in both directions
+        present = [row for row in selected if row.get(sort_column) not in (None, '')]
+        missing = [row for row in selected if row.get(sort_column) in (None, '')]
+        present.sort(key=lambda row: _sort_key(row.get(sort_column)), reverse=descending)
+        selected = present + missing
+    
+    end = None if limit is None else offset + limit
+    return {
+        'headers': list(headers) if columns is None else list(columns),
+        'rows': selected[offset:end],
+        'total': len(selected)
+    }
+
+
 def get_default_spec_limits():
     """
     Get default specification limits for WKP characterization.
@@ -293,7 +461,7 @@ if __name__ == '__main__':
     creport_file = sys.argv[1]
     
     print("Parsing {0}...".format(creport_file))
-    results = parse_creport(creport_file)
+    results = load_creport(creport_file)
     
     if results:
         print("\nMetadata:")
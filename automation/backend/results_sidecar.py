@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Results Sidecar - columnar binary copy of creport.txt (creport.npz)
+
+Every results consumer re-tokenises the tab-padded creport.txt and tries
+float() on every cell. After the srt stage the pipeline also writes
+report/creport.npz next to it:
+
+- measurement columns whose cells are all numeric: one float64 matrix
+- every other column (process/extract/temp/v1/v2/v3, or measurements with
+  'error' cells): one int32 code matrix + per-column category tables
+- the supply-condition metadata block and the header list
+
+load_columns() returns the arrays as they are (no parsing at all);
+load_sidecar() rebuilds exactly what results_parser.parse_creport() returns
+with one float() per category instead of one per cell. The archive is
+stored uncompressed; NumPy cannot memory-map members of an .npz, so the two
+matrices are read into memory (a sweep is a few MB at most).
+
+The sidecar records the size, mtime and SHA-256 of the creport it was built
+from. A sidecar that no longer matches its creport is ignored, and readers
+fall back to the text file. NumPy is optional: without it no sidecar is
+written and everything reads creport.txt.
+"""
+
+import os
+import hashlib
+from typing import Dict, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SIDECAR_NAME = 'creport.npz'
+SIDECAR_VERSION = 1
+
+
+def sidecar_path(creport_path: str) -> str:
+    """Sidecar path for a creport: report/creport.txt -> report/creport.npz."""
+    return os.path.join(os.path.dirname(creport_path), SIDECAR_NAME)
+
+
+def _sha256(path: str) -> str:
+    """SHA-256 of a file's contents."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _to_text(value) -> str:
+    """Category text that converts back to the parsed value (float or string)."""
+    return repr(value) if isinstance(value, float) else value
+
+
+def _from_text(text: str):
+    """Parsed value of a category, as parse_creport converts a cell."""
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def columns_from_parsed(parsed: Dict) -> Dict:
+    """
+    Split parse_creport() output into columns, as load_columns() returns them.
+
+    Measurement columns whose cells are all numeric become float64 arrays;
+    every other column becomes int32 codes plus its parsed category values.
+
+    Args:
+        parsed: Result of results_parser.parse_creport()
+
+    Returns:
+        Same structure as load_columns()
+    """
+    rows = parsed['rows']
+    floats = {}
+    categorical = {}
+    for column in dict.fromkeys(parsed['headers']):  # unique, header order
+        values = [row[column] for row in rows]
+        if all(isinstance(v, float) for v in values):
+            floats[column] = np.array(values, dtype=np.float64)
+        else:
+            categories = {}
+            codes = [categories.setdefault(_to_text(v), len(categories)) for v in values]
+            categorical[column] = (np.array(codes, dtype=np.int32), [_from_text(t) for t in categories])
+
+    return {
+        'metadata': parsed['metadata'],
+        'headers': parsed['headers'],
+        'rows': len(rows),
+        'floats': floats,
+        'categorical': categorical
+    }
+
+
+def write_sidecar(creport_path: str) -> Optional[str]:
+    """
+    Write creport.npz for a creport.txt.
+
+    Args:
+        creport_path: Path to creport.txt
+
+    Returns:
+        Sidecar path, or None if NumPy is unavailable or the creport cannot be parsed
+    """
+    if np is None:
+        return None
+
+    from results_parser import parse_creport
+
+    st = os.stat(creport_path)
+    parsed = parse_creport(creport_path)
+    if parsed is None:
+        return None
+
+    columns = columns_from_parsed(parsed)
+    float_columns = list(columns['floats'])
+    code_columns = list(columns['categorical'])
+    category_lists = [categories for _, categories in columns['categorical'].values()]
+    n_rows = columns['rows']
+
+    arrays = {
+        'version': np.array(SIDECAR_VERSION),
+        'source_size': np.array(st.st_size, dtype=np.int64),
+        'source_mtime_ns': np.array(st.st_mtime_ns, dtype=np.int64),
+        'source_sha256': np.array(_sha256(creport_path)),
+        'metadata_keys': np.array(list(parsed['metadata'].keys()), dtype=str),
+        'metadata_values': np.array(list(parsed['metadata'].values()), dtype=str),
+        'headers': np.array(parsed['headers'], dtype=str),
+    }
+
+    arrays['float_columns'] = np.array(float_columns, dtype=str)
+    arrays['floats'] = np.array([columns['floats'][c] for c in float_columns],
+                                dtype=np.float64).reshape(len(float_columns), n_rows)
+    arrays['code_columns'] = np.array(code_columns, dtype=str)
+    arrays['codes'] = np.array([columns['categorical'][c][0] for c in code_columns],
+                               dtype=np.int32).reshape(len(code_columns), n_rows)
+    arrays['categories'] = np.array([_to_text(v) for cats in category_lists for v in cats], dtype=str)
+    arrays['category_counts'] = np.array([len(cats) for cats in category_lists], dtype=np.int64)
+
+    path = sidecar_path(creport_path)
+    tmp_path = path + '.tmp.npz'
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _matches(data, creport_path: str) -> bool:
+    """True if the sidecar was built from the current creport."""
+    try:
+        st = os.stat(creport_path)
+    except OSError:
+        return False
+
+    if int(data['version']) != SIDECAR_VERSION or int(data['source_size']) != st.st_size:
+        return False
+    if int(data['source_mtime_ns']) == st.st_mtime_ns:
+        return True
+    # Moved or hard-linked (bkp, backup store) without keeping the mtime
+    return str(data['source_sha256']) == _sha256(creport_path)
+
+
+def load_columns(creport_path: str) -> Optional[Dict]:
+    """
+    Load the sidecar of a creport as columns, without building rows.
+
+    Args:
+        creport_path: Path to creport.txt
+
+    Returns:
+        Dict with keys: metadata, headers, rows (count), floats
+        (column -> float64 array) and categorical (column -> (int32 code
+        array, list of parsed category values)); None if there is no valid
+        sidecar
+    """
+    path = sidecar_path(creport_path)
+    if np is None or not os.path.isfile(path):
+        return None
+
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            if not _matches(data, creport_path):
+                return None
+
+            floats = data['floats']
+            codes = data['codes']
+            categories = [_from_text(t) for t in data['categories'].tolist()]
+
+            categorical = {}
+            start = 0
+            for i, (column, count) in enumerate(zip(data['code_columns'].tolist(),
+                                                    data['category_counts'].tolist())):
+                categorical[column] = (codes[i], categories[start:start + count])
+                start += count
+
+            return {
+                'metadata': dict(zip(data['metadata_keys'].tolist(), data['metadata_values'].tolist())),
+                'headers': data['headers'].tolist(),
+                'rows': floats.shape[1] if floats.shape[0] else codes.shape[1],
+                'floats': dict(zip(data['float_columns'].tolist(), floats)),
+                'categorical': categorical
+            }
+    except Exception as e:
+        print("⚠️  Ignoring unreadable sidecar {0}: {1}".format(path, e))
+        return None
+
+
+def load_sidecar(creport_path: str) -> Optional[Dict]:
+    """
+    Load parsed results from the sidecar of a creport.
+
+    Args:
+        creport_path: Path to creport.txt
+
+    Returns:
+        Same structure as results_parser.parse_creport(), or None if there is
+        no valid sidecar (caller falls back to the text file)
+    """
+    data = load_columns(creport_path)
+    if data is None:
+        return None
+
+    values = dict((column, array.tolist()) for column, array in data['floats'].items())
+    for column, (codes, categories) in data['categorical'].items():
+        values[column] = [categories[code] for code in codes.tolist()]
+
+    # Duplicate header names keep one value, as in parse_creport
+    columns = list(dict.fromkeys(data['headers']))
+    rows = [dict(zip(columns, cells)) for cells in zip(*(values[c] for c in columns))]
+
+    return {
+        'metadata': data['metadata'],
+        'headers': data['headers'],
+        'rows': rows,
+        'total_corners': len(rows)
+    }
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Results Store - per-PVT-point extraction results
+
+Records every PVT point extracted while a sweep is still running, so the
+final ext stage only has to extract the stragglers and the results API can
+serve a partial creport before all jobs have finished.
+
+Extracted report files live in <work_dir>/report/ as usual; the point_results
+table tracks which points have been extracted (or failed) for each simulation.
+"""
+
+import sqlite3
+from typing import Dict, List, Set
+
+
+POINT_RESULTS_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS point_results (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        sim_id TEXT NOT NULL,
+        point_name TEXT NOT NULL,
+        directory_path TEXT NOT NULL,
+        report_path TEXT,
+        status TEXT NOT NULL,
+        rows INTEGER DEFAULT 0,
+        error TEXT,
+        extracted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(sim_id, point_name),
+        FOREIGN KEY(sim_id) REFERENCES simulations(sim_id) ON DELETE CASCADE
+    )
+'''
+
+
+def init_results_table(conn):
+    """
+    Create point_results table and indices if they do not exist.
+
+    Args:
+        conn: Open sqlite3 connection (caller commits)
+    """
+    c = conn.cursor()
+    c.execute(POINT_RESULTS_SCHEMA)
+    c.execute('CREATE INDEX IF NOT EXISTS idx_point_results_sim ON point_results(sim_id)')
+
+
+class ResultsStore(object):
+    """
+    Per-point extraction results for running and finished simulations.
+
+    Usage:
+        store = ResultsStore(db_path)
+        store.record_points(sim_id, results)      # from extraction_engine.extract_jobs()
+        done = store.get_recorded_paths(sim_id)   # skip these on the next poll
+    """
+
+    def __init__(self, db_path):
+        """
+        Initialize results store.
+
+        Args:
+            db_path (str): Path to SQLite database
+        """
+        self.db_path = db_path
+
+    def record_points(self, sim_id: str, results: List[Dict]) -> int:
+        """
+        Record extraction results for PVT points.
+
+        Args:
+            sim_id: Simulation ID
+            results: Point results with keys name, directory, report, success, rows, error
+
+        Returns:
+            Number of successfully extracted points recorded
+        """
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+
+        extracted = 0
+        for result in results:
+            status = 'extracted' if result['success'] else 'failed'
+            c.execute('''
+                INSERT OR REPLACE INTO point_results
+                (sim_id, point_name, directory_path, report_path, status, rows, error)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (sim_id, result['name'], result['directory'], result.get('report'),
+                  status, result.get('rows', 0), result.get('error')))
+            if result['success']:
+                extracted += 1
+
+        conn.commit()
+        conn.close()
+        return extracted
+
+    def get_recorded_paths(self, sim_id: str) -> Set[str]:
+        """
+        Get directory paths of points already recorded (extracted or failed).
+
+        Args:
+            sim_id: Simulation ID
+
+        Returns:
+            Set of directory paths
+        """
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute('SELECT directory_path FROM point_results WHERE sim_id = ?', (sim_id,))
+        paths = set(row[0] for row in c.fetchall())
+        conn.close()
+        return paths
+
+    def get_points(self, sim_id: str) -> List[Dict]:
+        """
+        Get all recorded points for a simulation, oldest first.
+
+        Args:
+            sim_id: Simulation ID
+
+        Returns:
+            List of point dicts (point_name, directory_path, report_path, status, rows, error, extracted_at)
+        """
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        c = conn.cursor()
+        c.execute('''
+            SELECT point_name, directory_path, report_path, status, rows, error, extracted_at
+            FROM point_results
+            WHERE sim_id = ?
+            ORDER BY id
+        ''', (sim_id,))
+        points = [dict(row) for row in c.fetchall()]
+        conn.close()
+        return points
+
+    def get_summary(self, sim_id: str) -> Dict:
+        """
+        Count recorded points by status.
+
+        Args:
+            sim_id: Simulation ID
+
+        Returns:
+            Dict with keys: extracted, failed, rows
+        """
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute('''
+            SELECT status, COUNT(*), COALESCE(SUM(rows), 0)
+            FROM point_results
+            WHERE sim_id = ?
+            GROUP BY status
+        ''', (sim_id,))
+
+        summary = {'extracted': 0, 'failed': 0, 'rows': 0}
+        for status, count, rows in c.fetchall():
+            summary[status] = count
+            summary['rows'] += rows
+        conn.close()
+        return summary
@@ -388,6 +388,71 @@ def update_config_file(work_dir: str, corners: List[str], temperatures: List[str
     return True
 
 
+def run_preflight_stage(work_dir: str, project: str = 'gpio', voltage_domain: str = '1p1v') -> Dict:
+    """
+    Check the template's .inc/.lib files and model sections before generation
+
+    Args:
+        work_dir: Working directory path containing config.cfg and template/
+        project: Project name ('gpio' or 'i3c')
+        voltage_domain: Voltage domain (e.g., '1p1v')
+
+    Returns:
+        preflight.validate_testbench() result (ok, errors, warnings, files, elapsed_ms)
+    """
+    from preflight import validate_work_dir
+
+    executor = PaiHoExecutor(
+        project_root=str(REPO_ROOT),
+        project=project,
+        voltage_domain=voltage_domain
+    )
+
+    try:
+        result = validate_work_dir(work_dir, str(executor.script_path))
+    except ValueError as e:
+        result = {'ok': False, 'errors': [str(e)], 'warnings': [], 'files': 0, 'elapsed_ms': 0.0}
+
+    for warning in result['warnings']:
+        logger.warning(f"  ⚠️ Pre-flight: {warning}")
+    if result['ok']:
+        logger.info(f"  ✓ Pre-flight passed ({result['files']} files, {result['elapsed_ms']} ms)")
+    else:
+        logger.error(f"  ❌ Pre-flight failed: {result['errors'][0]}"
+                     + (f" (+{len(result['errors']) - 1} more)" if len(result['errors']) > 1 else ''))
+    return result
+
+
+def run_dense_sweep_setup(work_dir: str, spec: Dict, project: str = 'gpio', voltage_domain: str = '1p1v') -> Dict:
+    """
+    Set a work_dir up for a dense .alter sweep (before generation)
+
+    Args:
+        work_dir: Working directory path containing config.cfg and template/
+        spec: Dense sweep request ({'parameter': 'vcn'|'temp', 'steps': N, 'values': [...]})
+        project: Project name ('gpio' or 'i3c')
+        voltage_domain: Voltage domain (e.g., '1p1v')
+
+    Returns:
+        alter_sweep.prepare_dense_sweep() result (parameter, values, jobs, points)
+
+    Raises:
+        ValueError: If the sweep cannot run in this work_dir
+    """
+    from alter_sweep import prepare_dense_sweep
+
+    executor = PaiHoExecutor(
+        project_root=str(REPO_ROOT),
+        project=project,
+        voltage_domain=voltage_domain
+    )
+
+    summary = prepare_dense_sweep(work_dir, str(executor.script_path), spec)
+    logger.info(f"  🎚️ Dense {summary['parameter']} sweep: {len(summary['values'])} steps "
+                f"in {summary['jobs']} jobs (instead of {summary['points']} points)")
+    return summary
+
+
 def run_generation_stage(work_dir: str, project: str = 'gpio', voltage_domain: str = '1p1v') -> bool:
     """
     Run generation stage using PaiHoExecutor wrapper
@@ -416,6 +481,8 @@ def run_generation_stage(work_dir: str, project: str = 'gpio', voltage_domain: s
         
         if result['success']:
             logger.info("  ✓ Generation completed successfully")
+            from alter_sweep import apply_dense_sweep
+            apply_dense_sweep(work_dir, str(executor.script_path))
             return True
         else:
             logger.error(f"  ❌ Generation failed: {result['stderr'][:200]}")
@@ -426,21 +493,29 @@ def run_generation_stage(work_dir: str, project: str = 'gpio', voltage_domain: s
         return False
 
 
-def run_submission_stage(work_dir: str, project: str = 'gpio', voltage_domain: str = '1p1v') -> Optional[str]:
+def run_submission_stage(work_dir: str, project: str = 'gpio', voltage_domain: str = '1p1v',
+                         order: Optional[str] = None, part: str = 'all') -> Optional[str]:
     """
-    Run submission stage using PaiHoExecutor wrapper
-    Calls Pai Ho's ver03/sim_pvt.sh script with 'run' stage
-    
+    Run submission stage
+
+    Uses the Python submission engine when config.SUBMISSION_ENGINE ==
+    'python' (submission order policy, job_map.csv), otherwise calls Pai Ho's
+    ver03/sim_pvt.sh script with 'run' stage via PaiHoExecutor. Post-layout
+    sweeps always go through the shell stage.
+
     Args:
         work_dir: Working directory path
         project: Project name ('gpio' or 'i3c')
         voltage_domain: Voltage domain (e.g., '1p1v')
-        
+        order: Submission order ('plan' or 'risk'; default config.SUBMISSION_ORDER)
+        part: 'all', 'canary' or 'rest' (canary runs, Python engine only;
+            see submission_engine.run_submission)
+
     Returns:
         Path to job_log.txt if successful, None otherwise
     """
-    logger.info("🚀 Running submission stage (via PaiHoExecutor)...")
-    
+    from config import SUBMISSION_ENGINE, SUBMISSION_ORDER, DB_PATH
+
     try:
         # Initialize PaiHoExecutor
         executor = PaiHoExecutor(
@@ -448,7 +523,38 @@ def run_submission_stage(work_dir: str, project: str = 'gpio', voltage_domain: s
             project=project,
             voltage_domain=voltage_domain
         )
-        
+
+        if SUBMISSION_ENGINE == 'python':
+            from submission_engine import run_submission, prior_margins
+            from results_parser import load_custom_spec_limits, get_default_spec_limits
+
+            order = order or SUBMISSION_ORDER
+            margins = None
+            if order == 'risk':
+                spec_limits = load_custom_spec_limits() or get_default_spec_limits()
+                margins = prior_margins(DB_PATH, project, voltage_domain, spec_limits)
+
+            try:
+                logger.info(f"🚀 Running submission stage (Python engine, order: {order})...")
+                summary = run_submission(work_dir, str(executor.script_path), order=order,
+                                         margins=margins, part=part)
+            except ValueError as e:
+                if part == 'rest':
+                    logger.error(f"  ❌ {e}")
+                    return None
+                logger.info(f"  {e} - using the shell run stage")
+            else:
+                if not summary['jobs']:
+                    logger.error("  ❌ Submission failed: no job was accepted by NetBatch")
+                    return None
+                if summary['failed']:
+                    logger.warning(f"  ⚠️ {len(summary['failed'])}/{summary['total']} points not submitted: "
+                                   f"{', '.join(summary['failed'][:5])}")
+                logger.info(f"  ✓ Submission completed ({len(summary['jobs'])} jobs)")
+                return summary['job_log']
+
+        logger.info("🚀 Running submission stage (via PaiHoExecutor)...")
+
         # Run submission stage: bash ver03/sim_pvt.sh config.cfg run
         result = executor.run_submission(work_dir=work_dir, config_file='config.cfg')
         
@@ -472,19 +578,22 @@ def run_submission_stage(work_dir: str, project: str = 'gpio', voltage_domain: s
 
 def run_extraction_stage(work_dir: str, project: str = 'gpio', voltage_domain: str = '1p1v') -> bool:
     """
-    Run extraction stage using PaiHoExecutor wrapper
-    Calls Pai Ho's ver03/sim_pvt.sh script with 'ext' stage
-    
+    Run extraction stage
+
+    Uses the Python extraction engine (process pool) when
+    config.EXTRACTION_ENGINE == 'python', otherwise calls Pai Ho's
+    ver03/sim_pvt.sh script with 'ext' stage via PaiHoExecutor.
+
     Args:
         work_dir: Working directory path
         project: Project name ('gpio' or 'i3c')
         voltage_domain: Voltage domain (e.g., '1p1v')
-        
+
     Returns:
         True if successful
     """
-    logger.info("📊 Running extraction stage (via PaiHoExecutor)...")
-    
+    from config import EXTRACTION_ENGINE
+
     try:
         # Initialize PaiHoExecutor
         executor = PaiHoExecutor(
@@ -492,7 +601,24 @@ def run_extraction_stage(work_dir: str, project: str = 'gpio', voltage_domain: s
             project=project,
             voltage_domain=voltage_domain
         )
-        
+
+        if EXTRACTION_ENGINE == 'python':
+            from extraction_engine import run_extraction
+
+            logger.info("📊 Running extraction stage (Python engine)...")
+            # Points extracted per job while the sweep was running are kept
+            summary = run_extraction(work_dir, str(executor.script_path), skip_existing=True)
+
+            if summary['success']:
+                logger.info(f"  ✓ Extraction completed ({summary['extracted']} extracted, "
+                            f"{summary['skipped']} already extracted, {summary['total']} points)")
+                return True
+            else:
+                logger.error(f"  ❌ Extraction failed: no PVT point could be extracted")
+                return False
+
+        logger.info("📊 Running extraction stage (via PaiHoExecutor)...")
+
         # Run extraction stage: bash ver03/sim_pvt.sh config.cfg ext
         result = executor.run_extraction(work_dir=work_dir, config_file='config.cfg')
         
@@ -509,21 +635,52 @@ def run_extraction_stage(work_dir: str, project: str = 'gpio', voltage_domain: s
         return False
 
 
+def run_incremental_extraction(work_dir: str, directory_paths: List[str], project: str = 'gpio',
+                               voltage_domain: str = '1p1v') -> List[Dict]:
+    """
+    Extract individual completed jobs while the rest of the sweep is running
+
+    Args:
+        work_dir: Working directory path
+        directory_paths: Output directories of the completed jobs
+        project: Project name ('gpio' or 'i3c')
+        voltage_domain: Voltage domain (e.g., '1p1v')
+
+    Returns:
+        List of per-point results from extraction_engine.extract_jobs()
+    """
+    from extraction_engine import extract_jobs
+
+    executor = PaiHoExecutor(
+        project_root=str(REPO_ROOT),
+        project=project,
+        voltage_domain=voltage_domain
+    )
+
+    results = extract_jobs(work_dir, str(executor.script_path), directory_paths)
+    extracted = sum(1 for r in results if r['success'])
+    logger.info(f"  ✓ Incremental extraction: {extracted}/{len(results)} jobs")
+    return results
+
+
 def run_sorting_stage(work_dir: str, project: str = 'gpio', voltage_domain: str = '1p1v') -> bool:
     """
-    Run sorting stage using PaiHoExecutor wrapper
-    Calls Pai Ho's ver03/sim_pvt.sh script with 'srt' stage
-    
+    Run sorting stage
+
+    Uses the Python extraction engine (single pass per report) when
+    config.EXTRACTION_ENGINE == 'python', otherwise calls Pai Ho's
+    ver03/sim_pvt.sh script with 'srt' stage via PaiHoExecutor.
+
     Args:
         work_dir: Working directory path
         project: Project name ('gpio' or 'i3c')
         voltage_domain: Voltage domain (e.g., '1p1v')
-        
+
     Returns:
         True if successful
     """
-    logger.info("📋 Running sorting stage (via PaiHoExecutor)...")
-    
+    from config import EXTRACTION_ENGINE
+
     try:
         # Initialize PaiHoExecutor
         executor = PaiHoExecutor(
@@ -531,7 +688,22 @@ def run_sorting_stage(work_dir: str, project: str = 'gpio', voltage_domain: str
             project=project,
             voltage_domain=voltage_domain
         )
-        
+
+        if EXTRACTION_ENGINE == 'python':
+            from extraction_engine import run_sorting
+
+            logger.info("📋 Running sorting stage (Python engine)...")
+            summary = run_sorting(work_dir, str(executor.script_path))
+
+            if summary['success']:
+                logger.info(f"  ✓ Sorting completed, creport at: {summary['creport']}")
+                return True
+            else:
+                logger.error(f"  ❌ Sorting failed: no report files found")
+                return False
+
+        logger.info("📋 Running sorting stage (via PaiHoExecutor)...")
+
         # Run sorting stage: bash ver03/sim_pvt.sh config.cfg srt
         result = executor.run_sorting(work_dir=work_dir, config_file='config.cfg')
         
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Spec Evaluator - vectorised spec-limit checks on result columns
+
+results_parser.analyze_results() used to walk every row, check every limit
+with isinstance() and format each failure string as it went. Here every
+limited measurement becomes a float64 column in which non-numeric cells
+(PrimeSim 'error', missing columns) are NaN and therefore masked: they never
+pass or fail a limit, as before. Each min/max limit is one array comparison.
+Failure messages are only formatted for failing rows, when asked for.
+
+Inputs are either parse_creport() rows (columns_from_rows) or the columns
+of a creport.npz sidecar (columns_from_sidecar), so a whole
+results history can be re-evaluated without parsing text.
+
+summarize_measurements() answers the usual question about a creport - min,
+max and mean of every measurement, the PVT point where each extreme occurs
+and the margin to its spec limits - on the same columns, optionally per
+process or temperature (/api/results/<sim_id>/summary).
+"""
+
+from typing import Dict, List, Optional
+
+from measurement_index import KEY_COLUMNS
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def columns_from_rows(rows: List[Dict], params) -> Dict:
+    """
+    Build float64 columns for the limited measurements.
+
+    Args:
+        rows: Row dicts from parse_creport()
+        params: Measurement names to extract
+
+    Returns:
+        Dict param -> float64 array (NaN where the cell is missing or not numeric)
+    """
+    columns = {}
+    for param in params:
+        columns[param] = np.array(
+            [v if isinstance(v, (int, float)) else np.nan for v in (row.get(param) for row in rows)],
+            dtype=np.float64)
+    return columns
+
+
+def columns_from_sidecar(columns_data: Dict, params) -> Dict:
+    """
+    Float64 columns for the limited measurements from results_sidecar.load_columns().
+
+    Categorical columns (measurements with 'error' cells) are decoded through
+    their category table, with NaN for the non-numeric categories.
+
+    Returns:
+        Dict param -> float64 array
+    """
+    columns = {}
+    for param in params:
+        if param in columns_data['floats']:
+            columns[param] = columns_data['floats'][param]
+        elif param in columns_data['categorical']:
+            codes, categories = columns_data['categorical'][param]
+            table = np.array([c if isinstance(c, float) else np.nan for c in categories], dtype=np.float64)
+            columns[param] = table[codes]
+    return columns
+
+
+def evaluate_limits(columns: Dict, spec_limits: Dict, n_rows: int) -> Dict:
+    """
+    Compute violation masks for every limit.
+
+    Args:
+        columns: Dict param -> float64 array (columns_from_rows / columns_from_sidecar)
+        spec_limits: Dict param -> {'min': x, 'max': y}
+        n_rows: Number of rows (for params without a column)
+
+    Returns:
+        Dict with keys:
+            fail: bool array, True for rows violating any limit
+            violations: list of (param, 'min'|'max', limit, bool mask) in
+                spec_limits order, min before max
+    """
+    fail = np.zeros(n_rows, dtype=bool)
+    violations = []
+
+    for param, limits in spec_limits.items():
+        values = columns.get(param)
+        if values is None:
+            continue
+        valid = ~np.isnan(values)
+        if 'min' in limits:
+            mask = valid & (values < limits['min'])
+            violations.append((param, 'min', limits['min'], mask))
+            fail |= mask
+        if 'max' in limits:
+            mask = valid & (values > limits['max'])
+            violations.append((param, 'max', limits['max'], mask))
+            fail |= mask
+
+    return {'fail': fail, 'violations': violations}
+
+
+def failure_messages(columns: Dict, evaluation: Dict) -> Dict[int, List[str]]:
+    """
+    Failure messages of the failing rows, in the format analyze_results()
+    always used. Only failing cells are formatted.
+
+    Args:
+        columns: Columns passed to evaluate_limits()
+        evaluation: Result of evaluate_limits()
+
+    Returns:
+        Dict row index -> list like ["rwkpull_vih < 1200.0 (min: 1500)"]
+    """
+    messages = {}
+    for param, kind, limit, mask in evaluation['violations']:
+        rows = np.flatnonzero(mask)
+        if not rows.size:
+            continue
+        op = '<' if kind == 'min' else '>'
+        for row, value in zip(rows.tolist(), columns[param][rows].tolist()):
+            messages.setdefault(row, []).append(
+                "{0} {1} {2} ({3}: {4})".format(param, op, value, kind, limit))
+    return messages
+
+
+def analyze_rows(parsed_data: Dict, spec_limits: Dict) -> Dict:
+    """
+    Vectorised analyze_results() for parse_creport() output.
+
+    Returns:
+        Same structure as results_parser.analyze_results()
+    """
+    rows = parsed_data['rows']
+    columns = columns_from_rows(rows, spec_limits.keys())
+    evaluation = evaluate_limits(columns, spec_limits, len(rows))
+
+    fail_count = int(evaluation['fail'].sum())
+    messages = failure_messages(columns, evaluation)
+
+    rows_with_status = []
+    for i, row in enumerate(rows):
+        row_with_status = row.copy()
+        failures = messages.get(i)
+        row_with_status['_status'] = 'fail' if failures else 'pass'
+        row_with_status['_failures'] = failures
+        rows_with_status.append(row_with_status)
+
+    return {
+        'total_corners': parsed_data['total_corners'],
+        'pass_count': len(rows) - fail_count,
+        'fail_count': fail_count,
+        'warnings': [],
+        'rows_with_status': rows_with_status,
+        'spec_limits_used': spec_limits
+    }
+
+
+def summarize_columns(columns_data: Dict, spec_limits: Dict) -> Optional[Dict]:
+    """
+    Pass/fail counts straight from sidecar columns, without building rows.
+
+    Args:
+        columns_data: Result of results_sidecar.load_columns()
+        spec_limits: Spec limits
+
+    Returns:
+        Dict with keys: total, pass_count, fail_count, fail (bool array),
+        param_failures (param -> failing row count); None for an empty creport
+    """
+    n_rows = columns_data['rows']
+    if not n_rows:
+        return None
+
+    columns = columns_from_sidecar(columns_data, spec_limits.keys())
+    evaluation = evaluate_limits(columns, spec_limits, n_rows)
+    param_failures = {}
+    for param, _, _, mask in evaluation['violations']:
+        param_failures[param] = param_failures.get(param, 0) + int(mask.sum())
+
+    fail_count = int(evaluation['fail'].sum())
+    return {
+        'total': n_rows,
+        'pass_count': n_rows - fail_count,
+        'fail_count': fail_count,
+        'fail': evaluation['fail'],
+        'param_failures': param_failures
+    }
+
+
+def column_values(columns_data: Dict, column: str, rows) -> List:
+    """Parsed values of a column at the given row indices."""
+    if column in columns_data['floats']:
+        return columns_data['floats'][column][rows].tolist()
+    codes, categories = columns_data['categorical'][column]
+    return [categories[code] for code in codes[rows].tolist()]
+
+
+def _number(value) -> Optional[float]:
+    """Python float for JSON, None for NaN."""
+    return None if np.isnan(value) else float(value)
+
+
+def summarize_measurements(columns_data: Dict, spec_limits: Optional[Dict] = None,
+                           group_by: Optional[str] = None) -> List[Dict]:
+    """
+    Min/max/mean of every measurement and where the extremes occur.
+
+    Args:
+        columns_data: Columns as from results_sidecar.load_columns()
+        spec_limits: Spec limits; measurements with limits get a margin
+            ({'min': min - limit_min, 'max': limit_max - max}, negative = violated)
+        group_by: Optional PVT column (KEY_COLUMNS) to summarise per value of
+
+    Returns:
+        List of groups, each {'group': value (None when not grouped),
+        'corners': row count, 'measurements': {name: {count, errors, min, max,
+        mean, argmin, argmax[, limits, margin]}}}; argmin/argmax are PVT
+        coordinates like {'process': 'SSG', 'temp': -40.0, ...}
+
+    Raises:
+        ValueError: If group_by is not a PVT column of this creport
+    """
+    spec_limits = spec_limits or {}
+    headers = [h for h in dict.fromkeys(columns_data['headers']) if h]
+    keys = [h for h in KEY_COLUMNS if h in headers]
+    measurements = [h for h in headers if h not in KEY_COLUMNS]
+    n_rows = columns_data['rows']
+
+    if group_by is not None and group_by not in keys:
+        raise ValueError("Cannot group on column: {0}".format(group_by))
+
+    columns = columns_from_sidecar(columns_data, measurements)
+
+    if group_by is None:
+        groups = [(None, np.arange(n_rows))]
+    elif group_by in columns_data['floats']:
+        values = columns_data['floats'][group_by]
+        groups = [(float(v), np.flatnonzero(values == v)) for v in np.unique(values)]
+    else:
+        codes, categories = columns_data['categorical'][group_by]
+        groups = [(categories[code], np.flatnonzero(codes == code))
+                  for code in range(len(categories)) if (codes == code).any()]
+
+    summary = []
+    for group, rows in groups:
+        stats = {}
+        for name in measurements:
+            values = columns[name][rows]
+            valid = ~np.isnan(values)
+            count = int(valid.sum())
+            entry = {'count': count, 'errors': len(rows) - count,
+                     'min': None, 'max': None, 'mean': None, 'argmin': None, 'argmax': None}
+            if count:
+                extremes = rows[[np.nanargmin(values), np.nanargmax(values)]]
+                points = [dict((k, v) for k, v in zip(keys, cells))
+                          for cells in zip(*(column_values(columns_data, k, extremes) for k in keys))]
+                entry.update({
+                    'min': _number(np.nanmin(values)),
+                    'max': _number(np.nanmax(values)),
+                    'mean': _number(np.nanmean(values)),
+                    'argmin': points[0],
+                    'argmax': points[1]
+                })
+            limits = spec_limits.get(name)
+            if limits:
+                entry['limits'] = limits
+                entry['margin'] = {}
+                if 'min' in limits:
+                    entry['margin']['min'] = None if entry['min'] is None else entry['min'] - limits['min']
+                if 'max' in limits:
+                    entry['margin']['max'] = None if entry['max'] is None else limits['max'] - entry['max']
+            stats[name] = entry
+        summary.append({'group': group, 'corners': len(rows), 'measurements': stats})
+
+    return summary
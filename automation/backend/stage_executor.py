@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Stage Executor - shared worker pools for the gen/run/ext/srt/bkp stages
+(plus 'pre', pre-flight include validation, 'arc', background waveform
+archival, 'idx', measurement indexing, 'exp', chunk encoding of streamed
+exports, and 'cxl', NetBatch removal of cancelled simulations)
+
+Every stage of every simulation (SubmitHandler, ExtractHandler and the
+BackgroundMonitor auto-extraction) goes through one process-wide executor with
+a bounded worker pool per stage. When many sweeps finish together their
+extraction stages queue up instead of all hitting NFS at the same time.
+
+Queue depth, wait times and active tasks are exposed via /api/executor/stats.
+Queued tasks of a cancelled simulation give their place up (cancel_queued()).
+"""
+
+import threading
+import time
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+
+class StageExecutor(object):
+    """
+    Per-stage bounded worker pools with queue/wait statistics.
+
+    Usage:
+        executor = get_stage_executor()
+
+        # Non-blocking (Tornado coroutines can `yield` the returned future)
+        future = executor.submit('gen', run_generation_stage, work_dir, label=sim_id)
+
+        # Blocking (background threads)
+        ok = executor.run('ext', run_extraction_stage, work_dir, label=sim_id)
+
+        # Drop a simulation's tasks that have not started yet
+        executor.cancel_queued(sim_id)
+    """
+
+    STAGES = ['pre', 'gen', 'run', 'ext', 'srt', 'bkp', 'arc', 'idx', 'exp', 'cxl']
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None):
+        """
+        Initialize executor.
+
+        Args:
+            limits: Max concurrent tasks per stage (default: config.STAGE_CONCURRENCY)
+        """
+        if limits is None:
+            from config import STAGE_CONCURRENCY
+            limits = STAGE_CONCURRENCY
+
+        self.limits = dict((stage, max(1, int(limits.get(stage, 1)))) for stage in self.STAGES)
+        self._pools = dict(
+            (stage, ThreadPoolExecutor(max_workers=self.limits[stage],
+                                       thread_name_prefix="stage-{0}".format(stage)))
+            for stage in self.STAGES
+        )
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._tasks = dict((stage, {}) for stage in self.STAGES)  # task_id -> task info
+        self._totals = dict(
+            (stage, {'completed': 0, 'failed': 0, 'cancelled': 0, 'total_wait': 0.0,
+                     'max_wait': 0.0, 'total_run': 0.0})
+            for stage in self.STAGES
+        )
+
+    def submit(self, stage: str, fn: Callable, *args, **kwargs):
+        """
+        Queue a stage function.
+
+        Args:
+            stage: One of STAGES
+            fn: Function to run
+            *args, **kwargs: Passed to fn; `label` (e.g. sim_id) is used for stats and cancel_queued()
+
+        Returns:
+            concurrent.futures.Future with fn's return value
+        """
+        if stage not in self._pools:
+            raise ValueError("Unknown stage: {0}".format(stage))
+
+        label = kwargs.pop('label', None) or getattr(fn, '__name__', 'task')
+        task_id = next(self._ids)
+
+        with self._lock:
+            self._tasks[stage][task_id] = {
+                'task_id': task_id,
+                'label': label,
+                'queued_at': time.time(),
+                'started_at': None
+            }
+
+        future = self._pools[stage].submit(self._run_task, stage, task_id, fn, args, kwargs)
+        with self._lock:
+            task = self._tasks[stage].get(task_id)
+            if task is not None:
+                task['future'] = future
+        return future
+
+    def run(self, stage: str, fn: Callable, *args, **kwargs):
+        """Queue a stage function and block until it returns (re-raises its exception)."""
+        return self.submit(stage, fn, *args, **kwargs).result()
+
+    def cancel_queued(self, label: str, stages=None) -> int:
+        """
+        Cancel tasks that are still waiting for a worker.
+
+        Matches tasks labelled `label` or `label (...)` (e.g. "sim_id (canary)").
+        Their futures raise CancelledError; running tasks are not touched.
+
+        Args:
+            label: Task label, usually a sim_id
+            stages: Stages to look in (default: all)
+
+        Returns:
+            Number of tasks cancelled
+        """
+        cancelled = 0
+        with self._lock:
+            for stage in stages or self.STAGES:
+                for task_id, task in list(self._tasks[stage].items()):
+                    if task['started_at'] is not None or 'future' not in task:
+                        continue
+                    if task['label'] != label and not task['label'].startswith(label + " ("):
+                        continue
+                    if task['future'].cancel():
+                        del self._tasks[stage][task_id]
+                        self._totals[stage]['cancelled'] += 1
+                        cancelled += 1
+        return cancelled
+
+    def _run_task(self, stage, task_id, fn, args, kwargs):
+        """Worker wrapper: record wait/run time around fn."""
+        started = time.time()
+        with self._lock:
+            task = self._tasks[stage][task_id]
+            task['started_at'] = started
+            wait = started - task['queued_at']
+
+        failed = False
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            with self._lock:
+                del self._tasks[stage][task_id]
+                totals = self._totals[stage]
+                totals['failed' if failed else 'completed'] += 1
+                totals['total_wait'] += wait
+                totals['max_wait'] = max(totals['max_wait'], wait)
+                totals['total_run'] += time.time() - started
+
+    def get_stats(self) -> Dict:
+        """
+        Get queue depth, wait times and active tasks for every stage.
+
+        Returns:
+            Dict keyed by stage with limit, queued, active, completed, failed,
+            cancelled, avg_wait_s, max_wait_s, avg_run_s, active_tasks and queued_tasks
+        """
+        now = time.time()
+        stats = {}
+
+        with self._lock:
+            for stage in self.STAGES:
+                active = []
+                queued = []
+                for task in sorted(self._tasks[stage].values(), key=lambda t: t['task_id']):
+                    if task['started_at'] is None:
+                        queued.append({
+                            'task_id': task['task_id'],
+                            'label': task['label'],
+                            'waiting_s': round(now - task['queued_at'], 1)
+                        })
+                    else:
+                        active.append({
+                            'task_id': task['task_id'],
+                            'label': task['label'],
+                            'waited_s': round(task['started_at'] - task['queued_at'], 1),
+                            'running_s': round(now - task['started_at'], 1)
+                        })
+
+                totals = self._totals[stage]
+                finished = totals['completed'] + totals['failed']
+                stats[stage] = {
+                    'limit': self.limits[stage],
+                    'queued': len(queued),
+                    'active': len(active),
+                    'completed': totals['completed'],
+                    'failed': totals['failed'],
+                    'cancelled': totals['cancelled'],
+                    'avg_wait_s': round(totals['total_wait'] / finished, 2) if finished else 0.0,
+                    'max_wait_s': round(totals['max_wait'], 2),
+                    'avg_run_s': round(totals['total_run'] / finished, 2) if finished else 0.0,
+                    'active_tasks': active,
+                    'queued_tasks': queued
+                }
+
+        return stats
+
+    def shutdown(self, wait=True):
+        """Stop all stage pools."""
+        for pool in self._pools.values():
+            pool.shutdown(wait=wait)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_stage_executor() -> StageExecutor:
+    """Get the process-wide StageExecutor (created on first use)."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = StageExecutor()
+        return _executor
@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+Stage Pipeline - persisted checkpoints for the post-simulation stage DAG
+
+The ext -> srt -> bkp chain of every simulation is modelled as a small DAG of
+stages. Each stage's state (pending / running / done / failed) and result
+(e.g. the backup directory) is checkpointed in the stage_checkpoints table, so
+after a server restart BackgroundMonitor re-queues only the stages that have
+not finished. Stages are re-runnable from their last checkpoint:
+
+- ext: the Python engine skips PVT points whose report already exists
+- srt: rebuilds creport.txt from the reports (milliseconds) and writes the
+  columnar creport.npz sidecar (results_sidecar.py)
+- bkp: if report/ was already moved into a 00bkp_* directory, that backup is
+  recovered and its remaining steps (waveforms, simulation.log, tb_bkp/,
+  corner directory removal) are finished instead of running the shell stage
+  again; the backup is then deduplicated into the content-addressed store
+  (backup_store.py)
+
+A manual /api/extract runs the stages that have not finished. Once bkp is
+done, report/ lives in 00bkp_* and the corner directories are gone, so
+/api/extract answers 409 instead of extracting an empty work_dir.
+
+gen/run stay outside the DAG: re-running them would resubmit NetBatch jobs.
+"""
+
+import os
+import json
+import shutil
+import sqlite3
+from typing import Dict, List, Optional
+
+
+# Stage -> stages it depends on
+STAGE_DEPENDENCIES = {
+    'ext': [],
+    'srt': ['ext'],
+    'bkp': ['srt'],
+}
+
+# Simulation state while a stage is running
+STAGE_STATES = {
+    'ext': 'extracting',
+    'srt': 'sorting',
+    'bkp': 'backing_up',
+}
+
+# Display names (log and error messages)
+STAGE_NAMES = {
+    'ext': 'Extraction',
+    'srt': 'Sorting',
+    'bkp': 'Backup',
+}
+
+STAGE_CHECKPOINTS_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS stage_checkpoints (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        sim_id TEXT NOT NULL,
+        stage TEXT NOT NULL,
+        status TEXT DEFAULT 'pending',
+        result TEXT,
+        error TEXT,
+        attempts INTEGER DEFAULT 0,
+        started_at TIMESTAMP,
+        finished_at TIMESTAMP,
+        UNIQUE(sim_id, stage),
+        FOREIGN KEY(sim_id) REFERENCES simulations(sim_id) ON DELETE CASCADE
+    )
+'''
+
+
+def init_checkpoint_table(conn):
+    """
+    Create stage_checkpoints table and indices if they do not exist.
+
+    Args:
+        conn: Open sqlite3 connection (caller commits)
+    """
+    c = conn.cursor()
+    c.execute(STAGE_CHECKPOINTS_SCHEMA)
+    c.execute('CREATE INDEX IF NOT EXISTS idx_stage_checkpoints_sim ON stage_checkpoints(sim_id)')
+
+
+def stage_order(dependencies: Dict[str, List[str]] = STAGE_DEPENDENCIES) -> List[str]:
+    """
+    Topological order of the stage DAG.
+
+    Raises:
+        ValueError: If the dependencies contain a cycle
+    """
+    order = []
+    remaining = dict((stage, set(deps)) for stage, deps in dependencies.items())
+
+    while remaining:
+        # Keep declaration order among stages that become ready together
+        ready = [s for s in dependencies if s in remaining and not remaining[s] - set(order)]
+        if not ready:
+            raise ValueError("Stage dependencies contain a cycle: {0}".format(sorted(remaining)))
+        for stage in ready:
+            order.append(stage)
+            del remaining[stage]
+
+    return order
+
+
+def recover_backup(work_dir: str) -> Optional[str]:
+    """
+    Find a backup directory left by an interrupted bkp stage.
+
+    bkp first moves report/ into 00bkp_<timestamp>/. Once that has happened,
+    running the shell stage again would create an empty backup, so the
+    existing one is used instead.
+
+    Args:
+        work_dir: Working directory path
+
+    Returns:
+        Path to the latest backup containing report/creport.txt, or None if
+        report/ is still in the work_dir
+    """
+    if not os.path.isdir(work_dir) or os.path.isdir(os.path.join(work_dir, 'report')):
+        return None
+
+    backups = sorted(d for d in os.listdir(work_dir) if d.startswith('00bkp_'))
+    for name in reversed(backups):
+        backup_dir = os.path.join(work_dir, name)
+        if os.path.exists(os.path.join(backup_dir, 'report', 'creport.txt')):
+            return backup_dir
+
+    return None
+
+
+def finish_backup(work_dir: str, backup_dir: str, script_path: str):
+    """
+    Finish the bkp steps that follow moving report/ into a recovered backup.
+
+    The shell stage then moves compiled_waveform/, copies the typical 85C
+    nominal simulation log to simulation.log and the typical corner's
+    testbenches to tb_bkp/, and finally removes the corner directories.
+    Steps that already happened are skipped; the corner directories still go
+    last, so the copies are taken from them first.
+
+    Args:
+        work_dir: Working directory path
+        backup_dir: Backup directory returned by recover_backup()
+        script_path: Path to ver03 scripts (PaiHoExecutor.script_path)
+
+    Raises:
+        OSError: If a step fails
+    """
+    from extraction_engine import load_stage_config, find_testbench, build_pvt_plan, get_vtrends
+
+    config = load_stage_config(work_dir, script_path)
+    testbench = find_testbench(work_dir)
+    typ_ex = config.get('typ_ex', '')
+    typ_dir = os.path.join(work_dir, config.get('typ_corner', ''), typ_ex)
+
+    waveforms = os.path.join(work_dir, 'compiled_waveform')
+    if os.path.isdir(waveforms) and not os.path.exists(os.path.join(backup_dir, 'compiled_waveform')):
+        shutil.move(waveforms, backup_dir)
+
+    log = os.path.join(typ_dir, f"{typ_ex}_85", get_vtrends(config)['nom'][0], f"{testbench}.log")
+    if testbench and os.path.isfile(log) and not os.path.exists(os.path.join(backup_dir, 'simulation.log')):
+        shutil.copy2(log, os.path.join(backup_dir, 'simulation.log'))
+
+    # rsync -a --include='*.sp' --include='*/' --exclude='*' (repeated in full: a copy may be partial)
+    if os.path.isdir(typ_dir):
+        for root, _, files in os.walk(typ_dir):
+            target = os.path.join(backup_dir, 'tb_bkp', os.path.relpath(root, typ_dir))
+            os.makedirs(target, exist_ok=True)
+            for name in files:
+                if name.endswith('.sp'):
+                    shutil.copy2(os.path.join(root, name), os.path.join(target, name))
+
+    for corner in dict.fromkeys(p['corner'] for p in build_pvt_plan(config)):
+        if corner and os.path.isdir(os.path.join(work_dir, corner)):
+            shutil.rmtree(os.path.join(work_dir, corner))
+
+
+def store_backup(work_dir: str, backup_dir: str):
+    """
+    Deduplicate a finished backup into the content-addressed backup store.
+
+    Safe to repeat for a recovered backup. Failures are logged only; the
+    00bkp_* directory itself is complete either way.
+
+    Args:
+        work_dir: Working directory path
+        backup_dir: 00bkp_<timestamp> directory created by the bkp stage
+    """
+    from config import BACKUP_STORE
+
+    if not BACKUP_STORE:
+        return
+
+    from backup_store import get_store_root, store_snapshot
+
+    try:
+        summary = store_snapshot(backup_dir, get_store_root(work_dir), os.path.basename(work_dir))
+        print("[StagePipeline] 📦 Backup stored: {0} files, {1} new ({2:.1f} of {3:.1f} MB)".format(
+            summary['files'], summary['new_objects'],
+            summary['new_bytes'] / 1e6, summary['total_bytes'] / 1e6))
+    except Exception as e:
+        print("[StagePipeline] ⚠️  Backup store failed for {0}: {1}".format(backup_dir, e))
+
+
+def write_results_sidecar(work_dir: str):
+    """
+    Write report/creport.npz after the srt stage.
+
+    Failures are logged only; readers fall back to creport.txt.
+
+    Args:
+        work_dir: Working directory path
+    """
+    from config import RESULTS_SIDECAR
+
+    if not RESULTS_SIDECAR:
+        return
+
+    from results_sidecar import write_sidecar
+
+    creport_path = os.path.join(work_dir, 'report', 'creport.txt')
+    try:
+        path = write_sidecar(creport_path)
+        if path:
+            print("[StagePipeline] 📊 Results sidecar written: {0}".format(path))
+    except Exception as e:
+        print("[StagePipeline] ⚠️  Results sidecar failed for {0}: {1}".format(creport_path, e))
+
+
+def run_pipeline_stage(stage: str, work_dir: str, project: str, voltage_domain: str):
+    """
+    Run one pipeline stage from its last checkpoint.
+
+    Args:
+        stage: 'ext', 'srt' or 'bkp'
+        work_dir: Working directory path
+        project: Project name ('gpio' or 'i3c')
+        voltage_domain: Voltage domain (e.g., '1p1v')
+
+    Returns:
+        Stage result (True for ext/srt, backup directory for bkp)
+
+    Raises:
+        Exception: If the stage failed
+    """
+    from simulation import run_extraction_stage, run_sorting_stage, run_backup_stage
+
+    if stage == 'bkp':
+        backup_dir = recover_backup(work_dir)
+        if backup_dir:
+            print("[StagePipeline] Recovered backup from interrupted bkp stage: {0}".format(backup_dir))
+            from config import REPO_ROOT
+            from paiho_executor import PaiHoExecutor
+
+            executor = PaiHoExecutor(project_root=str(REPO_ROOT), project=project, voltage_domain=voltage_domain)
+            try:
+                finish_backup(work_dir, backup_dir, str(executor.script_path))
+            except OSError as e:
+                raise Exception("{0} stage failed: could not finish {1}: {2}".format(
+                    STAGE_NAMES[stage], backup_dir, e))
+        else:
+            backup_dir = run_backup_stage(work_dir, project=project, voltage_domain=voltage_domain)
+            if not backup_dir:
+                raise Exception("{0} stage failed".format(STAGE_NAMES[stage]))
+        store_backup(work_dir, backup_dir)
+        return backup_dir
+
+    stage_functions = {
+        'ext': run_extraction_stage,
+        'srt': run_sorting_stage,
+    }
+
+    result = stage_functions[stage](work_dir, project=project, voltage_domain=voltage_domain)
+    if not result:
+        raise Exception("{0} stage failed".format(STAGE_NAMES[stage]))
+    if stage == 'srt':
+        write_results_sidecar(work_dir)
+    return result
+
+
+class StagePipeline(object):
+    """
+    Checkpointed ext -> srt -> bkp pipeline for a simulation.
+
+    Usage:
+        pipeline = StagePipeline(db_path)
+        pipeline.create(sim_id)
+        for stage in pipeline.pending_stages(sim_id):
+            pipeline.start_stage(sim_id, stage)
+            ...
+            pipeline.complete_stage(sim_id, stage, result)
+    """
+
+    STAGES = stage_order()
+
+    def __init__(self, db_path):
+        """
+        Initialize pipeline.
+
+        Args:
+            db_path (str): Path to SQLite database
+        """
+        self.db_path = db_path
+
+    def create(self, sim_id: str):
+        """Create pending checkpoints for every stage (existing ones are kept)."""
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        for stage in self.STAGES:
+            c.execute('''
+                INSERT OR IGNORE INTO stage_checkpoints (sim_id, stage, status)
+                VALUES (?, ?, 'pending')
+            ''', (sim_id, stage))
+        conn.commit()
+        conn.close()
+
+    def get_checkpoints(self, sim_id: str) -> Dict[str, Dict]:
+        """
+        Get checkpoints of a simulation.
+
+        Returns:
+            Dict stage -> {status, result, error, attempts, started_at, finished_at}
+        """
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        c = conn.cursor()
+        c.execute('''
+            SELECT stage, status, result, error, attempts, started_at, finished_at
+            FROM stage_checkpoints
+            WHERE sim_id = ?
+        ''', (sim_id,))
+        checkpoints = {}
+        for row in c.fetchall():
+            checkpoint = dict(row)
+            checkpoint['result'] = json.loads(checkpoint['result']) if checkpoint['result'] else None
+            checkpoints[checkpoint.pop('stage')] = checkpoint
+        conn.close()
+        return checkpoints
+
+    def pending_stages(self, sim_id: str) -> List[str]:
+        """Stages not yet done, in DAG order."""
+        checkpoints = self.get_checkpoints(sim_id)
+        return [s for s in self.STAGES if checkpoints.get(s, {}).get('status') != 'done']
+
+    def get_result(self, sim_id: str, stage: str):
+        """Result of a finished stage (None if not done)."""
+        checkpoint = self.get_checkpoints(sim_id).get(stage)
+        if checkpoint and checkpoint['status'] == 'done':
+            return checkpoint['result']
+        return None
+
+    def start_stage(self, sim_id: str, stage: str):
+        """
+        Mark a stage as running.
+
+        Raises:
+            ValueError: If a dependency of the stage has not finished
+        """
+        checkpoints = self.get_checkpoints(sim_id)
+        for dep in STAGE_DEPENDENCIES[stage]:
+            if checkpoints.get(dep, {}).get('status') != 'done':
+                raise ValueError("Stage '{0}' requires '{1}' to finish first".format(stage, dep))
+
+        self._update(sim_id, stage, '''
+            UPDATE stage_checkpoints
+            SET status = 'running', error = NULL, attempts = attempts + 1,
+                started_at = CURRENT_TIMESTAMP, finished_at = NULL
+            WHERE sim_id = ? AND stage = ?
+        ''')
+
+    def complete_stage(self, sim_id: str, stage: str, result=None):
+        """Checkpoint a finished stage with its (JSON-serializable) result."""
+        self._update(sim_id, stage, '''
+            UPDATE stage_checkpoints
+            SET status = 'done', result = ?, finished_at = CURRENT_TIMESTAMP
+            WHERE sim_id = ? AND stage = ?
+        ''', (json.dumps(result),))
+
+    def fail_stage(self, sim_id: str, stage: str, error: str):
+        """Mark a stage as failed."""
+        self._update(sim_id, stage, '''
+            UPDATE stage_checkpoints
+            SET status = 'failed', error = ?, finished_at = CURRENT_TIMESTAMP
+            WHERE sim_id = ? AND stage = ?
+        ''', (error,))
+
+    def reset(self, sim_id: str, stages: Optional[List[str]] = None):
+        """Set stages (default: all) back to pending so they run again."""
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        for stage in stages or self.STAGES:
+            c.execute('''
+                UPDATE stage_checkpoints
+                SET status = 'pending', result = NULL, error = NULL, finished_at = NULL
+                WHERE sim_id = ? AND stage = ?
+            ''', (sim_id, stage))
+        conn.commit()
+        conn.close()
+
+    def find_interrupted(self) -> List[str]:
+        """
+        Simulations whose pipeline was interrupted (pending or running stages).
+
+        Failed stages are not included; they need a manual /api/extract.
+
+        Returns:
+            List of sim_ids
+        """
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute('''
+            SELECT DISTINCT sim_id FROM stage_checkpoints
+            WHERE sim_id NOT IN (
+                SELECT sim_id FROM stage_checkpoints WHERE status = 'failed'
+            )
+            AND status IN ('pending', 'running')
+            ORDER BY sim_id
+        ''')
+        sim_ids = [row[0] for row in c.fetchall()]
+        conn.close()
+        return sim_ids
+
+    def _update(self, sim_id, stage, sql, params=()):
+        """Run a checkpoint UPDATE, creating the checkpoint row if needed."""
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute('''
+            INSERT OR IGNORE INTO stage_checkpoints (sim_id, stage, status)
+            VALUES (?, ?, 'pending')
+        ''', (sim_id, stage))
+        c.execute(sql, tuple(params) + (sim_id, stage))
+        conn.commit()
+        conn.close()
@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+"""
+Submission Engine - Python implementation of Pai Ho's ver03 'run' stage
+
+The shell run stage walks gen_pvt_loop_seq and calls `nbjob run` in every PVT
+directory, appending the NetBatch output to job_log.txt. Jobs therefore reach
+the farm in plain nested-loop order, and the corners most likely to violate
+spec (SSG/SSAG cold at min supply, FFG/FFAG hot at max supply) may be the
+last ones to run.
+
+run_submission() submits the same points (build_pvt_plan; only the host
+points of a dense sweep, see alter_sweep) with the same nbjob command line,
+in an order chosen by a policy:
+
+- 'plan': gen_pvt_loop_seq order, identical to the shell stage
+- 'risk': lowest prior spec margin first. The margin of a point is taken
+  from the measurement index (worst value ever recorded at that PVT point
+  across finished runs and 00bkp_* snapshots), relative to the active spec
+  limits; negative means the point has failed before. Points without history
+  rank as UNKNOWN_MARGIN, i.e. after known failures and before known passes.
+
+Since submission order no longer follows the loop, each job's directory is
+recorded in job_map.csv next to job_log.txt; create_job_directory_mapping()
+reads it instead of pairing sorted job IDs with the loop order.
+
+Canary runs split a sweep in two submissions: part='canary' submits only
+the typical-corner nominal-voltage point (canary_point()); once that job has
+finished and check_canary() finds a parseable measurement file, part='rest'
+submits everything else and appends to job_log.txt and job_map.csv. A broken
+template or include path then costs one farm slot instead of the whole sweep.
+
+Jobs that failed for a transient reason (failure_classifier.py) are sent
+again with resubmit_point(), after archive_attempt() moved the failed
+attempt's outputs aside; replace_job_id() keeps job_map.csv current.
+
+Only prelayout sweeps are handled (post-layout runs one extraction per
+invocation via run_pvt_loop_polo); other modes fall back to the shell stage.
+"""
+
+import csv
+import glob
+import os
+import shutil
+import re
+import subprocess
+import logging
+from typing import Dict, List, Optional
+
+from extraction_engine import (
+    load_stage_config, find_testbench, sweep_plan, point_directory, get_vtrends,
+    find_measurement_files, build_point_report, _extraction_settings
+)
+
+logger = logging.getLogger(__name__)
+
+# NetBatch pool and queue slot used by sim_pvt.sh
+SUBMIT_TARGET = 'altera_png_normal'
+SUBMIT_QSLOT = '/psg/km/phe/ckt/gen'
+
+JOB_LOG = 'job_log.txt'
+JOB_MAP = 'job_map.csv'
+JOB_MAP_FIELDS = ['job_id', 'directory_path', 'corner', 'temperature', 'voltage']
+
+ORDER_POLICIES = ('plan', 'risk')
+
+# Subsets of the plan run_submission() can submit
+SUBMISSION_PARTS = ('all', 'canary', 'rest')
+
+# Lines of the canary's simulator log kept when it fails
+CANARY_LOG_LINES = 40
+
+# Rank of points with no history under the 'risk' policy (0 = at the limit)
+UNKNOWN_MARGIN = 0.0
+
+# Same pattern as netbatch_monitor.capture_job_ids_from_log()
+JOB_ID_PATTERN = re.compile(r'\b(\d{10,})\b')
+
+
+def submit_command(config: Dict[str, str], testbench: str) -> List[str]:
+    """
+    nbjob command line sim_pvt.sh runs in every PVT directory.
+
+    Args:
+        config: Stage configuration from load_stage_config()
+        testbench: Testbench name (find_testbench())
+
+    Returns:
+        Command as argument list
+
+    Raises:
+        ValueError: If ncpu or nmem is not a whole number
+    """
+    cpu = str(config.get('ncpu', '')).strip()
+    mem = str(config.get('nmem', '')).strip()
+    # The shell stage refuses a non-numeric CPU/memory class before calling nbjob
+    for key, value in (('ncpu', cpu), ('nmem', mem)):
+        if not value.isdigit():
+            raise ValueError(f"{key} must be a whole number for the nbjob class, got {value!r}")
+    command = ['nbjob', 'run', '--target', SUBMIT_TARGET, '--qslot', SUBMIT_QSLOT,
+               '--class', f"SLES15&&{mem}G&&{cpu}C"]
+
+    # finesim unless primesim is configured (the shell's fallback branch is finesim too)
+    if config.get('simulator') == 'primesim':
+        return command + ['primesim', '-np', cpu, '-spice', f"{testbench}.sp", '-o', testbench]
+    return command + ['finesim', '-np', cpu, f"{testbench}.sp", '-o', testbench]
+
+
+def parse_job_id(output: str) -> Optional[int]:
+    """NetBatch job ID in nbjob run output, or None."""
+    match = JOB_ID_PATTERN.search(output or '')
+    return int(match.group(1)) if match else None
+
+
+def point_key(process, extract, temp, v1, v2=None, v3=None) -> tuple:
+    """Comparable PVT key; missing supplies ('NA', '' or None) are left out as None."""
+    def level(value):
+        return None if value in (None, '', 'NA') else str(value)
+    return (process, extract, float(temp), level(v1), level(v2), level(v3))
+
+
+def plan_point_key(point: Dict) -> tuple:
+    """point_key() of a build_pvt_plan() entry."""
+    voltage = point['voltage']
+    return point_key(point['corner'], point['extraction'], point['temp'], point['lv1'],
+                     point['lv2'] if '_v2' in voltage else None,
+                     point['lv3'] if '_v3' in voltage else None)
+
+
+def spec_margins(extremes: List[List], spec_limits: Dict) -> Dict[tuple, float]:
+    """
+    Worst normalised spec margin per PVT point.
+
+    A measurement with both limits uses (value - min) / (max - min) and
+    (max - value) / (max - min); a one-sided limit is normalised by |limit|.
+
+    Args:
+        extremes: Rows from MeasurementIndex.point_extremes()
+        spec_limits: Spec limits (param -> {'min': x, 'max': y})
+
+    Returns:
+        Dict point_key() -> lowest margin over its measurements (< 0: failed)
+    """
+    margins = {}
+    for process, extract, temp, v1, v2, v3, measurement, low, high in extremes:
+        limits = spec_limits.get(measurement) or {}
+        lo, hi = limits.get('min'), limits.get('max')
+        if lo is not None and hi is not None and hi > lo:
+            margin = min((low - lo) / (hi - lo), (hi - high) / (hi - lo))
+        elif lo is not None:
+            margin = (low - lo) / (abs(lo) or 1.0)
+        elif hi is not None:
+            margin = (hi - high) / (abs(hi) or 1.0)
+        else:
+            continue
+        key = point_key(process, extract, temp, v1, v2, v3)
+        margins[key] = min(margin, margins.get(key, margin))
+    return margins
+
+
+def prior_margins(db_path: str, project: str, voltage_domain: str, spec_limits: Dict) -> Dict[tuple, float]:
+    """
+    spec_margins() of everything recorded in the measurement index for a voltage domain.
+
+    Args:
+        db_path: Path to SQLite database
+        project: Project name
+        voltage_domain: Voltage domain
+        spec_limits: Spec limits
+
+    Returns:
+        Dict point_key() -> margin
+    """
+    from measurement_index import MeasurementIndex
+
+    extremes = MeasurementIndex(db_path).point_extremes(project, voltage_domain, list(spec_limits))
+    return spec_margins(extremes, spec_limits)
+
+
+def order_plan(plan: List[Dict], margins: Optional[Dict[tuple, float]] = None,
+               policy: str = 'plan') -> List[Dict]:
+    """
+    Submission order of a PVT plan.
+
+    Args:
+        plan: build_pvt_plan() result
+        margins: point_key() -> prior margin (policy 'risk')
+        policy: 'plan' or 'risk'
+
+    Returns:
+        The plan points in submission order (ties keep plan order)
+
+    Raises:
+        ValueError: For unknown policies
+    """
+    if policy not in ORDER_POLICIES:
+        raise ValueError("Unknown submission order: {0} (use {1})".format(policy, ', '.join(ORDER_POLICIES)))
+    if policy == 'plan' or not margins:
+        return list(plan)
+    return sorted(plan, key=lambda point: margins.get(plan_point_key(point), UNKNOWN_MARGIN))
+
+
+def canary_point(plan: List[Dict], config: Dict[str, str]) -> Optional[Dict]:
+    """
+    Canary of a sweep: the typical corner/extraction at nominal voltage.
+
+    Args:
+        plan: build_pvt_plan() result (gen_pvt_loop_seq order)
+        config: Stage configuration from load_stage_config()
+
+    Returns:
+        The first matching plan point (the first plan point if none matches),
+        None for an empty plan
+    """
+    nominal = get_vtrends(config)['nom'][0]
+    for point in plan:
+        if (point['corner'] == config.get('typ_corner') and point['extraction'] == config.get('typ_ex')
+                and point['voltage'] == nominal):
+            return point
+    return plan[0] if plan else None
+
+
+def write_job_map(work_dir: str, jobs: List[Dict], append: bool = False):
+    """Write job_map.csv: one row per submitted job, in submission order."""
+    path = os.path.join(work_dir, JOB_MAP)
+    header = not (append and os.path.exists(path))
+    with open(path, 'a' if append else 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=JOB_MAP_FIELDS)
+        if header:
+            writer.writeheader()
+        for job in jobs:
+            writer.writerow(dict((k, job[k]) for k in JOB_MAP_FIELDS))
+
+
+def read_job_map(work_dir: str) -> Optional[List[Dict]]:
+    """
+    Jobs recorded by run_submission().
+
+    Returns:
+        List of dicts (JOB_MAP_FIELDS, job_id as int); None if the sweep was
+        submitted by the shell stage
+    """
+    path = os.path.join(work_dir, JOB_MAP)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', newline='') as f:
+        return [dict(row, job_id=int(row['job_id'])) for row in csv.DictReader(f)]
+
+
+def run_submission(work_dir: str, script_path: str, order: str = 'plan',
+                   margins: Optional[Dict[tuple, float]] = None, timeout: int = 120,
+                   part: str = 'all') -> Dict:
+    """
+    Submit the PVT points of a sweep to NetBatch.
+
+    Args:
+        work_dir: Working directory (after the gen stage)
+        script_path: Path to ver03 scripts (PaiHoExecutor.script_path)
+        order: Submission order policy ('plan' or 'risk')
+        margins: Prior margins for 'risk' (prior_margins())
+        timeout: Seconds allowed per nbjob call
+        part: 'all', 'canary' (canary_point() only) or 'rest' (everything but
+            the canary, appended to an earlier 'canary' submission)
+
+    Returns:
+        Dict with keys: jobs (list of JOB_MAP_FIELDS dicts, submission order),
+        failed (point names not submitted), total, job_log
+
+    Raises:
+        ValueError: For post-layout sweeps, a missing template, an unknown
+            order, an unknown part or a non-numeric ncpu/nmem
+    """
+    if part not in SUBMISSION_PARTS:
+        raise ValueError("Unknown submission part: {0} (use {1})".format(part, ', '.join(SUBMISSION_PARTS)))
+    config = load_stage_config(work_dir, script_path)
+    if config.get('mode', 'prelay') != 'prelay':
+        raise ValueError(f"Submission engine handles prelayout sweeps only (mode: {config.get('mode')})")
+    testbench = find_testbench(work_dir)
+    if not testbench:
+        raise ValueError(f"No testbench found in {work_dir}/template")
+
+    plan = order_plan(sweep_plan(work_dir, config), margins, order)
+    if part != 'all':
+        canary = canary_point(plan, config)
+        plan = [p for p in plan if (p is canary) == (part == 'canary')]
+    command = submit_command(config, testbench)
+    job_log = os.path.join(work_dir, JOB_LOG)
+
+    if order == 'risk' and margins and part != 'canary':
+        head = [f"{p['name']} ({margins.get(plan_point_key(p), UNKNOWN_MARGIN):+.3f})" for p in plan[:5]]
+        logger.info(f"  🎯 Riskiest points first: {', '.join(head)}")
+
+    jobs = []
+    failed = []
+    append = part == 'rest'
+    with open(job_log, 'a' if append else 'w') as log:
+        if not append:
+            log.write("NB job submit log\n")
+        for point in plan:
+            directory = point_directory(work_dir, point)
+            if not os.path.isdir(directory):
+                logger.warning(f"  ⚠️ {point['name']}: directory missing, not submitted")
+                failed.append(point['name'])
+                continue
+
+            try:
+                result = subprocess.run(command, cwd=directory, stdout=subprocess.PIPE,
+                                        stderr=subprocess.PIPE, universal_newlines=True, timeout=timeout)
+            except (OSError, subprocess.TimeoutExpired) as e:
+                logger.error(f"  ❌ {point['name']}: nbjob failed: {e}")
+                failed.append(point['name'])
+                continue
+
+            log.write(result.stdout)
+            log.flush()
+            job_id = parse_job_id(result.stdout)
+            if result.returncode != 0 or job_id is None:
+                logger.error(f"  ❌ {point['name']}: no job ID ({result.stderr.strip()[:200]})")
+                failed.append(point['name'])
+                continue
+
+            jobs.append({
+                'job_id': job_id,
+                'directory_path': directory,
+                'corner': point['corner'],
+                'temperature': point['temp'],
+                'voltage': point['voltage']
+            })
+
+    write_job_map(work_dir, jobs, append=append)
+    return {'jobs': jobs, 'failed': failed, 'total': len(plan), 'job_log': job_log}
+
+
+def _is_number(token: str) -> bool:
+    try:
+        float(token)
+    except ValueError:
+        return False
+    return True
+
+
+def log_tail(directory: str, testbench: str, lines: int = CANARY_LOG_LINES) -> str:
+    """
+    Last lines of a PVT point's simulator log.
+
+    Falls back to the NetBatch output file (##*altera_png_vp) when the
+    simulator never started.
+
+    Returns:
+        Log tail ('' if neither file exists)
+    """
+    candidates = [os.path.join(directory, f"{testbench}.log")]
+    candidates += sorted(glob.glob(os.path.join(directory, '##*altera_png_vp*')))
+    for path in candidates:
+        if os.path.isfile(path):
+            with open(path, 'r', errors='replace') as f:
+                return ''.join(f.readlines()[-lines:])
+    return ''
+
+
+def check_canary(work_dir: str, script_path: str, directory: str) -> Dict:
+    """
+    Verify a finished canary job.
+
+    The canary passes when its measurement file exists and yields a header
+    and at least one numeric value (the same parsing as the ext stage).
+
+    Args:
+        work_dir: Working directory
+        script_path: Path to ver03 scripts (PaiHoExecutor.script_path)
+        directory: Canary PVT directory (job_map.csv directory_path)
+
+    Returns:
+        Dict with keys: ok, reason, log_tail
+    """
+    config = load_stage_config(work_dir, script_path)
+    settings = _extraction_settings(work_dir, config)
+    testbench = settings['testbench']
+
+    meas_files = find_measurement_files(directory, testbench, settings['alter_mode'], settings['simulator'])
+    if not meas_files:
+        reason = f"no measurement file for {testbench} in {directory}"
+    else:
+        try:
+            report = build_point_report(meas_files, settings['alter_mode'], settings['swpl'])
+        except (OSError, UnicodeDecodeError) as e:
+            report = []
+            reason = f"unreadable measurement file: {e}"
+        else:
+            reason = f"measurement file {os.path.basename(meas_files[0])} has no results"
+        header = report[0].split() if report else []
+        values = [token for row in report[1:] for token in row.split()]
+        if header and any(_is_number(token) for token in values):
+            return {'ok': True, 'reason': '', 'log_tail': ''}
+
+    return {'ok': False, 'reason': reason, 'log_tail': log_tail(directory, testbench)}
+
+
+def replace_job_id(work_dir: str, old_job_id: int, new_job_id: int):
+    """Point a job_map.csv row at a resubmitted job (no-op for shell-submitted sweeps)."""
+    jobs = read_job_map(work_dir)
+    if jobs is None:
+        return
+    write_job_map(work_dir, [dict(job, job_id=new_job_id) if job['job_id'] == old_job_id else job
+                             for job in jobs])
+
+
+def archive_attempt(directory: str, testbench: str, attempt: int) -> str:
+    """
+    Move the outputs of a failed attempt into attempt_{n}/ in its PVT directory.
+
+    Everything the job wrote (simulator log, measurement files, waveforms,
+    NetBatch output) is moved; the testbench {tb}.sp and subdirectories stay.
+
+    Returns:
+        Path of the attempt directory
+    """
+    target = os.path.join(directory, f"attempt_{attempt}")
+    os.makedirs(target, exist_ok=True)
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if name != f"{testbench}.sp" and os.path.isfile(path):
+            shutil.move(path, os.path.join(target, name))
+    return target
+
+
+def resubmit_point(work_dir: str, script_path: str, directory: str,
+                   mem: Optional[int] = None, timeout: int = 120) -> Optional[int]:
+    """
+    Submit one PVT directory again with the sweep's nbjob command line.
+
+    Args:
+        work_dir: Working directory
+        script_path: Path to ver03 scripts (PaiHoExecutor.script_path)
+        directory: PVT directory of the failed job
+        mem: Memory class in GB (default: the sweep's nmem)
+        timeout: Seconds allowed for nbjob
+
+    Returns:
+        New NetBatch job ID, or None if nbjob did not accept the job
+
+    Raises:
+        ValueError: If the sweep's ncpu or nmem is not a whole number
+    """
+    config = load_stage_config(work_dir, script_path)
+    if mem:
+        config = dict(config, nmem=str(mem))
+    command = submit_command(config, find_testbench(work_dir))
+
+    try:
+        result = subprocess.run(command, cwd=directory, stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, universal_newlines=True, timeout=timeout)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logger.error(f"  ❌ {directory}: nbjob failed: {e}")
+        return None
+
+    with open(os.path.join(work_dir, JOB_LOG), 'a') as log:
+        log.write(result.stdout)
+    job_id = parse_job_id(result.stdout)
+    if result.returncode != 0 or job_id is None:
+        logger.error(f"  ❌ {directory}: no job ID ({result.stderr.strip()[:200]})")
+        return None
+    return job_id
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Surrogate Model - per-corner response surfaces over (temp, v1, v2, v3)
+
+Within one corner (process, extract) the measurements (ioh, rwkpull0,
+rwkpull_vih, vwkp, ...) vary smoothly with temperature and supply level,
+yet every min/nom/max x temperature combination is simulated. This module
+fits a surrogate per corner and measurement over the completed points and
+predicts unsimulated combinations with an uncertainty estimate:
+
+- inputs: temp scaled to [-1, 1] over the fitted temperature range, supply
+  levels min/nom/max as -1/0/+1 (numeric v-values are used as they are)
+- 'poly': ridge-regularised polynomial (degree 1 or 2, chosen by
+  leave-one-out error); predictive std from the Bayesian posterior
+- 'gp': Gaussian process with an RBF kernel on standardised outputs; the
+  length scale is chosen per measurement by closed-form leave-one-out error
+
+Every measurement of a corner shares the design matrix (or kernel), so a
+fit is one linear solve for all measurements at once. Measurements with
+'error' cells are fitted separately on their valid rows.
+
+recommend_points() evaluates a candidate grid (temperatures x v-levels) and
+marks the points whose prediction is too uncertain, or whose prediction
+band straddles a spec limit, as needing simulation. Served at
+/api/results/<sim_id>/surrogate.
+"""
+
+from itertools import combinations_with_replacement, product
+from typing import Dict, List, Optional
+
+from measurement_index import KEY_COLUMNS
+from spec_evaluator import np, columns_from_sidecar, column_values
+
+METHODS = ('gp', 'poly')
+
+# Supply level labels -> model coordinate
+LEVELS = {'min': -1.0, 'nom': 0.0, 'max': 1.0}
+
+# Sweep bookkeeping columns echoed into the creport, not measurements
+NON_MEASUREMENTS = ('temper', 'alter#', 'swp')
+
+POLY_RIDGE = 1e-6
+GP_LENGTH_SCALES = (0.5, 1.0, 2.0, 4.0)
+GP_NOISE = 1e-4
+
+# Default recommendation thresholds: relative 1-sigma uncertainty and band width in sigmas
+DEFAULT_REL_TOL = 0.05
+DEFAULT_SIGMAS = 2.0
+
+
+def _level(value) -> float:
+    """Model coordinate of a v-column value."""
+    if isinstance(value, float):
+        return value
+    if value not in LEVELS:
+        raise ValueError("Unknown supply level: {0}".format(value))
+    return LEVELS[value]
+
+
+class _Scaler(object):
+    """Maps temperatures onto [-1, 1] over the fitted range."""
+
+    def __init__(self, temps):
+        low, high = float(np.min(temps)), float(np.max(temps))
+        self.mid = (low + high) / 2.0
+        self.half = (high - low) / 2.0 or 1.0
+
+    def encode(self, temps, levels):
+        """(n x d) model inputs from temperatures and level columns."""
+        columns = [(np.asarray(temps, dtype=np.float64) - self.mid) / self.half]
+        columns.extend(np.asarray(l, dtype=np.float64) for l in levels)
+        return np.column_stack(columns)
+
+
+def _poly_features(X, degree: int):
+    """All monomials of the inputs up to degree (constant first)."""
+    n, d = X.shape
+    features = [np.ones(n)]
+    for k in range(1, degree + 1):
+        for combo in combinations_with_replacement(range(d), k):
+            features.append(np.prod(X[:, combo], axis=1))
+    return np.column_stack(features)
+
+
+def fit_poly(X, Y) -> Dict:
+    """
+    Ridge polynomial fit of all measurement columns at once.
+
+    Args:
+        X: (n x d) inputs
+        Y: (n x m) outputs
+
+    Returns:
+        Model dict (use predict())
+    """
+    best = None
+    for degree in (1, 2):
+        F = _poly_features(X, degree)
+        n, p = F.shape
+        if p >= n and best is not None:
+            break
+        A_inv = np.linalg.inv(F.T @ F + POLY_RIDGE * np.eye(p))
+        W = A_inv @ F.T @ Y
+        residuals = Y - F @ W
+        leverage = np.einsum('ij,jk,ik->i', F, A_inv, F)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            loo = residuals / (1.0 - leverage)[:, None]
+        loo_mse = np.mean(loo ** 2, axis=0)
+        if not np.all(np.isfinite(loo_mse)):
+            loo_mse = np.full(Y.shape[1], np.inf)
+        if best is None or np.sum(loo_mse) < np.sum(best['loo_mse']):
+            dof = max(n - p, 1)
+            sigma2 = np.sum(residuals ** 2, axis=0) / dof
+            # Saturated fits have no residual: fall back to the leave-one-out error
+            sigma2 = np.where(np.isfinite(loo_mse) & (n <= p), loo_mse, sigma2)
+            best = {'kind': 'poly', 'degree': degree, 'W': W, 'A_inv': A_inv,
+                    'sigma2': sigma2, 'loo_mse': loo_mse}
+    return best
+
+
+def _rbf(A, B, length_scale: float):
+    """RBF kernel matrix between input sets."""
+    sq = np.sum(A ** 2, axis=1)[:, None] + np.sum(B ** 2, axis=1)[None, :] - 2.0 * A @ B.T
+    return np.exp(-0.5 * np.maximum(sq, 0.0) / length_scale ** 2)
+
+
+def fit_gp(X, Y) -> Dict:
+    """
+    Gaussian-process fit of all measurement columns at once.
+
+    Outputs are standardised per column; each column gets the length scale
+    (from GP_LENGTH_SCALES) with the lowest leave-one-out error.
+
+    Args:
+        X: (n x d) inputs
+        Y: (n x m) outputs
+
+    Returns:
+        Model dict (use predict())
+    """
+    mean = Y.mean(axis=0)
+    std = Y.std(axis=0)
+    std = np.where(std > 0, std, 1.0)
+    Ys = (Y - mean) / std
+
+    K_invs, alphas, loo_mse, gains = [], [], [], []
+    for length_scale in GP_LENGTH_SCALES:
+        K_inv = np.linalg.inv(_rbf(X, X, length_scale) + GP_NOISE * np.eye(len(X)))
+        alpha = K_inv @ Ys
+        diag = np.diag(K_inv)[:, None]
+        loo = alpha / diag
+        K_invs.append(K_inv)
+        alphas.append(alpha)
+        loo_mse.append(np.mean(loo ** 2, axis=0))
+        # Signal variance matching the leave-one-out residuals to their predicted variance (1 / diag)
+        gains.append(np.mean(loo ** 2 * diag, axis=0))
+
+    loo_mse = np.array(loo_mse)  # (scales x m)
+    choice = np.argmin(loo_mse, axis=0)
+    cols = np.arange(Y.shape[1])
+    return {'kind': 'gp', 'X': X, 'mean': mean, 'std': std, 'K_invs': K_invs, 'alphas': alphas,
+            'choice': choice, 'gain': np.sqrt(np.array(gains)[choice, cols]),
+            'loo_mse': loo_mse[choice, cols] * std ** 2}
+
+
+def predict(model: Dict, Xq):
+    """
+    Predict all measurement columns of a model.
+
+    Args:
+        model: fit_poly() / fit_gp() result
+        Xq: (q x d) query inputs
+
+    Returns:
+        tuple: (mean, std), both (q x m)
+    """
+    if model['kind'] == 'poly':
+        F = _poly_features(Xq, model['degree'])
+        mean = F @ model['W']
+        spread = 1.0 + np.einsum('ij,jk,ik->i', F, model['A_inv'], F)
+        return mean, np.sqrt(spread[:, None] * model['sigma2'][None, :])
+
+    m = len(model['choice'])
+    mean = np.empty((len(Xq), m))
+    var = np.empty((len(Xq), m))
+    for s, length_scale in enumerate(GP_LENGTH_SCALES):
+        cols = np.flatnonzero(model['choice'] == s)
+        if not cols.size:
+            continue
+        K_star = _rbf(Xq, model['X'], length_scale)
+        mean[:, cols] = K_star @ model['alphas'][s][:, cols]
+        var[:, cols] = np.maximum(1.0 + GP_NOISE - np.einsum('ij,jk,ik->i', K_star, model['K_invs'][s], K_star),
+                                  0.0)[:, None]
+    return mean * model['std'] + model['mean'], np.sqrt(var) * model['std'] * model['gain']
+
+
+def _fit(method: str, X, Y) -> Dict:
+    if method not in METHODS:
+        raise ValueError("Unknown surrogate method: {0} (use {1})".format(method, ', '.join(METHODS)))
+    return fit_gp(X, Y) if method == 'gp' else fit_poly(X, Y)
+
+
+def fit_corners(columns_data: Dict, method: str = 'gp', measurements: Optional[List[str]] = None,
+                corners: Optional[List] = None) -> List[Dict]:
+    """
+    Fit surrogates for every corner of a creport.
+
+    Args:
+        columns_data: Columns as from results_sidecar.load_columns()
+        method: 'gp' or 'poly'
+        measurements: Measurement names (default: all but NON_MEASUREMENTS)
+        corners: Optional list of process names to fit
+
+    Returns:
+        List of corner dicts: process, extract, v_columns, scaler, points
+        (set of simulated (temp, v...) tuples), measurements, fits (list of
+        (measurement indices, row mask, model)), magnitude (mean |value| per
+        measurement), loo_rmse (measurement -> leave-one-out RMSE)
+
+    Raises:
+        ValueError: For unknown methods, measurements or supply levels
+    """
+    headers = [h for h in dict.fromkeys(columns_data['headers']) if h]
+    if 'temp' not in headers or 'process' not in headers:
+        raise ValueError("creport has no process/temp columns")
+    v_columns = [h for h in ('v1', 'v2', 'v3') if h in headers]
+    available = [h for h in headers if h not in KEY_COLUMNS and h not in NON_MEASUREMENTS]
+    if measurements is None:
+        measurements = available
+    for name in measurements:
+        if name not in available:
+            raise ValueError("Unknown measurement: {0}".format(name))
+
+    n_rows = columns_data['rows']
+    all_rows = np.arange(n_rows)
+    process = column_values(columns_data, 'process', all_rows)
+    extract = column_values(columns_data, 'extract', all_rows) if 'extract' in headers else [''] * n_rows
+    temps = np.array(column_values(columns_data, 'temp', all_rows), dtype=np.float64)
+    v_raw = [column_values(columns_data, v, all_rows) for v in v_columns]
+    levels = [np.array([_level(x) for x in values]) for values in v_raw]
+    values = columns_from_sidecar(columns_data, measurements)
+    Y_all = np.column_stack([values[m] for m in measurements]) if measurements else np.zeros((n_rows, 0))
+
+    fitted = []
+    for corner in dict.fromkeys(zip(process, extract)):
+        if corners and corner[0] not in corners:
+            continue
+        rows = np.flatnonzero([(p, e) == corner for p, e in zip(process, extract)])
+        scaler = _Scaler(temps[rows])
+        X = scaler.encode(temps[rows], [l[rows] for l in levels])
+        Y = Y_all[rows]
+
+        # One fit per distinct pattern of valid rows ('error' cells)
+        valid = ~np.isnan(Y)
+        fits = []
+        loo_rmse = {}
+        patterns = {}
+        for j in range(Y.shape[1]):
+            patterns.setdefault(valid[:, j].tobytes(), []).append(j)
+        for cols in patterns.values():
+            mask = valid[:, cols[0]]
+            if mask.sum() < 2:
+                continue
+            model = _fit(method, X[mask], Y[mask][:, cols])
+            fits.append((cols, mask, model))
+            for j, mse in zip(cols, model['loo_mse'].tolist()):
+                loo_rmse[measurements[j]] = float(np.sqrt(mse)) if np.isfinite(mse) else None
+
+        with np.errstate(invalid='ignore'):
+            magnitude = np.nanmean(np.abs(Y), axis=0) if len(Y) else np.zeros(Y.shape[1])
+        fitted.append({
+            'process': corner[0],
+            'extract': corner[1],
+            'v_columns': v_columns,
+            'scaler': scaler,
+            'points': set(zip(temps[rows].tolist(), *[[v[i] for i in rows.tolist()] for v in v_raw])),
+            'measurements': measurements,
+            'fits': fits,
+            'magnitude': magnitude,
+            'loo_rmse': loo_rmse
+        })
+    return fitted
+
+
+def predict_corner(corner: Dict, temps, v_values: List[List]):
+    """
+    Predict all measurements of a fitted corner.
+
+    Args:
+        corner: fit_corners() entry
+        temps: Query temperatures
+        v_values: One list per v-column of level labels (or numbers)
+
+    Returns:
+        tuple: (mean, std), both (q x measurements); NaN where no model
+    """
+    X = corner['scaler'].encode(temps, [[_level(x) for x in v] for v in v_values])
+    mean = np.full((len(X), len(corner['measurements'])), np.nan)
+    std = np.full_like(mean, np.nan)
+    for cols, _, model in corner['fits']:
+        mean[:, cols], std[:, cols] = predict(model, X)
+    return mean, std
+
+
+def recommend_points(columns_data: Dict, temps: Optional[List[float]] = None, method: str = 'gp',
+                     measurements: Optional[List[str]] = None, corners: Optional[List] = None,
+                     spec_limits: Optional[Dict] = None, rel_tol: float = DEFAULT_REL_TOL,
+                     sigmas: float = DEFAULT_SIGMAS) -> Dict:
+    """
+    Predict a candidate grid per corner and mark the points that need simulating.
+
+    The grid is temps x min/nom/max (or the observed values) for each
+    v-column. A candidate needs simulation when a measurement has no model
+    (fewer than 2 valid rows in the corner), when its predicted std exceeds
+    rel_tol x max(|mean|, the corner's mean |value|), or when mean +/- sigmas
+    x std straddles one of its spec limits.
+
+    Args:
+        columns_data: Columns as from results_sidecar.load_columns()
+        temps: Candidate temperatures (default: the simulated ones)
+        method, measurements, corners: As for fit_corners()
+        spec_limits: Spec limits (param -> {'min': x, 'max': y})
+        rel_tol: Relative 1-sigma uncertainty above which a point needs simulating
+        sigmas: Width of the prediction band checked against spec limits
+
+    Returns:
+        Dict with keys: method, measurements, corners (list of {process,
+        extract, loo_rmse, points}), and counts candidates / simulated /
+        recommended / skippable. Each point is {temp, v1.., simulated,
+        needs_simulation, reasons, predicted: {measurement: [mean, std]}}.
+    """
+    spec_limits = spec_limits or {}
+    fitted = fit_corners(columns_data, method, measurements, corners)
+    counts = {'candidates': 0, 'simulated': 0, 'recommended': 0, 'skippable': 0}
+    result_corners = []
+
+    for corner in fitted:
+        names = corner['measurements']
+        corner_temps = sorted(set(temps if temps else [p[0] for p in corner['points']]))
+        grids = []
+        for i, _ in enumerate(corner['v_columns']):
+            observed = set(p[1 + i] for p in corner['points'])
+            grids.append([l for l in LEVELS if l in observed or all(isinstance(o, str) for o in observed)]
+                         + sorted(o for o in observed if not isinstance(o, str)))
+        candidates = [(t,) + combo for t in corner_temps for combo in product(*grids)]
+        if not candidates:
+            continue
+
+        mean, std = predict_corner(corner, [c[0] for c in candidates],
+                                   [[c[1 + i] for c in candidates] for i in range(len(grids))])
+        unmodelled = np.isnan(mean) | np.isnan(std)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            uncertain = std > rel_tol * np.maximum(np.abs(mean), corner['magnitude'])
+        low, high = mean - sigmas * std, mean + sigmas * std
+        straddles = np.zeros_like(uncertain)
+        for j, name in enumerate(names):
+            for kind in ('min', 'max'):
+                limit = (spec_limits.get(name) or {}).get(kind)
+                if limit is not None:
+                    straddles[:, j] |= (low[:, j] < limit) & (high[:, j] > limit)
+
+        points = []
+        for q, candidate in enumerate(candidates):
+            simulated = candidate in corner['points']
+            reasons = []
+            if not simulated:
+                reasons = (['no model: ' + n for n, u in zip(names, unmodelled[q].tolist()) if u] +
+                           ['uncertain: ' + n for n, u in zip(names, uncertain[q].tolist()) if u] +
+                           ['near spec limit: ' + n for n, s in zip(names, straddles[q].tolist()) if s])
+            point = dict(zip(['temp'] + corner['v_columns'], candidate))
+            point.update({
+                'simulated': simulated,
+                'needs_simulation': bool(reasons),
+                'reasons': reasons,
+                'predicted': dict((n, [None if np.isnan(m) else float(m), None if np.isnan(s) else float(s)])
+                                  for n, m, s in zip(names, mean[q].tolist(), std[q].tolist()))
+            })
+            points.append(point)
+            counts['candidates'] += 1
+            counts['simulated'] += simulated
+            counts['recommended'] += bool(reasons)
+            counts['skippable'] += not simulated and not reasons
+
+        result_corners.append({
+            'process': corner['process'],
+            'extract': corner['extract'],
+            'loo_rmse': corner['loo_rmse'],
+            'points': points
+        })
+
+    return dict(counts, method=method, measurements=fitted[0]['measurements'] if fitted else [],
+                corners=result_corners)
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Test script for dense .alter sweeps.
+Checks the step values and host points on the gpio/1p1v plan, the testbench
+rewrite, and synthetic vccn and temperature sweeps through the alter extraction path.
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import config
+from config import REPO_ROOT, DENSE_SWEEP_MAX_STEPS
+from extraction_engine import (
+    load_stage_config,
+    build_pvt_plan,
+    point_directory,
+    sweep_plan,
+    run_extraction,
+    run_sorting
+)
+from alter_sweep import (
+    dense_values,
+    dense_hosts,
+    alter_testbench,
+    prepare_dense_sweep,
+    apply_dense_sweep,
+    load_dense_sweep
+)
+
+SCRIPT_PATH = str(REPO_ROOT / "gpio" / "1p1v" / "dependencies" / "scripts" /
+                  "simulation_script" / "auto_pvt" / "ver03")
+GPIO_DOMAIN = REPO_ROOT / "gpio" / "1p1v"
+
+
+def make_work_dir():
+    """Create a temporary work_dir with the gpio/1p1v config and template"""
+    work_dir = tempfile.mkdtemp(prefix="wkp_dense_")
+    shutil.copy(str(GPIO_DOMAIN / "config.cfg"), work_dir)
+    shutil.copytree(str(GPIO_DOMAIN / "template"), os.path.join(work_dir, "template"))
+    return work_dir
+
+
+def write_mt0(path, headers, rows, title="* sim_tx"):
+    """Write a measurement file in the layout produced by finesim/primesim"""
+    with open(path, 'w') as f:
+        f.write("$DATA1 SOURCE='PrimeSim' VERSION='2023.12'\n")
+        f.write(".TITLE '{0}'\n".format(title))
+        f.write("  ".join(headers) + "\n")
+        for row in rows:
+            f.write("   ".join(row) + "  \n")
+
+
+def error_of(func, *args):
+    """ValueError message of a call (None if it succeeds)"""
+    try:
+        func(*args)
+    except ValueError as e:
+        return str(e)
+    return None
+
+
+def python_submission(func, *args):
+    """Call func with config.SUBMISSION_ENGINE = 'python' (dense sweeps need it)"""
+    engine = config.SUBMISSION_ENGINE
+    config.SUBMISSION_ENGINE = 'python'
+    try:
+        return func(*args)
+    finally:
+        config.SUBMISSION_ENGINE = engine
+
+
+def test_values_and_hosts():
+    """Test step values and the host points of vccn and temperature sweeps"""
+    print("\n" + "="*60)
+    print("TEST 1: dense_values() / dense_hosts()")
+    print("="*60)
+
+    work_dir = make_work_dir()
+    try:
+        config = load_stage_config(work_dir, SCRIPT_PATH)
+    finally:
+        shutil.rmtree(work_dir)
+
+    plan = build_pvt_plan(config)
+    vcn_hosts = dense_hosts(plan, config, 'vcn')
+    temp_hosts = dense_hosts(plan, config, 'temp')
+    no_vccn = dict(config, supply2='vcctx')
+
+    checks = [
+        ("vcn steps span vcnmin..vcnmax", dense_values(config, 'vcn', 5),
+         [0.99, 1.0395, 1.089, 1.1385, 1.188]),
+        ("explicit values, duplicates dropped", dense_values(config, 'temp', None, ['-40', 0, 0.0, 125]),
+         [-40.0, 0.0, 125.0]),
+        ("temp needs values", error_of(dense_values, config, 'temp', 5), "Dense temp sweep needs 'values'"),
+        ("unknown parameter", error_of(dense_values, config, 'vcc', 5) is not None, True),
+        ("single step rejected", error_of(dense_values, config, 'vcn', 1) is not None, True),
+        ("step limit", error_of(dense_values, config, 'vcn', DENSE_SWEEP_MAX_STEPS + 1) is not None, True),
+        ("vcn hosts: vccn min/max/nom merged", (len(plan), len(vcn_hosts)), (92, 56)),
+        ("vcn host keeps vcc level", [p['voltage'] for p in vcn_hosts[:3]],
+         ['v1min_v2min', 'v1max_v2min', 'v1nom_v2nom']),
+        ("temp hosts: temperatures merged", len(temp_hosts), 45),
+        ("temp host is the cold point", temp_hosts[0]['name'], plan[0]['name']),
+        ("vcn sweep needs vccn", error_of(dense_hosts, plan, no_vccn, 'vcn'),
+         "vccn is not a swept supply of this voltage domain"),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def test_alter_testbench():
+    """Test preparing a work_dir and rewriting the generated host testbenches"""
+    print("\n" + "="*60)
+    print("TEST 2: prepare_dense_sweep() / apply_dense_sweep()")
+    print("="*60)
+
+    deck = [".title fmax", ".temp 100", ".param vcn=1.1", ".param vsh=\"vcn*0.35/1.1\"", ".end"]
+    temp_deck = alter_testbench(deck, 'temp', [-40.0, 125.0])
+
+    work_dir = make_work_dir()
+    try:
+        shell_engine = error_of(prepare_dense_sweep, work_dir, SCRIPT_PATH, {'parameter': 'vcn', 'steps': 3})
+        bad_spec = error_of(python_submission, prepare_dense_sweep, work_dir, SCRIPT_PATH, {'parameter': 'vcn'})
+        summary = python_submission(prepare_dense_sweep, work_dir, SCRIPT_PATH, {'parameter': 'vcn', 'steps': 3})
+        config = load_stage_config(work_dir, SCRIPT_PATH)
+        hosts = sweep_plan(work_dir, config)
+
+        # What the gen stage leaves behind: one testbench per plan point
+        for point in build_pvt_plan(config):
+            os.makedirs(point_directory(work_dir, point))
+        for point in hosts[1:]:
+            shutil.copy(os.path.join(work_dir, "template", "sim_tx.sp"), point_directory(work_dir, point))
+        rewritten = apply_dense_sweep(work_dir, SCRIPT_PATH)
+
+        with open(os.path.join(point_directory(work_dir, hosts[1]), "sim_tx.sp")) as f:
+            lines = f.read().splitlines()
+        with open(os.path.join(work_dir, "template", "sim_tx.sp")) as f:
+            template_lines = f.read().splitlines()
+    finally:
+        shutil.rmtree(work_dir)
+
+    checks = [
+        ("vcn deck", alter_testbench(deck, 'vcn', [0.99, 1.1]),
+         [".title 0.99", ".temp 100", ".param vcn=0.99", ".param vsh=\"vcn*0.35/1.1\"",
+          ".alter 1.1", ".param vcn=1.1", ".end"]),
+        ("temp deck", temp_deck,
+         [".title -40", ".temp -40", ".param vcn=1.1", ".param vsh=\"vcn*0.35/1.1\"",
+          ".alter 125", ".temp 125", ".end"]),
+        ("deck without the parameter", error_of(alter_testbench, deck[:2], 'vcn', [1.0, 1.1]),
+         "Testbench has no .param vcn= line to sweep"),
+        ("shell submission engine rejected", shell_engine,
+         "Dense sweeps need the Python submission and extraction engines"),
+        ("invalid request rejected", bad_spec, "Dense vcn sweep needs 'steps' or 'values'"),
+        ("summary", (summary['values'], summary['jobs'], summary['points']), ([0.99, 1.089, 1.188], 56, 92)),
+        ("alter extraction switched on", (config['alt_ext_mode'], config['alt_ext_n']), ('Yes', '11')),
+        ("sweep plan is the hosts", len(hosts), 56),
+        ("missing testbench skipped", rewritten, 55),
+        ("alter blocks before .end", lines[-5:],
+         [".alter 1.089", ".param vcn=1.089", ".alter 1.188", ".param vcn=1.188", ".end"]),
+        ("base run is the first step", (lines[3], lines[24]), (".title 0.99", ".param vcn=0.99")),
+        ("rest of the deck unchanged", lines[25:-5], template_lines[25:-1]),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def run_dense_sweep(spec):
+    """Prepare a gpio work_dir, fake one measurement file per step and host, run ext/srt"""
+    work_dir = make_work_dir()
+    try:
+        python_submission(prepare_dense_sweep, work_dir, SCRIPT_PATH, spec)
+        sweep = load_dense_sweep(work_dir)
+        hosts = sweep_plan(work_dir, load_stage_config(work_dir, SCRIPT_PATH))
+        for point in hosts:
+            point_dir = point_directory(work_dir, point)
+            os.makedirs(point_dir)
+            for n, value in enumerate(sweep['values']):
+                write_mt0(os.path.join(point_dir, "sim_tx_a{0}.mt0".format(n)), ["ioh", "alter#"],
+                          [["{0}e-04".format(value), "{0}.0".format(n + 1)]], title="{0:g}".format(value))
+
+        extraction = run_extraction(work_dir, SCRIPT_PATH, max_workers=2, pack=False)
+        sorting = run_sorting(work_dir, SCRIPT_PATH)
+        with open(sorting['creport']) as f:
+            creport = f.read().splitlines()
+    finally:
+        shutil.rmtree(work_dir)
+    return sweep, extraction, sorting, creport
+
+
+def test_dense_extraction():
+    """Test one creport row per step through the alter extraction path"""
+    print("\n" + "="*60)
+    print("TEST 3: dense sweep ext/srt")
+    print("="*60)
+
+    sweep, extraction, sorting, creport = run_dense_sweep({'parameter': 'vcn', 'values': [0.99, 1.05, 1.188]})
+    header = creport[9].split('\t')
+    rows = [line.split('\t') for line in creport[10:]]
+
+    _, temp_extraction, temp_sorting, temp_creport = run_dense_sweep({'parameter': 'temp',
+                                                                      'values': [-40, 25, 125]})
+    temp_rows = [line.split('\t') for line in temp_creport[10:]]
+
+    checks = [
+        ("stored sweep", sweep, {'parameter': 'vcn', 'values': [0.99, 1.05, 1.188]}),
+        ("every host extracted", (extraction['total'], extraction['extracted']), (56, 56)),
+        ("no missing reports", sorting['missing'], []),
+        ("swp column", header[:7], ['process', 'extract', 'temp', 'v1', 'v2', 'swp', 'ioh']),
+        ("one row per step", sorting['rows'], 56 * 3),
+        ("steps of the first host", [r[:6] for r in rows[:3]],
+         [['TT', 'typical', '-40', 'min', 'min', s] for s in ('0.99', '1.05', '1.188')]),
+        ("measurement per step", [r[6] for r in rows[:3]], ['0.99e-04', '1.05e-04', '1.188e-04']),
+        ("temp sweep: every host extracted", (temp_extraction['extracted'], temp_sorting['rows']), (45, 45 * 3)),
+        ("temp sweep: temp column is the simulated temperature", [r[:6] for r in temp_rows[:3]],
+         [['TT', 'typical', t, 'min', 'min', t] for t in ('-40', '25', '125')]),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("\n" + "="*60)
+    print("DENSE ALTER SWEEP TESTS")
+    print("="*60)
+
+    tests = [
+        ("dense_values / dense_hosts", test_values_and_hosts),
+        ("alter testbench", test_alter_testbench),
+        ("dense extraction", test_dense_extraction),
+    ]
+
+    results = []
+
+    for name, test_func in tests:
+        try:
+            passed = test_func()
+        except AssertionError:
+            passed = False
+        results.append((name, passed))
+
+    # Summary
+    print("\n" + "="*60)
+    print("TEST SUMMARY")
+    print("="*60)
+
+    total_passed = sum(1 for _, passed in results if passed)
+    total_tests = len(results)
+
+    for name, passed in results:
+        status = "✓ PASSED" if passed else "✗ FAILED"
+        print(f"{status}: {name}")
+
+    print(f"\nOverall: {total_passed}/{total_tests} test suites passed")
+
+    if total_passed == total_tests:
+        print("\n🎉 All tests passed!")
+        return 0
+    else:
+        print(f"\n⚠️  {total_tests - total_passed} test suite(s) failed")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
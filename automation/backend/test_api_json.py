@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script for API response serialisation.
+Checks compact JSON and float precision.
+"""
+
+import sys
+import os
+import json
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import REPO_ROOT
+from results_parser import parse_creport
+from api_json import to_json, parse_precision
+
+GPIO_DOMAIN = REPO_ROOT / "gpio" / "1p1v"
+
+
+def test_api_json():
+    """Test compact serialisation and float precision"""
+    print("\n" + "="*60)
+    print("TEST 1: API JSON")
+    print("="*60)
+
+    parsed = parse_creport(str(GPIO_DOMAIN / "00bkp_202510301443" / "report" / "creport.txt"))
+    compact = to_json(parsed, indent=None)
+    rounded = json.loads(to_json({'v': [7467.68798, 'error', 3], 't': (1.0e-12 / 3,)}, precision=4, indent=None))
+
+    bad = 0
+    for text in ['0', '18', 'x']:
+        try:
+            parse_precision(text)
+        except ValueError:
+            bad += 1
+
+    checks = [
+        ("round trip", json.loads(compact) == json.loads(json.dumps(parsed)), True),
+        ("smaller than indent=2", len(compact) < len(json.dumps(parsed, indent=2)), True),
+        ("floats rounded", rounded, {'v': [7468.0, 'error', 3], 't': [3.333e-13]}),
+        ("precision parsed", (parse_precision(None), parse_precision('6')), (None, 6)),
+        ("bad precision rejected", bad, 3),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("\n" + "="*60)
+    print("API JSON TESTS")
+    print("="*60)
+
+    tests = [
+        ("API JSON", test_api_json),
+    ]
+
+    results = []
+
+    for name, test_func in tests:
+        try:
+            passed = test_func()
+        except AssertionError:
+            passed = False
+        results.append((name, passed))
+
+    # Summary
+    print("\n" + "="*60)
+    print("TEST SUMMARY")
+    print("="*60)
+
+    total_passed = sum(1 for _, passed in results if passed)
+    total_tests = len(results)
+
+    for name, passed in results:
+        status = "✓ PASSED" if passed else "✗ FAILED"
+        print(f"{status}: {name}")
+
+    print(f"\nOverall: {total_passed}/{total_tests} test suites passed")
+
+    if total_passed == total_tests:
+        print("\n🎉 All tests passed!")
+        return 0
+    else:
+        print(f"\n⚠️  {total_tests - total_passed} test suite(s) failed")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
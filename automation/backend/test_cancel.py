@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+"""
+Test script for cancelling simulations.
+Checks batched `nbjob remove` calls (with a stand-in nbjob on PATH),
+releasing the queued stage executor tasks of a cancelled simulation, the
+database side of a cancel (scratch database), the cancel/submit
+endpoints over HTTP and the stop-on-failure cancellation of queued jobs.
+"""
+
+import sys
+import os
+import json
+import shutil
+import sqlite3
+import asyncio
+import tempfile
+import threading
+import time
+from concurrent.futures import CancelledError
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import config
+from netbatch_monitor import remove_netbatch_jobs_batched, CURRENT_USER
+from stage_executor import StageExecutor
+
+# Stand-in nbjob: records each call, rejects any call naming a finished job
+FAKE_NBJOB = """#!/bin/bash
+echo "$*" >> "{state}/calls"
+for arg in "$@"; do
+    if [ "$arg" = "{finished}" ]; then
+        echo "Error: job {finished} is not active" >&2
+        exit 1
+    fi
+done
+"""
+
+FINISHED_JOB = 1700000007
+
+
+def load_server(db_path):
+    """Import main_tornado on a scratch database (it initializes DB_PATH on import)"""
+    real_db_path = config.DB_PATH
+    config.DB_PATH = db_path
+    try:
+        import main_tornado
+    finally:
+        config.DB_PATH = real_db_path
+    main_tornado.DB_PATH = db_path
+    # Schema of a database that has been through a restart (custom_corners comes from migrate_db)
+    main_tornado.init_db()
+    main_tornado.migrate_db()
+    return main_tornado
+
+
+def install_nbjob(bin_dir):
+    """Put the stand-in nbjob first on PATH, returning the previous PATH"""
+    nbjob = os.path.join(bin_dir, "nbjob")
+    with open(nbjob, 'w') as f:
+        f.write(FAKE_NBJOB.format(state=bin_dir, finished=FINISHED_JOB))
+    os.chmod(nbjob, 0o755)
+    old_path = os.environ.get('PATH', '')
+    os.environ['PATH'] = bin_dir + os.pathsep + old_path
+    return old_path
+
+
+def add_simulation(db_path, sim_id, state, username=CURRENT_USER, canary=None, jobs=()):
+    """Insert a simulation and its job_tracking rows [(job_id, status), ...]"""
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+        INSERT INTO simulations (sim_id, project, voltage_domain, corner_set, work_dir, username, state, canary)
+        VALUES (?, 'gpio', '1p1v', 'custom', ?, ?, ?, ?)
+    ''', (sim_id, "/tmp/" + sim_id, username, state, canary))
+    conn.executemany('''
+        INSERT INTO job_tracking (sim_id, job_id, directory_path, status) VALUES (?, ?, ?, ?)
+    ''', [(sim_id, job_id, "/tmp/{0}/{1}".format(sim_id, job_id), status) for job_id, status in jobs])
+    conn.commit()
+    conn.close()
+
+
+def query(db_path, sql, params=()):
+    """Rows of a query on the scratch database"""
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(sql, params).fetchall()
+    conn.close()
+    return rows
+
+
+def test_remove_batched():
+    """Test one nbjob call per batch and the per-job fallback"""
+    print("\n" + "="*60)
+    print("TEST 1: remove_netbatch_jobs_batched()")
+    print("="*60)
+
+    bin_dir = tempfile.mkdtemp(prefix="wkp_nbjob_")
+    old_path = os.environ.get('PATH', '')
+    job_ids = list(range(1700000001, 1700000013))
+    try:
+        nbjob = os.path.join(bin_dir, "nbjob")
+        with open(nbjob, 'w') as f:
+            f.write(FAKE_NBJOB.format(state=bin_dir, finished=FINISHED_JOB))
+        os.chmod(nbjob, 0o755)
+        os.environ['PATH'] = bin_dir + os.pathsep + old_path
+
+        removed = remove_netbatch_jobs_batched(job_ids, batch_size=5)
+        with open(os.path.join(bin_dir, "calls")) as f:
+            calls = [line.split()[3:] for line in f.read().splitlines()]
+        nothing = remove_netbatch_jobs_batched([], batch_size=5)
+    finally:
+        os.environ['PATH'] = old_path
+        shutil.rmtree(bin_dir)
+
+    checks = [
+        ("all but the finished job removed", removed, [j for j in job_ids if j != FINISHED_JOB]),
+        ("first batch in one call", calls[0], [str(j) for j in job_ids[:5]]),
+        ("rejected batch retried per job", calls[1:7],
+         [[str(j) for j in job_ids[5:10]]] + [[str(j)] for j in job_ids[5:10]]),
+        ("last partial batch", calls[7:], [[str(j) for j in job_ids[10:]]]),
+        ("no jobs, no calls", nothing, []),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def test_cancel_queued():
+    """Test releasing a simulation's queued stage tasks"""
+    print("\n" + "="*60)
+    print("TEST 2: StageExecutor.cancel_queued()")
+    print("="*60)
+
+    executor = StageExecutor({'run': 1, 'gen': 1})
+    gate = threading.Event()
+    ran = []
+    try:
+        blocker = executor.submit('run', gate.wait, 10, label="sim_a")
+        while not executor.get_stats()['run']['active']:
+            time.sleep(0.01)
+        queued = [
+            executor.submit('run', ran.append, "sim_a", label="sim_a"),
+            executor.submit('run', ran.append, "sim_a canary", label="sim_a (canary)"),
+            executor.submit('run', ran.append, "sim_ab", label="sim_ab"),
+            executor.submit('run', ran.append, "sim_b", label="sim_b"),
+        ]
+        released = executor.cancel_queued("sim_a")
+        stats = executor.get_stats()['run']
+        gate.set()
+        for future in queued:
+            try:
+                future.result(timeout=10)
+            except CancelledError:
+                pass
+        blocker_result = blocker.result(timeout=10)
+        again = executor.cancel_queued("sim_a")
+    finally:
+        gate.set()
+        executor.shutdown()
+
+    checks = [
+        ("queued tasks of the simulation released", released, 2),
+        ("their futures cancelled", [f.cancelled() for f in queued], [True, True, False, False]),
+        ("running task kept", blocker_result, True),
+        ("other simulations still run", ran, ["sim_ab", "sim_b"]),
+        ("released tasks leave the queue", [t['label'] for t in stats['queued_tasks']], ["sim_ab", "sim_b"]),
+        ("cancellations counted", stats['cancelled'], 2),
+        ("nothing left to release", again, 0),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def test_cancel_database():
+    """Test marking simulations cancelled and cancelling their tracked jobs"""
+    print("\n" + "="*60)
+    print("TEST 3: mark_simulations_cancelled() / cancel_tracked_jobs()")
+    print("="*60)
+
+    tmp_dir = tempfile.mkdtemp(prefix="wkp_cancel_db_")
+    db_path = os.path.join(tmp_dir, "webapp.db")
+    server = load_server(db_path)
+    real_executor = server.get_stage_executor
+    executor = StageExecutor({'run': 1})
+    old_path = install_nbjob(tmp_dir)
+    try:
+        server.get_stage_executor = lambda: executor
+        add_simulation(db_path, "sim_run", 'running', canary='pending',
+                       jobs=[(101, 'waiting'), (102, 'running'), (103, 'retrying'), (104, 'completed'),
+                             (FINISHED_JOB, 'running')])
+        add_simulation(db_path, "sim_sub", 'submitted', jobs=[(201, 'waiting')])
+        add_simulation(db_path, "sim_done", 'finished', jobs=[(301, 'completed')])
+        add_simulation(db_path, "sim_other", 'running', username="someone_else", jobs=[(401, 'running')])
+
+        results = server.mark_simulations_cancelled(["sim_run", "sim_sub", "sim_done", "sim_other", "sim_none"],
+                                                    "Wrong corner list")
+        counts = server.cancel_tracked_jobs(["sim_run", "sim_sub"])
+
+        simulations = dict((row[0], row[1:]) for row in query(
+            db_path, 'SELECT sim_id, state, cancel_reason, canary, jobs_running, jobs_waiting FROM simulations'))
+        jobs = dict(query(db_path, 'SELECT job_id, status FROM job_tracking'))
+        with open(os.path.join(tmp_dir, "calls")) as f:
+            removed_ids = [arg for line in f.read().splitlines() for arg in line.split()[3:]]
+    finally:
+        os.environ['PATH'] = old_path
+        server.get_stage_executor = real_executor
+        server.DB_PATH = config.DB_PATH
+        executor.shutdown()
+        shutil.rmtree(tmp_dir)
+
+    checks = [
+        ("only own active simulations cancelled", [r['cancelled'] for r in results],
+         [True, True, False, False, False]),
+        ("state before the request", [r['state'] for r in results],
+         ['running', 'submitted', 'finished', None, None]),
+        ("terminal simulation refused", results[2]['error'], "Simulation is finished, nothing to cancel"),
+        ("other user's simulation not found", results[3]['error'], "Simulation not found"),
+        ("state, reason, canary", simulations['sim_run'][:3], ('cancelled', "Wrong corner list", 'cancelled')),
+        ("others untouched", (simulations['sim_done'][0], simulations['sim_other'][0]), ('finished', 'running')),
+        ("job counts", counts, {'sim_run': {'jobs_cancelled': 3, 'jobs_not_removed': [FINISHED_JOB]},
+                                'sim_sub': {'jobs_cancelled': 1, 'jobs_not_removed': []}}),
+        ("job statuses", [jobs[j] for j in (101, 102, 103, 104, FINISHED_JOB, 201, 401)],
+         ['cancelled', 'cancelled', 'cancelled', 'completed', 'running', 'cancelled', 'running']),
+        ("retrying job not sent to nbjob", "103" in removed_ids, False),
+        ("running/waiting recounted", (simulations['sim_run'][3:], simulations['sim_sub'][3:]), ((1, 0), (0, 0))),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def test_cancel_endpoints():
+    """Test the cancel endpoint status codes and a submission cancelled before gen"""
+    print("\n" + "="*60)
+    print("TEST 4: /api/simulations/<sim_id>/cancel, /api/submit")
+    print("="*60)
+
+    from tornado.httpclient import AsyncHTTPClient
+    from tornado.httpserver import HTTPServer
+    from tornado.testing import bind_unused_port
+
+    tmp_dir = tempfile.mkdtemp(prefix="wkp_cancel_http_")
+    db_path = os.path.join(tmp_dir, "webapp.db")
+    server = load_server(db_path)
+    patched = dict((name, getattr(server, name)) for name in
+                   ('get_stage_executor', 'create_work_directory', 'PREFLIGHT_VALIDATION'))
+    executor = StageExecutor({'gen': 1, 'run': 1, 'cxl': 1})
+    gate = threading.Event()
+    old_path = install_nbjob(tmp_dir)
+
+    def work_directory(project, voltage_domain, sim_id):
+        work_dir = os.path.join(tmp_dir, "runs", sim_id)
+        os.makedirs(work_dir)
+        return work_dir
+
+    submission = {
+        "project": "gpio", "voltage_domain": "1p1v", "corners": ["TT"],
+        "temperatures": ["85"], "temp_85_voltages": "v1nom_v2nom", "canary": False
+    }
+
+    async def scenario():
+        sock, port = bind_unused_port()
+        http = HTTPServer(server.make_app())
+        http.add_sockets([sock])
+        client = AsyncHTTPClient()
+        url = "http://127.0.0.1:{0}".format(port)
+
+        def post(path, body):
+            return client.fetch(url + path, method='POST', body=json.dumps(body), raise_error=False)
+
+        codes = {}
+        for sim_id in ("sim_done", "sim_other", "sim_none"):
+            codes[sim_id] = (await post("/api/simulations/{0}/cancel".format(sim_id), {})).code
+        codes['bulk_empty'] = (await post("/api/simulations/cancel", {"sim_ids": []})).code
+
+        # The only gen slot is busy: the submission waits in the gen queue
+        blocker = executor.submit('gen', gate.wait, 30, label="blocker")
+        while not executor.get_stats()['gen']['active']:
+            await asyncio.sleep(0.01)
+        submit = asyncio.ensure_future(post("/api/submit", submission))
+        while not executor.get_stats()['gen']['queued_tasks'] and not submit.done():
+            await asyncio.sleep(0.01)
+        sim_id = query(db_path, "SELECT sim_id FROM simulations WHERE state = 'created'")[0][0]
+        cancel = await post("/api/simulations/{0}/cancel".format(sim_id), {"reason": "Changed my mind"})
+        response = await submit
+        gate.set()
+        await asyncio.wrap_future(blocker)
+
+        http.stop()
+        client.close()
+        return codes, sim_id, cancel, response
+
+    try:
+        server.get_stage_executor = lambda: executor
+        server.create_work_directory = work_directory
+        server.PREFLIGHT_VALIDATION = False
+        add_simulation(db_path, "sim_done", 'finished')
+        add_simulation(db_path, "sim_other", 'running', username="someone_else")
+
+        codes, sim_id, cancel, response = asyncio.run(asyncio.wait_for(scenario(), 60))
+        stats = executor.get_stats()['gen']
+        state = query(db_path, "SELECT state, cancel_reason FROM simulations WHERE sim_id = ?", (sim_id,))[0]
+    finally:
+        gate.set()
+        os.environ['PATH'] = old_path
+        for name, value in patched.items():
+            setattr(server, name, value)
+        server.DB_PATH = config.DB_PATH
+        executor.shutdown()
+        shutil.rmtree(tmp_dir)
+
+    checks = [
+        ("finished simulation: 409", codes['sim_done'], 409),
+        ("other user's simulation: 404", codes['sim_other'], 404),
+        ("unknown simulation: 404", codes['sim_none'], 404),
+        ("empty bulk request: 400", codes['bulk_empty'], 400),
+        ("cancel during submission", (cancel.code, json.loads(cancel.body)['stage_tasks_released']), (200, 1)),
+        ("submission answers 409", (response.code, json.loads(response.body)['status']), (409, 'cancelled')),
+        ("gen task released, never run", (stats['cancelled'], stats['completed']), (1, 1)),
+        ("simulation stays cancelled", state, ('cancelled', "Changed my mind")),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def test_stop_queued_jobs():
+    """Test that stop-on-failure removes the queued jobs on the 'cxl' pool"""
+    print("\n" + "="*60)
+    print("TEST 5: BackgroundMonitor.stop_queued_jobs()")
+    print("="*60)
+
+    import background_monitor
+
+    tmp_dir = tempfile.mkdtemp(prefix="wkp_stop_")
+    db_path = os.path.join(tmp_dir, "webapp.db")
+    server = load_server(db_path)
+    real_executor = background_monitor.get_stage_executor
+    executor = StageExecutor({'cxl': 1})
+    gate = threading.Event()
+    old_path = install_nbjob(tmp_dir)
+    try:
+        background_monitor.get_stage_executor = lambda: executor
+        monitor = background_monitor.BackgroundMonitor(db_path)
+        add_simulation(db_path, "sim_stop", 'running',
+                       jobs=[(501, 'error'), (502, 'running'), (503, 'waiting'), (504, 'waiting')])
+
+        # The cxl worker is busy: the stop is queued and the caller returns at once
+        executor.submit('cxl', gate.wait, 10, label="other")
+        task = monitor.stop_queued_jobs("sim_stop", "1 job(s) failed")
+        again = monitor.stop_queued_jobs("sim_stop", "1 job(s) failed")
+        queued_statuses = [row[0] for row in query(db_path, 'SELECT status FROM job_tracking ORDER BY job_id')]
+        called_early = os.path.exists(os.path.join(tmp_dir, "calls"))
+        gate.set()
+        removed = task.result(timeout=10)
+        executor.shutdown()
+
+        statuses = [row[0] for row in query(db_path, 'SELECT status FROM job_tracking ORDER BY job_id')]
+        with open(os.path.join(tmp_dir, "calls")) as f:
+            removed_ids = [arg for line in f.read().splitlines() for arg in line.split()[3:]]
+    finally:
+        gate.set()
+        os.environ['PATH'] = old_path
+        background_monitor.get_stage_executor = real_executor
+        server.DB_PATH = config.DB_PATH
+        executor.shutdown()
+        shutil.rmtree(tmp_dir)
+
+    checks = [
+        ("one stop in flight per simulation", again is task, True),
+        ("nothing removed before the cxl worker runs", (called_early, queued_statuses),
+         (False, ['error', 'running', 'waiting', 'waiting'])),
+        ("waiting jobs removed", removed, [503, 504]),
+        ("only waiting jobs sent to nbjob", removed_ids, ["503", "504"]),
+        ("removed jobs recorded cancelled", statuses, ['error', 'running', 'cancelled', 'cancelled']),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("\n" + "="*60)
+    print("CANCELLATION TESTS")
+    print("="*60)
+
+    tests = [
+        ("remove_netbatch_jobs_batched", test_remove_batched),
+        ("cancel_queued", test_cancel_queued),
+        ("cancel database", test_cancel_database),
+        ("cancel endpoints", test_cancel_endpoints),
+        ("stop_queued_jobs", test_stop_queued_jobs),
+    ]
+
+    results = []
+
+    for name, test_func in tests:
+        try:
+            passed = test_func()
+        except AssertionError:
+            passed = False
+        results.append((name, passed))
+
+    # Summary
+    print("\n" + "="*60)
+    print("TEST SUMMARY")
+    print("="*60)
+
+    total_passed = sum(1 for _, passed in results if passed)
+    total_tests = len(results)
+
+    for name, passed in results:
+        status = "✓ PASSED" if passed else "✗ FAILED"
+        print(f"{status}: {name}")
+
+    print(f"\nOverall: {total_passed}/{total_tests} test suites passed")
+
+    if total_passed == total_tests:
+        print("\n🎉 All tests passed!")
+        return 0
+    else:
+        print(f"\n⚠️  {total_tests - total_passed} test suite(s) failed")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Test script for the Python extraction engine.
+Checks that PVT plan order and report files match Pai Ho's ver03 shell stages.
+"""
+
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import REPO_ROOT
+from extraction_engine import (
+    load_stage_config,
+    build_pvt_plan,
+    point_directory,
+    find_measurement_files,
+    build_point_report,
+    run_extraction,
+    run_sorting,
+    extract_jobs,
+    PARTIAL_CREPORT
+)
+from results_store import ResultsStore, init_results_table
+from report_container import ReportReader, pack_reports, export_reports, CONTAINER_NAME
+
+SCRIPT_PATH = str(REPO_ROOT / "gpio" / "1p1v" / "dependencies" / "scripts" /
+                  "simulation_script" / "auto_pvt" / "ver03")
+GPIO_DOMAIN = REPO_ROOT / "gpio" / "1p1v"
+
+
+def make_work_dir():
+    """Create a temporary work_dir with the gpio/1p1v config and template"""
+    work_dir = tempfile.mkdtemp(prefix="wkp_ext_")
+    shutil.copy(str(GPIO_DOMAIN / "config.cfg"), work_dir)
+    shutil.copytree(str(GPIO_DOMAIN / "template"), os.path.join(work_dir, "template"))
+    return work_dir
+
+
+def write_mt0(path, headers, rows, title="* sim_tx"):
+    """Write a measurement file in the layout produced by finesim/primesim"""
+    with open(path, 'w') as f:
+        f.write("$DATA1 SOURCE='PrimeSim' VERSION='2023.12'\n")
+        f.write(".TITLE '{0}'\n".format(title))
+        f.write("  ".join(headers) + "\n")
+        for row in rows:
+            f.write("   ".join(row) + "  \n")
+
+
+def test_pvt_plan_order():
+    """Test plan order matches the checked-in gpio creport"""
+    print("\n" + "="*60)
+    print("TEST 1: build_pvt_plan()")
+    print("="*60)
+
+    work_dir = make_work_dir()
+    try:
+        config = load_stage_config(work_dir, SCRIPT_PATH)
+        plan = build_pvt_plan(config)
+    finally:
+        shutil.rmtree(work_dir)
+
+    report_dir = GPIO_DOMAIN / "00bkp_202510301443" / "report"
+    expected_names = sorted(f[len("report_"):-len(".txt")] for f in os.listdir(str(report_dir))
+                            if f.startswith("report_"))
+
+    checks = [
+        ("point count", len(plan), len(expected_names)),
+        ("point names", sorted(p['name'] for p in plan), expected_names),
+        ("first point", plan[0]['name'], "TT_typical_m40_v1min_v2min"),
+        ("first temp", plan[0]['temp'], "-40"),
+        ("last point", plan[-1]['name'], "TT_typical_100_v1nom_v2nom"),
+        ("voltage split", (plan[1]['lv1'], plan[1]['lv2']), ("min", "max")),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def test_point_report_format():
+    """Test report.txt format for normal and alter extraction"""
+    print("\n" + "="*60)
+    print("TEST 2: build_point_report()")
+    print("="*60)
+
+    headers = ["ioh", "rwkpull0", "alter#"]
+    tmp_dir = tempfile.mkdtemp(prefix="wkp_mt0_")
+    try:
+        write_mt0(os.path.join(tmp_dir, "sim_tx.mt0"), headers, [["1.0e-04", "7.3e+03", "1.0"]])
+        normal = build_point_report(find_measurement_files(tmp_dir, "sim_tx", False, "primesim"), False)
+
+        for n in range(2):
+            write_mt0(os.path.join(tmp_dir, "sim_tx_a{0}.mt0".format(n)), headers,
+                      [["{0}.0e-04".format(n), "7.3e+03", "{0}.0".format(n + 1)]],
+                      title="vccn = 'sweep {0}' long alter title".format(n))
+        alter = build_point_report(find_measurement_files(tmp_dir, "sim_tx", True, "primesim"), True, swpl=9)
+
+        wide_headers = ["m{0}".format(i) for i in range(130)]
+        write_mt0(os.path.join(tmp_dir, "sim_tx.mt0"), wide_headers, [["1"] * 130])
+        wide = build_point_report(find_measurement_files(tmp_dir, "sim_tx", False, "primesim"), False)
+    finally:
+        shutil.rmtree(tmp_dir)
+
+    checks = [
+        ("normal header", normal[0], "ioh\trwkpull0\talter#" + "\t" * 99),
+        ("normal row", normal[1], "1.0e-04\t7.3e+03\t1.0" + "\t" * 99),
+        ("alter header", alter[0], "swp\tioh\trwkpull0\talter#" + "\t" * 99),
+        ("alter title truncated", alter[1].split("\t")[0], "vccn = sw"),
+        ("alter rows", len(alter), 3),
+        ("wide header kept", len(wide[0].split("\t")), 130),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def test_run_extraction():
+    """Test full ext stage over a synthetic gpio sweep"""
+    print("\n" + "="*60)
+    print("TEST 3: run_extraction()")
+    print("="*60)
+
+    work_dir = make_work_dir()
+    try:
+        plan = build_pvt_plan(load_stage_config(work_dir, SCRIPT_PATH))
+        for point in plan[:-1]:  # leave one point without results
+            point_dir = point_directory(work_dir, point)
+            os.makedirs(point_dir)
+            write_mt0(os.path.join(point_dir, "sim_tx.mt0"), ["ioh"], [["1.0"]])
+            open(os.path.join(point_dir, "sim_tx.fsdb"), 'w').close()
+
+        summary = run_extraction(work_dir, SCRIPT_PATH, max_workers=2, pack=True)
+        reports = os.listdir(os.path.join(work_dir, "report"))
+        with ReportReader(os.path.join(work_dir, "report")) as reader:
+            packed = reader.names()
+        waveforms = os.listdir(os.path.join(work_dir, "compiled_waveform"))
+    finally:
+        shutil.rmtree(work_dir)
+
+    checks = [
+        ("extracted", summary['extracted'], len(plan) - 1),
+        ("failed", len(summary['failed']), 1),
+        ("reports packed", len(packed), len(plan) - 1),
+        ("no loose report files", reports, [CONTAINER_NAME]),
+        ("waveform name", "sim_tx_TT_typical_m40_v1min_v2min.fsdb" in waveforms, True),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def test_run_sorting():
+    """Test creport.txt is identical to the checked-in gpio backup"""
+    print("\n" + "="*60)
+    print("TEST 4: run_sorting()")
+    print("="*60)
+
+    bkp_report = GPIO_DOMAIN / "00bkp_202510301443" / "report"
+    work_dir = make_work_dir()
+    try:
+        shutil.copytree(str(bkp_report), os.path.join(work_dir, "report"))
+        os.remove(os.path.join(work_dir, "report", "creport.txt"))
+
+        summary = run_sorting(work_dir, SCRIPT_PATH)
+        with open(summary['creport']) as f:
+            result = f.read()
+    finally:
+        shutil.rmtree(work_dir)
+
+    with open(str(bkp_report / "creport.txt")) as f:
+        expected = f.read()
+
+    checks = [
+        ("creport identical", result == expected, True),
+        ("row count", summary['rows'], len(expected.splitlines()) - 10),
+        ("no missing reports", summary['missing'], []),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def test_incremental_extraction():
+    """Test per-job extraction, results store and partial creport"""
+    print("\n" + "="*60)
+    print("TEST 5: extract_jobs() + ResultsStore")
+    print("="*60)
+
+    work_dir = make_work_dir()
+    db_path = os.path.join(work_dir, "test.db")
+    try:
+        conn = sqlite3.connect(db_path)
+        init_results_table(conn)
+        conn.commit()
+        conn.close()
+        store = ResultsStore(db_path)
+
+        plan = build_pvt_plan(load_stage_config(work_dir, SCRIPT_PATH))
+        for point in plan:
+            point_dir = point_directory(work_dir, point)
+            os.makedirs(point_dir)
+            write_mt0(os.path.join(point_dir, "sim_tx.mt0"), ["ioh"], [["1.0"]])
+
+        # First two jobs complete, plus one directory outside the plan
+        first = [point_directory(work_dir, p) for p in plan[:2]]
+        results = extract_jobs(work_dir, SCRIPT_PATH, first + [os.path.join(work_dir, "XX")])
+        store.record_points("sim_test", results)
+        partial_file = os.path.join(work_dir, "report", PARTIAL_CREPORT)
+        with open(partial_file) as f:
+            partial_rows = len(f.read().splitlines()) - 10
+
+        summary = store.get_summary("sim_test")
+        recorded = store.get_recorded_paths("sim_test")
+
+        # Final stages only extract the remaining points
+        final = run_extraction(work_dir, SCRIPT_PATH, max_workers=2, skip_existing=True)
+        run_sorting(work_dir, SCRIPT_PATH)
+        partial_removed = not os.path.exists(partial_file)
+    finally:
+        shutil.rmtree(work_dir)
+
+    checks = [
+        ("extracted in store", summary['extracted'], 2),
+        ("failed in store", summary['failed'], 1),
+        ("recorded paths", set(first) <= recorded, True),
+        ("partial creport rows", partial_rows, 2),
+        ("final stage skipped", final['skipped'], 2),
+        ("final stage extracted", final['extracted'], len(plan) - 2),
+        ("partial creport removed", partial_removed, True),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def test_report_container():
+    """Test srt from reports.zip and the loose-file exporter"""
+    print("\n" + "="*60)
+    print("TEST 6: report container")
+    print("="*60)
+
+    bkp_report = GPIO_DOMAIN / "00bkp_202510301443" / "report"
+    work_dir = make_work_dir()
+    try:
+        report_dir = os.path.join(work_dir, "report")
+        shutil.copytree(str(bkp_report), report_dir)
+        os.remove(os.path.join(report_dir, "creport.txt"))
+
+        packed = pack_reports(report_dir)
+        remaining = os.listdir(report_dir)
+        summary = run_sorting(work_dir, SCRIPT_PATH)
+        with open(summary['creport']) as f:
+            result = f.read()
+
+        export_dir = os.path.join(work_dir, "exported")
+        exported = export_reports(report_dir, export_dir)
+        identical = all(
+            open(os.path.join(export_dir, name), 'rb').read() == open(str(bkp_report / name), 'rb').read()
+            for name in os.listdir(export_dir)
+        )
+    finally:
+        shutil.rmtree(work_dir)
+
+    with open(str(bkp_report / "creport.txt")) as f:
+        expected = f.read()
+    report_count = len([n for n in os.listdir(str(bkp_report)) if n.startswith("report_")])
+
+    checks = [
+        ("reports packed", packed['total'], report_count),
+        ("loose files removed", remaining, [CONTAINER_NAME]),
+        ("creport identical", result == expected, True),
+        ("exported files", exported, report_count),
+        ("export byte-identical", identical, True),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("\n" + "="*60)
+    print("EXTRACTION ENGINE TESTS")
+    print("="*60)
+
+    tests = [
+        ("build_pvt_plan", test_pvt_plan_order),
+        ("build_point_report", test_point_report_format),
+        ("run_extraction", test_run_extraction),
+        ("run_sorting", test_run_sorting),
+        ("incremental extraction", test_incremental_extraction),
+        ("report container", test_report_container),
+    ]
+
+    results = []
+
+    for name, test_func in tests:
+        try:
+            passed = test_func()
+        except AssertionError:
+            passed = False
+        results.append((name, passed))
+
+    # Summary
+    print("\n" + "="*60)
+    print("TEST SUMMARY")
+    print("="*60)
+
+    total_passed = sum(1 for _, passed in results if passed)
+    total_tests = len(results)
+
+    for name, passed in results:
+        status = "✓ PASSED" if passed else "✗ FAILED"
+        print(f"{status}: {name}")
+
+    print(f"\nOverall: {total_passed}/{total_tests} test suites passed")
+
+    if total_passed == total_tests:
+        print("\n🎉 All tests passed!")
+        return 0
+    else:
+        print(f"\n⚠️  {total_tests - total_passed} test suite(s) failed")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Test script for failure classification and job resubmission.
+Checks the log signatures (synthetic logs and a real NetBatch output file),
+moving a failed attempt aside and resubmitting a point with more memory
+(with a stand-in nbjob on PATH), and the background monitor's retry task
+against a scratch database.
+"""
+
+import sys
+import os
+import json
+import shutil
+import sqlite3
+import asyncio
+import tempfile
+import threading
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import config
+from config import REPO_ROOT
+from extraction_engine import load_stage_config, build_pvt_plan, point_directory
+from failure_classifier import classify_failure, classify_text, FAILURE_CLASSES
+from netbatch_monitor import capture_job_ids_from_log
+from submission_engine import (
+    run_submission,
+    read_job_map,
+    archive_attempt,
+    resubmit_point,
+    replace_job_id
+)
+
+SCRIPT_PATH = str(REPO_ROOT / "gpio" / "1p1v" / "dependencies" / "scripts" /
+                  "simulation_script" / "auto_pvt" / "ver03")
+GPIO_DOMAIN = REPO_ROOT / "gpio" / "1p1v"
+NB_OUTPUT_DIR = REPO_ROOT / "i3c" / "1p1v" / "template"
+
+NB_OUTPUT = "##Jun-16-10:48:53#.apgcp0k601201.altera_png_vp.800670626"
+
+# Stand-in nbjob: records its arguments, prints a job ID
+FAKE_NBJOB = """#!/bin/bash
+n=$(( $(cat "{state}/count" 2>/dev/null || echo 0) + 1 ))
+echo $n > "{state}/count"
+echo "$PWD $*" >> "{state}/calls"
+echo "Your job has been queued (JobID $(( 1700000000 + n )), Class SLES15)"
+"""
+
+LOGS = {
+    'oom': "Reading netlist\nError: Memory allocation failed while building matrix (requested 3.2 GB)\n",
+    'license': "Checking out license...\nError: License checkout failed for feature 'primesim_base'\n",
+    'convergence': "transient analysis\n**error** at time 1.2e-09: timestep too small, abort\n",
+    'netlist': "Parsing sim_tx.sp\nError: cannot open include file '/nfs/models/gone.sp'\n",
+    'host': "writing sim_tx.tr0\nError: Stale NFS file handle\n",
+}
+
+
+def write(path, text):
+    """Write a text file"""
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+def nb_footer(status):
+    """NetBatch output footer box with the given exit status"""
+    return "+----------------+\n| Exit Status    : {0} |\n+----------------+\n".format(status)
+
+
+def test_classify_failure():
+    """Test the failure signatures against synthetic and real logs"""
+    print("\n" + "="*60)
+    print("TEST 1: classify_failure()")
+    print("="*60)
+
+    directory = tempfile.mkdtemp(prefix="wkp_failure_")
+    try:
+        verdicts = {}
+        for name, text in LOGS.items():
+            write(os.path.join(directory, "sim_tx.log"), text)
+            verdicts[name] = classify_failure(directory)
+        os.remove(os.path.join(directory, "sim_tx.log"))
+
+        none = classify_failure(directory)
+        write(os.path.join(directory, "##Jun-16#.host.altera_png_vp.1"), "job stdout\n" + nb_footer(-4))
+        killed = classify_failure(directory)
+        write(os.path.join(directory, "sim_tx.log"), LOGS['oom'])
+        oom_killed = classify_failure(directory)
+        write(os.path.join(directory, "sim_tx.log"), "simulation finished\n")
+        os.remove(os.path.join(directory, "##Jun-16#.host.altera_png_vp.1"))
+        silent = classify_failure(directory)
+    finally:
+        shutil.rmtree(directory)
+
+    real = classify_failure(str(NB_OUTPUT_DIR))
+    with open(str(NB_OUTPUT_DIR / NB_OUTPUT), errors='ignore') as f:
+        real_text = f.read()
+
+    checks = [
+        ("every class recognized", dict((n, v['class']) for n, v in verdicts.items()),
+         dict((n, n) for n in LOGS)),
+        ("detail is the log line", verdicts['license']['detail'],
+         "Error: License checkout failed for feature 'primesim_base'"),
+        ("source log named", verdicts['oom']['source'], "sim_tx.log"),
+        ("transient classes", sorted(n for n, v in verdicts.items() if v['transient']),
+         ['host', 'license', 'oom']),
+        ("no logs is unknown", (none['class'], none['detail']), ('unknown', 'no output files')),
+        ("NetBatch -4 is host", (killed['class'], killed['detail']), ('host', 'Exit Status : -4')),
+        ("OOM wins over -4", (oom_killed['class'], oom_killed['source']), ('oom', 'sim_tx.log')),
+        ("no signature is unknown", silent['class'], 'unknown'),
+        ("successful NetBatch output has no signature", classify_text(real_text), None),
+        ("classes listed", FAILURE_CLASSES[-1], 'unknown'),
+        ("real output directory not transient", real['transient'], False),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def test_resubmit_point():
+    """Test archiving a failed attempt and resubmitting it with more memory"""
+    print("\n" + "="*60)
+    print("TEST 2: archive_attempt() / resubmit_point()")
+    print("="*60)
+
+    work_dir = tempfile.mkdtemp(prefix="wkp_retry_")
+    bin_dir = tempfile.mkdtemp(prefix="wkp_nbjob_")
+    old_path = os.environ.get('PATH', '')
+    try:
+        shutil.copy(str(GPIO_DOMAIN / "config.cfg"), work_dir)
+        shutil.copytree(str(GPIO_DOMAIN / "template"), os.path.join(work_dir, "template"))
+        nbjob = os.path.join(bin_dir, "nbjob")
+        write(nbjob, FAKE_NBJOB.format(state=bin_dir))
+        os.chmod(nbjob, 0o755)
+        os.environ['PATH'] = bin_dir + os.pathsep + old_path
+
+        plan = build_pvt_plan(load_stage_config(work_dir, SCRIPT_PATH))
+        for point in plan[:2]:
+            os.makedirs(point_directory(work_dir, point))
+        directory = point_directory(work_dir, plan[0])
+        write(os.path.join(directory, "sim_tx.sp"), "* testbench\n")
+        os.makedirs(os.path.join(directory, "waves"))
+
+        summary = run_submission(work_dir, SCRIPT_PATH)
+        old_id = summary['jobs'][0]['job_id']
+        write(os.path.join(directory, "sim_tx.log"), LOGS['oom'])
+        write(os.path.join(directory, "sim_tx.mt0"), "partial\n")
+
+        attempt_dir = archive_attempt(directory, "sim_tx", 1)
+        left = sorted(os.listdir(directory))
+        archived = sorted(os.listdir(attempt_dir))
+        after_archive = classify_failure(directory)
+
+        new_id = resubmit_point(work_dir, SCRIPT_PATH, directory, mem=8)
+        replace_job_id(work_dir, old_id, new_id)
+        job_map = read_job_map(work_dir)
+        logged_ids = capture_job_ids_from_log(summary['job_log'])
+        with open(os.path.join(bin_dir, "calls")) as f:
+            calls = [line.split() for line in f.read().splitlines()]
+
+        # nbjob refusing the job
+        write(nbjob, "#!/bin/bash\necho 'Error: qslot closed' >&2\nexit 1\n")
+        refused = resubmit_point(work_dir, SCRIPT_PATH, directory)
+    finally:
+        os.environ['PATH'] = old_path
+        shutil.rmtree(bin_dir)
+        shutil.rmtree(work_dir)
+
+    checks = [
+        ("testbench and subdirectories stay", left, ['attempt_1', 'sim_tx.sp', 'waves']),
+        ("outputs moved", archived, ['sim_tx.log', 'sim_tx.mt0']),
+        ("archived logs not reclassified", after_archive['class'], 'unknown'),
+        ("new job ID", new_id, old_id + 2),
+        ("resubmitted in point directory", calls[-1][0], directory),
+        ("memory class escalated", calls[-1][calls[-1].index('--class') + 1], 'SLES15&&8G&&4C'),
+        ("job_log.txt appended", logged_ids, [j['job_id'] for j in summary['jobs']] + [new_id]),
+        ("job_map.csv points at new job", [j['job_id'] for j in job_map], [new_id, old_id + 1]),
+        ("refused resubmission", refused, None),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def test_retry_failed_jobs():
+    """Test classifying and resubmitting failed jobs off the IOLoop"""
+    print("\n" + "="*60)
+    print("TEST 3: BackgroundMonitor.retry_failed_jobs()")
+    print("="*60)
+
+    import background_monitor
+    from stage_executor import StageExecutor
+
+    tmp_dir = tempfile.mkdtemp(prefix="wkp_retry_db_")
+    db_path = os.path.join(tmp_dir, "webapp.db")
+    bin_dir = os.path.join(tmp_dir, "bin")
+    work_dir = os.path.join(tmp_dir, "run")
+    old_path = os.environ.get('PATH', '')
+    real_db_path = config.DB_PATH
+    real_executor = background_monitor.get_stage_executor
+    executor = StageExecutor({'run': 1, 'cxl': 1})
+    gate = threading.Event()
+    try:
+        # Schema as created by the server (main_tornado initializes DB_PATH on import)
+        config.DB_PATH = db_path
+        import main_tornado
+        main_tornado.DB_PATH = db_path
+        main_tornado.init_db()
+        main_tornado.migrate_db()
+
+        os.makedirs(bin_dir)
+        nbjob = os.path.join(bin_dir, "nbjob")
+        write(nbjob, FAKE_NBJOB.format(state=bin_dir))
+        os.chmod(nbjob, 0o755)
+        os.environ['PATH'] = bin_dir + os.pathsep + old_path
+
+        os.makedirs(work_dir)
+        shutil.copy(str(GPIO_DOMAIN / "config.cfg"), work_dir)
+        shutil.copytree(str(GPIO_DOMAIN / "template"), os.path.join(work_dir, "template"))
+        plan = build_pvt_plan(load_stage_config(work_dir, SCRIPT_PATH))
+        directories = [point_directory(work_dir, point) for point in plan[:2]]
+        for directory, log in zip(directories, (LOGS['oom'], LOGS['convergence'])):
+            os.makedirs(directory)
+            write(os.path.join(directory, "sim_tx.sp"), "* testbench\n")
+            write(os.path.join(directory, "sim_tx.log"), log)
+
+        conn = sqlite3.connect(db_path)
+        conn.execute('''
+            INSERT INTO simulations (sim_id, project, voltage_domain, corner_set, work_dir, username, state,
+                                     netbatch_job_ids, nb_memory)
+            VALUES ('sim_retry', 'gpio', '1p1v', 'custom', ?, 'tester', 'running', '[101, 102]', 4)
+        ''', (work_dir,))
+        conn.executemany('''
+            INSERT INTO job_tracking (sim_id, job_id, directory_path, status) VALUES ('sim_retry', ?, ?, 'error')
+        ''', [(101, directories[0]), (102, directories[1])])
+        conn.commit()
+        conn.close()
+
+        def job_rows():
+            conn = sqlite3.connect(db_path)
+            rows = conn.execute('''
+                SELECT job_id, status, failure_class, attempts, memory_gb FROM job_tracking ORDER BY id
+            ''').fetchall()
+            conn.close()
+            return rows
+
+        background_monitor.get_stage_executor = lambda: executor
+        monitor = background_monitor.BackgroundMonitor(db_path)
+
+        async def scenario():
+            # The run worker is busy: the retry is queued and the poll returns at once
+            executor.submit('run', gate.wait, 10, label="other")
+            handed = monitor.retry_failed_jobs("sim_retry", work_dir)
+            again = monitor.retry_failed_jobs("sim_retry", work_dir)
+            queued = (job_rows(), sorted(os.listdir(directories[0])))
+            gate.set()
+            while any(row[1] == 'retrying' for row in job_rows()):
+                await asyncio.sleep(0.05)
+            return handed, again, queued
+
+        handed, again, queued = asyncio.run(asyncio.wait_for(scenario(), 60))
+
+        rows = job_rows()
+        conn = sqlite3.connect(db_path)
+        history = json.loads(conn.execute("SELECT retry_history FROM job_tracking WHERE id = 1").fetchone()[0])
+        job_ids = json.loads(conn.execute("SELECT netbatch_job_ids FROM simulations").fetchone()[0])
+        conn.close()
+        with open(os.path.join(bin_dir, "calls")) as f:
+            calls = [line.split() for line in f.read().splitlines()]
+        archived = [os.path.isdir(os.path.join(directory, "attempt_1")) for directory in directories]
+    finally:
+        gate.set()
+        os.environ['PATH'] = old_path
+        config.DB_PATH = real_db_path
+        background_monitor.get_stage_executor = real_executor
+        if 'main_tornado' in sys.modules:
+            sys.modules['main_tornado'].DB_PATH = real_db_path
+        executor.shutdown()
+        shutil.rmtree(tmp_dir)
+
+    new_id = 1700000001
+    checks = [
+        ("failed jobs handed over", (handed, again), (2, 0)),
+        ("nothing classified or moved on the loop", queued,
+         ([(101, 'retrying', None, 1, None), (102, 'retrying', None, 1, None)], ['sim_tx.log', 'sim_tx.sp'])),
+        ("oom job resubmitted with more memory", rows[0], (new_id, 'waiting', None, 2, 8)),
+        ("convergence failure is final", rows[1], (102, 'error', 'convergence', 1, None)),
+        ("only the resubmitted attempt archived", archived, [True, False]),
+        ("one nbjob call in the point directory", [(c[0], c[c.index('--class') + 1]) for c in calls],
+         [(directories[0], 'SLES15&&8G&&4C')]),
+        ("retry history", [(h['job_id'], h['failure_class'], h['memory_gb']) for h in history], [(101, 'oom', 8)]),
+        ("simulation job IDs updated", job_ids, [new_id, 102]),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("\n" + "="*60)
+    print("FAILURE CLASSIFICATION TESTS")
+    print("="*60)
+
+    tests = [
+        ("classify_failure", test_classify_failure),
+        ("resubmit_point", test_resubmit_point),
+        ("retry_failed_jobs", test_retry_failed_jobs),
+    ]
+
+    results = []
+
+    for name, test_func in tests:
+        try:
+            passed = test_func()
+        except AssertionError:
+            passed = False
+        results.append((name, passed))
+
+    # Summary
+    print("\n" + "="*60)
+    print("TEST SUMMARY")
+    print("="*60)
+
+    total_passed = sum(1 for _, passed in results if passed)
+    total_tests = len(results)
+
+    for name, passed in results:
+        status = "✓ PASSED" if passed else "✗ FAILED"
+        print(f"{status}: {name}")
+
+    print(f"\nOverall: {total_passed}/{total_tests} test suites passed")
+
+    if total_passed == total_tests:
+        print("\n🎉 All tests passed!")
+        return 0
+    else:
+        print(f"\n⚠️  {total_tests - total_passed} test suite(s) failed")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
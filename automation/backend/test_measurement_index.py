@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Test script for the measurement index.
+Checks indexing two gpio backups, filtered/grouped queries and trends
+across 00bkp_* snapshots.
+"""
+
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import REPO_ROOT
+from results_parser import parse_creport
+from measurement_index import MeasurementIndex, init_measurement_table
+
+GPIO_DOMAIN = REPO_ROOT / "gpio" / "1p1v"
+
+
+def test_measurement_index():
+    """Test indexing two backups, filtered/grouped queries and snapshot trends"""
+    print("\n" + "="*60)
+    print("TEST 1: MeasurementIndex")
+    print("="*60)
+
+    tmp_dir = tempfile.mkdtemp(prefix="wkp_idx_")
+    try:
+        db_path = os.path.join(tmp_dir, "test.db")
+        conn = sqlite3.connect(db_path)
+        init_measurement_table(conn)
+        conn.commit()
+        conn.close()
+
+        index = MeasurementIndex(db_path)
+        written = []
+        for sim_id, name in [("sim_a", "00bkp_202506161234"), ("sim_b", "00bkp_202510301443")]:
+            creport = str(GPIO_DOMAIN / name / "report" / "creport.txt")
+            written.append(index.index_simulation(sim_id, creport, "gpio", "1p1v"))
+        reindexed = index.index_simulation("sim_b", creport, "gpio", "1p1v")
+
+        ssg = index.query({'measurement': ['rwkpull_vih'], 'process': ['SSG'], 'temp': ['-40']},
+                          group_by=['sim_id'])
+        high = index.query({'measurement': ['rwkpull_vih'], 'process': ['SSG'], 'temp': ['-40']},
+                           min_value=ssg['rows'][0][-2], group_by=['sim_id'])
+        rows = index.query({'sim_id': ['sim_b'], 'measurement': ['ioh']}, limit=5)
+
+        unknown_column = False
+        try:
+            index.query({'value; DROP TABLE measurements': ['x']})
+        except ValueError:
+            unknown_column = True
+        rejected = []
+        for selection in [({'corner': ['SSG']}, None), ({'process': ['SSG']}, '1.5')]:
+            try:
+                MeasurementIndex.validate_filters(selection[0], min_value=selection[1])
+            except ValueError as e:
+                rejected.append(str(e))
+        valid = MeasurementIndex.validate_filters({'process': ['SSG'], 'temp': []}, 1.5, 2)
+        indexed = index.get_indexed_sims()
+
+        # Snapshots kept in the voltage domain directory, in time order
+        domain_dir = os.path.join(tmp_dir, "1p1v")
+        for name in ["00bkp_202510301443", "00bkp_202506161234", "not_a_backup"]:
+            os.makedirs(os.path.join(domain_dir, name, "report"))
+            shutil.copy(creport, os.path.join(domain_dir, name, "report", "creport.txt"))
+        snapshots = index.index_snapshots("gpio", "1p1v", domain_dir)
+        again = index.index_snapshots("gpio", "1p1v", domain_dir)
+        point = {'process': 'SSG', 'temp': '-40', 'v1': 'max', 'v2': 'min'}
+        trend = index.trend("gpio", "1p1v", "rwkpull_vih", point)
+
+        unknown_point = False
+        try:
+            index.trend("gpio", "1p1v", "rwkpull_vih", {'corner': 'SSG'})
+        except ValueError:
+            unknown_point = True
+    finally:
+        shutil.rmtree(tmp_dir)
+
+    expected = parse_creport(str(GPIO_DOMAIN / "00bkp_202510301443" / "report" / "creport.txt"))
+    ssg_rows = [r for r in expected['rows'] if r['process'] == 'SSG' and r['temp'] == -40.0]
+
+    checks = [
+        ("rows written", written[1], reindexed),
+        ("re-index replaces rows", indexed, ['sim_a', 'sim_b']),
+        ("grouped per sim", [r[0] for r in ssg['rows']], ['sim_a', 'sim_b']),
+        ("group count", ssg['rows'][1][1], len(ssg_rows)),
+        ("group max", ssg['rows'][1][3], max(r['rwkpull_vih'] for r in ssg_rows)),
+        ("value filter", all(r[1] >= 1 for r in high['rows']), True),
+        ("row limit", (len(rows['rows']), rows['truncated']), (5, True)),
+        ("unknown column rejected", unknown_column, True),
+        ("selection validated without a query", (rejected, valid),
+         (["Unknown column: corner", "min_value must be a number"], None)),
+        ("snapshots indexed once", (snapshots, again), (["00bkp_202506161234", "00bkp_202510301443"], [])),
+        ("trend in time order", [(r[0], r[2]) for r in trend['rows']],
+         [("gpio/1p1v/00bkp_202506161234", '2025-06-16 12:34'), ("sim_a", '2025-06-16 12:34'),
+          ("gpio/1p1v/00bkp_202510301443", '2025-10-30 14:43'), ("sim_b", '2025-10-30 14:43')]),
+        ("trend value", trend['rows'][-1][3:5],
+         [1, [r for r in ssg_rows if r['v1'] == 'max' and r['v2'] == 'min'][0]['rwkpull_vih']]),
+        ("unknown PVT column rejected", unknown_point, True),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("\n" + "="*60)
+    print("MEASUREMENT INDEX TESTS")
+    print("="*60)
+
+    tests = [
+        ("MeasurementIndex", test_measurement_index),
+    ]
+
+    results = []
+
+    for name, test_func in tests:
+        try:
+            passed = test_func()
+        except AssertionError:
+            passed = False
+        results.append((name, passed))
+
+    # Summary
+    print("\n" + "="*60)
+    print("TEST SUMMARY")
+    print("="*60)
+
+    total_passed = sum(1 for _, passed in results if passed)
+    total_tests = len(results)
+
+    for name, passed in results:
+        status = "✓ PASSED" if passed else "✗ FAILED"
+        print(f"{status}: {name}")
+
+    print(f"\nOverall: {total_passed}/{total_tests} test suites passed")
+
+    if total_passed == total_tests:
+        print("\n🎉 All tests passed!")
+        return 0
+    else:
+        print(f"\n⚠️  {total_tests - total_passed} test suite(s) failed")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
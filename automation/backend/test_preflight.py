@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Test script for the pre-flight include validator.
+Checks the include graph walk (nested .inc, .lib sections, gen_tb.pl corner
+substitution), error/warning reporting and the file-identity cache.
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import REPO_ROOT
+from preflight import parse_spice_file, validate_testbench, validate_work_dir, get_preflight_cache
+
+SCRIPT_PATH = str(REPO_ROOT / "gpio" / "1p1v" / "dependencies" / "scripts" /
+                  "simulation_script" / "auto_pvt" / "ver03")
+GPIO_DOMAIN = REPO_ROOT / "gpio" / "1p1v"
+
+MODEL_VAR = "DP_HSPICE_MODEL"
+
+
+def write(path, text):
+    """Write a text file, creating its directory"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+def make_tree(root):
+    """Template referencing a model library, nested includes and option libraries"""
+    write(os.path.join(root, "models", "model.lib"),
+          ".lib TT\n.inc 'tt.sp'\n.endl TT\n.lib FFG\n.inc 'ffg.sp'\n.endl FFG\n")
+    write(os.path.join(root, "models", "tt.sp"), "* tt\n")
+    write(os.path.join(root, "models", "ffg.sp"), "* ffg\n")
+    write(os.path.join(root, "lib", "opt.lib"),
+          ".LIB default\n.param x=1\n.ENDL\n.lib fast\n.include \"slew_fast.sp\"\n.endl\n")
+    write(os.path.join(root, "lib", "nested.sp"), ".lib 'opt.lib' fast\n")
+    write(os.path.join(root, "template", "sim_tx.sp"), "\n".join([
+        ".title test",
+        ".lib \"${0}\" TT".format(MODEL_VAR),
+        ".temp 100",
+        ".inc \"../lib/nested.sp\"",
+        ".lib \"../lib/opt.lib\"default",
+        "* .inc \"/nowhere/commented_out.sp\"",
+        ".lib \"$WKP_PREFLIGHT_UNSET/x.lib\" TT",
+        ".end",
+    ]) + "\n")
+
+
+def plan_of(corners):
+    """Minimal build_pvt_plan()-like points for the given corners"""
+    return [{'corner': c, 'extraction': 'typical', 'temp_dir': 'm40', 'lv1': 'nom', 'lv2': 'nom', 'lv3': 'NA'}
+            for c in corners]
+
+
+def test_validate_testbench():
+    """Test include graph errors, warnings and the identity cache"""
+    print("\n" + "="*60)
+    print("TEST 1: validate_testbench()")
+    print("="*60)
+
+    root = tempfile.mkdtemp(prefix="wkp_preflight_")
+    old_model = os.environ.get(MODEL_VAR)
+    os.environ[MODEL_VAR] = os.path.join(root, "models", "model.lib")
+    os.environ.pop("WKP_PREFLIGHT_UNSET", None)
+    cache = get_preflight_cache()
+    try:
+        make_tree(root)
+        testbench = os.path.join(root, "template", "sim_tx.sp")
+        config = {'supply2': 'NA', 'supply3': 'NA'}
+        parsed = parse_spice_file(os.path.join(root, "lib", "opt.lib"))
+
+        missing_slew = validate_testbench(testbench, plan_of(['TT', 'FFG']), config, workers=4)
+        write(os.path.join(root, "lib", "slew_fast.sp"), "* fast\n")
+        cache.clear()
+        before = cache.get_stats()
+        clean = validate_testbench(testbench, plan_of(['TT', 'FFG']), config, workers=4)
+        first = cache.get_stats()
+        repeat = validate_testbench(testbench, plan_of(['TT', 'FFG']), config, workers=4)
+        second = cache.get_stats()
+        write(os.path.join(root, "lib", "nested.sp"), ".lib 'opt.lib' fast\n.inc 'gone.sp'\n")
+        changed = validate_testbench(testbench, plan_of(['TT']), config, workers=4)
+        no_section = validate_testbench(testbench, plan_of(['TT', 'SSG']), config, workers=4)
+        strict = validate_testbench(testbench, plan_of(['TT']), config, require_env=True)
+    finally:
+        if old_model is None:
+            os.environ.pop(MODEL_VAR, None)
+        else:
+            os.environ[MODEL_VAR] = old_model
+        shutil.rmtree(root)
+
+    checks = [
+        ("sections parsed", sorted(parsed['sections']), ['DEFAULT', 'FAST']),
+        ("section body", [r[1] for r in parsed['sections']['FAST']], ['slew_fast.sp']),
+        ("nested missing file", missing_slew['errors'],
+         ["opt.lib:5: missing file {0}".format(os.path.join(root, "lib", "slew_fast.sp"))]),
+        ("complete tree passes", clean['ok'], True),
+        ("unset variable warns", [w.split(': ')[1].split()[0] for w in clean['warnings']], ['WKP_PREFLIGHT_UNSET']),
+        ("distinct files", clean['files'], 6),
+        ("first run parses", first['misses'] - before['misses'], 7),
+        ("repeat run is cached", (second['hits'] - first['hits'], second['misses'] - first['misses']), (8, 0)),
+        ("changed file re-read", changed['errors'],
+         ["nested.sp:2: missing file {0}".format(os.path.join(root, "lib", "gone.sp"))]),
+        ("missing corner section", no_section['errors'][0].split(' (')[0],
+         "sim_tx.sp:2: section SSG not found in {0}".format(os.path.join(root, "models", "model.lib"))),
+        ("available sections listed", no_section['errors'][0].endswith("(sections: FFG, TT)"), True),
+        ("unset variable rejected when required", strict['ok'], False),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def test_validate_work_dir():
+    """Test the gpio/1p1v template against the farm paths it references"""
+    print("\n" + "="*60)
+    print("TEST 2: validate_work_dir()")
+    print("="*60)
+
+    work_dir = tempfile.mkdtemp(prefix="wkp_preflight_")
+    old_model = os.environ.pop("DP_HSPICE_MODEL", None)
+    try:
+        shutil.copy(str(GPIO_DOMAIN / "config.cfg"), work_dir)
+        shutil.copytree(str(GPIO_DOMAIN / "template"), os.path.join(work_dir, "template"))
+        with open(os.path.join(work_dir, "template", "sim_tx.sp")) as f:
+            active = [line for line in f if line.lstrip().lower().startswith(('.inc', '.lib'))]
+        result = validate_work_dir(work_dir, SCRIPT_PATH)
+    finally:
+        if old_model is not None:
+            os.environ["DP_HSPICE_MODEL"] = old_model
+        shutil.rmtree(work_dir)
+
+    # The farm paths only exist on site; elsewhere every one of them is missing
+    farm = os.path.isdir("/nfs/site/disks/km6_io_22")
+
+    checks = [
+        ("model library warned", [w.split(': ')[1].split()[0] for w in result['warnings']], ['DP_HSPICE_MODEL']),
+        ("model sections listed", result['warnings'][0].endswith("(sections FFAG, FFG, FFG_SSG, FSG, SFG, SSAG, SSG, SSG_FFG, TT) not checked"), True),
+        ("one error per missing reference", farm or len(result['errors']) == len(active) - 1, True),
+        ("errors name the template line", farm or all(e.startswith("sim_tx.sp:") for e in result['errors']), True),
+        ("rejected", farm or not result['ok'], True),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("\n" + "="*60)
+    print("PRE-FLIGHT VALIDATION TESTS")
+    print("="*60)
+
+    tests = [
+        ("validate_testbench", test_validate_testbench),
+        ("validate_work_dir", test_validate_work_dir),
+    ]
+
+    results = []
+
+    for name, test_func in tests:
+        try:
+            passed = test_func()
+        except AssertionError:
+            passed = False
+        results.append((name, passed))
+
+    # Summary
+    print("\n" + "="*60)
+    print("TEST SUMMARY")
+    print("="*60)
+
+    total_passed = sum(1 for _, passed in results if passed)
+    total_tests = len(results)
+
+    for name, passed in results:
+        status = "✓ PASSED" if passed else "✗ FAILED"
+        print(f"{status}: {name}")
+
+    print(f"\nOverall: {total_passed}/{total_tests} test suites passed")
+
+    if total_passed == total_tests:
+        print("\n🎉 All tests passed!")
+        return 0
+    else:
+        print(f"\n⚠️  {total_tests - total_passed} test suite(s) failed")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test script for the parsed-creport cache.
+Checks cache hits, file-identity invalidation, spec-limit versions and
+eviction against the checked-in gpio backups.
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import REPO_ROOT
+from results_cache import ResultsCache
+from results_parser import parse_creport, analyze_results
+
+GPIO_DOMAIN = REPO_ROOT / "gpio" / "1p1v"
+
+
+def test_results_cache():
+    """Test hits, file-identity invalidation, spec-limit versions and eviction"""
+    print("\n" + "="*60)
+    print("TEST 1: ResultsCache")
+    print("="*60)
+
+    tmp_dir = tempfile.mkdtemp(prefix="wkp_cache_")
+    try:
+        paths = []
+        for name in ["00bkp_202506161234", "00bkp_202510301443"]:
+            path = os.path.join(tmp_dir, name + "_creport.txt")
+            shutil.copy(str(GPIO_DOMAIN / name / "report" / "creport.txt"), path)
+            paths.append(path)
+
+        cache = ResultsCache(max_entries=1, max_mb=64)
+        first = cache.get_parsed(paths[0])
+        second = cache.get_parsed(paths[0])
+
+        version = cache.spec_version()
+        computed = []
+        analysis = lambda: computed.append(1) or analyze_results(first)
+        first_analysis = cache.get_analysis(paths[0], version, analysis)
+        second_analysis = cache.get_analysis(paths[0], version, analysis)
+        cache.put_response(paths[0], version, '{"cached": true}')
+        cached_body = cache.get_response(paths[0], version)
+        cache.invalidate_spec_limits()
+        after_invalidate = cache.get_response(paths[0], cache.spec_version())
+        cache.get_analysis(paths[0], cache.spec_version(), analysis)
+        stale_put = cache.put_response(paths[0], version, '{"stale": true}')
+        stale_body = cache.get_response(paths[0], version)
+
+        # Rewriting the creport changes its identity
+        with open(paths[0], 'a') as f:
+            f.write("\n")
+        reparsed = cache.get_parsed(paths[0])
+
+        cache.get_parsed(paths[1])  # evicts paths[0] (max_entries=1)
+        stats = cache.get_stats()
+    finally:
+        shutil.rmtree(tmp_dir)
+
+    checks = [
+        ("parse matches parser", first == parse_creport(str(GPIO_DOMAIN / "00bkp_202506161234" / "report" / "creport.txt")), True),
+        ("second lookup is cached object", second is first, True),
+        ("analysis cached per version", (second_analysis is first_analysis, len(computed)), (True, 2)),
+        ("response cached", cached_body, '{"cached": true}'),
+        ("spec change drops response", after_invalidate, None),
+        ("old version not stored", stale_put is None and stale_body is None, True),
+        ("rewritten file re-parsed", reparsed is not first, True),
+        ("hits/misses", (stats['hits'], stats['misses']), (1, 3)),
+        ("evicted to max_entries", (stats['entries'], stats['evictions']), (1, 1)),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("\n" + "="*60)
+    print("RESULTS CACHE TESTS")
+    print("="*60)
+
+    tests = [
+        ("ResultsCache", test_results_cache),
+    ]
+
+    results = []
+
+    for name, test_func in tests:
+        try:
+            passed = test_func()
+        except AssertionError:
+            passed = False
+        results.append((name, passed))
+
+    # Summary
+    print("\n" + "="*60)
+    print("TEST SUMMARY")
+    print("="*60)
+
+    total_passed = sum(1 for _, passed in results if passed)
+    total_tests = len(results)
+
+    for name, passed in results:
+        status = "✓ PASSED" if passed else "✗ FAILED"
+        print(f"{status}: {name}")
+
+    print(f"\nOverall: {total_passed}/{total_tests} test suites passed")
+
+    if total_passed == total_tests:
+        print("\n🎉 All tests passed!")
+        return 0
+    else:
+        print(f"\n⚠️  {total_tests - total_passed} test suite(s) failed")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test script for run-to-run result diffs.
+Checks PVT row alignment, deltas, flags, one-sided rows and paging.
+"""
+
+import sys
+import os
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import REPO_ROOT
+from results_parser import parse_creport
+from results_sidecar import columns_from_parsed, np
+from results_diff import diff_columns
+
+GPIO_DOMAIN = REPO_ROOT / "gpio" / "1p1v"
+
+
+def test_results_diff():
+    """Test PVT row alignment, deltas, flags, one-sided rows and paging"""
+    print("\n" + "="*60)
+    print("TEST 1: results diff")
+    print("="*60)
+
+    if np is None:
+        print("⚠️  NumPy not installed, diff endpoint disabled - skipping")
+        return True
+
+    parsed = parse_creport(str(GPIO_DOMAIN / "00bkp_202510301443" / "report" / "creport.txt"))
+    rows = [dict(r) for r in parsed['rows']]
+
+    # New run: reversed row order, first row dropped, one row added,
+    # one value 10% higher and one measurement error
+    changed = [dict(r) for r in reversed(rows[1:])]
+    changed[0]['rwkpull_vih'] *= 1.1
+    changed[1]['ioh'] = 'error'
+    extra = dict(rows[0], process='XX')
+    changed.append(extra)
+
+    base = columns_from_parsed(parsed)
+    new = columns_from_parsed(dict(parsed, rows=changed, total_corners=len(changed)))
+
+    same = diff_columns(base, base)
+    diff = diff_columns(base, new)
+    flagged = diff_columns(base, new, flagged_only=True)
+    page = diff_columns(base, new, offset=5, limit=3)
+    loose = diff_columns(base, new, rel_threshold=0.2)
+
+    by_row = dict((r['row_a'], r) for r in diff['rows'])
+    raised = by_row[len(rows) - 1]
+    errored = by_row[len(rows) - 2]
+    column = diff['measurements'].index('rwkpull_vih')
+
+    checks = [
+        ("identical runs", (same['matched'], same['flagged_count']), (len(rows), 0)),
+        ("rows aligned", (diff['matched'], raised['row_b']), (len(rows) - 1, 0)),
+        ("one-sided rows", (diff['only_a'][0]['process'], diff['only_b'][0]['process']),
+         (rows[0]['process'], 'XX')),
+        ("relative delta", round(raised['rel'][column], 6), 0.1),
+        ("absolute delta", raised['delta'][column], changed[0]['rwkpull_vih'] - rows[-1]['rwkpull_vih']),
+        ("flags", (raised['flags'], errored['flags']), (['rwkpull_vih'], ['ioh'])),
+        ("flagged only", [r['row_a'] for r in flagged['rows']], [len(rows) - 2, len(rows) - 1]),
+        ("page", ([r['row_a'] for r in page['rows']], page['total_rows']), ([6, 7, 8], len(rows) - 1)),
+        ("threshold", loose['flagged_count'], 1),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("\n" + "="*60)
+    print("RESULTS DIFF TESTS")
+    print("="*60)
+
+    tests = [
+        ("results diff", test_results_diff),
+    ]
+
+    results = []
+
+    for name, test_func in tests:
+        try:
+            passed = test_func()
+        except AssertionError:
+            passed = False
+        results.append((name, passed))
+
+    # Summary
+    print("\n" + "="*60)
+    print("TEST SUMMARY")
+    print("="*60)
+
+    total_passed = sum(1 for _, passed in results if passed)
+    total_tests = len(results)
+
+    for name, passed in results:
+        status = "✓ PASSED" if passed else "✗ FAILED"
+        print(f"{status}: {name}")
+
+    print(f"\nOverall: {total_passed}/{total_tests} test suites passed")
+
+    if total_passed == total_tests:
+        print("\n🎉 All tests passed!")
+        return 0
+    else:
+        print(f"\n⚠️  {total_tests - total_passed} test suite(s) failed")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
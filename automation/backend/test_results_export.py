@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test script for streamed result exports.
+Checks CSV/NDJSON/NPZ exports of a creport and of measurement index
+selections.
+"""
+
+import sys
+import os
+import io
+import csv
+import json
+import shutil
+import sqlite3
+import tempfile
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import REPO_ROOT
+from results_parser import parse_creport
+from measurement_index import MeasurementIndex, init_measurement_table
+from results_sidecar import np
+from results_export import export_creport, export_measurements
+
+GPIO_DOMAIN = REPO_ROOT / "gpio" / "1p1v"
+
+
+def test_results_export():
+    """Test streamed CSV/NDJSON/NPZ exports of a creport and of index selections"""
+    print("\n" + "="*60)
+    print("TEST 1: streamed export")
+    print("="*60)
+
+    creport = str(GPIO_DOMAIN / "00bkp_202510301443" / "report" / "creport.txt")
+    parsed = parse_creport(creport)
+    columns = [h for h in dict.fromkeys(parsed['headers']) if h]
+
+    csv_chunks = list(export_creport(creport, 'csv', chunk_rows=10))
+    csv_rows = list(csv.reader(io.StringIO(''.join(csv_chunks))))
+    ndjson_rows = [json.loads(line) for line in ''.join(export_creport(creport, 'ndjson')).splitlines()]
+
+    tmp_dir = tempfile.mkdtemp(prefix="wkp_export_")
+    try:
+        db_path = os.path.join(tmp_dir, "test.db")
+        conn = sqlite3.connect(db_path)
+        init_measurement_table(conn)
+        conn.commit()
+        conn.close()
+        index = MeasurementIndex(db_path)
+        index.index_simulation("sim_a", str(GPIO_DOMAIN / "00bkp_202506161234" / "report" / "creport.txt"))
+        index.index_simulation("sim_b", creport)
+        selection = {'measurement': ['rwkpull_vih'], 'process': ['SSG']}
+        measurement_csv = list(csv.reader(io.StringIO(''.join(export_measurements(index, 'csv', selection)))))
+        expected_rows = index.query(selection)['rows']
+
+        if np is not None:
+            creport_npz = np.load(io.BytesIO(b''.join(export_creport(creport, 'npz', chunk_rows=10))))['rows']
+            measurement_npz = np.load(io.BytesIO(b''.join(
+                export_measurements(index, 'npz', selection, chunk_rows=7))))['rows']
+    finally:
+        shutil.rmtree(tmp_dir)
+
+    checks = [
+        ("csv chunked", len(csv_chunks), 1 + (parsed['total_corners'] + 9) // 10),
+        ("csv header and rows", (csv_rows[0], len(csv_rows) - 1), (columns, parsed['total_corners'])),
+        ("csv values", float(csv_rows[1][columns.index('rwkpull_vih')]), parsed['rows'][0]['rwkpull_vih']),
+        ("ndjson rows", ndjson_rows, [dict((c, r[c]) for c in columns) for r in parsed['rows']]),
+        ("measurement csv", [[r[0], float(r[-1])] for r in measurement_csv[1:]],
+         [[r[0], r[-1]] for r in expected_rows]),
+    ]
+    if np is not None:
+        checks += [
+            ("npz creport", (creport_npz.shape, list(creport_npz.dtype.names)), ((parsed['total_corners'],), columns)),
+            ("npz values", creport_npz['rwkpull_vih'].tolist(), [r['rwkpull_vih'] for r in parsed['rows']]),
+            ("npz measurements", (measurement_npz['sim_id'].tolist(), measurement_npz['value'].tolist()),
+             ([r[0] for r in expected_rows], [r[-1] for r in expected_rows])),
+        ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("\n" + "="*60)
+    print("RESULTS EXPORT TESTS")
+    print("="*60)
+
+    tests = [
+        ("streamed export", test_results_export),
+    ]
+
+    results = []
+
+    for name, test_func in tests:
+        try:
+            passed = test_func()
+        except AssertionError:
+            passed = False
+        results.append((name, passed))
+
+    # Summary
+    print("\n" + "="*60)
+    print("TEST SUMMARY")
+    print("="*60)
+
+    total_passed = sum(1 for _, passed in results if passed)
+    total_tests = len(results)
+
+    for name, passed in results:
+        status = "✓ PASSED" if passed else "✗ FAILED"
+        print(f"{status}: {name}")
+
+    print(f"\nOverall: {total_passed}/{total_tests} test suites passed")
+
+    if total_passed == total_tests:
+        print("\n🎉 All tests passed!")
+        return 0
+    else:
+        print(f"\n⚠️  {total_tests - total_passed} test suite(s) failed")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test script for server-side result queries.
+Checks query_results() filters, projection, sorting and pagination on a
+checked-in gpio backup.
+"""
+
+import sys
+import os
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import REPO_ROOT
+from results_parser import parse_creport, analyze_results, query_results
+
+GPIO_DOMAIN = REPO_ROOT / "gpio" / "1p1v"
+
+
+def test_query_results():
+    """Test server-side row filters, projection, sorting and pagination"""
+    print("\n" + "="*60)
+    print("TEST 1: result queries")
+    print("="*60)
+
+    parsed = parse_creport(str(GPIO_DOMAIN / "00bkp_202510301443" / "report" / "creport.txt"))
+    headers = parsed['headers']
+    rows = analyze_results(parsed, {'rwkpull_vih': {'min': 2000, 'max': 2500}})['rows_with_status']
+
+    ssg_cold = query_results(headers, rows, filters={'process': ['SSG'], 'temp': ['-40']})
+    failing = query_results(headers, rows, status='fail')
+    projected = query_results(headers, rows, columns=['process', 'temp', 'rwkpull_vih'])
+    ordered = query_results(headers, rows, sort='-rwkpull_vih')
+    page = query_results(headers, rows, sort='rwkpull_vih', offset=10, limit=5)
+    everything = query_results(headers, rows)
+
+    errors = 0
+    for kwargs in [{'filters': {'rwkpull_vih': ['1']}}, {'status': 'maybe'},
+                   {'columns': ['nope']}, {'sort': '-nope'}, {'offset': -1}]:
+        try:
+            query_results(headers, rows, **kwargs)
+        except ValueError:
+            errors += 1
+
+    values = [r['rwkpull_vih'] for r in ordered['rows'] if isinstance(r['rwkpull_vih'], float)]
+    ascending = sorted(values)
+
+    checks = [
+        ("filters match rows", ssg_cold['total'],
+         len([r for r in rows if r['process'] == 'SSG' and r['temp'] == -40.0])),
+        ("status filter", failing['total'], len([r for r in rows if r['_status'] == 'fail'])),
+        ("projection headers", projected['headers'], ['process', 'temp', 'rwkpull_vih']),
+        ("descending sort", values, sorted(values, reverse=True)),
+        ("page", [r['rwkpull_vih'] for r in page['rows']], ascending[10:15]),
+        ("page total is unpaginated", page['total'], len(rows)),
+        ("no arguments returns everything", (everything['headers'], len(everything['rows'])),
+         (headers, len(rows))),
+        ("bad arguments rejected", errors, 5),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("\n" + "="*60)
+    print("RESULTS PARSER TESTS")
+    print("="*60)
+
+    tests = [
+        ("result queries", test_query_results),
+    ]
+
+    results = []
+
+    for name, test_func in tests:
+        try:
+            passed = test_func()
+        except AssertionError:
+            passed = False
+        results.append((name, passed))
+
+    # Summary
+    print("\n" + "="*60)
+    print("TEST SUMMARY")
+    print("="*60)
+
+    total_passed = sum(1 for _, passed in results if passed)
+    total_tests = len(results)
+
+    for name, passed in results:
+        status = "✓ PASSED" if passed else "✗ FAILED"
+        print(f"{status}: {name}")
+
+    print(f"\nOverall: {total_passed}/{total_tests} test suites passed")
+
+    if total_passed == total_tests:
+        print("\n🎉 All tests passed!")
+        return 0
+    else:
+        print(f"\n⚠️  {total_tests - total_passed} test suite(s) failed")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Test script for NumPy spec-limit evaluation.
+Checks vectorised pass/fail against row-by-row analysis and the
+per-measurement summaries behind /api/results/<sim_id>/summary.
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import REPO_ROOT
+from results_cache import ResultsCache
+from results_parser import parse_creport, analyze_results
+from spec_evaluator import summarize_columns, summarize_measurements
+from results_sidecar import write_sidecar, load_columns, columns_from_parsed, np
+
+GPIO_DOMAIN = REPO_ROOT / "gpio" / "1p1v"
+
+
+def test_spec_evaluation():
+    """Test vectorised limits, masked 'error' cells and sidecar summaries"""
+    print("\n" + "="*60)
+    print("TEST 1: spec-limit evaluation")
+    print("="*60)
+
+    if np is None:
+        print("⚠️  NumPy not installed, row-by-row analysis in use - skipping")
+        return True
+
+    parsed = {
+        'headers': ['process', 'rwkpull_vih', 'ioh'],
+        'rows': [
+            {'process': 'TT', 'rwkpull_vih': 2000.0, 'ioh': 1.0},
+            {'process': 'FF', 'rwkpull_vih': 1200.0, 'ioh': 5.0},
+            {'process': 'SS', 'rwkpull_vih': 'error', 'ioh': 1.0},
+        ],
+        'total_corners': 3
+    }
+    limits = {'rwkpull_vih': {'min': 1500, 'max': 2500}, 'ioh': {'max': 2}, 'missing': {'min': 0}}
+    analysis = analyze_results(parsed, limits)
+
+    tmp_dir = tempfile.mkdtemp(prefix="wkp_spec_")
+    try:
+        creport = os.path.join(tmp_dir, "creport.txt")
+        shutil.copy(str(GPIO_DOMAIN / "00bkp_202510301443" / "report" / "creport.txt"), creport)
+        write_sidecar(creport)
+        bkp_limits = {'rwkpull_vih': {'min': 2000, 'max': 2500}}
+        summary = summarize_columns(load_columns(creport), bkp_limits)
+        row_analysis = analyze_results(parse_creport(creport), bkp_limits)
+    finally:
+        shutil.rmtree(tmp_dir)
+
+    checks = [
+        ("statuses", [r['_status'] for r in analysis['rows_with_status']], ['pass', 'fail', 'pass']),
+        ("failure messages", analysis['rows_with_status'][1]['_failures'],
+         ["rwkpull_vih < 1200.0 (min: 1500)", "ioh > 5.0 (max: 2)"]),
+        ("error cell masked", analysis['rows_with_status'][2]['_failures'], None),
+        ("counts", (analysis['pass_count'], analysis['fail_count']), (2, 1)),
+        ("sidecar summary matches rows", (summary['pass_count'], summary['fail_count']),
+         (row_analysis['pass_count'], row_analysis['fail_count'])),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def test_measurement_summary():
+    """Test per-measurement extremes, argmin/argmax points, margins and grouping"""
+    print("\n" + "="*60)
+    print("TEST 2: measurement summary")
+    print("="*60)
+
+    if np is None:
+        print("⚠️  NumPy not installed, summary endpoint disabled - skipping")
+        return True
+
+    tmp_dir = tempfile.mkdtemp(prefix="wkp_summary_")
+    try:
+        creport = os.path.join(tmp_dir, "creport.txt")
+        shutil.copy(str(GPIO_DOMAIN / "00bkp_202510301443" / "report" / "creport.txt"), creport)
+        parsed = parse_creport(creport)
+        from_rows = columns_from_parsed(parsed)
+        write_sidecar(creport)
+        from_sidecar = load_columns(creport)
+        cache_columns = ResultsCache().get_columns(creport)
+    finally:
+        shutil.rmtree(tmp_dir)
+
+    limits = {'rwkpull_vih': {'min': 1500, 'max': 2500}}
+    overall = summarize_measurements(from_rows, limits)
+    by_temp = summarize_measurements(from_sidecar, limits, group_by='temp')
+
+    values = [(r['rwkpull_vih'], r) for r in parsed['rows'] if isinstance(r['rwkpull_vih'], float)]
+    low = min(values, key=lambda v: v[0])
+    high = max(values, key=lambda v: v[0])
+    stats = overall[0]['measurements']['rwkpull_vih']
+    cold = [g for g in by_temp if g['group'] == -40.0][0]
+
+    bad_group = False
+    try:
+        summarize_measurements(from_rows, limits, group_by='rwkpull_vih')
+    except ValueError:
+        bad_group = True
+
+    checks = [
+        ("min/max", (stats['min'], stats['max']), (low[0], high[0])),
+        ("argmin point", (stats['argmin']['process'], stats['argmin']['temp'], stats['argmin']['v1']),
+         (low[1]['process'], low[1]['temp'], low[1]['v1'])),
+        ("argmax point", stats['argmax']['process'], high[1]['process']),
+        ("margins", stats['margin'], {'min': low[0] - 1500, 'max': 2500 - high[0]}),
+        ("unlimited measurement has no margin", 'margin' in overall[0]['measurements']['ioh'], False),
+        ("grouped corners", sum(g['corners'] for g in by_temp), parsed['total_corners']),
+        ("group min", cold['measurements']['rwkpull_vih']['min'],
+         min(v for v, r in values if r['temp'] == -40.0)),
+        ("sidecar and rows agree", summarize_measurements(from_sidecar, limits), overall),
+        ("cache columns", summarize_measurements(cache_columns, limits), overall),
+        ("bad group column rejected", bad_group, True),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("\n" + "="*60)
+    print("SPEC EVALUATOR TESTS")
+    print("="*60)
+
+    tests = [
+        ("spec-limit evaluation", test_spec_evaluation),
+        ("measurement summary", test_measurement_summary),
+    ]
+
+    results = []
+
+    for name, test_func in tests:
+        try:
+            passed = test_func()
+        except AssertionError:
+            passed = False
+        results.append((name, passed))
+
+    # Summary
+    print("\n" + "="*60)
+    print("TEST SUMMARY")
+    print("="*60)
+
+    total_passed = sum(1 for _, passed in results if passed)
+    total_tests = len(results)
+
+    for name, passed in results:
+        status = "✓ PASSED" if passed else "✗ FAILED"
+        print(f"{status}: {name}")
+
+    print(f"\nOverall: {total_passed}/{total_tests} test suites passed")
+
+    if total_passed == total_tests:
+        print("\n🎉 All tests passed!")
+        return 0
+    else:
+        print(f"\n⚠️  {total_tests - total_passed} test suite(s) failed")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared stage executor.
+Checks the per-stage concurrency limits (a saturated pool queues work
+without holding up other stages), the queue/wait statistics, releasing
+queued tasks, and /api/executor/stats.
+"""
+
+import sys
+import os
+import json
+import shutil
+import asyncio
+import tempfile
+import threading
+import time
+from concurrent.futures import CancelledError
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import config
+from stage_executor import StageExecutor, get_stage_executor
+
+
+def wait_for(condition, timeout=10):
+    """Poll until condition() is true (False on timeout)"""
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def error_of(func, *args, **kwargs):
+    """Message of the exception a call raises (None if it succeeds)"""
+    try:
+        func(*args, **kwargs)
+    except Exception as e:
+        return str(e)
+    return None
+
+
+def test_concurrency_limits():
+    """Test that a saturated stage queues work and other stages keep running"""
+    print("\n" + "="*60)
+    print("TEST 1: per-stage concurrency limits")
+    print("="*60)
+
+    executor = StageExecutor({'gen': 2, 'ext': 1, 'run': 0})
+    gate = threading.Event()
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+
+    def gated(n):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        gate.wait(10)
+        with lock:
+            running[0] -= 1
+        return n
+
+    try:
+        futures = [executor.submit('gen', gated, n, label="sim_{0}".format(n)) for n in range(5)]
+        saturated = wait_for(lambda: executor.get_stats()['gen']['active'] == 2)
+        time.sleep(0.1)
+        stats = executor.get_stats()['gen']
+        # The gen pool is full; ext still has its own worker
+        other_stage = executor.submit('ext', lambda: 'ext ran', label="sim_x").result(timeout=10)
+        gate.set()
+        results = [f.result(timeout=10) for f in futures]
+        done = executor.get_stats()['gen']
+    finally:
+        gate.set()
+        executor.shutdown()
+
+    checks = [
+        ("pool saturated", saturated, True),
+        ("never more than the limit at once", peak[0], 2),
+        ("rest queued", (stats['active'], stats['queued']), (2, 3)),
+        ("queued in submission order", [t['label'] for t in stats['queued_tasks']], ['sim_2', 'sim_3', 'sim_4']),
+        ("running tasks listed", [t['label'] for t in stats['active_tasks']], ['sim_0', 'sim_1']),
+        ("other stages not blocked", other_stage, 'ext ran'),
+        ("every task ran", results, [0, 1, 2, 3, 4]),
+        ("queue drained", (done['active'], done['queued'], done['completed']), (0, 0, 5)),
+        ("limits (missing stages get 1, minimum 1)",
+         (executor.limits['gen'], executor.limits['ext'], executor.limits['run'], executor.limits['bkp']),
+         (2, 1, 1, 1)),
+        ("default limits from config", StageExecutor().limits == config.STAGE_CONCURRENCY, True),
+        ("unknown stage", error_of(executor.submit, 'sim', len, []), "Unknown stage: sim"),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def test_statistics():
+    """Test queued, running, waited and failed counts of get_stats()"""
+    print("\n" + "="*60)
+    print("TEST 2: get_stats()")
+    print("="*60)
+
+    executor = StageExecutor({'srt': 1})
+    gate = threading.Event()
+
+    def fail():
+        raise RuntimeError("srt failed")
+
+    try:
+        first = executor.submit('srt', gate.wait, 10, label="sim_a")
+        wait_for(lambda: executor.get_stats()['srt']['active'] == 1)
+        second = executor.submit('srt', len, [1, 2], label="sim_b")
+        time.sleep(0.3)
+        busy = executor.get_stats()['srt']
+        gate.set()
+        results = (first.result(timeout=10), second.result(timeout=10))
+        run_error = error_of(executor.run, 'srt', fail, label="sim_c")
+        idle = executor.get_stats()['srt']
+        untouched = executor.get_stats()['bkp']
+    finally:
+        gate.set()
+        executor.shutdown()
+
+    checks = [
+        ("running task", [(t['label'], t['waited_s']) for t in busy['active_tasks']], [('sim_a', 0.0)]),
+        ("running time counts up", busy['active_tasks'][0]['running_s'] >= 0.3, True),
+        ("queued task and its wait", [(t['label'], t['waiting_s'] >= 0.3) for t in busy['queued_tasks']],
+         [('sim_b', True)]),
+        ("counts while busy", (busy['active'], busy['queued'], busy['completed']), (1, 1, 0)),
+        ("results", results, (True, 2)),
+        ("run() re-raises", run_error, "srt failed"),
+        ("completed and failed", (idle['completed'], idle['failed'], idle['active'], idle['queued']), (2, 1, 0, 0)),
+        ("queued task waited for the worker", idle['max_wait_s'] >= 0.3, True),
+        ("average wait over finished tasks", 0 < idle['avg_wait_s'] < idle['max_wait_s'], True),
+        ("average run time", idle['avg_run_s'] > 0, True),
+        ("idle stage", (untouched['limit'], untouched['completed'], untouched['avg_wait_s']), (1, 0, 0.0)),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def test_cancel_queued():
+    """Test releasing queued tasks by label and stage"""
+    print("\n" + "="*60)
+    print("TEST 3: cancel_queued()")
+    print("="*60)
+
+    executor = StageExecutor({'ext': 1, 'srt': 1})
+    gate = threading.Event()
+    ran = []
+    try:
+        for stage in ('ext', 'srt'):
+            executor.submit(stage, gate.wait, 10, label="sim_a")
+        wait_for(lambda: executor.get_stats()['srt']['active'] == 1)
+        ext_task = executor.submit('ext', ran.append, 'ext', label="sim_a")
+        srt_task = executor.submit('srt', ran.append, 'srt', label="sim_a (partial)")
+        srt_only = executor.cancel_queued("sim_a", stages=['srt'])
+        running_kept = executor.cancel_queued("sim_a", stages=['srt'])
+        gate.set()
+        ext_task.result(timeout=10)
+        try:
+            srt_task.result(timeout=10)
+            srt_cancelled = False
+        except CancelledError:
+            srt_cancelled = True
+        stats = executor.get_stats()
+    finally:
+        gate.set()
+        executor.shutdown()
+
+    checks = [
+        ("only the named stage", (srt_only, running_kept), (1, 0)),
+        ("labelled sub-task released", srt_cancelled, True),
+        ("other stage's task ran", ran, ['ext']),
+        ("cancellations counted per stage", (stats['ext']['cancelled'], stats['srt']['cancelled']), (0, 1)),
+        ("released tasks not counted as run", stats['srt']['completed'], 1),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def test_stats_endpoint():
+    """Test /api/executor/stats and the process-wide executor"""
+    print("\n" + "="*60)
+    print("TEST 4: /api/executor/stats")
+    print("="*60)
+
+    from tornado.httpclient import AsyncHTTPClient
+    from tornado.httpserver import HTTPServer
+    from tornado.testing import bind_unused_port
+
+    tmp_dir = tempfile.mkdtemp(prefix="wkp_executor_")
+    db_path = os.path.join(tmp_dir, "webapp.db")
+    real_db_path = config.DB_PATH
+    executor = StageExecutor({'bkp': 1})
+    gate = threading.Event()
+    server = None
+    try:
+        # main_tornado initializes DB_PATH on import
+        config.DB_PATH = db_path
+        import main_tornado as server
+        real_executor = server.get_stage_executor
+        server.DB_PATH = db_path
+        server.get_stage_executor = lambda: executor
+
+        executor.submit('bkp', gate.wait, 10, label="sim_a")
+        wait_for(lambda: executor.get_stats()['bkp']['active'] == 1)
+        executor.submit('bkp', len, [], label="sim_b")
+
+        async def scenario():
+            sock, port = bind_unused_port()
+            http = HTTPServer(server.make_app())
+            http.add_sockets([sock])
+            response = await AsyncHTTPClient().fetch("http://127.0.0.1:{0}/api/executor/stats".format(port),
+                                                     raise_error=False)
+            http.stop()
+            return response
+
+        response = asyncio.run(asyncio.wait_for(scenario(), 60))
+        body = json.loads(response.body)
+    finally:
+        gate.set()
+        config.DB_PATH = real_db_path
+        if server is not None:
+            server.DB_PATH = real_db_path
+            server.get_stage_executor = real_executor
+        executor.shutdown()
+        shutil.rmtree(tmp_dir)
+
+    bkp = body['stages']['bkp']
+    checks = [
+        ("status", response.code, 200),
+        ("every stage reported", sorted(body['stages']), sorted(StageExecutor.STAGES)),
+        ("bkp queue", (bkp['limit'], bkp['active'], bkp['queued']), (1, 1, 1)),
+        ("task labels", ([t['label'] for t in bkp['active_tasks']], [t['label'] for t in bkp['queued_tasks']]),
+         (['sim_a'], ['sim_b'])),
+        ("timestamp", 'timestamp' in body, True),
+        ("one process-wide executor", get_stage_executor() is get_stage_executor(), True),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("\n" + "="*60)
+    print("STAGE EXECUTOR TESTS")
+    print("="*60)
+
+    tests = [
+        ("concurrency limits", test_concurrency_limits),
+        ("get_stats", test_statistics),
+        ("cancel_queued", test_cancel_queued),
+        ("stats endpoint", test_stats_endpoint),
+    ]
+
+    results = []
+
+    for name, test_func in tests:
+        try:
+            passed = test_func()
+        except AssertionError:
+            passed = False
+        results.append((name, passed))
+
+    # Summary
+    print("\n" + "="*60)
+    print("TEST SUMMARY")
+    print("="*60)
+
+    total_passed = sum(1 for _, passed in results if passed)
+    total_tests = len(results)
+
+    for name, passed in results:
+        status = "✓ PASSED" if passed else "✗ FAILED"
+        print(f"{status}: {name}")
+
+    print(f"\nOverall: {total_passed}/{total_tests} test suites passed")
+
+    if total_passed == total_tests:
+        print("\n🎉 All tests passed!")
+        return 0
+    else:
+        print(f"\n⚠️  {total_tests - total_passed} test suite(s) failed")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Test script for the checkpointed ext -> srt -> bkp stage pipeline.
+Checks that interrupted pipelines resume without redoing finished stages,
+and that /api/extract leaves backed-up simulations alone.
+"""
+
+import sys
+import os
+import json
+import shutil
+import sqlite3
+import asyncio
+import tempfile
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stage_pipeline import (
+    StagePipeline,
+    init_checkpoint_table,
+    stage_order,
+    recover_backup,
+    finish_backup
+)
+from extraction_engine import load_stage_config, build_pvt_plan, point_directory
+from backup_store import store_snapshot, restore_snapshot, list_manifests, hash_file, detach_file
+
+GPIO_DOMAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "gpio", "1p1v")
+SCRIPT_PATH = os.path.join(GPIO_DOMAIN, "dependencies", "scripts", "simulation_script", "auto_pvt", "ver03")
+
+
+def make_pipeline(tmp_dir):
+    """Create a StagePipeline on a scratch database"""
+    db_path = os.path.join(tmp_dir, "test.db")
+    conn = sqlite3.connect(db_path)
+    init_checkpoint_table(conn)
+    conn.commit()
+    conn.close()
+    return StagePipeline(db_path)
+
+
+def test_checkpoint_resume():
+    """Test pending stages and interrupted pipeline detection"""
+    print("\n" + "="*60)
+    print("TEST 1: StagePipeline checkpoints")
+    print("="*60)
+
+    tmp_dir = tempfile.mkdtemp(prefix="wkp_pipe_")
+    try:
+        pipeline = make_pipeline(tmp_dir)
+
+        # sim_a: ext finished, server stopped while srt was running
+        pipeline.create("sim_a")
+        pipeline.start_stage("sim_a", "ext")
+        pipeline.complete_stage("sim_a", "ext", True)
+        pipeline.start_stage("sim_a", "srt")
+
+        # sim_b: fully done; sim_c: bkp failed
+        pipeline.create("sim_b")
+        pipeline.create("sim_c")
+        for stage in pipeline.STAGES:
+            pipeline.start_stage("sim_b", stage)
+            pipeline.complete_stage("sim_b", stage, "/tmp/00bkp_x" if stage == 'bkp' else True)
+            pipeline.start_stage("sim_c", stage)
+            if stage == 'bkp':
+                pipeline.fail_stage("sim_c", stage, "Backup stage failed")
+            else:
+                pipeline.complete_stage("sim_c", stage, True)
+
+        dependency_error = False
+        pipeline.create("sim_d")
+        try:
+            pipeline.start_stage("sim_d", "bkp")
+        except ValueError:
+            dependency_error = True
+
+        checkpoints = pipeline.get_checkpoints("sim_a")
+        results = {
+            'pending_a': pipeline.pending_stages("sim_a"),
+            'pending_b': pipeline.pending_stages("sim_b"),
+            'pending_c': pipeline.pending_stages("sim_c"),
+            'interrupted': pipeline.find_interrupted(),
+            'backup_b': pipeline.get_result("sim_b", "bkp"),
+            'attempts_srt': checkpoints['srt']['attempts'],
+        }
+    finally:
+        shutil.rmtree(tmp_dir)
+
+    checks = [
+        ("stage order", stage_order(), ['ext', 'srt', 'bkp']),
+        ("resume from srt", results['pending_a'], ['srt', 'bkp']),
+        ("done pipeline", results['pending_b'], []),
+        ("failed stage pending", results['pending_c'], ['bkp']),
+        ("interrupted sims", results['interrupted'], ['sim_a', 'sim_d']),
+        ("stored backup_dir", results['backup_b'], "/tmp/00bkp_x"),
+        ("srt attempts", results['attempts_srt'], 1),
+        ("dependency enforced", dependency_error, True),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def test_recover_backup():
+    """Test backup recovery after an interrupted bkp stage"""
+    print("\n" + "="*60)
+    print("TEST 2: recover_backup()")
+    print("="*60)
+
+    work_dir = tempfile.mkdtemp(prefix="wkp_bkp_")
+    try:
+        shutil.copy(os.path.join(GPIO_DOMAIN, "config.cfg"), work_dir)
+        shutil.copytree(os.path.join(GPIO_DOMAIN, "template"), os.path.join(work_dir, "template"))
+        plan = build_pvt_plan(load_stage_config(work_dir, SCRIPT_PATH))
+        for point in plan:
+            os.makedirs(point_directory(work_dir, point))
+            for name in ("sim_tx.sp", "sim_tx.log", "sim_tx.mt0"):
+                with open(os.path.join(point_directory(work_dir, point), name), 'w') as f:
+                    f.write(point['name'] + "\n")
+        os.makedirs(os.path.join(work_dir, "compiled_waveform"))
+        os.makedirs(os.path.join(work_dir, "report"))
+        before_move = recover_backup(work_dir)
+
+        # bkp moved report/ into the backup, then the server stopped
+        backup_dir = os.path.join(work_dir, "00bkp_202601011200")
+        os.makedirs(backup_dir)
+        shutil.move(os.path.join(work_dir, "report"), backup_dir)
+        open(os.path.join(backup_dir, "report", "creport.txt"), 'w').close()
+        os.makedirs(os.path.join(work_dir, "00bkp_202601011201"))  # empty re-run backup
+        after_move = recover_backup(work_dir)
+
+        finish_backup(work_dir, after_move, SCRIPT_PATH)
+        with open(os.path.join(backup_dir, "simulation.log")) as f:
+            simulation_log = f.read()
+        tb_bkp = sorted(os.path.relpath(os.path.join(root, name), os.path.join(backup_dir, "tb_bkp"))
+                        for root, _, files in os.walk(os.path.join(backup_dir, "tb_bkp")) for name in files)
+        left = sorted(os.listdir(work_dir))
+        backed_up = sorted(os.listdir(backup_dir))
+        finish_backup(work_dir, after_move, SCRIPT_PATH)  # repeated after a second interruption
+        repeated = sorted(os.listdir(backup_dir))
+    finally:
+        shutil.rmtree(work_dir)
+
+    typ_points = [p for p in plan if (p['corner'], p['extraction']) == ('TT', 'typical')]
+
+    checks = [
+        ("report still in work_dir", before_move, None),
+        ("moved report recovered", after_move, backup_dir),
+        ("waveforms moved", backed_up, ['compiled_waveform', 'report', 'simulation.log', 'tb_bkp']),
+        ("typical nominal 85C log", simulation_log, "TT_typical_85_v1nom_v2nom\n"),
+        ("typical corner testbenches only", tb_bkp,
+         sorted(os.path.join("typical_" + p['temp_dir'], p['voltage'], "sim_tx.sp") for p in typ_points)),
+        ("corner directories removed", left,
+         ['00bkp_202601011200', '00bkp_202601011201', 'config.cfg', 'template']),
+        ("repeatable", repeated, backed_up),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def test_backup_store():
+    """Test deduplicated snapshots of the checked-in 00bkp trees"""
+    print("\n" + "="*60)
+    print("TEST 3: backup_store snapshots")
+    print("="*60)
+
+    tmp_dir = tempfile.mkdtemp(prefix="wkp_store_")
+    try:
+        store_root = os.path.join(tmp_dir, ".backup_store")
+        summaries = []
+        # Two sweeps with different configs, then a re-run of the second one
+        for sim_id, name in [("sim_a", "00bkp_202506161234"), ("sim_b", "00bkp_202510301443"),
+                             ("sim_c", "00bkp_202510301443")]:
+            snapshot = os.path.join(tmp_dir, sim_id, name)
+            shutil.copytree(os.path.join(GPIO_DOMAIN, name), snapshot)
+            summaries.append(store_snapshot(snapshot, store_root, sim_id))
+        repeat = store_snapshot(snapshot, store_root, "sim_c")
+
+        restore_dir = os.path.join(tmp_dir, "restored")
+        restored = restore_snapshot(summaries[1]['manifest'], restore_dir)
+        source = os.path.join(GPIO_DOMAIN, "00bkp_202510301443")
+        identical = all(
+            hash_file(os.path.join(restore_dir, rel)) == hash_file(os.path.join(source, rel))
+            for rel in (os.path.relpath(os.path.join(root, f), source)
+                        for root, _, names in os.walk(source) for f in names)
+        )
+        manifests = len(list_manifests(store_root))
+
+        report_files = len(os.listdir(os.path.join(snapshot, "report")))
+        testbench = next(os.path.join(root, f) for root, _, names in os.walk(os.path.join(snapshot, "tb_bkp"))
+                         for f in names)
+        restored_report = os.path.join(restore_dir, "report", "creport.txt")
+        shared = [os.stat(path).st_nlink > 1 for path in (testbench, restored_report)]
+        writable = [os.access(path, os.W_OK) for path in (testbench, restored_report)]
+
+        # Copy on write: an edited report leaves the stored object alone
+        report = os.path.join(snapshot, "report", "creport.txt")
+        digest = hash_file(report)
+        detached = (detach_file(report), detach_file(report))
+        with open(report, 'a') as f:
+            f.write("edited\n")
+        untouched = hash_file(os.path.join(store_root, "objects", digest[:2], digest[2:])) == digest
+    finally:
+        shutil.rmtree(tmp_dir)
+
+    first, second, rerun = summaries
+    print("  {0} files stored as {1} objects".format(
+        sum(s['files'] for s in summaries), sum(s['new_objects'] for s in summaries)))
+
+    checks = [
+        ("distinct snapshots stored", first['new_objects'] + second['new_objects'],
+         first['files'] + second['files']),
+        ("re-run snapshot stored once", rerun['new_objects'], 0),
+        ("report files linked", rerun['linked'], report_files),
+        ("testbench and restored report private", shared, [False, False]),
+        ("testbench and restored report writable", writable, [True, True]),
+        ("detach copies a linked file once", detached, (True, False)),
+        ("edited report leaves the object", untouched, True),
+        ("re-store writes nothing", repeat['new_objects'], 0),
+        ("restore file count", restored, second['files']),
+        ("restore byte-identical", identical, True),
+        ("manifests", manifests, 3),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def test_extract_finished():
+    """Test that /api/extract refuses simulations whose results are backed up"""
+    print("\n" + "="*60)
+    print("TEST 4: /api/extract on a finished simulation")
+    print("="*60)
+
+    import config
+    from tornado.httpclient import AsyncHTTPClient
+    from tornado.httpserver import HTTPServer
+    from tornado.testing import bind_unused_port
+
+    tmp_dir = tempfile.mkdtemp(prefix="wkp_extract_")
+    db_path = os.path.join(tmp_dir, "webapp.db")
+    real_db_path = config.DB_PATH
+    try:
+        # main_tornado initializes DB_PATH on import
+        config.DB_PATH = db_path
+        import main_tornado
+        main_tornado.DB_PATH = db_path
+        main_tornado.init_db()
+        main_tornado.migrate_db()
+
+        # sim_done: finished through /api/extract; sim_old: finished before checkpoints existed
+        conn = sqlite3.connect(db_path)
+        for sim_id, backup_dir in (("sim_done", ''), ("sim_old", "/runs/sim_old/00bkp_202510301443")):
+            conn.execute('''
+                INSERT INTO simulations (sim_id, project, voltage_domain, corner_set, work_dir, username,
+                                         state, backup_dir)
+                VALUES (?, 'gpio', '1p1v', 'custom', ?, ?, 'finished', ?)
+            ''', (sim_id, os.path.join(tmp_dir, sim_id), main_tornado.CURRENT_USER, backup_dir))
+        conn.commit()
+        conn.close()
+        pipeline = StagePipeline(db_path)
+        pipeline.create("sim_done")
+        for stage in pipeline.STAGES:
+            pipeline.start_stage("sim_done", stage)
+            pipeline.complete_stage("sim_done", stage, "/runs/sim_done/00bkp_202510301443" if stage == 'bkp' else True)
+
+        async def scenario():
+            sock, port = bind_unused_port()
+            http = HTTPServer(main_tornado.make_app())
+            http.add_sockets([sock])
+            client = AsyncHTTPClient()
+            responses = []
+            for sim_id in ("sim_done", "sim_old"):
+                responses.append(await client.fetch("http://127.0.0.1:{0}/api/extract/{1}".format(port, sim_id),
+                                                    method='POST', body='', raise_error=False))
+            http.stop()
+            return responses
+
+        responses = asyncio.run(asyncio.wait_for(scenario(), 60))
+        bodies = [json.loads(r.body) for r in responses]
+        conn = sqlite3.connect(db_path)
+        states = conn.execute("SELECT state FROM simulations ORDER BY sim_id").fetchall()
+        conn.close()
+        attempts = [c['attempts'] for _, c in sorted(pipeline.get_checkpoints("sim_done").items())]
+        old_checkpoints = pipeline.get_checkpoints("sim_old")
+    finally:
+        config.DB_PATH = real_db_path
+        if 'main_tornado' in sys.modules:
+            sys.modules['main_tornado'].DB_PATH = real_db_path
+        shutil.rmtree(tmp_dir)
+
+    checks = [
+        ("backed-up simulations refused", [r.code for r in responses], [409, 409]),
+        ("backup named", [b['backup_dir'] for b in bodies],
+         ["/runs/sim_done/00bkp_202510301443", "/runs/sim_old/00bkp_202510301443"]),
+        ("simulations stay finished", states, [('finished',), ('finished',)]),
+        ("no stage ran again", attempts, [1, 1, 1]),
+        ("no pipeline created for an old simulation", old_checkpoints, {}),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("\n" + "="*60)
+    print("STAGE PIPELINE TESTS")
+    print("="*60)
+
+    tests = [
+        ("StagePipeline checkpoints", test_checkpoint_resume),
+        ("recover_backup", test_recover_backup),
+        ("backup_store", test_backup_store),
+        ("extract finished simulation", test_extract_finished),
+    ]
+
+    results = []
+
+    for name, test_func in tests:
+        try:
+            passed = test_func()
+        except AssertionError:
+            passed = False
+        results.append((name, passed))
+
+    # Summary
+    print("\n" + "="*60)
+    print("TEST SUMMARY")
+    print("="*60)
+
+    total_passed = sum(1 for _, passed in results if passed)
+    total_tests = len(results)
+
+    for name, passed in results:
+        status = "✓ PASSED" if passed else "✗ FAILED"
+        print(f"{status}: {name}")
+
+    print(f"\nOverall: {total_passed}/{total_tests} test suites passed")
+
+    if total_passed == total_tests:
+        print("\n🎉 All tests passed!")
+        return 0
+    else:
+        print(f"\n⚠️  {total_tests - total_passed} test suite(s) failed")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Test script for the Python submission engine.
+Checks risk ordering from the measurement index and per-point nbjob
+submission (with a stand-in nbjob on PATH) against Pai Ho's ver03 run stage,
+and canary runs (nominal point first, the rest after its results check out).
+"""
+
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import REPO_ROOT
+from extraction_engine import load_stage_config, build_pvt_plan, point_directory, get_vtrends
+from measurement_index import MeasurementIndex, init_measurement_table
+from netbatch_monitor import capture_job_ids_from_log
+from submission_engine import (
+    prior_margins,
+    order_plan,
+    plan_point_key,
+    run_submission,
+    submit_command,
+    read_job_map,
+    canary_point,
+    check_canary,
+    UNKNOWN_MARGIN
+)
+
+SCRIPT_PATH = str(REPO_ROOT / "gpio" / "1p1v" / "dependencies" / "scripts" /
+                  "simulation_script" / "auto_pvt" / "ver03")
+GPIO_DOMAIN = REPO_ROOT / "gpio" / "1p1v"
+
+# Stand-in nbjob: records its arguments and working directory, prints a job ID
+FAKE_NBJOB = """#!/bin/bash
+n=$(( $(cat "{state}/count" 2>/dev/null || echo 0) + 1 ))
+echo $n > "{state}/count"
+echo "$PWD $*" >> "{state}/calls"
+echo "Your job has been queued (JobID $(( 1700000000 + n )), Class SLES15)"
+"""
+
+
+def write_mt0(path, rows):
+    """Write a minimal primesim measurement file"""
+    with open(path, 'w') as f:
+        f.write("$DATA1 SOURCE='PrimeSim' VERSION='2023.12'\n.TITLE '* sim_tx'\nvwkp  temper  alter#\n")
+        for row in rows:
+            f.write("   ".join(row) + "  \n")
+
+
+def install_fake_nbjob():
+    """Put the stand-in nbjob first on PATH; returns (bin_dir, old PATH)"""
+    bin_dir = tempfile.mkdtemp(prefix="wkp_nbjob_")
+    nbjob = os.path.join(bin_dir, "nbjob")
+    with open(nbjob, 'w') as f:
+        f.write(FAKE_NBJOB.format(state=bin_dir))
+    os.chmod(nbjob, 0o755)
+    old_path = os.environ.get('PATH', '')
+    os.environ['PATH'] = bin_dir + os.pathsep + old_path
+    return bin_dir, old_path
+
+
+def make_work_dir():
+    """Create a temporary work_dir with the gpio/1p1v config and template"""
+    work_dir = tempfile.mkdtemp(prefix="wkp_run_")
+    shutil.copy(str(GPIO_DOMAIN / "config.cfg"), work_dir)
+    shutil.copytree(str(GPIO_DOMAIN / "template"), os.path.join(work_dir, "template"))
+    return work_dir
+
+
+def test_risk_order():
+    """Test margins from indexed creports and the resulting submission order"""
+    print("\n" + "="*60)
+    print("TEST 1: risk ordering")
+    print("="*60)
+
+    spec_limits = {'rwkpull_vih': {'min': 1000, 'max': 8000}, 'vwkp': {'min': 0.9}}
+    tmp_dir = tempfile.mkdtemp(prefix="wkp_order_")
+    work_dir = make_work_dir()
+    try:
+        db_path = os.path.join(tmp_dir, "test.db")
+        conn = sqlite3.connect(db_path)
+        init_measurement_table(conn)
+        conn.commit()
+        conn.close()
+        MeasurementIndex(db_path).index_simulation(
+            "sim_a", str(GPIO_DOMAIN / "00bkp_202510301443" / "report" / "creport.txt"), "gpio", "1p1v")
+
+        margins = prior_margins(db_path, "gpio", "1p1v", spec_limits)
+        empty = prior_margins(db_path, "gpio", "1p8v", spec_limits)
+        plan = build_pvt_plan(load_stage_config(work_dir, SCRIPT_PATH))
+        ordered = order_plan(plan, margins, 'risk')
+    finally:
+        shutil.rmtree(tmp_dir)
+        shutil.rmtree(work_dir)
+
+    ranks = [margins.get(plan_point_key(p), UNKNOWN_MARGIN) for p in ordered]
+    worst = min(margins, key=margins.get)
+
+    def rejects(policy):
+        try:
+            order_plan(plan, margins, policy)
+        except ValueError:
+            return True
+        return False
+
+    checks = [
+        ("every plan point has history", all(plan_point_key(p) in margins for p in plan), True),
+        ("no history in other domains", empty, {}),
+        ("same points", sorted(p['name'] for p in ordered), sorted(p['name'] for p in plan)),
+        ("ascending margin", ranks == sorted(ranks), True),
+        ("riskiest first", plan_point_key(ordered[0]), worst),
+        ("plan policy keeps order", order_plan(plan, margins, 'plan'), plan),
+        ("no margins keeps order", order_plan(plan, {}, 'risk'), plan),
+        ("unknown policy rejected", rejects('random'), True),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def test_run_submission():
+    """Test per-point nbjob submission, job_log.txt and job_map.csv"""
+    print("\n" + "="*60)
+    print("TEST 2: run_submission()")
+    print("="*60)
+
+    work_dir = make_work_dir()
+    bin_dir, old_path = install_fake_nbjob()
+    try:
+        plan = build_pvt_plan(load_stage_config(work_dir, SCRIPT_PATH))
+        # The 'gen' stage creates the PVT directories; leave the last one out
+        for point in plan[:-1]:
+            os.makedirs(point_directory(work_dir, point))
+        margins = {plan_point_key(plan[3]): -0.5, plan_point_key(plan[7]): -0.1}
+
+        summary = run_submission(work_dir, SCRIPT_PATH, order='risk', margins=margins)
+        job_map = read_job_map(work_dir)
+        logged_ids = capture_job_ids_from_log(summary['job_log'])
+        with open(os.path.join(bin_dir, "calls")) as f:
+            calls = [line.split() for line in f.read().splitlines()]
+        bad_class = []
+        for bad in ({'ncpu': '4', 'nmem': '8G'}, {'ncpu': '', 'nmem': '4'}):
+            try:
+                submit_command(bad, 'sim_tx')
+            except ValueError as e:
+                bad_class.append(str(e))
+    finally:
+        os.environ['PATH'] = old_path
+        shutil.rmtree(bin_dir)
+        shutil.rmtree(work_dir)
+
+    checks = [
+        ("jobs submitted", len(summary['jobs']), len(plan) - 1),
+        ("missing directory reported", summary['failed'], [plan[-1]['name']]),
+        ("riskiest submitted first", [j['directory_path'] for j in summary['jobs'][:2]],
+         [point_directory(work_dir, plan[3]), point_directory(work_dir, plan[7])]),
+        ("nbjob ran in point directory", [c[0] for c in calls], [j['directory_path'] for j in summary['jobs']]),
+        ("nbjob command", calls[0][1:], ['run', '--target', 'altera_png_normal', '--qslot', '/psg/km/phe/ckt/gen',
+                                         '--class', 'SLES15&&4G&&4C', 'primesim', '-np', '4', '-spice',
+                                         'sim_tx.sp', '-o', 'sim_tx']),
+        ("non-numeric CPU/memory class rejected", bad_class,
+         ["nmem must be a whole number for the nbjob class, got '8G'",
+          "ncpu must be a whole number for the nbjob class, got ''"]),
+        ("job IDs in job_log.txt", logged_ids, [j['job_id'] for j in summary['jobs']]),
+        ("job_map.csv round trip", job_map, summary['jobs']),
+        ("job temperature", job_map[0]['temperature'], plan[3]['temp']),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def test_canary_run():
+    """Test canary selection, split submission and the canary results check"""
+    print("\n" + "="*60)
+    print("TEST 3: canary run")
+    print("="*60)
+
+    work_dir = make_work_dir()
+    bin_dir, old_path = install_fake_nbjob()
+    try:
+        config = load_stage_config(work_dir, SCRIPT_PATH)
+        plan = build_pvt_plan(config)
+        canary = canary_point(plan, config)
+        for point in plan:
+            os.makedirs(point_directory(work_dir, point))
+        canary_dir = point_directory(work_dir, canary)
+
+        first = run_submission(work_dir, SCRIPT_PATH, part='canary')
+        canary_map = read_job_map(work_dir)
+
+        # Simulator died before writing results
+        with open(os.path.join(canary_dir, "sim_tx.log"), 'w') as f:
+            f.write("\n".join("line {0}".format(n) for n in range(100)) + "\nError: include file not found\n")
+        missing = check_canary(work_dir, SCRIPT_PATH, canary_dir)
+        write_mt0(os.path.join(canary_dir, "sim_tx.mt0"), [])
+        empty = check_canary(work_dir, SCRIPT_PATH, canary_dir)
+        write_mt0(os.path.join(canary_dir, "sim_tx.mt0"), [["1.05", "-40", "1"]])
+        passed = check_canary(work_dir, SCRIPT_PATH, canary_dir)
+
+        rest = run_submission(work_dir, SCRIPT_PATH, order='risk',
+                              margins={plan_point_key(plan[5]): -1.0}, part='rest')
+        job_map = read_job_map(work_dir)
+        logged_ids = capture_job_ids_from_log(rest['job_log'])
+        with open(rest['job_log']) as f:
+            headers = f.read().count("NB job submit log")
+    finally:
+        os.environ['PATH'] = old_path
+        shutil.rmtree(bin_dir)
+        shutil.rmtree(work_dir)
+
+    def rejects(part):
+        try:
+            run_submission(work_dir, SCRIPT_PATH, part=part)
+        except ValueError:
+            return True
+        return False
+
+    checks = [
+        ("canary is typical corner", (canary['corner'], canary['extraction']),
+         (config['typ_corner'], config['typ_ex'])),
+        ("canary at nominal voltage", canary['voltage'], get_vtrends(config)['nom'][0]),
+        ("canary submitted alone", [j['directory_path'] for j in first['jobs']], [canary_dir]),
+        ("canary in job_map.csv", canary_map, first['jobs']),
+        ("missing results fail", missing['ok'], False),
+        ("log tail kept", missing['log_tail'].splitlines()[-1], "Error: include file not found"),
+        ("log tail bounded", len(missing['log_tail'].splitlines()) < 100, True),
+        ("empty results fail", empty['ok'], False),
+        ("parseable results pass", passed['ok'], True),
+        ("rest excludes canary", len(rest['jobs']), len(plan) - 1),
+        ("rest keeps order policy", rest['jobs'][0]['directory_path'], point_directory(work_dir, plan[5])),
+        ("job_map.csv appended", job_map, first['jobs'] + rest['jobs']),
+        ("job_log.txt appended", logged_ids, [j['job_id'] for j in job_map]),
+        ("single log header", headers, 1),
+        ("unknown part rejected", rejects('half'), True),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("\n" + "="*60)
+    print("SUBMISSION ENGINE TESTS")
+    print("="*60)
+
+    tests = [
+        ("risk ordering", test_risk_order),
+        ("run_submission", test_run_submission),
+        ("canary run", test_canary_run),
+    ]
+
+    results = []
+
+    for name, test_func in tests:
+        try:
+            passed = test_func()
+        except AssertionError:
+            passed = False
+        results.append((name, passed))
+
+    # Summary
+    print("\n" + "="*60)
+    print("TEST SUMMARY")
+    print("="*60)
+
+    total_passed = sum(1 for _, passed in results if passed)
+    total_tests = len(results)
+
+    for name, passed in results:
+        status = "✓ PASSED" if passed else "✗ FAILED"
+        print(f"{status}: {name}")
+
+    print(f"\nOverall: {total_passed}/{total_tests} test suites passed")
+
+    if total_passed == total_tests:
+        print("\n🎉 All tests passed!")
+        return 0
+    else:
+        print(f"\n⚠️  {total_tests - total_passed} test suite(s) failed")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Test script for per-corner surrogate models.
+Checks held-out predictions, exact recovery of smooth data and the
+point recommendations behind /api/results/<sim_id>/surrogate.
+"""
+
+import sys
+import os
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import REPO_ROOT
+from results_parser import parse_creport, get_default_spec_limits
+from results_sidecar import columns_from_parsed, np
+from surrogate_model import METHODS, fit_corners, predict_corner, recommend_points
+
+GPIO_DOMAIN = REPO_ROOT / "gpio" / "1p1v"
+
+
+def test_surrogate_model():
+    """Test held-out predictions, exact recovery of smooth data and point recommendations"""
+    print("\n" + "="*60)
+    print("TEST 1: surrogate model")
+    print("="*60)
+
+    if np is None:
+        print("⚠️  NumPy not installed, surrogate endpoint disabled - skipping")
+        return True
+
+    parsed = parse_creport(str(GPIO_DOMAIN / "00bkp_202510301443" / "report" / "creport.txt"))
+    rows = [dict(r) for r in parsed['rows']]
+    levels = {'min': -1.0, 'nom': 0.0, 'max': 1.0}
+    for r in rows:
+        r['vwkp'] = 1.0 + 0.002 * r['temp'] + 0.1 * levels[r['v1']] - 0.05 * levels[r['v2']]
+    full = columns_from_parsed(dict(parsed, rows=rows, total_corners=len(rows)))
+
+    # Hold out TT at 85C and predict it from the remaining TT points
+    held = [r for r in rows if r['process'] == 'TT' and r['temp'] == 85]
+    kept = [r for r in rows if not (r['process'] == 'TT' and r['temp'] == 85)]
+    columns = columns_from_parsed(dict(parsed, rows=kept, total_corners=len(kept)))
+    names = ['rwkpull_vih', 'vwkp']
+    truth = np.array([[r[n] for n in names] for r in held])
+    queries = ([r['temp'] for r in held], [[r['v1'] for r in held], [r['v2'] for r in held]])
+    predictions = {}
+    for method in METHODS:
+        corner = [c for c in fit_corners(columns, method, names) if c['process'] == 'TT'][0]
+        predictions[method] = predict_corner(corner, *queries)
+    gp_mean, gp_std = predictions['gp']
+    poly_mean, _ = predictions['poly']
+
+    recommendation = recommend_points(full, temps=[-40, 25, 85, 125], corners=['TT', 'SSG'],
+                              spec_limits=get_default_spec_limits())
+    points = [p for c in recommendation['corners'] for p in c['points']]
+    simulated = [p for p in points if p['simulated']]
+    tt_rows = [r for r in rows if r['process'] == 'TT' and r['temp'] in (-40, 85, 125)]
+
+    # Sparse corner: a single TT row leaves nothing to fit
+    sparse_rows = [r for r in rows if r['process'] == 'TT'][:1]
+    sparse = recommend_points(columns_from_parsed(dict(parsed, rows=sparse_rows, total_corners=1)),
+                              temps=[-40, 25, 85, 125], measurements=names)
+    sparse_points = [p for c in sparse['corners'] for p in c['points']]
+    sparse_unsimulated = [p for p in sparse_points if not p['simulated']]
+
+    def rejects(**kwargs):
+        try:
+            recommend_points(full, **kwargs)
+        except ValueError:
+            return True
+        return False
+
+    checks = [
+        ("gp held-out within 10%", bool(np.all(np.abs(gp_mean[:, 0] - truth[:, 0]) < 0.1 * truth[:, 0])), True),
+        ("gp held-out within 3 sigma", bool(np.all(np.abs(gp_mean - truth) <= 3 * gp_std + 1e-9)), True),
+        ("poly recovers linear surface", bool(np.allclose(poly_mean[:, 1], truth[:, 1])), True),
+        ("grid size", recommendation['candidates'], 2 * 4 * 9),
+        ("counts add up", sum(recommendation[k] for k in ('simulated', 'recommended', 'skippable')),
+         recommendation['candidates']),
+        ("simulated points found", len(simulated), len(tt_rows) + sum(
+            1 for r in rows if r['process'] == 'SSG' and r['temp'] in (-40, 25, 85, 125))),
+        ("simulated points need nothing", any(p['needs_simulation'] for p in simulated), False),
+        ("unsimulated points flagged with reasons",
+         all(bool(p['reasons']) == p['needs_simulation'] for p in points), True),
+        ("sparse corner: nothing skippable", (sparse['simulated'], sparse['skippable'], sparse['recommended']),
+         (1, 0, sparse['candidates'] - 1)),
+        ("sparse corner: no-model reasons", sparse_unsimulated[0]['reasons'],
+         ['no model: rwkpull_vih', 'no model: vwkp']),
+        ("unknown method rejected", rejects(method='spline'), True),
+        ("unknown measurement rejected", rejects(measurements=['nope']), True),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("\n" + "="*60)
+    print("SURROGATE MODEL TESTS")
+    print("="*60)
+
+    tests = [
+        ("surrogate model", test_surrogate_model),
+    ]
+
+    results = []
+
+    for name, test_func in tests:
+        try:
+            passed = test_func()
+        except AssertionError:
+            passed = False
+        results.append((name, passed))
+
+    # Summary
+    print("\n" + "="*60)
+    print("TEST SUMMARY")
+    print("="*60)
+
+    total_passed = sum(1 for _, passed in results if passed)
+    total_tests = len(results)
+
+    for name, passed in results:
+        status = "✓ PASSED" if passed else "✗ FAILED"
+        print(f"{status}: {name}")
+
+    print(f"\nOverall: {total_passed}/{total_tests} test suites passed")
+
+    if total_passed == total_tests:
+        print("\n🎉 All tests passed!")
+        return 0
+    else:
+        print(f"\n⚠️  {total_tests - total_passed} test suite(s) failed")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
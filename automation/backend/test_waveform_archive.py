@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Test script for waveform archival.
+Checks the .partial -> archive rename (originals removed only after a
+complete archive), resuming pending archives after a restart, moving the
+oldest archives to cold storage, and the owner check of /api/waveforms.
+"""
+
+import sys
+import os
+import json
+import shutil
+import sqlite3
+import asyncio
+import tempfile
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import config
+from waveform_archive import (
+    archive_waveforms,
+    list_waveforms,
+    extract_waveform,
+    init_archive_table,
+    run_archival,
+    migrate_cold_archives,
+    WaveformArchiveStore,
+    ARCHIVE_NAME,
+    WAVEFORM_DIR
+)
+
+WAVEFORMS = {
+    'sim_tx.fsdb': b'fsdb' * 50000,
+    'sim_tx.tr0': b'\x00\x01tr0' * 20000,
+    'sim_tx_a1.tr0': b'alter' * 30000,
+}
+
+
+def make_waveforms(parent):
+    """Create <parent>/compiled_waveform with the WAVEFORMS files"""
+    wave_dir = os.path.join(parent, WAVEFORM_DIR)
+    os.makedirs(wave_dir)
+    for name, data in WAVEFORMS.items():
+        with open(os.path.join(wave_dir, name), 'wb') as f:
+            f.write(data)
+    return wave_dir
+
+
+def make_store(tmp_dir):
+    """Create a WaveformArchiveStore on a scratch database"""
+    db_path = os.path.join(tmp_dir, "test.db")
+    conn = sqlite3.connect(db_path)
+    init_archive_table(conn)
+    conn.commit()
+    conn.close()
+    return WaveformArchiveStore(db_path)
+
+
+def error_of(func, *args, **kwargs):
+    """Message of the exception a call raises (None if it succeeds)"""
+    try:
+        func(*args, **kwargs)
+    except Exception as e:
+        return str(e)
+    return None
+
+
+def test_archive_waveforms():
+    """Test writing an archive atomically and removing the originals afterwards"""
+    print("\n" + "="*60)
+    print("TEST 1: archive_waveforms()")
+    print("="*60)
+
+    tmp_dir = tempfile.mkdtemp(prefix="wkp_wave_")
+    real_copy = shutil.copyfileobj
+    try:
+        wave_dir = make_waveforms(tmp_dir)
+        archive_path = os.path.join(tmp_dir, ARCHIVE_NAME)
+
+        # Interrupted after the first waveform
+        copies = []
+
+        def failing_copy(fin, fout, length=0):
+            if copies:
+                raise OSError("No space left on device")
+            copies.append(fin.name)
+            real_copy(fin, fout, length)
+
+        shutil.copyfileobj = failing_copy
+        try:
+            interrupted = error_of(archive_waveforms, wave_dir)
+        finally:
+            shutil.copyfileobj = real_copy
+        after_failure = (os.path.exists(archive_path), os.path.exists(archive_path + '.partial'),
+                         sorted(os.listdir(wave_dir)))
+
+        summary = archive_waveforms(wave_dir)
+        after_success = (os.path.exists(archive_path + '.partial'), os.path.exists(wave_dir))
+        listed = dict((w['name'], w['size']) for w in list_waveforms(archive_path))
+        extracted = extract_waveform(archive_path, 'sim_tx.tr0', tmp_dir)
+        with open(extracted, 'rb') as f:
+            round_trip = f.read() == WAVEFORMS['sim_tx.tr0']
+
+        # Keep the originals; unknown codec
+        kept_dir = make_waveforms(os.path.join(tmp_dir, "keep"))
+        kept = archive_waveforms(kept_dir, compression='bzip2', remove_originals=False)
+        kept_files = sorted(os.listdir(kept_dir))
+        bad_codec = error_of(archive_waveforms, kept_dir, compression='zstd')
+    finally:
+        shutil.copyfileobj = real_copy
+        shutil.rmtree(tmp_dir)
+
+    checks = [
+        ("interrupted archive raises", interrupted, "No space left on device"),
+        ("no archive, partial left, originals kept", after_failure,
+         (False, True, sorted(WAVEFORMS))),
+        ("summary", (summary['archive'], summary['files'], summary['original_bytes']),
+         (archive_path, 3, sum(len(d) for d in WAVEFORMS.values()))),
+        ("compressed", summary['archived_bytes'] < summary['original_bytes'], True),
+        ("partial renamed, originals and directory removed", after_success, (False, False)),
+        ("central directory lists every waveform", listed, dict((n, len(d)) for n, d in WAVEFORMS.items())),
+        ("single waveform extracted intact", round_trip, True),
+        ("originals kept on request", (kept['files'], kept_files), (3, sorted(WAVEFORMS))),
+        ("unknown compression", bad_codec, "Unknown compression: zstd (valid: bzip2, deflate, lzma)"),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def test_resume_archival():
+    """Test run_archival() on archives left pending by a restart"""
+    print("\n" + "="*60)
+    print("TEST 2: run_archival() after a restart")
+    print("="*60)
+
+    tmp_dir = tempfile.mkdtemp(prefix="wkp_wave_resume_")
+    try:
+        store = make_store(tmp_dir)
+        backups = dict((sim_id, os.path.join(tmp_dir, sim_id, "00bkp_202510301443"))
+                       for sim_id in ("sim_done", "sim_partial", "sim_gone"))
+
+        # sim_done: stopped after the rename, before the originals were removed
+        wave_dir = make_waveforms(backups['sim_done'])
+        archive_waveforms(wave_dir, remove_originals=False)
+        # sim_partial: stopped while writing the archive
+        wave_dir = make_waveforms(backups['sim_partial'])
+        with open(os.path.join(backups['sim_partial'], ARCHIVE_NAME + '.partial'), 'wb') as f:
+            f.write(b'PK\x03\x04truncated')
+        # sim_gone: the waveforms were never moved into the backup
+        os.makedirs(backups['sim_gone'])
+
+        for sim_id, backup_dir in backups.items():
+            store.queue(sim_id, os.path.join(backup_dir, WAVEFORM_DIR))
+        pending = [a['sim_id'] for a in store.list_by_status('pending')]
+
+        summaries = dict((sim_id, run_archival(store.db_path, sim_id)) for sim_id in backups)
+        records = dict((sim_id, store.get(sim_id)) for sim_id in backups)
+        left = dict((sim_id, sorted(os.listdir(backup_dir))) for sim_id, backup_dir in backups.items())
+        unknown = run_archival(store.db_path, "sim_none")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+    checks = [
+        ("pending archives found on start", pending, ["sim_done", "sim_partial", "sim_gone"]),
+        ("completed archive kept, originals removed", (summaries['sim_done']['files'], left['sim_done']),
+         (3, [ARCHIVE_NAME])),
+        ("partial archive rewritten", (summaries['sim_partial']['files'], left['sim_partial']),
+         (3, [ARCHIVE_NAME])),
+        ("both recorded as archived", [records[s]['status'] for s in ("sim_done", "sim_partial")],
+         ['archived', 'archived']),
+        ("sizes recorded", records['sim_done']['original_bytes'], sum(len(d) for d in WAVEFORMS.values())),
+        ("missing waveforms fail", (summaries['sim_gone'], records['sim_gone']['status'],
+                                    records['sim_gone']['error']),
+         (None, 'failed', "No compiled_waveform directory")),
+        ("unknown simulation ignored", unknown, None),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def test_migrate_cold_archives():
+    """Test moving the oldest archives to cold storage until the hot set fits"""
+    print("\n" + "="*60)
+    print("TEST 3: migrate_cold_archives()")
+    print("="*60)
+
+    tmp_dir = tempfile.mkdtemp(prefix="wkp_wave_cold_")
+    try:
+        store = make_store(tmp_dir)
+        cold_dir = os.path.join(tmp_dir, "cold")
+        paths = {}
+        for n, sim_id in enumerate(("sim_1", "sim_2", "sim_3", "sim_4")):
+            paths[sim_id] = os.path.join(tmp_dir, sim_id, ARCHIVE_NAME)
+            os.makedirs(os.path.dirname(paths[sim_id]))
+            with open(paths[sim_id], 'wb') as f:
+                f.write(b'z' * 1000)
+            store.queue(sim_id, os.path.join(tmp_dir, sim_id, WAVEFORM_DIR))
+            store.mark_archived(sim_id, {'archive': paths[sim_id], 'files': 1, 'original_bytes': 4000,
+                                         'archived_bytes': 1000})
+        # sim_4 vanished from disk: not moved, not counted against the budget
+        os.remove(paths['sim_4'])
+
+        within = migrate_cold_archives(store, cold_dir, 4000)
+        migrated = migrate_cold_archives(store, cold_dir, 1500)
+        records = dict((sim_id, store.get(sim_id)) for sim_id in paths)
+        on_disk = dict((sim_id, os.path.exists(records[sim_id]['archive_path'])) for sim_id in paths)
+        again = migrate_cold_archives(store, cold_dir, 1500)
+    finally:
+        shutil.rmtree(tmp_dir)
+
+    checks = [
+        ("within budget, nothing moved", within, []),
+        ("oldest archives moved first", migrated, ["sim_1", "sim_2"]),
+        ("locations", [records[s]['location'] for s in sorted(paths)], ['cold', 'cold', 'hot', 'hot']),
+        ("cold path per simulation", records['sim_1']['archive_path'],
+         os.path.join(cold_dir, "sim_1", ARCHIVE_NAME)),
+        ("moved, not copied", [on_disk[s] for s in sorted(paths)], [True, True, True, False]),
+        ("missing archive not moved", records['sim_4']['location'], 'hot'),
+        ("nothing left to move", again, []),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def test_waveforms_endpoint():
+    """Test /api/waveforms/<sim_id> for the owner and for other users"""
+    print("\n" + "="*60)
+    print("TEST 4: /api/waveforms/<sim_id>")
+    print("="*60)
+
+    from tornado.httpclient import AsyncHTTPClient
+    from tornado.httpserver import HTTPServer
+    from tornado.testing import bind_unused_port
+
+    tmp_dir = tempfile.mkdtemp(prefix="wkp_wave_http_")
+    db_path = os.path.join(tmp_dir, "webapp.db")
+    real_db_path = config.DB_PATH
+    try:
+        # main_tornado initializes DB_PATH on import
+        config.DB_PATH = db_path
+        import main_tornado
+        main_tornado.DB_PATH = db_path
+        main_tornado.init_db()
+        main_tornado.migrate_db()
+
+        conn = sqlite3.connect(db_path)
+        for sim_id, username in (("sim_mine", main_tornado.CURRENT_USER), ("sim_theirs", "someone_else")):
+            conn.execute('''
+                INSERT INTO simulations (sim_id, project, voltage_domain, corner_set, username, state)
+                VALUES (?, 'gpio', '1p1v', 'custom', ?, 'finished')
+            ''', (sim_id, username))
+        conn.commit()
+        conn.close()
+        store = WaveformArchiveStore(db_path)
+        for sim_id in ("sim_mine", "sim_theirs"):
+            summary = archive_waveforms(make_waveforms(os.path.join(tmp_dir, sim_id)))
+            store.queue(sim_id, os.path.join(tmp_dir, sim_id, WAVEFORM_DIR))
+            store.mark_archived(sim_id, summary)
+
+        async def scenario():
+            sock, port = bind_unused_port()
+            http = HTTPServer(main_tornado.make_app())
+            http.add_sockets([sock])
+            client = AsyncHTTPClient()
+            responses = {}
+            for key, path in (("list", "sim_mine"), ("download", "sim_mine/sim_tx.tr0"),
+                              ("missing", "sim_mine/sim_tx.psf"), ("other_list", "sim_theirs"),
+                              ("other_download", "sim_theirs/sim_tx.tr0"), ("unknown", "sim_none")):
+                responses[key] = await client.fetch("http://127.0.0.1:{0}/api/waveforms/{1}".format(port, path),
+                                                    raise_error=False)
+            http.stop()
+            return responses
+
+        responses = asyncio.run(asyncio.wait_for(scenario(), 60))
+    finally:
+        config.DB_PATH = real_db_path
+        if 'main_tornado' in sys.modules:
+            sys.modules['main_tornado'].DB_PATH = real_db_path
+        shutil.rmtree(tmp_dir)
+
+    listing = json.loads(responses['list'].body)
+    checks = [
+        ("owner lists the archive", (responses['list'].code, sorted(w['name'] for w in listing['waveforms'])),
+         (200, sorted(WAVEFORMS))),
+        ("owner downloads one waveform", (responses['download'].code, responses['download'].body),
+         (200, WAVEFORMS['sim_tx.tr0'])),
+        ("member not in the archive", responses['missing'].code, 404),
+        ("other user's archive hidden", (responses['other_list'].code, responses['other_download'].code),
+         (404, 404)),
+        ("no waveform bytes for other users", WAVEFORMS['sim_tx.tr0'] in responses['other_download'].body, False),
+        ("unknown simulation", responses['unknown'].code, 404),
+    ]
+
+    failed = 0
+    for name, result, expected in checks:
+        ok = result == expected
+        failed += 0 if ok else 1
+        print("{0} {1}".format("✓" if ok else "✗", name))
+
+    print(f"\nPassed: {len(checks) - failed}/{len(checks)}")
+    assert failed == 0
+    return True
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("\n" + "="*60)
+    print("WAVEFORM ARCHIVE TESTS")
+    print("="*60)
+
+    tests = [
+        ("archive_waveforms", test_archive_waveforms),
+        ("run_archival resume", test_resume_archival),
+        ("migrate_cold_archives", test_migrate_cold_archives),
+        ("waveforms endpoint", test_waveforms_endpoint),
+    ]
+
+    results = []
+
+    for name, test_func in tests:
+        try:
+            passed = test_func()
+        except AssertionError:
+            passed = False
+        results.append((name, passed))
+
+    # Summary
+    print("\n" + "="*60)
+    print("TEST SUMMARY")
+    print("="*60)
+
+    total_passed = sum(1 for _, passed in results if passed)
+    total_tests = len(results)
+
+    for name, passed in results:
+        status = "✓ PASSED" if passed else "✗ FAILED"
+        print(f"{status}: {name}")
+
+    print(f"\nOverall: {total_passed}/{total_tests} test suites passed")
+
+    if total_passed == total_tests:
+        print("\n🎉 All tests passed!")
+        return 0
+    else:
+        print(f"\n⚠️  {total_tests - total_passed} test suite(s) failed")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
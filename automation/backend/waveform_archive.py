@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Waveform Archive - background compression of compiled_waveform/
+
+The ext stage moves every .fsdb/.tr0/.ac0/.sw0 into compiled_waveform/ and bkp
+moves that directory into 00bkp_<timestamp>/. The template probes v(*) with
+post=2, so these files dominate disk use on the work area.
+
+After a simulation has finished, its compiled_waveform/ is streamed into a
+single zip archive (compiled_waveform.zip, stdlib codecs). The zip central
+directory is the index: one waveform can be listed and extracted without
+unpacking the rest. Original files are removed only after the archive has
+been completely written.
+
+Archives are tracked in the waveform_archives table. When WAVEFORM_COLD_DIR is
+set, the oldest archives beyond WAVEFORM_HOT_BUDGET_GB are moved there.
+
+Archival runs on the StageExecutor 'arc' pool, so it never delays extraction.
+"""
+
+import os
+import shutil
+import sqlite3
+import zipfile
+from typing import Dict, List, Optional
+
+ARCHIVE_NAME = 'compiled_waveform.zip'
+WAVEFORM_DIR = 'compiled_waveform'
+
+# Codec name -> zipfile compression method
+COMPRESSION_METHODS = {
+    'deflate': zipfile.ZIP_DEFLATED,
+    'bzip2': zipfile.ZIP_BZIP2,
+    'lzma': zipfile.ZIP_LZMA,
+}
+
+# Streaming chunk size for compression/extraction
+CHUNK_SIZE = 4 * 1024 * 1024
+
+WAVEFORM_ARCHIVES_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS waveform_archives (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        sim_id TEXT UNIQUE NOT NULL,
+        source_dir TEXT NOT NULL,
+        archive_path TEXT,
+        location TEXT DEFAULT 'hot',
+        status TEXT DEFAULT 'pending',
+        files INTEGER DEFAULT 0,
+        original_bytes INTEGER DEFAULT 0,
+        archived_bytes INTEGER DEFAULT 0,
+        error TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        archived_at TIMESTAMP,
+        migrated_at TIMESTAMP,
+        FOREIGN KEY(sim_id) REFERENCES simulations(sim_id) ON DELETE CASCADE
+    )
+'''
+
+
+def init_archive_table(conn):
+    """
+    Create waveform_archives table if it does not exist.
+
+    Args:
+        conn: Open sqlite3 connection (caller commits)
+    """
+    conn.cursor().execute(WAVEFORM_ARCHIVES_SCHEMA)
+
+
+def archive_waveforms(wave_dir: str, archive_path: Optional[str] = None, compression: str = 'deflate',
+                      level: Optional[int] = None, remove_originals: bool = True) -> Dict:
+    """
+    Stream every file of a compiled_waveform directory into one zip archive.
+
+    The archive is written to <archive>.partial and renamed when complete, so
+    an interrupted run leaves the original waveforms untouched.
+
+    Args:
+        wave_dir: compiled_waveform directory
+        archive_path: Output archive (default: <parent>/compiled_waveform.zip)
+        compression: 'deflate', 'bzip2' or 'lzma'
+        level: Compression level (deflate/bzip2 only)
+        remove_originals: Delete the waveform files (and the empty directory) afterwards
+
+    Returns:
+        Dict with keys: archive, files, original_bytes, archived_bytes
+    """
+    if compression not in COMPRESSION_METHODS:
+        raise ValueError("Unknown compression: {0} (valid: {1})".format(
+            compression, ', '.join(sorted(COMPRESSION_METHODS))))
+
+    if archive_path is None:
+        archive_path = os.path.join(os.path.dirname(os.path.abspath(wave_dir)), ARCHIVE_NAME)
+
+    names = sorted(f for f in os.listdir(wave_dir) if os.path.isfile(os.path.join(wave_dir, f)))
+    partial_path = archive_path + '.partial'
+
+    original_bytes = 0
+    with zipfile.ZipFile(partial_path, 'w', compression=COMPRESSION_METHODS[compression],
+                         compresslevel=level, allowZip64=True) as zf:
+        for name in names:
+            src = os.path.join(wave_dir, name)
+            original_bytes += os.path.getsize(src)
+            with open(src, 'rb') as fin, zf.open(name, 'w', force_zip64=True) as fout:
+                shutil.copyfileobj(fin, fout, CHUNK_SIZE)
+
+    os.replace(partial_path, archive_path)
+
+    if remove_originals:
+        _remove_archived(archive_path, wave_dir)
+
+    return {
+        'archive': archive_path,
+        'files': len(names),
+        'original_bytes': original_bytes,
+        'archived_bytes': os.path.getsize(archive_path)
+    }
+
+
+def _remove_archived(archive_path: str, wave_dir: str):
+    """Delete waveform files present in the archive, then the directory if empty."""
+    if not os.path.isdir(wave_dir):
+        return
+    for waveform in list_waveforms(archive_path):
+        path = os.path.join(wave_dir, waveform['name'])
+        if os.path.exists(path):
+            os.remove(path)
+    if not os.listdir(wave_dir):
+        os.rmdir(wave_dir)
+
+
+def list_waveforms(archive_path: str) -> List[Dict]:
+    """
+    List waveforms in an archive (reads only the zip central directory).
+
+    Returns:
+        List of dicts with keys: name, size, compressed_size
+    """
+    with zipfile.ZipFile(archive_path) as zf:
+        return [{'name': info.filename, 'size': info.file_size, 'compressed_size': info.compress_size}
+                for info in zf.infolist()]
+
+
+def open_waveform(archive_path: str, name: str):
+    """
+    Open a single waveform for streaming reads.
+
+    Returns:
+        (ZipFile, file object) - close both when done
+    """
+    zf = zipfile.ZipFile(archive_path)
+    try:
+        return zf, zf.open(name)
+    except KeyError:
+        zf.close()
+        raise
+
+
+def extract_waveform(archive_path: str, name: str, dest_dir: str) -> str:
+    """
+    Extract one waveform from an archive without unpacking the others.
+
+    Returns:
+        Path to the extracted file
+    """
+    dest = os.path.join(dest_dir, os.path.basename(name))
+    zf, fin = open_waveform(archive_path, name)
+    try:
+        with open(dest, 'wb') as fout:
+            shutil.copyfileobj(fin, fout, CHUNK_SIZE)
+    finally:
+        fin.close()
+        zf.close()
+    return dest
+
+
+class WaveformArchiveStore(object):
+    """
+    waveform_archives table: archive location and status per simulation.
+    """
+
+    def __init__(self, db_path):
+        """
+        Initialize archive store.
+
+        Args:
+            db_path (str): Path to SQLite database
+        """
+        self.db_path = db_path
+
+    def _execute(self, sql, params=()):
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute(sql, params)
+        conn.commit()
+        conn.close()
+
+    def queue(self, sim_id: str, source_dir: str):
+        """Record a simulation whose waveforms are waiting to be archived."""
+        self._execute('''
+            INSERT OR REPLACE INTO waveform_archives (sim_id, source_dir, status)
+            VALUES (?, ?, 'pending')
+        ''', (sim_id, source_dir))
+
+    def mark_archived(self, sim_id: str, summary: Dict):
+        """Record a finished archive."""
+        self._execute('''
+            UPDATE waveform_archives
+            SET status = 'archived', archive_path = ?, location = 'hot', files = ?,
+                original_bytes = ?, archived_bytes = ?, error = NULL, archived_at = CURRENT_TIMESTAMP
+            WHERE sim_id = ?
+        ''', (summary['archive'], summary['files'], summary['original_bytes'],
+              summary['archived_bytes'], sim_id))
+
+    def mark_failed(self, sim_id: str, error: str):
+        """Record an archival failure."""
+        self._execute('''
+            UPDATE waveform_archives SET status = 'failed', error = ? WHERE sim_id = ?
+        ''', (error, sim_id))
+
+    def mark_migrated(self, sim_id: str, archive_path: str):
+        """Record an archive moved to the cold directory."""
+        self._execute('''
+            UPDATE waveform_archives
+            SET archive_path = ?, location = 'cold', migrated_at = CURRENT_TIMESTAMP
+            WHERE sim_id = ?
+        ''', (archive_path, sim_id))
+
+    def get(self, sim_id: str) -> Optional[Dict]:
+        """Get the archive record of a simulation."""
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        c = conn.cursor()
+        c.execute('SELECT * FROM waveform_archives WHERE sim_id = ?', (sim_id,))
+        row = c.fetchone()
+        conn.close()
+        return dict(row) if row else None
+
+    def list_by_status(self, status: str, location: Optional[str] = None) -> List[Dict]:
+        """List archive records with a status (optionally a location), oldest first."""
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        c = conn.cursor()
+        if location:
+            c.execute('''
+                SELECT * FROM waveform_archives WHERE status = ? AND location = ?
+                ORDER BY archived_at, id
+            ''', (status, location))
+        else:
+            c.execute('SELECT * FROM waveform_archives WHERE status = ? ORDER BY id', (status,))
+        rows = [dict(row) for row in c.fetchall()]
+        conn.close()
+        return rows
+
+
+def migrate_cold_archives(store: WaveformArchiveStore, cold_dir: str, hot_budget_bytes: int) -> List[str]:
+    """
+    Move the oldest hot archives to cold_dir until the hot set fits the budget.
+
+    Args:
+        store: WaveformArchiveStore
+        cold_dir: Colder storage directory (archives go to <cold_dir>/<sim_id>/)
+        hot_budget_bytes: Max total size of archives left in the work area
+
+    Returns:
+        sim_ids of migrated archives
+    """
+    # Archives missing from the work area take no space there
+    hot = [a for a in store.list_by_status('archived', location='hot')
+           if a['archive_path'] and os.path.exists(a['archive_path'])]
+    total = sum(a['archived_bytes'] for a in hot)
+    migrated = []
+
+    for archive in hot:
+        if total <= hot_budget_bytes:
+            break
+        src = archive['archive_path']
+
+        dest_dir = os.path.join(cold_dir, archive['sim_id'])
+        os.makedirs(dest_dir, exist_ok=True)
+        dest = os.path.join(dest_dir, os.path.basename(src))
+        shutil.move(src, dest)
+
+        store.mark_migrated(archive['sim_id'], dest)
+        total -= archive['archived_bytes']
+        migrated.append(archive['sim_id'])
+        print("[WaveformArchive] Moved {0} to cold storage: {1}".format(archive['sim_id'], dest))
+
+    return migrated
+
+
+def run_archival(db_path: str, sim_id: str) -> Optional[Dict]:
+    """
+    Archive a queued simulation's waveforms, then apply the hot budget.
+
+    Runs on a StageExecutor 'arc' worker.
+
+    Returns:
+        archive_waveforms() summary, or None if there was nothing to archive
+    """
+    from config import (WAVEFORM_ARCHIVE_COMPRESSION, WAVEFORM_ARCHIVE_LEVEL,
+                        WAVEFORM_COLD_DIR, WAVEFORM_HOT_BUDGET_GB)
+
+    store = WaveformArchiveStore(db_path)
+    record = store.get(sim_id)
+    if not record:
+        return None
+
+    source_dir = record['source_dir']
+    archive_path = os.path.join(os.path.dirname(source_dir), ARCHIVE_NAME)
+
+    try:
+        if not os.path.exists(archive_path):
+            if not os.path.isdir(source_dir):
+                store.mark_failed(sim_id, "No compiled_waveform directory")
+                return None
+            summary = archive_waveforms(source_dir, archive_path, compression=WAVEFORM_ARCHIVE_COMPRESSION,
+                                        level=WAVEFORM_ARCHIVE_LEVEL)
+        else:
+            # Archive was completed before a restart: finish removing the originals
+            _remove_archived(archive_path, source_dir)
+            waveforms = list_waveforms(archive_path)
+            summary = {
+                'archive': archive_path,
+                'files': len(waveforms),
+                'original_bytes': sum(w['size'] for w in waveforms),
+                'archived_bytes': os.path.getsize(archive_path)
+            }
+
+        store.mark_archived(sim_id, summary)
+        print("[WaveformArchive] [{0}] {1} waveforms: {2:.1f} MB -> {3:.1f} MB".format(
+            sim_id, summary['files'], summary['original_bytes'] / 1e6, summary['archived_bytes'] / 1e6))
+
+        if WAVEFORM_COLD_DIR:
+            migrate_cold_archives(store, WAVEFORM_COLD_DIR, int(WAVEFORM_HOT_BUDGET_GB * 1024 ** 3))
+
+        return summary
+
+    except Exception as e:
+        print("[WaveformArchive] [{0}] ❌ Archival failed: {1}".format(sim_id, e))
+        store.mark_failed(sim_id, str(e))
+        raise
+
+
+def queue_archival(db_path: str, sim_id: str, backup_dir: str):
+    """
+    Queue waveform archival of a finished simulation on the 'arc' stage pool.
+
+    Args:
+        db_path: Path to SQLite database
+        sim_id: Simulation ID
+        backup_dir: Backup directory containing compiled_waveform/
+
+    Returns:
+        concurrent.futures.Future, or None if archival is disabled
+    """
+    from config import WAVEFORM_ARCHIVE
+    from stage_executor import get_stage_executor
+
+    if not WAVEFORM_ARCHIVE or not backup_dir:
+        return None
+
+    WaveformArchiveStore(db_path).queue(sim_id, os.path.join(backup_dir, WAVEFORM_DIR))
+    return get_stage_executor().submit('arc', run_archival, db_path, sim_id,
+                                       label="{0} (waveforms)".format(sim_id))